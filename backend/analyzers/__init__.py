@@ -5,7 +5,14 @@ Oferă funcționalități de analiză AST, dependențe și proiecte complete
 
 from .ast_analyzer import ASTAnalyzer, FunctionInfo, ClassInfo, ImportInfo
 from .dependency_analyzer import DependencyAnalyzer, ModuleDependency, DependencyNode
-from .project_analyzer import ProjectAnalyzer, ProjectMetrics, ProjectReport
+from .project_analyzer import ProjectAnalyzer, ProjectMetrics, ProjectReport, FileAggregate
+from .graph_export import GraphExporter, CallGraphBuilder
+from .history_analyzer import HistoryAnalyzer, BlobSummary, CommitSnapshot
+from .metrics_store import MetricsStore
+from .query_index import AnalysisIndex, QueryError
+from .snapshot_diff import AnalysisSnapshot, SnapshotStore, diff_snapshots
+from .distributed import ShardCoordinator
+from .spill_store import AnalysisSpillStore
 
 __all__ = [
     'ASTAnalyzer',
@@ -17,7 +24,21 @@ __all__ = [
     'DependencyNode',
     'ProjectAnalyzer',
     'ProjectMetrics',
-    'ProjectReport'
+    'ProjectReport',
+    'FileAggregate',
+    'GraphExporter',
+    'CallGraphBuilder',
+    'HistoryAnalyzer',
+    'BlobSummary',
+    'CommitSnapshot',
+    'MetricsStore',
+    'AnalysisIndex',
+    'QueryError',
+    'AnalysisSnapshot',
+    'SnapshotStore',
+    'diff_snapshots',
+    'ShardCoordinator',
+    'AnalysisSpillStore'
 ]
 
 # Versiune pachet
@@ -4,11 +4,50 @@ Oferă funcționalități avansate de parsare și analiză a codului Python
 Versiune actualizată cu remedieri FAZA 1, 3, 4
 """
 import ast
+import hashlib
 import re
-from typing import Dict, List, Any, Optional, Set, Tuple
+import time
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
 
 
+# Apelată cu (fază, secunde) după fiecare analiză: 'parse' (ast.parse) și 'extract' (restul)
+_phase_observer: Optional[Callable[[str, float], None]] = None
+
+
+def set_phase_observer(observer: Optional[Callable[[str, float], None]]):
+    """Înregistrează funcția care primește durata fazelor analizei (ex. pentru metrici)"""
+    global _phase_observer
+    _phase_observer = observer
+
+
+def run_with_phase_timings(function: Callable[..., Any], *args) -> Tuple[Any, List[Tuple[str, float]]]:
+    """
+    Rulează function(*args) într-un proces worker și returnează (rezultat, durate faze)
+
+    Observatorul înregistrat în procesul părinte nu vede analizele din pool
+    (metricile lui sunt în alt proces); duratele sunt colectate aici și
+    raportate în părinte cu report_phase_timings.
+    """
+    global _phase_observer
+    timings: List[Tuple[str, float]] = []
+    previous = _phase_observer
+    _phase_observer = lambda phase, seconds: timings.append((phase, seconds))
+    try:
+        return function(*args), timings
+    finally:
+        _phase_observer = previous
+
+
+def report_phase_timings(outcome: Tuple[Any, List[Tuple[str, float]]]) -> Any:
+    """Transmite observatorului duratele primite de la run_with_phase_timings; returnează rezultatul"""
+    result, timings = outcome
+    if _phase_observer is not None:
+        for phase, seconds in timings:
+            _phase_observer(phase, seconds)
+    return result
+
+
 @dataclass
 class FunctionInfo:
     """Informații detaliate despre o funcție"""
@@ -21,6 +60,9 @@ class FunctionInfo:
     return_type: Optional[str] = None
     is_async: bool = False
     calls: Set[str] = field(default_factory=set)
+    end_line_number: Optional[int] = None
+    qualname: str = ''
+    body_hash: str = ''
 
 
 @dataclass
@@ -34,6 +76,7 @@ class ClassInfo:
     base_classes: List[str] = field(default_factory=list)
     decorators: List[str] = field(default_factory=list)
     is_abstract: bool = False
+    qualname: str = ''
 
 
 @dataclass
@@ -54,19 +97,24 @@ class ASTAnalyzer:
         self.tree = None
         self.source_lines = []
         self._import_nodes = []  # FAZA 1.3 - cache pentru toate nodurile de import
+        self._qualnames = {}  # nod funcție/clasă -> nume calificat
         
     def analyze_code(self, code: str, filename: str = "<unknown>") -> Dict[str, Any]:
         """Analizează complet un cod Python și returnează toate informațiile"""
         self.source_lines = code.split('\n')
         self._import_nodes = []
+        self._qualnames = {}
         
         try:
+            started = time.perf_counter()
             self.tree = ast.parse(code, filename=filename)
+            parsed = time.perf_counter()
             
             # FAZA 1.3 - Colectează toate importurile din întregul arbore
             self._collect_all_imports()
+            self._collect_qualified_names()
             
-            return {
+            result = {
                 'filename': filename,
                 'imports': self._extract_imports(),
                 'imports_detail': self._extract_imports_detail(),  # Pentru compatibilitate cu app.py
@@ -81,6 +129,11 @@ class ASTAnalyzer:
                 'docstring': ast.get_docstring(self.tree),
                 'type_hints': self._extract_type_hints()
             }
+            
+            if _phase_observer is not None:
+                _phase_observer('parse', parsed - started)
+                _phase_observer('extract', time.perf_counter() - parsed)
+            return result
         except SyntaxError as e:
             return {
                 'filename': filename,
@@ -109,6 +162,29 @@ class ASTAnalyzer:
         # Începe vizitarea de la rădăcină
         visit_node(self.tree)
     
+    def release(self):
+        """Eliberează arborele AST și sursa ultimei analize"""
+        self.tree = None
+        self.source_lines = []
+        self._import_nodes = []
+        self._qualnames = {}
+    
+    def _collect_qualified_names(self):
+        """Calculează numele calificate ale funcțiilor și claselor (ca __qualname__)"""
+        def visit_node(node, prefix):
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    qualname = f'{prefix}{child.name}'
+                    self._qualnames[child] = qualname
+                    if isinstance(child, ast.ClassDef):
+                        visit_node(child, f'{qualname}.')
+                    else:
+                        visit_node(child, f'{qualname}.<locals>.')
+                else:
+                    visit_node(child, prefix)
+        
+        visit_node(self.tree, '')
+    
     def _extract_imports(self) -> List[ImportInfo]:
         """Extrage toate importurile cu informații detaliate"""
         imports = []
@@ -177,7 +253,10 @@ class ASTAnalyzer:
                     docstring=ast.get_docstring(node),
                     complexity=self._calculate_complexity(node),  # FAZA 4.1 - calcul îmbunătățit
                     line_number=node.lineno,
-                    is_async=isinstance(node, ast.AsyncFunctionDef)
+                    is_async=isinstance(node, ast.AsyncFunctionDef),
+                    end_line_number=getattr(node, 'end_lineno', None),
+                    qualname=self._qualnames.get(node, node.name),
+                    body_hash=self._body_hash(node)
                 )
                 
                 # Extrage tipul de return dacă există
@@ -204,7 +283,8 @@ class ASTAnalyzer:
                     docstring=ast.get_docstring(node),
                     line_number=node.lineno,
                     base_classes=[self._get_name(base) for base in node.bases],
-                    decorators=self._get_decorators(node)
+                    decorators=self._get_decorators(node),
+                    qualname=self._qualnames.get(node, node.name)
                 )
                 
                 # Verifică dacă e clasă abstractă
@@ -429,6 +509,17 @@ class ASTAnalyzer:
             'max_line_length': max(len(l) for l in lines) if lines else 0
         }
     
+    def _body_hash(self, node: ast.AST) -> str:
+        """Amprenta corpului unei funcții, independentă de nume, poziție și formatare"""
+        # ast.dump omite implicit numerele de linie și coloană
+        digest = hashlib.blake2b(digest_size=8)
+        parts = [node.args, *node.decorator_list, *node.body]
+        if node.returns:
+            parts.append(node.returns)
+        for part in parts:
+            digest.update(ast.dump(part).encode('utf-8'))
+        return digest.hexdigest()
+    
     def _get_decorators(self, node: ast.AST) -> List[str]:
         """Extrage decoratorii aplicați unei funcții sau clase"""
         decorators = []
@@ -4,7 +4,7 @@ Detectează și analizează relațiile dintre module Python
 """
 import os
 import re
-from typing import Dict, List, Set, Tuple, Optional, Any  # FIXED: Added Any import
+from typing import Dict, List, Set, Tuple, Optional, Any, Iterator  # FIXED: Added Any import
 from dataclasses import dataclass, field
 from collections import defaultdict
 import networkx as nx
@@ -45,6 +45,21 @@ class DependencyAnalyzer:
         
     def analyze_dependencies(self, files_data: List[Dict]) -> Dict[str, Any]:
         """Analizează dependențele pentru o listă de fișiere"""
+        self.build_graph(files_data)
+        
+        # Detectează probleme
+        self._detect_circular_dependencies()
+        
+        return {
+            'dependencies': self._serialize_dependencies(),
+            'module_graph': self._get_module_graph(),
+            'circular_dependencies': self.circular_dependencies,
+            'metrics': self._calculate_metrics(),
+            'suggestions': self._generate_suggestions()
+        }
+    
+    def build_graph(self, files_data: List[Dict]):
+        """Construiește doar harta de module și graful, fără metrici și sugestii"""
         # Reset pentru analiză nouă
         self.dependencies.clear()
         self.module_map.clear()
@@ -60,17 +75,6 @@ class DependencyAnalyzer:
         
         # Construiește graful
         self._build_dependency_graph()
-        
-        # Detectează probleme
-        self._detect_circular_dependencies()
-        
-        return {
-            'dependencies': self._serialize_dependencies(),
-            'module_graph': self._get_module_graph(),
-            'circular_dependencies': self.circular_dependencies,
-            'metrics': self._calculate_metrics(),
-            'suggestions': self._generate_suggestions()
-        }
     
     def _build_module_map(self, files_data: List[Dict]):
         """Construiește o hartă a tuturor modulelor din proiect"""
@@ -88,7 +92,8 @@ class DependencyAnalyzer:
         module_name = self._get_module_name(filename)
         content = file_data.get('content', '')
         
-        if not content:
+        # Fișierele fără conținut pot veni cu analiza deja calculată
+        if not content and 'analysis' not in file_data:
             return
         
         # Obține analiza AST din file_data dacă există
@@ -336,32 +341,32 @@ class DependencyAnalyzer:
     def _get_module_graph(self) -> Dict[str, Any]:
         """Obține reprezentarea grafului de module"""
         graph = {
-            'nodes': [],
-            'edges': []
+            'nodes': [{'id': module, **attrs} for module, attrs in self.iter_module_nodes()],
+            'edges': [{'source': source, 'target': target, **attrs}
+                      for source, target, attrs in self.iter_module_edges()]
         }
         
-        # Adaugă noduri
+        return graph
+    
+    def iter_module_nodes(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Generează nodurile grafului de module, unul câte unul"""
         for module, node in self.module_map.items():
-            graph['nodes'].append({
-                'id': module,
+            yield module, {
                 'label': module,
                 'file': node.file_path,
                 'imports_count': len(node.internal_deps) + len(node.external_deps),
                 'imported_by_count': len(node.imported_by),
                 'is_isolated': len(node.imports) == 0 and len(node.imported_by) == 0
-            })
-        
-        # Adaugă muchii
+            }
+    
+    def iter_module_edges(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Generează muchiile interne ale grafului de module, una câte una"""
         for dep in self.dependencies:
             if dep.target in self.module_map:
-                graph['edges'].append({
-                    'source': dep.source,
-                    'target': dep.target,
+                yield dep.source, dep.target, {
                     'type': dep.import_type,
                     'weight': len(dep.imported_names)
-                })
-        
-        return graph
+                }
     
     def get_import_chain(self, start_module: str, end_module: str) -> List[List[str]]:
         """Găsește toate căile de import între două module"""
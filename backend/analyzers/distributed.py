@@ -0,0 +1,516 @@
+"""
+Analiză distribuită pentru Python Forensics
+Un coordonator împarte proiectul în shard-uri adresate după conținut; workerii le preiau prin HTTP
+"""
+import argparse
+import dataclasses
+import hashlib
+import multiprocessing
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable
+
+from .ast_analyzer import ASTAnalyzer
+from .metrics_store import compact_file_metrics, FILE_COLUMNS
+from .project_analyzer import ProjectAnalyzer, ProjectReport, FileAggregate, summarize_file_analysis
+
+
+SHARD_PENDING = 'pending'
+SHARD_LEASED = 'leased'
+SHARD_DONE = 'done'
+SHARD_FAILED = 'failed'
+
+DEFAULT_SHARD_FILES = 200
+DEFAULT_SHARD_BYTES = 4 * 1024 * 1024
+DEFAULT_LEASE_TIMEOUT = 60.0
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Antetul cu token-ul partajat dintre coordonator și workeri
+CLUSTER_TOKEN_HEADER = 'X-Cluster-Token'
+
+
+@dataclass
+class Shard:
+    """Un grup de fișiere analizat de un singur worker"""
+    shard_id: str
+    files: List[Dict[str, Any]]
+    state: str = SHARD_PENDING
+    worker_id: Optional[str] = None
+    lease_expires: float = 0.0
+    attempts: int = 0
+
+
+@dataclass
+class ClusterJob:
+    """O analiză distribuită: shard-urile ei și rezultatele primite"""
+    job_id: str
+    project_name: str
+    shards: Dict[str, Shard]
+    created: float = field(default_factory=time.time)
+    results: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    report: Optional[ProjectReport] = None
+
+    @property
+    def state(self) -> str:
+        states = [shard.state for shard in self.shards.values()]
+        if any(state == SHARD_FAILED for state in states):
+            return SHARD_FAILED
+        if all(state == SHARD_DONE for state in states):
+            return SHARD_DONE
+        return 'running'
+
+    def progress(self) -> Dict[str, int]:
+        counts = {SHARD_PENDING: 0, SHARD_LEASED: 0, SHARD_DONE: 0, SHARD_FAILED: 0}
+        for shard in self.shards.values():
+            counts[shard.state] += 1
+        return counts
+
+
+def analyze_shard_files(files: List[Dict[str, Any]], analyzer: Optional[ASTAnalyzer] = None) -> List[Dict[str, Any]]:
+    """Analizează fișierele unui shard și returnează rezultatele compacte (partea de worker)"""
+    analyzer = analyzer or ASTAnalyzer()
+    results = []
+    for file_data in files:
+        filename = file_data['name']
+        analysis = analyzer.analyze_code(file_data.get('content', ''), filename)
+        aggregate = summarize_file_analysis(filename, analysis)
+        results.append({
+            'name': filename,
+            'path': file_data.get('path', filename),
+            'aggregate': dataclasses.asdict(aggregate),
+            'metrics': compact_file_metrics(analysis),
+            'imports_detail': {} if 'error' in analysis else analysis.get('imports_detail', {})
+        })
+    return results
+
+
+_INT32 = (-2 ** 31, 2 ** 31 - 1)
+
+
+def _is_count(value: Any) -> bool:
+    """Întreg (nu bool) care încape în coloanele 'i' ale MetricsStore"""
+    return isinstance(value, int) and not isinstance(value, bool) and _INT32[0] <= value <= _INT32[1]
+
+
+def validate_shard_result(result: Any) -> Optional[str]:
+    """Motivul pentru care un rezultat nu are forma produsă de analyze_shard_files, sau None"""
+    if not isinstance(result, dict):
+        return 'rezultatul nu este un obiect'
+    path = result.get('path')
+    if not isinstance(result.get('name'), str) or not isinstance(path, str):
+        return 'name și path trebuie să fie text'
+
+    aggregate = result.get('aggregate')
+    if not isinstance(aggregate, dict):
+        return f'{path}: aggregate lipsește'
+    fields = {f.name: f for f in dataclasses.fields(FileAggregate)}
+    unknown = set(aggregate) - set(fields)
+    if unknown:
+        return f'{path}: câmpuri necunoscute în aggregate: {", ".join(sorted(unknown))}'
+    if not isinstance(aggregate.get('filename'), str):
+        return f'{path}: aggregate.filename trebuie să fie text'
+    for name, value in aggregate.items():
+        expected = fields[name].type
+        if expected in (int, 'int') and not _is_count(value):
+            return f'{path}: aggregate.{name} trebuie să fie întreg'
+        if expected in (bool, 'bool') and not isinstance(value, bool):
+            return f'{path}: aggregate.{name} trebuie să fie boolean'
+    if not isinstance(aggregate.get('issues', []), list) or \
+            not all(isinstance(issue, dict) for issue in aggregate.get('issues', [])):
+        return f'{path}: aggregate.issues trebuie să fie o listă de obiecte'
+
+    metrics = result.get('metrics')
+    if not isinstance(metrics, dict):
+        return f'{path}: metrics lipsește'
+    file_metrics = metrics.get('file')
+    if not isinstance(file_metrics, list) or len(file_metrics) != len(FILE_COLUMNS) \
+            or not all(_is_count(value) for value in file_metrics):
+        return f'{path}: metrics.file trebuie să conțină {len(FILE_COLUMNS)} întregi'
+    functions = metrics.get('functions')
+    if not isinstance(functions, list):
+        return f'{path}: metrics.functions trebuie să fie o listă'
+    for row in functions:
+        if (not isinstance(row, list) or len(row) != 5 or not isinstance(row[0], str)
+                or not all(_is_count(value) for value in row[1:4]) or row[4] not in (0, 1)):
+            return f'{path}: rând invalid în metrics.functions'
+
+    imports_detail = result.get('imports_detail', {})
+    if not isinstance(imports_detail, dict):
+        return f'{path}: imports_detail trebuie să fie un obiect'
+    for module, detail in imports_detail.items():
+        if not isinstance(detail, dict) or not isinstance(detail.get('type'), str) \
+                or not isinstance(detail.get('items'), list):
+            return f'{path}: import invalid în imports_detail: {module}'
+    return None
+
+
+class ShardCoordinator:
+    """Împarte proiectele în shard-uri, le închiriază workerilor și combină rezultatele
+
+    Un shard închiriat și neconfirmat până la expirarea lease-ului este dat
+    altui worker, deci căderea unui worker doar întârzie shard-urile lui.
+
+    Cu shared și shared_results setate (două SharedStore), starea job-urilor
+    stă în baza comună și este modificată tranzacțional, iar fișierele
+    shard-urilor și rezultatele (după id-ul shard-ului, limitate de
+    max_entries al tabelului) sunt scrise separat: lease și complete pot fi
+    servite de oricare worker al serverului.
+    """
+
+    def __init__(self, content_loader: Callable[[Dict[str, Any]], str],
+                 lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 max_jobs: int = 20, max_cached_shards: int = 10000,
+                 shared=None, shared_results=None):
+        self.content_loader = content_loader
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.max_jobs = max_jobs
+        self.jobs: 'OrderedDict[str, ClusterJob]' = OrderedDict()
+        # Rezultate după id-ul shard-ului: un shard cu același conținut nu mai este trimis
+        self.shard_results: 'OrderedDict[str, List[Dict[str, Any]]]' = OrderedDict()
+        self.max_cached_shards = max_cached_shards
+        self.lock = threading.Lock()
+        self.shared = shared if shared_results is not None else None
+        self.shared_results = shared_results if shared is not None else None
+        # Cu baza comună: rapoartele combinate de acest proces (combinarea este deterministă)
+        self.reports: 'OrderedDict[str, ProjectReport]' = OrderedDict()
+
+    def create_job(self, files: List[Dict[str, Any]], project_name: str = 'Python Project',
+                   shard_files: int = DEFAULT_SHARD_FILES, shard_bytes: int = DEFAULT_SHARD_BYTES) -> ClusterJob:
+        """Creează o analiză distribuită din fișierele unei structuri"""
+        shards: Dict[str, Shard] = OrderedDict()
+        current, current_size = [], 0
+
+        def close_shard():
+            if not current:
+                return
+            digest = hashlib.sha256()
+            for entry in current:
+                digest.update(f"{entry['path']}\0{entry['sha256']}\0".encode('utf-8'))
+            shard_id = digest.hexdigest()[:16]
+            shards[shard_id] = Shard(shard_id=shard_id, files=list(current))
+
+        # Ordine stabilă: modificarea unui fișier schimbă doar shard-ul lui
+        for file_data in sorted(files, key=lambda f: f.get('path') or f['name']):
+            content = self.content_loader(file_data)
+            if not content:
+                continue
+            entry = {
+                'name': file_data['name'],
+                'path': file_data.get('path') or file_data['name'],
+                'sha256': hashlib.sha256(content.encode('utf-8', errors='surrogatepass')).hexdigest(),
+                'source': file_data
+            }
+            size = len(content)
+            content = None
+
+            if current and (len(current) >= shard_files or current_size + size > shard_bytes):
+                close_shard()
+                current, current_size = [], 0
+            current.append(entry)
+            current_size += size
+        close_shard()
+
+        job = ClusterJob(job_id=uuid.uuid4().hex[:12], project_name=project_name, shards=shards)
+        if self.shared is not None:
+            return self._create_shared_job(job)
+
+        with self.lock:
+            for shard_id, shard in shards.items():
+                cached = self.shard_results.get(shard_id)
+                if cached is not None:
+                    self.shard_results.move_to_end(shard_id)
+                    job.results[shard_id] = cached
+                    shard.state = SHARD_DONE
+
+            self.jobs[job.job_id] = job
+            while len(self.jobs) > self.max_jobs:
+                self.jobs.popitem(last=False)
+
+        return job
+
+    def _create_shared_job(self, job: ClusterJob) -> ClusterJob:
+        """Scrie fișierele shard-urilor, apoi adaugă antetul job-ului (fără fișiere) în baza comună"""
+        for shard_id, shard in job.shards.items():
+            if self.shared_results.get(shard_id) is not None:
+                shard.state = SHARD_DONE
+            else:
+                self.shared.set(self._files_key(job.job_id, shard_id), shard.files)
+        header = dataclasses.replace(job, shards=OrderedDict(
+            (shard_id, dataclasses.replace(shard, files=[])) for shard_id, shard in job.shards.items()
+        ))
+
+        def add(jobs):
+            jobs[job.job_id] = header
+            evicted = []
+            while len(jobs) > self.max_jobs:
+                evicted.append(jobs.popitem(last=False)[0])
+            return evicted
+        for job_id in self._update_jobs(add):
+            self.shared.delete_prefix(f'files:{job_id}:')
+        return header
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Închiriază următorul shard disponibil (nou sau cu lease expirat)"""
+        now = time.time()
+
+        def take(jobs):
+            for job in jobs.values():
+                for shard in job.shards.values():
+                    expired = shard.state == SHARD_LEASED and shard.lease_expires < now
+                    if shard.state != SHARD_PENDING and not expired:
+                        continue
+
+                    if shard.attempts >= self.max_attempts:
+                        shard.state = SHARD_FAILED
+                        continue
+
+                    shard.state = SHARD_LEASED
+                    shard.worker_id = worker_id
+                    shard.attempts += 1
+                    shard.lease_expires = now + self.lease_timeout
+                    return {'job_id': job.job_id, 'shard_id': shard.shard_id, 'lease_timeout': self.lease_timeout,
+                            'files': shard.files}
+            return None
+
+        lease = self._update_jobs(take)
+        if lease is not None and self.shared is not None:
+            lease['files'] = self.shared.get(self._files_key(lease['job_id'], lease['shard_id'])) or []
+        return lease
+
+    def shard_payload(self, lease: Dict[str, Any]) -> Dict[str, Any]:
+        """Adaugă conținutul fișierelor în răspunsul de lease (citit în afara lock-ului)"""
+        return {
+            **lease,
+            'files': [{
+                'name': entry['name'],
+                'path': entry['path'],
+                'content': self.content_loader(entry['source'])
+            } for entry in lease['files']]
+        }
+
+    def complete(self, worker_id: str, job_id: str, shard_id: str, results: List[Dict[str, Any]]) -> bool:
+        """
+        Înregistrează rezultatele unui shard; prima confirmare câștigă
+
+        Raises:
+            ValueError: dacă rezultatele nu au forma produsă de analyze_shard_files
+        """
+        # Validate înainte de combinare: un rezultat malformat ar eșua abia în merge
+        if not isinstance(results, list):
+            raise ValueError('results trebuie să fie o listă')
+        for result in results:
+            problem = validate_shard_result(result)
+            if problem:
+                raise ValueError(f'Rezultat invalid: {problem}')
+
+        if self.shared is not None:
+            files = self.shared.get(self._files_key(job_id, shard_id))
+            if files is None or {result.get('path') for result in results} != {entry['path'] for entry in files}:
+                return False
+            # Rezultatele (valide pentru conținutul shard-ului) se scriu înainte de marcarea shard-ului
+            self.shared_results.set(shard_id, results)
+
+            def finish(jobs):
+                job = jobs.get(job_id)
+                shard = job.shards.get(shard_id) if job else None
+                if shard is None or shard.state in (SHARD_DONE, SHARD_FAILED):
+                    return False
+                shard.state = SHARD_DONE
+                shard.worker_id = worker_id
+                return True
+            return self._update_jobs(finish)
+
+        with self.lock:
+            job = self.jobs.get(job_id)
+            shard = job.shards.get(shard_id) if job else None
+            if shard is None or shard.state in (SHARD_DONE, SHARD_FAILED):
+                return False
+
+            expected = {entry['path'] for entry in shard.files}
+            if {result.get('path') for result in results} != expected:
+                return False
+
+            shard.state = SHARD_DONE
+            shard.worker_id = worker_id
+            job.results[shard_id] = results
+
+            self.shard_results[shard_id] = results
+            self.shard_results.move_to_end(shard_id)
+            while len(self.shard_results) > self.max_cached_shards:
+                self.shard_results.popitem(last=False)
+            return True
+
+    def release(self, job_id: str, shard_id: str):
+        """Repune un shard în coadă (worker-ul a renunțat explicit)"""
+        def put_back(jobs):
+            job = jobs.get(job_id)
+            shard = job.shards.get(shard_id) if job else None
+            if shard is not None and shard.state == SHARD_LEASED:
+                shard.state = SHARD_PENDING
+                shard.worker_id = None
+        self._update_jobs(put_back)
+
+    def get_job(self, job_id: str) -> Optional[ClusterJob]:
+        if self.shared is not None:
+            return (self.shared.get('jobs') or {}).get(job_id)
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def job_status(self, job: ClusterJob) -> Dict[str, Any]:
+        """Starea unei analize distribuite"""
+        with self.lock:
+            return {
+                'job_id': job.job_id,
+                'project_name': job.project_name,
+                'state': job.state,
+                'shards': len(job.shards),
+                'progress': job.progress(),
+                'workers': sorted({s.worker_id for s in job.shards.values() if s.worker_id})
+            }
+
+    def merge(self, job: ClusterJob) -> ProjectReport:
+        """
+        Combină rezultatele shard-urilor în raportul proiectului (o singură dată)
+
+        Raises:
+            RuntimeError: dacă analiza nu este încheiată; cu baza comună și dacă
+                rezultatele unor shard-uri au fost evacuate (shard-urile sunt repuse în coadă)
+        """
+        if self.shared is not None:
+            return self._merge_shared(job)
+
+        with self.lock:
+            if job.report is not None:
+                return job.report
+            if job.state != SHARD_DONE:
+                raise RuntimeError('Analiza distribuită nu este încheiată')
+            # Ordinea shard-urilor (deci a căilor) face combinarea deterministă
+            partials = [result for shard_id in job.shards for result in job.results[shard_id]]
+
+        report = ProjectAnalyzer().merge_partial_results(partials, job.project_name)
+        with self.lock:
+            job.report = report
+        return report
+
+    def _merge_shared(self, job: ClusterJob) -> ProjectReport:
+        with self.lock:
+            report = self.reports.get(job.job_id)
+        if report is not None:
+            return report
+        if job.state != SHARD_DONE:
+            raise RuntimeError('Analiza distribuită nu este încheiată')
+
+        partials, missing = [], set()
+        for shard_id in job.shards:
+            results = self.shared_results.get(shard_id)
+            if results is None:
+                missing.add(shard_id)
+            else:
+                partials.extend(results)
+        if missing:
+            def requeue(jobs):
+                current = jobs.get(job.job_id)
+                for shard_id in missing:
+                    shard = current.shards.get(shard_id) if current else None
+                    if shard is not None and shard.state == SHARD_DONE:
+                        shard.state = SHARD_PENDING
+                        shard.attempts = 0
+            self._update_jobs(requeue)
+            raise RuntimeError(f'Rezultatele a {len(missing)} shard-uri au fost evacuate; shard-urile sunt reanalizate')
+
+        report = ProjectAnalyzer().merge_partial_results(partials, job.project_name)
+        with self.lock:
+            self.reports[job.job_id] = report
+            while len(self.reports) > self.max_jobs:
+                self.reports.popitem(last=False)
+        return report
+
+    def _update_jobs(self, action: Callable[['OrderedDict[str, ClusterJob]'], Any]) -> Any:
+        """action(job-uri) sub lock sau, cu baza comună, într-o tranzacție pe antetele job-urilor"""
+        if self.shared is None:
+            with self.lock:
+                return action(self.jobs)
+
+        def apply(jobs):
+            jobs = jobs if jobs is not None else OrderedDict()
+            return jobs, action(jobs)
+        return self.shared.update('jobs', apply)
+
+    @staticmethod
+    def _files_key(job_id: str, shard_id: str) -> str:
+        return f'files:{job_id}:{shard_id}'
+
+
+def run_worker(coordinator_url: str, worker_id: Optional[str] = None, token: str = '',
+               poll_interval: float = 1.0, max_idle: Optional[float] = None):
+    """Bucla unui worker: lease -> analiză -> confirmare, până la max_idle secunde fără lucru"""
+    import requests
+
+    worker_id = worker_id or f'{socket.gethostname()}-{uuid.uuid4().hex[:6]}'
+    base_url = coordinator_url.rstrip('/')
+    headers = {CLUSTER_TOKEN_HEADER: token} if token else {}
+    session = requests.Session()
+    analyzer = ASTAnalyzer()
+    idle_since = time.time()
+
+    while True:
+        try:
+            response = session.post(f'{base_url}/cluster/lease', json={'worker_id': worker_id},
+                                    headers=headers, timeout=30)
+            response.raise_for_status()
+            shard = response.json().get('shard')
+        except requests.RequestException as e:
+            print(f'[{worker_id}] Coordonator indisponibil: {e}')
+            shard = None
+
+        if not shard:
+            if max_idle is not None and time.time() - idle_since > max_idle:
+                return
+            time.sleep(poll_interval)
+            continue
+
+        results = analyze_shard_files(shard['files'], analyzer)
+        try:
+            session.post(f'{base_url}/cluster/complete', json={
+                'worker_id': worker_id,
+                'job_id': shard['job_id'],
+                'shard_id': shard['shard_id'],
+                'results': results
+            }, headers=headers, timeout=60).raise_for_status()
+        except requests.RequestException as e:
+            # Shard-ul va fi reatribuit la expirarea lease-ului
+            print(f'[{worker_id}] Confirmare eșuată pentru {shard["shard_id"]}: {e}')
+        idle_since = time.time()
+
+
+def main():
+    """Pornește unul sau mai mulți workeri locali: python -m analyzers.distributed --coordinator URL"""
+    parser = argparse.ArgumentParser(description='Worker pentru analiza distribuită Python Forensics')
+    parser.add_argument('--coordinator', required=True, help='URL-ul serverului Flask (coordonatorul)')
+    parser.add_argument('--workers', type=int, default=1, help='Numărul de procese worker pe această mașină')
+    parser.add_argument('--token', default='', help='Token partajat (CLUSTER_TOKEN)')
+    parser.add_argument('--max-idle', type=float, default=None, help='Oprire după atâtea secunde fără shard-uri')
+    args = parser.parse_args()
+
+    processes = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(args.coordinator, f'{socket.gethostname()}-{index}', args.token),
+            kwargs={'max_idle': args.max_idle}
+        )
+        for index in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
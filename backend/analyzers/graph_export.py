@@ -0,0 +1,229 @@
+"""
+Export incremental al grafurilor pentru Python Forensics
+Scrie graful de module și graful de apeluri ca DOT, GraphML sau listă binară de muchii
+"""
+import struct
+from typing import Dict, List, Any, Iterable, Iterator, Callable, Tuple, Set, Union
+
+
+# Dimensiunea aproximativă a unui fragment trimis clientului
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Format binar: antet (magic, versiune), tabel de noduri, apoi muchii până la EOF
+BINARY_MAGIC = b'P4N6'
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct('<4sB3x')
+_BINARY_COUNT = struct.Struct('<I')
+_BINARY_EDGE = struct.Struct('<IIH')
+
+EXPORT_FORMATS = {
+    'dot': {'mimetype': 'text/vnd.graphviz; charset=utf-8', 'extension': 'dot'},
+    'graphml': {'mimetype': 'application/graphml+xml; charset=utf-8', 'extension': 'graphml'},
+    'binary': {'mimetype': 'application/octet-stream', 'extension': 'p4g'}
+}
+
+NodeIter = Iterable[Tuple[str, Dict[str, Any]]]
+EdgeIter = Iterable[Tuple[str, str, Dict[str, Any]]]
+
+
+class CallGraphBuilder:
+    """Construiește graful de apeluri din rezumate compacte ale funcțiilor"""
+
+    def __init__(self):
+        # modul -> [(nume funcție, apeluri)]
+        self.functions: Dict[str, List[Tuple[str, Set[str]]]] = {}
+
+    def add_module(self, module_name: str, functions: Iterable[Any]):
+        """Reține doar numele și apelurile funcțiilor (fără AST sau docstring-uri)"""
+        self.functions[module_name] = [(f.name, set(f.calls)) for f in functions]
+
+    def iter_nodes(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Generează nodurile grafului (o funcție = un nod)"""
+        for module, functions in self.functions.items():
+            seen = set()
+            for name, _ in functions:
+                if name in seen:
+                    continue
+                seen.add(name)
+                yield f'{module}.{name}', {'label': name, 'module': module}
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Generează muchiile caller -> callee rezolvate în interiorul proiectului"""
+        by_name: Dict[str, List[str]] = {}
+        for module, functions in self.functions.items():
+            for name, _ in functions:
+                by_name.setdefault(name, []).append(module)
+
+        for module, functions in self.functions.items():
+            emitted = set()
+            for name, calls in functions:
+                caller = f'{module}.{name}'
+                for call in sorted(calls):
+                    callee = self._resolve_call(call, module, by_name)
+                    if callee and (caller, callee) not in emitted:
+                        emitted.add((caller, callee))
+                        yield caller, callee, {'type': 'call', 'weight': 1}
+
+    def _resolve_call(self, call: str, module: str, by_name: Dict[str, List[str]]) -> str:
+        """Rezolvă un apel la o funcție definită în proiect"""
+        parts = call.split('.')
+        name = parts[-1]
+        modules = by_name.get(name)
+        if not modules:
+            return ''
+
+        if len(parts) == 1:
+            # Apel simplu: preferă modulul curent, apoi o definiție unică
+            if module in modules:
+                return f'{module}.{name}'
+            if len(modules) == 1:
+                return f'{modules[0]}.{name}'
+            return ''
+
+        # Apel calificat: modul.funcție
+        qualifier = parts[-2]
+        for candidate in modules:
+            if candidate == qualifier or candidate.endswith(f'.{qualifier}'):
+                return f'{candidate}.{name}'
+        return ''
+
+
+class GraphExporter:
+    """Serializează incremental un graf, fără a construi documentul în memorie"""
+
+    def __init__(self, name: str, nodes: Callable[[], NodeIter], edges: Callable[[], EdgeIter],
+                 node_keys: Dict[str, str] = None, edge_keys: Dict[str, str] = None):
+        self.name = name
+        self.nodes = nodes
+        self.edges = edges
+        # Atributele exportate în GraphML: nume -> tip ('string', 'int', 'boolean')
+        self.node_keys = node_keys or {'label': 'string'}
+        self.edge_keys = edge_keys or {'type': 'string', 'weight': 'int'}
+
+    def iter_format(self, fmt: str) -> Iterator[bytes]:
+        """Generează fragmentele pentru formatul cerut"""
+        if fmt == 'dot':
+            return _chunked(self.iter_dot())
+        if fmt == 'graphml':
+            return _chunked(self.iter_graphml())
+        if fmt == 'binary':
+            return _chunked(self.iter_binary())
+        raise ValueError(f'Format de export necunoscut: {fmt}')
+
+    def iter_dot(self) -> Iterator[str]:
+        """Generează graful în format Graphviz DOT"""
+        yield f'digraph {_dot_quote(self.name)} {{\n'
+        for node_id, attrs in self.nodes():
+            yield f'  {_dot_quote(node_id)} [label={_dot_quote(attrs.get("label", node_id))}];\n'
+        for source, target, attrs in self.edges():
+            yield f'  {_dot_quote(source)} -> {_dot_quote(target)} [weight={int(attrs.get("weight", 1))}];\n'
+        yield '}\n'
+
+    def iter_graphml(self) -> Iterator[str]:
+        """Generează graful în format GraphML"""
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        for key, key_type in self.node_keys.items():
+            yield f'  <key id="n_{key}" for="node" attr.name="{key}" attr.type="{key_type}"/>\n'
+        for key, key_type in self.edge_keys.items():
+            yield f'  <key id="e_{key}" for="edge" attr.name="{key}" attr.type="{key_type}"/>\n'
+        yield f'  <graph id={_xml_attr(self.name)} edgedefault="directed">\n'
+
+        for node_id, attrs in self.nodes():
+            data = ''.join(
+                f'<data key="n_{key}">{_xml_text(attrs[key])}</data>'
+                for key in self.node_keys if key in attrs
+            )
+            yield f'    <node id={_xml_attr(node_id)}>{data}</node>\n'
+
+        for source, target, attrs in self.edges():
+            data = ''.join(
+                f'<data key="e_{key}">{_xml_text(attrs[key])}</data>'
+                for key in self.edge_keys if key in attrs
+            )
+            yield f'    <edge source={_xml_attr(source)} target={_xml_attr(target)}>{data}</edge>\n'
+
+        yield '  </graph>\n</graphml>\n'
+
+    def iter_binary(self) -> Iterator[bytes]:
+        """Generează lista binară compactă de muchii
+
+        Layout (little-endian): '4s B 3x' antet, 'I' număr noduri,
+        pentru fiecare nod 'I' lungime + nume UTF-8, apoi muchii 'I I H'
+        (index sursă, index destinație, greutate) până la sfârșitul fluxului.
+        """
+        yield _BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION)
+
+        # Tabelul de noduri trebuie cunoscut înaintea muchiilor
+        index: Dict[str, int] = {}
+        names: List[bytes] = []
+        for node_id, _ in self.nodes():
+            if node_id not in index:
+                index[node_id] = len(names)
+                names.append(node_id.encode('utf-8'))
+
+        yield _BINARY_COUNT.pack(len(names))
+        for encoded in names:
+            yield _BINARY_COUNT.pack(len(encoded)) + encoded
+        names.clear()
+
+        for source, target, attrs in self.edges():
+            if source in index and target in index:
+                weight = min(int(attrs.get('weight', 1)), 0xFFFF)
+                yield _BINARY_EDGE.pack(index[source], index[target], weight)
+
+
+def read_binary_edges(data: bytes) -> Tuple[List[str], List[Tuple[int, int, int]]]:
+    """Decodează o listă binară de muchii (util pentru instrumente offline)"""
+    magic, version = _BINARY_HEADER.unpack_from(data, 0)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError('Format binar de graf necunoscut')
+
+    offset = _BINARY_HEADER.size
+    (count,) = _BINARY_COUNT.unpack_from(data, offset)
+    offset += _BINARY_COUNT.size
+
+    nodes = []
+    for _ in range(count):
+        (length,) = _BINARY_COUNT.unpack_from(data, offset)
+        offset += _BINARY_COUNT.size
+        nodes.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    edges = list(_BINARY_EDGE.iter_unpack(data[offset:]))
+    return nodes, edges
+
+
+def _chunked(parts: Iterable[Union[str, bytes]], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Grupează bucățile mici în fragmente de ~chunk_size bytes"""
+    buffer = []
+    size = 0
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _dot_quote(value: Any) -> str:
+    """Citează un identificator DOT"""
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _xml_text(value: Any) -> str:
+    """Escape pentru conținut XML"""
+    if isinstance(value, bool):
+        value = 'true' if value else 'false'
+    return str(value).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _xml_attr(value: Any) -> str:
+    """Escape și citare pentru atribut XML"""
+    return '"' + _xml_text(value).replace('"', '&quot;') + '"'
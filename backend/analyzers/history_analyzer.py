@@ -0,0 +1,323 @@
+"""
+Analiza istoricului git pentru Python Forensics
+Urmărește evoluția metricilor și a grafului de importuri de la un commit la altul
+"""
+import io
+import subprocess
+import threading
+import tokenize
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Set
+
+from .ast_analyzer import ASTAnalyzer, run_with_phase_timings, report_phase_timings
+from .project_analyzer import summarize_file_analysis
+
+
+class GitCommandError(RuntimeError):
+    """O comandă git a eșuat"""
+
+
+@dataclass
+class BlobSummary:
+    """Rezumat compact al unui blob Python, independent de calea la care apare"""
+    total_lines: int = 0
+    total_functions: int = 0
+    total_classes: int = 0
+    total_imports: int = 0
+    complexity_sum: int = 0
+    complexity_max: int = 0
+    documented_entities: int = 0
+    imports: Tuple[str, ...] = ()
+    has_error: bool = False
+
+
+@dataclass
+class CommitSnapshot:
+    """Metricile agregate și modificările grafului pentru un commit"""
+    commit: str
+    timestamp: int
+    metrics: Dict[str, Any]
+    changes: Dict[str, int]
+    edges_added: List[Tuple[str, str]] = field(default_factory=list)
+    edges_removed: List[Tuple[str, str]] = field(default_factory=list)
+    new_blobs: int = 0
+
+
+def summarize_blob(content: str) -> BlobSummary:
+    """Analizează conținutul unui blob și păstrează doar rezumatul (rulează și în procese worker)"""
+    analysis = ASTAnalyzer().analyze_code(content)
+    if 'error' in analysis:
+        return BlobSummary(has_error=True)
+
+    aggregate = summarize_file_analysis('', analysis)
+    return BlobSummary(
+        total_lines=aggregate.total_lines,
+        total_functions=aggregate.total_functions,
+        total_classes=aggregate.total_classes,
+        total_imports=aggregate.total_imports,
+        complexity_sum=aggregate.complexity_sum,
+        complexity_max=aggregate.complexity_max,
+        documented_entities=aggregate.documented_entities,
+        imports=tuple(analysis.get('imports_detail', {}).keys())
+    )
+
+
+def module_name_for_path(path: str) -> str:
+    """Convertește calea unui fișier din repository în nume de modul"""
+    module = path[:-3] if path.endswith('.py') else path
+    module = module.replace('/', '.')
+    if module.endswith('.__init__'):
+        module = module[:-9]
+    return module
+
+
+class HistoryAnalyzer:
+    """Analizor de istoric git cu cache de rezumate după SHA-ul blob-urilor
+
+    O instanță poate fi folosită de mai multe cereri simultan: cache-ul și
+    contorul sunt actualizate sub lock, iar analiza blob-urilor rulează în afara lui.
+    """
+
+    def __init__(self, repo_path: str, git_executable: str = 'git'):
+        self.repo_path = repo_path
+        self.git_executable = git_executable
+        # SHA blob -> rezumat; fiecare blob unic este analizat o singură dată
+        self.blob_cache: Dict[str, BlobSummary] = {}
+        self.blobs_analyzed = 0
+        self.lock = threading.Lock()
+
+    def list_commits(self, rev: str = 'HEAD', max_commits: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Lista (commit, timestamp) de la cel mai vechi la cel mai nou"""
+        args = ['rev-list', '--reverse', '--timestamp']
+        if max_commits is not None:
+            if int(max_commits) <= 0:
+                raise ValueError('max_commits trebuie să fie pozitiv')
+            args.append(f'--max-count={int(max_commits)}')
+        args.extend([rev, '--'])
+
+        commits = []
+        for line in self._git(*args).decode('ascii').splitlines():
+            timestamp, sha = line.split()
+            commits.append((sha, int(timestamp)))
+        return commits
+
+    def list_tree(self, commit: str) -> Dict[str, str]:
+        """Fișierele Python dintr-un commit: cale -> SHA blob"""
+        tree = {}
+        output = self._git('ls-tree', '-r', '-z', '--full-tree', commit)
+        for record in output.split(b'\0'):
+            if not record:
+                continue
+            meta, _, raw_path = record.partition(b'\t')
+            _, object_type, sha = meta.split()
+            path = raw_path.decode('utf-8', errors='surrogateescape')
+            if object_type == b'blob' and path.endswith('.py'):
+                tree[path] = sha.decode('ascii')
+        return tree
+
+    def iter_history(self, rev: str = 'HEAD', max_commits: Optional[int] = None,
+                     executor=None) -> Iterator[CommitSnapshot]:
+        """Generează câte un CommitSnapshot pentru fiecare commit, în ordine cronologică
+
+        Agregatele și muchiile sunt actualizate incremental: doar fișierele
+        modificate față de commit-ul anterior sunt recalculate.
+        """
+        commits = self.list_commits(rev, max_commits)
+
+        previous_tree: Dict[str, str] = {}
+        totals = Counter()
+        complexity_maxima = Counter()
+        file_edges: Dict[str, Set[Tuple[str, str]]] = {}
+        edge_counts = Counter()
+        module_index: Dict[str, List[str]] = {}
+        modules: Set[str] = set()
+
+        with _BlobReader(self.git_executable, self.repo_path) as reader:
+            for sha, timestamp in commits:
+                tree = self.list_tree(sha)
+
+                added = [p for p in tree if p not in previous_tree]
+                removed = [p for p in previous_tree if p not in tree]
+                modified = [p for p in tree if p in previous_tree and previous_tree[p] != tree[p]]
+
+                new_blobs = self._summarize_missing(
+                    sorted({tree[p] for p in added + modified}), reader, executor
+                )
+
+                # Scade fișierele vechi, adună fișierele noi
+                for path in removed + modified:
+                    self._apply_summary(totals, complexity_maxima, self.blob_cache[previous_tree[path]], -1)
+                for path in added + modified:
+                    self._apply_summary(totals, complexity_maxima, self.blob_cache[tree[path]], 1)
+
+                # La schimbarea setului de module, toate importurile se rezolvă din nou
+                if added or removed:
+                    modules = {module_name_for_path(p) for p in tree}
+                    module_index = self._build_module_index(modules)
+                    dirty = list(tree)
+                else:
+                    dirty = modified
+
+                before = set(edge_counts)
+                for path in removed:
+                    for edge in file_edges.pop(path, ()):
+                        edge_counts[edge] -= 1
+                for path in dirty:
+                    for edge in file_edges.get(path, ()):
+                        edge_counts[edge] -= 1
+                    edges = self._resolve_edges(path, self.blob_cache[tree[path]], modules, module_index)
+                    file_edges[path] = edges
+                    for edge in edges:
+                        edge_counts[edge] += 1
+                edge_counts = +edge_counts
+                after = set(edge_counts)
+
+                yield CommitSnapshot(
+                    commit=sha,
+                    timestamp=timestamp,
+                    metrics=self._metrics(totals, complexity_maxima, len(tree)),
+                    changes={'added': len(added), 'modified': len(modified), 'removed': len(removed)},
+                    edges_added=sorted(after - before),
+                    edges_removed=sorted(before - after),
+                    new_blobs=new_blobs
+                )
+                previous_tree = tree
+
+    def _summarize_missing(self, shas: List[str], reader: '_BlobReader', executor=None) -> int:
+        """Analizează doar blob-urile care nu sunt deja în cache; returnează câte au fost adăugate"""
+        with self.lock:
+            missing = [sha for sha in shas if sha not in self.blob_cache]
+        if not missing:
+            return 0
+
+        contents = (_decode_blob(reader.read(sha)) for sha in missing)
+        if executor is not None:
+            summaries = map(report_phase_timings, executor.map(partial(run_with_phase_timings, summarize_blob), contents))
+        else:
+            summaries = map(summarize_blob, contents)
+
+        summaries = list(summaries)
+        added = 0
+        with self.lock:
+            for sha, summary in zip(missing, summaries):
+                # Alt apel poate fi analizat același blob între timp
+                if sha not in self.blob_cache:
+                    self.blob_cache[sha] = summary
+                    added += 1
+            self.blobs_analyzed += added
+        return added
+
+    def _apply_summary(self, totals: Counter, complexity_maxima: Counter, summary: BlobSummary, sign: int):
+        """Adună (sign=1) sau scade (sign=-1) un rezumat din totaluri"""
+        totals['files'] += sign
+        if summary.has_error:
+            return
+        totals['lines'] += sign * summary.total_lines
+        totals['functions'] += sign * summary.total_functions
+        totals['classes'] += sign * summary.total_classes
+        totals['imports'] += sign * summary.total_imports
+        totals['complexity'] += sign * summary.complexity_sum
+        totals['documented'] += sign * summary.documented_entities
+        complexity_maxima[summary.complexity_max] += sign
+
+    def _metrics(self, totals: Counter, complexity_maxima: Counter, total_files: int) -> Dict[str, Any]:
+        """Metricile agregate ale unui commit, în forma ProjectMetrics"""
+        functions = totals['functions']
+        entities = functions + totals['classes']
+        return {
+            'total_files': total_files,
+            'total_lines': totals['lines'],
+            'total_functions': functions,
+            'total_classes': totals['classes'],
+            'total_imports': totals['imports'],
+            'complexity_average': round(totals['complexity'] / functions, 2) if functions else 0.0,
+            'complexity_max': max((value for value, count in complexity_maxima.items() if count > 0), default=0),
+            'documentation_coverage': round(totals['documented'] / entities * 100, 2) if entities else 0.0
+        }
+
+    def _build_module_index(self, modules: Set[str]) -> Dict[str, List[str]]:
+        """Index sufix de nume -> module, pentru importuri relative la rădăcina unui pachet"""
+        index: Dict[str, List[str]] = {}
+        for module in sorted(modules):
+            parts = module.split('.')
+            for start in range(len(parts)):
+                index.setdefault('.'.join(parts[start:]), []).append(module)
+        return index
+
+    def _resolve_edges(self, path: str, summary: BlobSummary, modules: Set[str],
+                       module_index: Dict[str, List[str]]) -> Set[Tuple[str, str]]:
+        """Muchiile interne ale unui fișier: (modul sursă, modul importat)"""
+        source = module_name_for_path(path)
+        edges = set()
+        for imported in summary.imports:
+            if imported in modules:
+                target = imported
+            else:
+                candidates = module_index.get(imported, [])
+                if len(candidates) != 1:
+                    continue
+                target = candidates[0]
+            if target != source:
+                edges.add((source, target))
+        return edges
+
+    def _git(self, *args: str) -> bytes:
+        """Rulează o comandă git în repository și returnează ieșirea"""
+        try:
+            completed = subprocess.run(
+                [self.git_executable, '-C', self.repo_path, *args],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+            )
+        except FileNotFoundError:
+            raise GitCommandError('Executabilul git nu a fost găsit')
+        except subprocess.CalledProcessError as e:
+            message = e.stderr.decode('utf-8', errors='replace').strip()
+            raise GitCommandError(f'git {args[0]} a eșuat: {message}')
+        return completed.stdout
+
+
+class _BlobReader:
+    """Proces `git cat-file --batch` persistent pentru citirea blob-urilor"""
+
+    def __init__(self, git_executable: str, repo_path: str):
+        self.command = [git_executable, '-C', repo_path, 'cat-file', '--batch']
+        self.process = None
+
+    def __enter__(self) -> '_BlobReader':
+        try:
+            self.process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            raise GitCommandError('Executabilul git nu a fost găsit')
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.process:
+            self.process.stdin.close()
+            self.process.wait()
+
+    def read(self, sha: str) -> bytes:
+        """Citește conținutul unui blob"""
+        self.process.stdin.write(f'{sha}\n'.encode('ascii'))
+        self.process.stdin.flush()
+
+        header = self.process.stdout.readline().decode('ascii').split()
+        if len(header) != 3:
+            raise GitCommandError(f'Blob inexistent: {sha}')
+
+        size = int(header[2])
+        data = self.process.stdout.read(size)
+        self.process.stdout.read(1)  # '\n' final
+        return data
+
+
+def _decode_blob(data: bytes) -> str:
+    """Decodează un blob Python respectând declarația de encoding (PEP 263)"""
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError:
+        encoding = 'utf-8'
+    return data.decode(encoding, errors='replace')
@@ -0,0 +1,186 @@
+"""
+Reanaliză incrementală pentru Python Forensics
+Manifest per proiect și cache de rezultate per fișier, adresat după conținut
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+from .ast_analyzer import ASTAnalyzer
+
+
+# Se incrementează când se schimbă forma rezultatelor produse de analizoare
+ANALYZER_VERSION = '1.2.0'
+
+
+def content_hash(content: str) -> str:
+    """Hash SHA-256 al conținutului unui fișier"""
+    return hashlib.sha256(content.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+
+def analysis_key(content: str) -> str:
+    """Cheia de cache a analizei: versiunea analizorului + hash-ul conținutului"""
+    return key_for_hash(content_hash(content))
+
+
+def key_for_hash(digest: str) -> str:
+    """Cheia de cache pentru un hash SHA-256 deja calculat"""
+    return f'{ANALYZER_VERSION}:{digest}'
+
+
+def file_fingerprint(file_data: Dict[str, Any]) -> Optional[str]:
+    """Amprenta trimisă de client (hash sau mtime), dacă există"""
+    for field_name in ('sha256', 'hash'):
+        if file_data.get(field_name):
+            return f'{field_name}:{file_data[field_name]}'
+    for field_name in ('mtime', 'modified', 'lastModified'):
+        if file_data.get(field_name) is not None:
+            return f'mtime:{file_data[field_name]}'
+    return None
+
+
+def build_file_result(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Construiește rezultatul reutilizabil al unui fișier analizat"""
+    complexity = None
+    functions = analysis.get('functions', []) if 'error' not in analysis else []
+    if functions:
+        total_complexity = sum(f.complexity for f in functions)
+        complexity = {
+            'total': total_complexity,
+            'average': round(total_complexity / len(functions), 2),
+            'max': max(f.complexity for f in functions)
+        }
+
+    return {
+        'analysis': analysis,
+        'complexity': complexity,
+        'imports': list(analysis.get('imports_detail', {}).keys())
+    }
+
+
+def analyze_source(content: str, filename: str) -> Dict[str, Any]:
+    """Analizează un fișier și returnează rezultatul reutilizabil (rulează și în procese worker)"""
+    return build_file_result(ASTAnalyzer().analyze_code(content, filename))
+
+
+@dataclass
+class ManifestEntry:
+    """Starea unui fișier la ultima analiză a proiectului"""
+    path: str
+    size: int
+    fingerprint: Optional[str]
+    analysis_key: str
+
+    def matches(self, size: int, fingerprint: Optional[str]) -> bool:
+        """Verifică dacă fișierul este neschimbat față de manifest"""
+        return fingerprint is not None and self.size == size and self.fingerprint == fingerprint
+
+
+class AnalysisResultCache:
+    """Cache LRU de rezultate per fișier, partajat între proiecte
+
+    Cu shared setat (un SharedStore), rezultatele sunt scrise și într-o bază
+    comună tuturor proceselor serverului: un rezultat calculat de un worker
+    devine hit în ceilalți. Cheile sunt adresate după conținut, deci copia
+    locală nu poate deveni învechită.
+    """
+
+    def __init__(self, max_entries: int = 5000, shared=None):
+        self.cache = OrderedDict()
+        self.max_entries = max_entries
+        self.shared = shared
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+
+        result = self.shared.get(key) if self.shared is not None else None
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.shared_hits += 1
+            self._store(key, result)
+            return result
+
+    def set(self, key: str, result: Dict[str, Any]):
+        with self.lock:
+            self._store(key, result)
+        if self.shared is not None:
+            self.shared.set(key, result)
+
+    def size(self) -> int:
+        if self.shared is not None:
+            return self.shared.count()
+        with self.lock:
+            return len(self.cache)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def _store(self, key: str, result: Dict[str, Any]):
+        if key in self.cache:
+            self.cache.move_to_end(key)
+        self.cache[key] = result
+
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+
+class ProjectManifest:
+    """Manifestul unui proiect: cale -> (mărime, amprentă, cheie analiză)"""
+
+    def __init__(self, project_key: str):
+        self.project_key = project_key
+        self.entries: Dict[str, ManifestEntry] = {}
+        self.lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        with self.lock:
+            return self.entries.get(path)
+
+    def replace(self, entries: Dict[str, ManifestEntry]) -> List[str]:
+        """Înlocuiește manifestul și returnează căile eliminate"""
+        with self.lock:
+            removed = [path for path in self.entries if path not in entries]
+            self.entries = entries
+            return removed
+
+
+class ManifestStore:
+    """Manifestele proiectelor, limitate ca număr (LRU)"""
+
+    def __init__(self, max_projects: int = 100):
+        self.manifests = OrderedDict()
+        self.max_projects = max_projects
+        self.lock = threading.Lock()
+
+    def get(self, project_key: str) -> ProjectManifest:
+        """Returnează manifestul proiectului, creându-l dacă nu există"""
+        with self.lock:
+            manifest = self.manifests.get(project_key)
+            if manifest is None:
+                manifest = ProjectManifest(project_key)
+                self.manifests[project_key] = manifest
+            self.manifests.move_to_end(project_key)
+
+            while len(self.manifests) > self.max_projects:
+                self.manifests.popitem(last=False)
+
+            return manifest
+
+    def discard(self, project_key: str):
+        with self.lock:
+            self.manifests.pop(project_key, None)
@@ -0,0 +1,274 @@
+"""
+Stocare columnară a metricilor pentru Python Forensics
+Metrici per funcție și per fișier în tablouri tipizate, cu agregate vectorizate
+"""
+import bisect
+import math
+from array import array
+from typing import Dict, List, Any, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Coloanele per funcție și tipul lor (cod array.array)
+FUNCTION_COLUMNS = {
+    'complexity': 'i',
+    'lines': 'i',
+    'args': 'i',
+    'documented': 'b',
+    'file_index': 'i'
+}
+
+# Coloanele per fișier
+FILE_COLUMNS = {
+    'total_lines': 'i',
+    'code_lines': 'i',
+    'functions': 'i',
+    'classes': 'i',
+    'documented_classes': 'i',
+    'imports': 'i'
+}
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def compact_file_metrics(analysis: Dict[str, Any]) -> Dict[str, List]:
+    """Metricile unui fișier ca liste simple (serializabile JSON, ieftine între procese)
+
+    'file' urmează ordinea FILE_COLUMNS; 'functions' conține rânduri
+    [nume, complexitate, linii, argumente, documentat].
+    """
+    if 'error' in analysis:
+        return {'file': [0] * len(FILE_COLUMNS), 'functions': []}
+
+    functions = analysis.get('functions', [])
+    classes = analysis.get('classes', [])
+    metrics = analysis.get('metrics', {})
+
+    return {
+        'file': [
+            metrics.get('total_lines', 0),
+            metrics.get('code_lines', 0),
+            len(functions),
+            len(classes),
+            sum(1 for c in classes if c.docstring),
+            len(analysis.get('imports', []))
+        ],
+        'functions': [
+            [
+                f.name,
+                f.complexity,
+                (f.end_line_number or f.line_number) - f.line_number + 1,
+                len(f.args),
+                1 if f.docstring else 0
+            ]
+            for f in functions
+        ]
+    }
+
+
+class MetricsStore:
+    """Metrici per funcție și per fișier păstrate în coloane tipizate
+
+    Coloanele sunt array.array (adăugare ieftină, memorie compactă); cu NumPy
+    instalat sunt copiate într-un ndarray la citire și agregatele sunt vectorizate.
+    """
+
+    def __init__(self):
+        self.files: List[str] = []
+        self.function_names: List[str] = []
+        self.function_columns = {name: array(code) for name, code in FUNCTION_COLUMNS.items()}
+        self.file_columns = {name: array(code) for name, code in FILE_COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.function_names)
+
+    @property
+    def file_count(self) -> int:
+        return len(self.files)
+
+    def estimated_bytes(self) -> int:
+        """Memoria coloanelor și a numelor (aproximativ)"""
+        columns = list(self.function_columns.values()) + list(self.file_columns.values())
+        data = sum(len(values) * values.itemsize for values in columns)
+        names = sum(len(name) + 56 for name in self.function_names) + sum(len(name) + 56 for name in self.files)
+        return data + names
+
+    def add_file(self, filename: str, analysis: Dict[str, Any]) -> int:
+        """Adaugă metricile unui fișier analizat și returnează indexul fișierului"""
+        return self.add_compact(filename, compact_file_metrics(analysis))
+
+    def add_compact(self, filename: str, compact: Dict[str, List]) -> int:
+        """Adaugă metricile în forma compactă produsă de compact_file_metrics"""
+        file_index = len(self.files)
+        self.files.append(filename)
+
+        for name, value in zip(FILE_COLUMNS, compact['file']):
+            self.file_columns[name].append(value)
+
+        columns = self.function_columns
+        for name, complexity, lines, args, documented in compact['functions']:
+            self.function_names.append(name)
+            columns['complexity'].append(complexity)
+            columns['lines'].append(lines)
+            columns['args'].append(args)
+            columns['documented'].append(documented)
+            columns['file_index'].append(file_index)
+
+        return file_index
+
+    def column(self, name: str):
+        """Coloana cerută: ndarray dacă NumPy este disponibil, altfel array.array
+
+        ndarray-ul este o copie: o vedere (np.frombuffer) ar ține exportat
+        buffer-ul array.array, iar un add_file ulterior ar ridica BufferError.
+        """
+        if name in self.function_columns:
+            values = self.function_columns[name]
+        elif name in self.file_columns:
+            values = self.file_columns[name]
+        else:
+            raise ValueError(f'Coloană necunoscută: {name}')
+
+        if np is not None:
+            return np.array(values, dtype=values.typecode)
+        return values
+
+    def total(self, name: str) -> int:
+        """Suma unei coloane"""
+        values = self.column(name)
+        return int(values.sum()) if np is not None else sum(values)
+
+    def maximum(self, name: str) -> int:
+        """Maximul unei coloane (0 pentru o coloană goală)"""
+        values = self.column(name)
+        if not len(values):
+            return 0
+        return int(values.max()) if np is not None else max(values)
+
+    def percentiles(self, name: str = 'complexity',
+                    percents: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """
+        Percentilele unei coloane, cu interpolare liniară (ca numpy.percentile)
+
+        Fără numpy, coloana este sortată în Python: O(n log n) per apel, de ordinul
+        secundelor pentru ~1M de funcții, față de milisecunde cu numpy.
+
+        Raises:
+            ValueError: dacă un procent nu este un număr între 0 și 100
+        """
+        for p in percents:
+            if isinstance(p, bool) or not isinstance(p, (int, float)) or not 0 <= p <= 100:
+                raise ValueError(f'Percentilă invalidă: {p!r} (0-100)')
+        values = self.column(name)
+        if not len(values):
+            return {f'p{_percent_label(p)}': 0.0 for p in percents}
+
+        if np is not None:
+            results = np.percentile(values, percents)
+        else:
+            ordered = sorted(values)
+            results = [_interpolate(ordered, p) for p in percents]
+
+        return {f'p{_percent_label(p)}': round(float(r), 2) for p, r in zip(percents, results)}
+
+    def histogram(self, name: str = 'complexity', bins: int = 10) -> Dict[str, List]:
+        """Histograma unei coloane: limitele intervalelor și numărul de valori din fiecare"""
+        values = self.column(name)
+        if not len(values):
+            return {'edges': [], 'counts': []}
+
+        if np is not None:
+            counts, edges = np.histogram(values, bins=bins)
+            return {'edges': [round(float(e), 2) for e in edges], 'counts': counts.tolist()}
+
+        low, high = min(values), max(values)
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        width = (high - low) / bins
+        edges = [low + i * width for i in range(bins + 1)]
+        counts = [0] * bins
+        for value in values:
+            # Ultimul interval este închis la dreapta, ca în numpy.histogram
+            position = min(bisect.bisect_right(edges, value) - 1, bins - 1)
+            counts[position] += 1
+        return {'edges': [round(e, 2) for e in edges], 'counts': counts}
+
+    def select_functions(self, name: str = 'complexity', minimum: Optional[float] = None,
+                         maximum: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Funcțiile cu valoarea coloanei în [minimum, maximum], descrescător după valoare"""
+        if name not in self.function_columns:
+            raise ValueError(f'Coloană per funcție necunoscută: {name}')
+
+        values = self.column(name)
+        file_indexes = self.column('file_index')
+
+        if np is not None:
+            mask = np.ones(len(values), dtype=bool)
+            if minimum is not None:
+                mask &= values >= minimum
+            if maximum is not None:
+                mask &= values <= maximum
+            selected = np.flatnonzero(mask)
+            # Sortare stabilă: la valori egale se păstrează ordinea fișierelor
+            selected = selected[np.argsort(-values[selected].astype(np.int64), kind='stable')][:limit]
+            indexes = selected.tolist()
+        else:
+            indexes = [
+                i for i, value in enumerate(values)
+                if (minimum is None or value >= minimum) and (maximum is None or value <= maximum)
+            ]
+            indexes.sort(key=lambda i: -values[i])
+            indexes = indexes[:limit]
+
+        return [{
+            'file': self.files[file_indexes[i]],
+            'function': self.function_names[i],
+            name: int(values[i])
+        } for i in indexes]
+
+    def count_above(self, name: str, threshold: float) -> int:
+        """Numărul de valori strict peste prag"""
+        values = self.column(name)
+        if np is not None:
+            return int(np.count_nonzero(values > threshold))
+        return sum(1 for value in values if value > threshold)
+
+    def summary(self, percents: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """Agregatele principale ale proiectului, calculate pe coloane"""
+        function_count = len(self)
+        class_count = self.total('classes')
+        documented = self.total('documented') + self.total('documented_classes')
+        complexity_sum = self.total('complexity')
+
+        return {
+            'total_files': self.file_count,
+            'total_lines': self.total('total_lines'),
+            'total_functions': function_count,
+            'total_classes': class_count,
+            'total_imports': self.total('imports'),
+            'complexity_average': round(complexity_sum / function_count, 2) if function_count else 0.0,
+            'complexity_max': self.maximum('complexity'),
+            'complexity_percentiles': self.percentiles('complexity', percents),
+            'documentation_coverage': (
+                round(documented / (function_count + class_count) * 100, 2)
+                if function_count + class_count else 0.0
+            )
+        }
+
+
+def _percent_label(percent: float) -> str:
+    """Eticheta unei percentile: 50 -> '50', 99.9 -> '99.9'"""
+    return str(int(percent)) if float(percent).is_integer() else str(percent)
+
+
+def _interpolate(ordered: List[float], percent: float) -> float:
+    """Percentila dintr-o listă sortată, cu interpolare liniară între vecini"""
+    position = (len(ordered) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    fraction = position - lower
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
@@ -3,11 +3,26 @@ Analizor pentru proiecte Python complete
 Coordonează analiza AST și dependențe pentru întregul proiect
 """
 import os
-from typing import Dict, List, Any, Optional, Set
-from dataclasses import dataclass, field
+from collections import deque
+from contextlib import nullcontext
+from functools import partial
+from typing import Dict, List, Any, Optional, Set, Iterator, Iterable, Tuple, Callable
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from .ast_analyzer import ASTAnalyzer
+from concurrent.futures import ProcessPoolExecutor
+from .ast_analyzer import ASTAnalyzer, run_with_phase_timings, report_phase_timings
 from .dependency_analyzer import DependencyAnalyzer
+from .metrics_store import MetricsStore
+from .spill_store import AnalysisSpillStore
+
+
+# Praguri folosite la detectarea problemelor per fișier
+HIGH_COMPLEXITY_THRESHOLD = 10
+LARGE_FILE_THRESHOLD = 500
+TOO_MANY_IMPORTS_THRESHOLD = 20
+
+# Ordinea în care apar problemele per fișier în raport
+FILE_ISSUE_ORDER = ('high_complexity', 'large_file', 'too_many_imports')
 
 
 @dataclass
@@ -20,6 +35,7 @@ class ProjectMetrics:
     total_imports: int = 0
     complexity_average: float = 0.0
     complexity_max: int = 0
+    complexity_percentiles: Dict[str, float] = field(default_factory=dict)
     test_coverage: Optional[float] = None
     documentation_coverage: float = 0.0
     code_duplication: float = 0.0
@@ -38,35 +54,289 @@ class ProjectReport:
     recommendations: List[Dict[str, Any]]
 
 
+@dataclass
+class FileAggregate:
+    """Agregate parțiale ale unui fișier, combinabile determinist între procese"""
+    filename: str
+    total_lines: int = 0
+    total_functions: int = 0
+    total_classes: int = 0
+    total_imports: int = 0
+    complexity_sum: int = 0
+    complexity_max: int = 0
+    documented_entities: int = 0
+    poorly_documented: bool = False
+    issues: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def summarize_file_analysis(filename: str, analysis: Dict[str, Any]) -> FileAggregate:
+    """Calculează agregatele și problemele unui singur fișier analizat"""
+    aggregate = FileAggregate(filename=filename)
+    if 'error' in analysis:
+        return aggregate
+    
+    functions = analysis['functions']
+    classes = analysis['classes']
+    metrics = analysis['metrics']
+    
+    aggregate.total_lines = metrics['total_lines']
+    aggregate.total_functions = len(functions)
+    aggregate.total_classes = len(classes)
+    aggregate.total_imports = len(analysis['imports'])
+    aggregate.complexity_sum = sum(f.complexity for f in functions)
+    aggregate.complexity_max = max((f.complexity for f in functions), default=0)
+    aggregate.documented_entities = (
+        len([f for f in functions if f.docstring]) +
+        len([c for c in classes if c.docstring])
+    )
+    
+    # Fișiere cu complexitate ridicată
+    high_complexity_funcs = [f for f in functions if f.complexity > HIGH_COMPLEXITY_THRESHOLD]
+    if high_complexity_funcs:
+        aggregate.issues.append({
+            'type': 'high_complexity',
+            'severity': 'medium',
+            'message': f"{filename}: {len(high_complexity_funcs)} funcții cu complexitate > {HIGH_COMPLEXITY_THRESHOLD}",
+            'files': [filename],
+            'functions': [f.name for f in high_complexity_funcs],
+            'recommendation': 'Simplificați funcțiile complexe'
+        })
+    
+    # Fișiere prea mari
+    if metrics['code_lines'] > LARGE_FILE_THRESHOLD:
+        aggregate.issues.append({
+            'type': 'large_file',
+            'severity': 'low',
+            'message': f"{filename}: {metrics['code_lines']} linii de cod",
+            'files': [filename],
+            'recommendation': 'Considerați împărțirea în module mai mici'
+        })
+    
+    # Module cu prea multe importuri
+    if aggregate.total_imports > TOO_MANY_IMPORTS_THRESHOLD:
+        aggregate.issues.append({
+            'type': 'too_many_imports',
+            'severity': 'medium',
+            'message': f"{filename}: {aggregate.total_imports} importuri",
+            'files': [filename],
+            'recommendation': 'Revizuiți și reduceți dependențele'
+        })
+    
+    # Lipsa documentației
+    total_items = aggregate.total_functions + aggregate.total_classes
+    if total_items > 5 and aggregate.documented_entities / total_items < 0.3:
+        aggregate.poorly_documented = True
+    
+    return aggregate
+
+
+def analyze_file_partial(ast_analyzer: ASTAnalyzer, 
+                         file_data: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any], FileAggregate]]:
+    """Analizează un fișier și returnează (nume, analiză, agregate parțiale)"""
+    filename = file_data.get('name', '')
+    content = file_data.get('content', '')
+    
+    if not content or content == '[File too large - content not loaded]':
+        return None
+    
+    analysis = ast_analyzer.analyze_code(content, filename)
+    return filename, analysis, summarize_file_analysis(filename, analysis)
+
+
+# Analizor reutilizat de fiecare proces worker
+_worker_analyzer: Optional[ASTAnalyzer] = None
+
+
+def _analyze_file_worker(file_data: Dict[str, Any]):
+    """Punct de intrare pentru procesele worker"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = ASTAnalyzer()
+    result = analyze_file_partial(_worker_analyzer, file_data)
+    _worker_analyzer.release()
+    return result
+
+
 class ProjectAnalyzer:
     """Analizor principal pentru proiecte Python"""
     
-    def __init__(self, project_root: str = ""):
+    def __init__(self, project_root: str = "", workers: int = 1):
         self.project_root = project_root
         self.ast_analyzer = ASTAnalyzer()
         self.dependency_analyzer = DependencyAnalyzer(project_root)
         self.file_analyses = {}
+        self.file_aggregates: Dict[str, FileAggregate] = {}
+        self.metrics_store = MetricsStore()
         self.project_metrics = ProjectMetrics()
+        # 1 = analiză secvențială, 0 sau negativ = câte un proces per nucleu
+        self.workers = workers
         
     def analyze_project(self, files_data: List[Dict[str, Any]], 
-                       project_name: str = "Python Project") -> ProjectReport:
-        """Analizează complet un proiect Python"""
+                       project_name: str = "Python Project",
+                       workers: Optional[int] = None,
+                       progress: Optional[Callable[[int, int], None]] = None,
+                       executor=None) -> ProjectReport:
+        """Analizează complet un proiect Python
+        
+        progress(fișiere analizate, total) este apelat după fiecare fișier; o
+        excepție ridicată de el oprește analiza (anulare cooperativă).
+        executor este un pool de procese existent (ex. cel al aplicației); fără
+        el, cu workers > 1, se creează un pool doar pentru acest apel.
+        """
         # Reset pentru analiză nouă
-        self.file_analyses.clear()
-        self.project_metrics = ProjectMetrics()
+        self._reset()
         
         # Analizează fiecare fișier Python
         python_files = [f for f in files_data if f.get('type') == 'python']
         self.project_metrics.total_files = len(python_files)
         
-        for file_data in python_files:
-            self._analyze_file(file_data)
+        # Rezultatele vin în ordinea fișierelor, indiferent de numărul de procese
+        dependency_files = []
+        results = self._iter_file_results(python_files, workers, executor)
+        for index, (file_data, result) in enumerate(zip(python_files, results), 1):
+            if result is not None:
+                self._record_file_result(*result)
+                # Importurile ajung la analizorul de dependențe ca în analiza streaming și distribuită
+                filename, analysis, _ = result
+                dependency_files.append({
+                    'name': filename,
+                    'path': file_data.get('path', filename),
+                    'type': 'python',
+                    'analysis': {'imports_detail': analysis.get('imports_detail', {})}
+                })
+            if progress is not None:
+                progress(index, len(python_files))
+
+        return self._build_report(project_name, dependency_files)
+    
+    def analyze_project_stream(self, files: Iterable[Dict[str, Any]],
+                               project_name: str = "Python Project",
+                               workers: Optional[int] = None,
+                               spill_path: Optional[str] = None,
+                               executor=None,
+                               keep_analyses: bool = True) -> ProjectReport:
+        """Analizează un proiect în mod streaming, cu memorie limitată
+        
+        Fișierele sunt consumate dintr-un iterator (conținutul poate fi citit
+        leneș). Arborele AST și sursa sunt eliberate imediat după extragere,
+        analizele complete ajung într-un AnalysisSpillStore pe disc, iar în RAM
+        rămân doar agregatele, coloanele de metrici și importurile.
+        
+        Cu keep_analyses=False analizele complete nu sunt păstrate deloc:
+        file_analyses conține doar agregatele per fișier (ca merge_partial_results).
+        """
+        self._reset()
+        spill_store = AnalysisSpillStore(spill_path) if keep_analyses else None
+        if spill_store is not None:
+            self.file_analyses = spill_store
         
+        dependency_files = []
+        total_files = 0
+        
+        for file_data, result in self._iter_stream_results(files, workers, executor):
+            total_files += 1
+            if result is None:
+                continue
+            
+            filename, analysis, aggregate = result
+            if spill_store is not None:
+                spill_store.put(filename, analysis)
+            else:
+                self.file_analyses[filename] = asdict(aggregate)
+            self.file_aggregates[filename] = aggregate
+            self.metrics_store.add_file(filename, analysis)
+            dependency_files.append({
+                'name': filename,
+                'path': file_data.get('path', filename),
+                'type': 'python',
+                'analysis': {'imports_detail': analysis.get('imports_detail', {})}
+            })
+        
+        if spill_store is not None:
+            spill_store.flush()
+        self.project_metrics.total_files = total_files
+        return self._build_report(project_name, dependency_files)
+    
+    def _iter_stream_results(self, files: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                             executor=None):
+        """Generează (metadate fișier, rezultat) cu un număr limitat de fișiere în lucru"""
+        workers = self._resolve_workers(workers)
+        
+        def metadata(file_data):
+            # Conținutul nu este păstrat după trimiterea la analiză
+            return {k: v for k, v in file_data.items() if k != 'content'}
+        
+        python_files = (f for f in files if f.get('type') == 'python')
+        
+        if executor is None and workers <= 1:
+            for file_data in python_files:
+                result = analyze_file_partial(self.ast_analyzer, file_data)
+                self.ast_analyzer.release()
+                yield metadata(file_data), result
+            return
+        
+        # executor.map ar consuma tot iteratorul; fereastra limitează memoria
+        pending = deque()
+        max_pending = max(workers, 1) * 2
+        pool = nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=workers)
+        with pool as executor:
+            try:
+                for file_data in python_files:
+                    pending.append((
+                        metadata(file_data), executor.submit(run_with_phase_timings, _analyze_file_worker, file_data)
+                    ))
+                    file_data = None
+                    while len(pending) > max_pending:
+                        done_metadata, future = pending.popleft()
+                        yield done_metadata, report_phase_timings(future.result())
+                while pending:
+                    done_metadata, future = pending.popleft()
+                    yield done_metadata, report_phase_timings(future.result())
+            finally:
+                # Analiza oprită (excepție sau anulare): fișierele încă neîncepute nu mai ocupă pool-ul comun
+                for _, future in pending:
+                    future.cancel()
+    
+    def merge_partial_results(self, partials: List[Dict[str, Any]],
+                              project_name: str = "Python Project") -> ProjectReport:
+        """Construiește raportul din rezultate compacte produse în altă parte (ex. workeri distribuiți)
+        
+        Fiecare rezultat conține 'name', 'path', 'aggregate' (FileAggregate ca dict),
+        'metrics' (vezi compact_file_metrics) și 'imports_detail'.
+        """
+        self._reset()
+        self.project_metrics.total_files = len(partials)
+        
+        dependency_files = []
+        for partial in partials:
+            filename = partial['name']
+            aggregate = FileAggregate(**partial['aggregate'])
+            self.file_aggregates[filename] = aggregate
+            self.file_analyses[filename] = partial['aggregate']
+            self.metrics_store.add_compact(filename, partial['metrics'])
+            dependency_files.append({
+                'name': filename,
+                'path': partial.get('path', filename),
+                'type': 'python',
+                'analysis': {'imports_detail': partial.get('imports_detail', {})}
+            })
+        
+        return self._build_report(project_name, dependency_files)
+    
+    def _reset(self):
+        """Golește starea analizei anterioare (raportul anterior își păstrează datele)"""
+        self.file_analyses = {}
+        self.file_aggregates = {}
+        self.metrics_store = MetricsStore()
+        self.project_metrics = ProjectMetrics()
+    
+    def _build_report(self, project_name: str, dependency_files: List[Dict[str, Any]]) -> ProjectReport:
+        """Metrici agregate, dependențe, probleme și recomandări pentru fișierele înregistrate"""
         # Calculează metrici agregate
         self._calculate_aggregate_metrics()
         
         # Analizează dependențele
-        dependency_analysis = self.dependency_analyzer.analyze_dependencies(python_files)
+        dependency_analysis = self.dependency_analyzer.analyze_dependencies(dependency_files)
         
         # Detectează probleme
         issues = self._detect_issues(dependency_analysis)
@@ -86,58 +356,57 @@ class ProjectAnalyzer:
             recommendations=recommendations
         )
     
+    def _resolve_workers(self, workers: Optional[int]) -> int:
+        """Determină numărul efectiv de procese"""
+        if workers is None:
+            workers = self.workers
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        return workers
+    
+    def _iter_file_results(self, python_files: List[Dict[str, Any]], 
+                           workers: Optional[int] = None,
+                           executor=None) -> Iterator[Optional[Tuple[str, Dict[str, Any], FileAggregate]]]:
+        """Analizează fișierele secvențial sau în procese separate (pool-ul primit sau unul propriu)"""
+        workers = self._resolve_workers(workers)
+        
+        if (executor is not None or workers > 1) and len(python_files) > 1:
+            # Loturi suficient de mari pentru a amortiza transferul între procese
+            chunksize = max(1, len(python_files) // (max(workers, 1) * 4))
+            pool = nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=workers)
+            with pool as executor:
+                outcomes = executor.map(
+                    partial(run_with_phase_timings, _analyze_file_worker), python_files, chunksize=chunksize
+                )
+                yield from map(report_phase_timings, outcomes)
+        else:
+            for file_data in python_files:
+                yield analyze_file_partial(self.ast_analyzer, file_data)
+    
     def _analyze_file(self, file_data: Dict[str, Any]):
         """Analizează un singur fișier Python"""
-        filename = file_data.get('name', '')
-        content = file_data.get('content', '')
-        
-        if not content or content == '[File too large - content not loaded]':
-            return
-        
-        # Analiză AST
-        analysis = self.ast_analyzer.analyze_code(content, filename)
-        
-        # Salvează analiza
+        result = analyze_file_partial(self.ast_analyzer, file_data)
+        if result is not None:
+            self._record_file_result(*result)
+    
+    def _record_file_result(self, filename: str, analysis: Dict[str, Any], aggregate: FileAggregate):
+        """Salvează analiza și agregatele parțiale ale unui fișier"""
         self.file_analyses[filename] = analysis
-        
-        # Actualizează metrici globale
-        if 'error' not in analysis:
-            self.project_metrics.total_lines += analysis['metrics']['total_lines']
-            self.project_metrics.total_functions += len(analysis['functions'])
-            self.project_metrics.total_classes += len(analysis['classes'])
-            self.project_metrics.total_imports += len(analysis['imports'])
-            
-            # Complexitate
-            for func in analysis['functions']:
-                complexity = func.complexity
-                if complexity > self.project_metrics.complexity_max:
-                    self.project_metrics.complexity_max = complexity
+        self.file_aggregates[filename] = aggregate
+        self.metrics_store.add_file(filename, analysis)
     
     def _calculate_aggregate_metrics(self):
-        """Calculează metrici agregate pentru proiect"""
-        if self.project_metrics.total_functions > 0:
-            total_complexity = sum(
-                sum(f.complexity for f in analysis['functions'])
-                for analysis in self.file_analyses.values()
-                if 'error' not in analysis
-            )
-            self.project_metrics.complexity_average = round(
-                total_complexity / self.project_metrics.total_functions, 2
-            )
-        
-        # Calculează acoperirea cu documentație
-        total_entities = self.project_metrics.total_functions + self.project_metrics.total_classes
-        documented_entities = sum(
-            len([f for f in analysis['functions'] if f.docstring]) +
-            len([c for c in analysis['classes'] if c.docstring])
-            for analysis in self.file_analyses.values()
-            if 'error' not in analysis
-        )
+        """Calculează metricile proiectului din coloanele de metrici, în ordinea fișierelor"""
+        summary = self.metrics_store.summary()
         
-        if total_entities > 0:
-            self.project_metrics.documentation_coverage = round(
-                documented_entities / total_entities * 100, 2
-            )
+        self.project_metrics.total_lines = summary['total_lines']
+        self.project_metrics.total_functions = summary['total_functions']
+        self.project_metrics.total_classes = summary['total_classes']
+        self.project_metrics.total_imports = summary['total_imports']
+        self.project_metrics.complexity_average = summary['complexity_average']
+        self.project_metrics.complexity_max = summary['complexity_max']
+        self.project_metrics.complexity_percentiles = summary['complexity_percentiles']
+        self.project_metrics.documentation_coverage = summary['documentation_coverage']
     
     def _detect_issues(self, dependency_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Detectează probleme în proiect"""
@@ -154,69 +423,16 @@ class ProjectAnalyzer:
                 'recommendation': 'Refactorizați pentru a elimina dependența circulară'
             })
         
-        # Fișiere cu complexitate ridicată
-        for filename, analysis in self.file_analyses.items():
-            if 'error' in analysis:
-                continue
-                
-            high_complexity_funcs = [
-                f for f in analysis['functions'] 
-                if f.complexity > 10
-            ]
-            
-            if high_complexity_funcs:
-                issues.append({
-                    'type': 'high_complexity',
-                    'severity': 'medium',
-                    'message': f"{filename}: {len(high_complexity_funcs)} funcții cu complexitate > 10",
-                    'files': [filename],
-                    'functions': [f.name for f in high_complexity_funcs],
-                    'recommendation': 'Simplificați funcțiile complexe'
-                })
-        
-        # Fișiere prea mari
-        for filename, analysis in self.file_analyses.items():
-            if 'error' in analysis:
-                continue
-                
-            metrics = analysis['metrics']
-            if metrics['code_lines'] > 500:
-                issues.append({
-                    'type': 'large_file',
-                    'severity': 'low',
-                    'message': f"{filename}: {metrics['code_lines']} linii de cod",
-                    'files': [filename],
-                    'recommendation': 'Considerați împărțirea în module mai mici'
-                })
-        
-        # Module cu prea multe importuri
-        for filename, analysis in self.file_analyses.items():
-            if 'error' in analysis:
-                continue
-                
-            if len(analysis['imports']) > 20:
-                issues.append({
-                    'type': 'too_many_imports',
-                    'severity': 'medium',
-                    'message': f"{filename}: {len(analysis['imports'])} importuri",
-                    'files': [filename],
-                    'recommendation': 'Revizuiți și reduceți dependențele'
-                })
+        # Problemele per fișier, grupate pe tip
+        for issue_type in FILE_ISSUE_ORDER:
+            for aggregate in self.file_aggregates.values():
+                issues.extend(i for i in aggregate.issues if i['type'] == issue_type)
         
         # Lipsa documentației
-        poorly_documented = []
-        for filename, analysis in self.file_analyses.items():
-            if 'error' in analysis:
-                continue
-                
-            total_items = len(analysis['functions']) + len(analysis['classes'])
-            documented_items = (
-                len([f for f in analysis['functions'] if f.docstring]) +
-                len([c for c in analysis['classes'] if c.docstring])
-            )
-            
-            if total_items > 5 and documented_items / total_items < 0.3:
-                poorly_documented.append(filename)
+        poorly_documented = [
+            filename for filename, aggregate in self.file_aggregates.items()
+            if aggregate.poorly_documented
+        ]
         
         if poorly_documented:
             issues.append({
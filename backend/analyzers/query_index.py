@@ -0,0 +1,400 @@
+"""
+Interogări peste analizele salvate pentru Python Forensics
+Index secundar (nume, decorator, clasă de bază, complexitate, tip script) și un limbaj simplu de filtre
+"""
+import bisect
+import fnmatch
+import re
+import shlex
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple
+
+
+QUERY_KINDS = ('function', 'class', 'import', 'module')
+
+# Câmpurile disponibile pentru fiecare tip de entitate
+QUERY_FIELDS = {
+    'function': ('name', 'file', 'line', 'complexity', 'is_async', 'decorator', 'args', 'documented', 'calls'),
+    'class': ('name', 'file', 'line', 'base', 'decorator', 'is_abstract', 'methods', 'documented'),
+    'import': ('module', 'name', 'file', 'line', 'is_from_import'),
+    'module': ('file', 'script_type', 'lines', 'functions', 'classes')
+}
+
+# Relații între fișiere, rezolvate din graful de importuri
+RELATION_FIELDS = ('imports', 'imported_by')
+
+_CONDITION = re.compile(r'^([a-z_]+)\s*(>=|<=|!=|=|>|<|~)\s*(.+)$')
+
+# O valoare care începe cu unul dintre aceste caractere provine dintr-un operator greșit (ex. `==`)
+_OPERATOR_CHARS = '=<>!~'
+
+MAX_PAGE_SIZE = 500
+
+# Memoria estimată a unei înregistrări (dict-ul ei plus intrările din indexuri)
+INDEX_RECORD_BYTES = 1024
+
+
+class QueryError(ValueError):
+    """Interogare invalidă"""
+
+
+@dataclass
+class Condition:
+    """O condiție `câmp operator valoare`"""
+    field: str
+    operator: str
+    value: Any
+
+
+def parse_query(where: str) -> List[Condition]:
+    """
+    Parsează un filtru de forma `complexity > 15 and is_async = true and decorator = 'route'`
+
+    Args:
+        where: Condiții unite prin `and`; valorile cu spații se pun între ghilimele
+
+    Returns:
+        Lista de condiții (toate trebuie îndeplinite)
+    """
+    if not where or not where.strip():
+        return []
+
+    try:
+        tokens = shlex.split(where, posix=True)
+    except ValueError as e:
+        raise QueryError(f'Filtru invalid: {e}')
+
+    # Regrupează tokenii între conectorii `and`
+    parts, current = [], []
+    for token in tokens:
+        if token.lower() == 'and':
+            parts.append(current)
+            current = []
+        else:
+            current.append(token)
+    parts.append(current)
+
+    conditions = []
+    for part in parts:
+        if not part:
+            raise QueryError('Condiție goală în filtru')
+        match = _CONDITION.match(' '.join(part))
+        if not match:
+            raise QueryError(f'Condiție invalidă: {" ".join(part)}')
+        field_name, operator, raw_value = match.groups()
+        raw_value = raw_value.strip()
+        if raw_value[0] in _OPERATOR_CHARS:
+            raise QueryError(
+                f'Operator invalid în condiția: {" ".join(part)} (operatori: >=, <=, !=, =, >, <, ~)'
+            )
+        conditions.append(Condition(field_name, operator, _parse_value(raw_value)))
+    return conditions
+
+
+def _parse_value(raw: str) -> Any:
+    """Convertește valoarea unei condiții în bool, int sau text"""
+    lower = raw.lower()
+    if lower in ('true', 'false'):
+        return lower == 'true'
+    try:
+        return int(raw)
+    except ValueError:
+        return raw
+
+
+class AnalysisIndex:
+    """Index secundar peste analizele unui proiect"""
+
+    def __init__(self):
+        # Înregistrări per tip, în ordinea fișierelor și a liniilor
+        self.records: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in QUERY_KINDS}
+        # tip -> câmp -> valoare -> id-uri
+        self.indexes: Dict[str, Dict[str, Dict[Any, List[int]]]] = {kind: {} for kind in QUERY_KINDS}
+        # tip -> câmp numeric -> [(valoare, id)] sortat, pentru intervale
+        self.ranges: Dict[str, Dict[str, List[Tuple[int, int]]]] = {kind: {} for kind in QUERY_KINDS}
+        self.imports: Dict[str, Set[str]] = {}
+        self.imported_by: Dict[str, Set[str]] = {}
+
+    def estimated_bytes(self) -> int:
+        """Memoria aproximativă a indexului: înregistrările plus intrările din indexuri"""
+        records = sum(len(kind_records) for kind_records in self.records.values())
+        return records * INDEX_RECORD_BYTES
+
+    @classmethod
+    def build(cls, file_analyses: Dict[str, Dict[str, Any]],
+              dependencies: Optional[Dict[str, List[str]]] = None) -> 'AnalysisIndex':
+        """Construiește indexul din analizele per fișier și din dependențele interne"""
+        index = cls()
+        for filename, analysis in file_analyses.items():
+            index._add_file(filename, analysis)
+
+        for filename, targets in (dependencies or {}).items():
+            for target in targets:
+                index.imports.setdefault(filename, set()).add(target)
+                index.imported_by.setdefault(target, set()).add(filename)
+
+        index._build_indexes()
+        return index
+
+    def _add_file(self, filename: str, analysis: Dict[str, Any]):
+        """Adaugă entitățile unui fișier"""
+        if 'error' in analysis:
+            return
+
+        functions = analysis.get('functions', [])
+        classes = analysis.get('classes', [])
+
+        self.records['module'].append({
+            'file': filename,
+            'script_type': analysis.get('script_type', ''),
+            'lines': analysis.get('metrics', {}).get('total_lines', 0),
+            'functions': len(functions),
+            'classes': len(classes)
+        })
+
+        for function in functions:
+            self.records['function'].append({
+                'name': function.name,
+                'file': filename,
+                'line': function.line_number,
+                'complexity': function.complexity,
+                'is_async': function.is_async,
+                'decorator': [_decorator_name(d) for d in function.decorators],
+                'args': len(function.args),
+                'documented': bool(function.docstring),
+                'calls': sorted(function.calls)
+            })
+
+        for class_info in classes:
+            self.records['class'].append({
+                'name': class_info.name,
+                'file': filename,
+                'line': class_info.line_number,
+                'base': list(class_info.base_classes),
+                'decorator': [_decorator_name(d) for d in class_info.decorators],
+                'is_abstract': class_info.is_abstract,
+                'methods': len(class_info.methods),
+                'documented': bool(class_info.docstring)
+            })
+
+        for import_info in analysis.get('imports', []):
+            self.records['import'].append({
+                'module': import_info.module,
+                'name': list(import_info.names),
+                'file': filename,
+                'line': import_info.line_number,
+                'is_from_import': import_info.is_from_import
+            })
+
+    def _build_indexes(self):
+        """Construiește indexurile de egalitate și de interval"""
+        equality_fields = {
+            'function': ('name', 'file', 'decorator', 'is_async'),
+            'class': ('name', 'file', 'base', 'decorator'),
+            'import': ('module', 'file'),
+            'module': ('file', 'script_type')
+        }
+        range_fields = {
+            'function': ('complexity', 'args'),
+            'class': ('methods',),
+            'import': (),
+            'module': ('lines', 'functions', 'classes')
+        }
+
+        for kind, records in self.records.items():
+            for field_name in equality_fields[kind]:
+                index: Dict[Any, List[int]] = {}
+                for record_id, record in enumerate(records):
+                    value = record[field_name]
+                    for key in (set(value) if isinstance(value, list) else (value,)):
+                        index.setdefault(key, []).append(record_id)
+                self.indexes[kind][field_name] = index
+
+            for field_name in range_fields[kind]:
+                self.ranges[kind][field_name] = sorted(
+                    (record[field_name], record_id) for record_id, record in enumerate(records)
+                )
+
+    def stats(self) -> Dict[str, int]:
+        """Numărul de entități indexate pe tip"""
+        return {kind: len(records) for kind, records in self.records.items()}
+
+    def query(self, kind: str, where: str = '', page: int = 1, page_size: int = 50,
+              sort: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execută o interogare și returnează o pagină de rezultate
+
+        Args:
+            kind: function, class, import sau module
+            where: Filtru (vezi parse_query)
+            page: Pagina cerută (de la 1)
+            page_size: Rezultate per pagină (maxim MAX_PAGE_SIZE)
+            sort: Câmpul de sortare; prefixul '-' înseamnă descrescător
+
+        Returns:
+            Dicționar cu total, pagină și rezultate
+        """
+        if kind not in QUERY_KINDS:
+            raise QueryError(f'Tip necunoscut: {kind} (function, class, import sau module)')
+
+        conditions = parse_query(where)
+        allowed = QUERY_FIELDS[kind] + RELATION_FIELDS
+        for condition in conditions:
+            if condition.field not in allowed:
+                raise QueryError(f'Câmp necunoscut pentru {kind}: {condition.field}')
+
+        records = self.records[kind]
+        candidates, remaining = self._plan(kind, conditions)
+        ids = range(len(records)) if candidates is None else sorted(candidates)
+        matched = [i for i in ids if all(self._matches(records[i], c) for c in remaining)]
+
+        if sort:
+            descending = sort.startswith('-')
+            sort_field = sort.lstrip('-')
+            if sort_field not in QUERY_FIELDS[kind]:
+                raise QueryError(f'Câmp de sortare necunoscut: {sort_field}')
+            matched.sort(key=lambda i: _sort_key(records[i][sort_field]), reverse=descending)
+
+        try:
+            page = max(1, int(page))
+            page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        except (TypeError, ValueError):
+            raise QueryError('page și page_size trebuie să fie numere întregi')
+        start = (page - 1) * page_size
+
+        return {
+            'kind': kind,
+            'total': len(matched),
+            'page': page,
+            'page_size': page_size,
+            'pages': (len(matched) + page_size - 1) // page_size,
+            'results': [records[i] for i in matched[start:start + page_size]]
+        }
+
+    def _plan(self, kind: str, conditions: List[Condition]) -> Tuple[Optional[Set[int]], List[Condition]]:
+        """Folosește indexurile pentru condițiile care le permit; restul se verifică pe candidați"""
+        candidate_sets: List[Set[int]] = []
+        remaining = []
+
+        for condition in conditions:
+            ids = self._lookup(kind, condition)
+            if ids is None:
+                remaining.append(condition)
+            else:
+                candidate_sets.append(ids)
+
+        if not candidate_sets:
+            return None, remaining
+
+        # Intersecția începe cu cel mai mic set
+        candidate_sets.sort(key=len)
+        candidates = set(candidate_sets[0])
+        for ids in candidate_sets[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return candidates, remaining
+
+    def _lookup(self, kind: str, condition: Condition) -> Optional[Set[int]]:
+        """Id-urile care satisfac condiția folosind un index, sau None dacă nu există index potrivit"""
+        field_name, operator, value = condition.field, condition.operator, condition.value
+
+        if field_name in RELATION_FIELDS and operator == '=':
+            related = self._related_files(field_name, str(value))
+            file_index = self.indexes[kind]['file']
+            return {record_id for filename in related for record_id in file_index.get(filename, ())}
+
+        if operator == '=' and field_name in self.indexes[kind]:
+            return set(self.indexes[kind][field_name].get(value, ()))
+
+        if operator in ('>', '>=', '<', '<=') and field_name in self.ranges[kind] and isinstance(value, int):
+            return self._range(self.ranges[kind][field_name], operator, value)
+
+        return None
+
+    def _range(self, ordered: List[Tuple[int, int]], operator: str, value: int) -> Set[int]:
+        """Id-urile dintr-un interval, prin căutare binară în lista sortată"""
+        if operator == '>':
+            start, end = bisect.bisect_right(ordered, (value, float('inf'))), len(ordered)
+        elif operator == '>=':
+            start, end = bisect.bisect_left(ordered, (value, -1)), len(ordered)
+        elif operator == '<':
+            start, end = 0, bisect.bisect_left(ordered, (value, -1))
+        else:
+            start, end = 0, bisect.bisect_right(ordered, (value, float('inf')))
+        return {record_id for _, record_id in ordered[start:end]}
+
+    def _related_files(self, relation: str, target: str) -> Set[str]:
+        """Fișierele importate de țintă (imported_by) sau care importă ținta (imports)"""
+        graph = self.imports if relation == 'imported_by' else self.imported_by
+        related = set()
+        for filename in _matching_files(target, graph.keys()):
+            related |= graph[filename]
+        return related
+
+    def _matches(self, record: Dict[str, Any], condition: Condition) -> bool:
+        """Verifică o condiție pe o înregistrare"""
+        if condition.field in RELATION_FIELDS:
+            related = self._related_files(condition.field, str(condition.value))
+            result = record['file'] in related
+            return result if condition.operator == '=' else not result
+
+        actual = record[condition.field]
+        if isinstance(actual, list):
+            return _compare_list(actual, condition.operator, condition.value)
+        return _compare(actual, condition.operator, condition.value)
+
+
+def _decorator_name(decorator: str) -> str:
+    """Numele decoratorului, fără '@' și fără argumente: "@app.route('/')" -> 'app.route'"""
+    return decorator.lstrip('@').split('(', 1)[0].strip()
+
+
+def _matching_files(target: str, filenames: Iterable[str]) -> List[str]:
+    """Fișierele care corespund țintei: nume exact, nume de modul sau șablon glob"""
+    module_file = target if target.endswith('.py') else f'{target.rsplit(".", 1)[-1]}.py'
+    return [
+        name for name in filenames
+        if name in (target, module_file) or fnmatch.fnmatchcase(name, target)
+    ]
+
+
+def _compare(actual: Any, operator: str, expected: Any) -> bool:
+    """Compară o valoare scalară"""
+    if operator == '=':
+        return actual == expected
+    if operator == '!=':
+        return actual != expected
+    if operator == '~':
+        return fnmatch.fnmatchcase(str(actual), str(expected))
+
+    try:
+        if operator == '>':
+            return actual > expected
+        if operator == '>=':
+            return actual >= expected
+        if operator == '<':
+            return actual < expected
+        return actual <= expected
+    except TypeError:
+        return False
+
+
+def _compare_list(actual: List[Any], operator: str, expected: Any) -> bool:
+    """Compară un câmp listă: '=' conține, '!=' nu conține, '~' un element corespunde șablonului"""
+    if operator == '=':
+        return expected in actual
+    if operator == '!=':
+        return expected not in actual
+    if operator == '~':
+        return any(fnmatch.fnmatchcase(str(item), str(expected)) for item in actual)
+    raise QueryError(f'Operatorul {operator} nu se aplică unui câmp listă')
+
+
+def _sort_key(value: Any):
+    """Cheie de sortare tolerantă la tipuri amestecate"""
+    if isinstance(value, list):
+        return (1, len(value))
+    if isinstance(value, (int, float, bool)):
+        return (0, value)
+    return (2, str(value))
@@ -0,0 +1,351 @@
+"""
+Comparare de snapshot-uri ale analizei pentru Python Forensics
+Fiecare entitate are o amprentă (cale, nume calificat, hash corp); diferența se calculează în timp liniar
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+
+# Decoratorii care definesc altă variantă a aceluiași nume (accesorii unei proprietăți, @overload)
+_ACCESSOR_DECORATOR = re.compile(r'^@[\w.]+\.(setter|getter|deleter)$')
+_OVERLOAD_DECORATOR = re.compile(r'^@(typing\.)?overload$')
+
+
+@dataclass
+class FunctionFingerprint:
+    """Amprenta unei funcții: hash-ul corpului și metricile comparate"""
+    body_hash: str
+    complexity: int
+    line: int
+
+
+@dataclass
+class ClassFingerprint:
+    """Amprenta unei clase: clasele de bază și metodele"""
+    bases: Tuple[str, ...]
+    methods: Tuple[str, ...]
+    line: int
+
+
+@dataclass
+class AnalysisSnapshot:
+    """Starea compactă a unei analize: doar amprentele necesare comparării"""
+    snapshot_id: str
+    project_key: str
+    created: str
+    # 'cale:nume_calificat[@variantă][#apariție]' -> amprentă (vezi entity_key)
+    functions: Dict[str, FunctionFingerprint] = field(default_factory=dict)
+    classes: Dict[str, ClassFingerprint] = field(default_factory=dict)
+    imports: Set[Tuple[str, str]] = field(default_factory=set)
+    edges: Set[Tuple[str, str]] = field(default_factory=set)
+    cycles: Set[Tuple[str, ...]] = field(default_factory=set)
+
+    def describe(self) -> Dict[str, Any]:
+        """Rezumatul snapshot-ului pentru listări"""
+        return {
+            'snapshot_id': self.snapshot_id,
+            'project_key': self.project_key,
+            'created': self.created,
+            'functions': len(self.functions),
+            'classes': len(self.classes),
+            'edges': len(self.edges),
+            'cycles': len(self.cycles)
+        }
+
+
+def entity_key(path: str, qualname: str, decorators: List[str], seen: Dict[str, int]) -> str:
+    """
+    Cheia unei funcții sau clase într-un snapshot
+
+    Calea fișierului (nu doar numele) separă modulele omonime, ex. mai multe
+    __init__.py. Variantele aceluiași nume primesc un discriminator: @setter /
+    @getter / @deleter pentru accesorii unei proprietăți, @overload pentru
+    stub-uri, iar redefinirile (ex. condiționate) #2, #3... în ordinea apariției.
+    """
+    key = f'{path}:{qualname}'
+    for decorator in decorators:
+        accessor = _ACCESSOR_DECORATOR.match(decorator)
+        if accessor:
+            key += f'@{accessor.group(1)}'
+            break
+        if _OVERLOAD_DECORATOR.match(decorator):
+            key += '@overload'
+            break
+
+    seen[key] = seen.get(key, 0) + 1
+    return key if seen[key] == 1 else f'{key}#{seen[key]}'
+
+
+def build_snapshot(project_key: str, file_analyses: Dict[str, Dict[str, Any]],
+                   dependencies: Dict[str, List[str]]) -> AnalysisSnapshot:
+    """Construiește snapshot-ul unei analize de director (file_analyses: cale fișier -> analiză)"""
+    functions: Dict[str, FunctionFingerprint] = {}
+    classes: Dict[str, ClassFingerprint] = {}
+    imports: Set[Tuple[str, str]] = set()
+
+    for module, analysis in file_analyses.items():
+        if 'error' in analysis:
+            continue
+
+        seen: Dict[str, int] = {}
+        for function in analysis.get('functions', []):
+            key = entity_key(module, function.qualname or function.name, function.decorators, seen)
+            functions[key] = FunctionFingerprint(
+                body_hash=function.body_hash,
+                complexity=function.complexity,
+                line=function.line_number
+            )
+
+        seen = {}
+        for class_info in analysis.get('classes', []):
+            key = entity_key(module, class_info.qualname or class_info.name, [], seen)
+            classes[key] = ClassFingerprint(
+                bases=tuple(class_info.base_classes),
+                methods=tuple(sorted(m.get('name', '') for m in class_info.methods)),
+                line=class_info.line_number
+            )
+
+        for imported in analysis.get('imports_detail', {}):
+            imports.add((module, imported))
+
+    edges = {(source, target) for source, targets in dependencies.items() for target in targets}
+
+    # Identificator după conținut: o reanaliză fără modificări produce același snapshot
+    digest = hashlib.sha1()
+    for key in sorted(functions):
+        digest.update(f'{key}={functions[key].body_hash};'.encode('utf-8'))
+    for key in sorted(classes):
+        digest.update(f'{key}={classes[key].bases}{classes[key].methods};'.encode('utf-8'))
+    for edge in sorted(imports):
+        digest.update(f'{edge[0]}>{edge[1]};'.encode('utf-8'))
+
+    return AnalysisSnapshot(
+        snapshot_id=digest.hexdigest()[:12],
+        project_key=project_key,
+        created=datetime.now().isoformat(),
+        functions=functions,
+        classes=classes,
+        imports=imports,
+        edges=edges,
+        cycles=find_cycles(edges)
+    )
+
+
+def find_cycles(edges: Set[Tuple[str, str]]) -> Set[Tuple[str, ...]]:
+    """Componentele tare conexe cu cicluri (Tarjan iterativ), ca tupluri sortate de noduri"""
+    graph: Dict[str, List[str]] = {}
+    for source, target in edges:
+        graph.setdefault(source, []).append(target)
+        graph.setdefault(target, [])
+
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    cycles: Set[Tuple[str, ...]] = set()
+    counter = 0
+
+    for root in sorted(graph):
+        if root in index_of:
+            continue
+
+        work = [(root, iter(graph[root]))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, neighbours = work[-1]
+            advanced = False
+            for neighbour in neighbours:
+                if neighbour not in index_of:
+                    index_of[neighbour] = lowlink[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack.add(neighbour)
+                    work.append((neighbour, iter(graph[neighbour])))
+                    advanced = True
+                    break
+                if neighbour in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[neighbour])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or (node, node) in edges:
+                    cycles.add(tuple(sorted(component)))
+
+    return cycles
+
+
+def diff_snapshots(base: AnalysisSnapshot, target: AnalysisSnapshot) -> Dict[str, Any]:
+    """
+    Diferența structurată dintre două snapshot-uri
+
+    Args:
+        base: Snapshot-ul vechi
+        target: Snapshot-ul nou
+
+    Returns:
+        Funcții/clase adăugate, eliminate, modificate sau redenumite, importuri,
+        muchii și cicluri apărute sau dispărute
+    """
+    added_functions = [key for key in target.functions if key not in base.functions]
+    removed_functions = [key for key in base.functions if key not in target.functions]
+
+    modified_functions = []
+    for key, new in target.functions.items():
+        old = base.functions.get(key)
+        if old is None or old.body_hash == new.body_hash:
+            continue
+        modified_functions.append({
+            'function': key,
+            'complexity_before': old.complexity,
+            'complexity_after': new.complexity,
+            'complexity_delta': new.complexity - old.complexity
+        })
+
+    # Redenumiri / mutări: corp identic sub alt nume
+    removed_by_hash: Dict[str, List[str]] = {}
+    for key in removed_functions:
+        removed_by_hash.setdefault(base.functions[key].body_hash, []).append(key)
+
+    renamed_functions = []
+    for key in added_functions:
+        candidates = removed_by_hash.get(target.functions[key].body_hash)
+        if candidates:
+            renamed_functions.append({'from': candidates.pop(0), 'to': key})
+
+    renamed_sources = {item['from'] for item in renamed_functions}
+    renamed_targets = {item['to'] for item in renamed_functions}
+    added_functions = [key for key in added_functions if key not in renamed_targets]
+    removed_functions = [key for key in removed_functions if key not in renamed_sources]
+
+    modified_classes = []
+    for key, new in target.classes.items():
+        old = base.classes.get(key)
+        if old is None or (old.bases == new.bases and old.methods == new.methods):
+            continue
+        old_methods, new_methods = set(old.methods), set(new.methods)
+        modified_classes.append({
+            'class': key,
+            'bases_before': list(old.bases),
+            'bases_after': list(new.bases),
+            'methods_added': sorted(new_methods - old_methods),
+            'methods_removed': sorted(old_methods - new_methods)
+        })
+
+    delta = {
+        'base': base.snapshot_id,
+        'target': target.snapshot_id,
+        'functions': {
+            'added': sorted(added_functions),
+            'removed': sorted(removed_functions),
+            'modified': sorted(modified_functions, key=lambda item: item['function']),
+            'renamed': renamed_functions
+        },
+        'classes': {
+            'added': sorted(key for key in target.classes if key not in base.classes),
+            'removed': sorted(key for key in base.classes if key not in target.classes),
+            'modified': sorted(modified_classes, key=lambda item: item['class'])
+        },
+        'imports': {
+            'added': sorted(target.imports - base.imports),
+            'removed': sorted(base.imports - target.imports)
+        },
+        'edges': {
+            'added': sorted(target.edges - base.edges),
+            'removed': sorted(base.edges - target.edges)
+        },
+        'cycles': {
+            'introduced': sorted(target.cycles - base.cycles),
+            'resolved': sorted(base.cycles - target.cycles)
+        }
+    }
+
+    delta['summary'] = {
+        'functions_added': len(delta['functions']['added']),
+        'functions_removed': len(delta['functions']['removed']),
+        'functions_modified': len(modified_functions),
+        'functions_renamed': len(renamed_functions),
+        'complexity_delta': sum(item['complexity_delta'] for item in modified_functions) +
+                            sum(target.functions[key].complexity for key in delta['functions']['added']) -
+                            sum(base.functions[key].complexity for key in delta['functions']['removed']),
+        'edges_added': len(delta['edges']['added']),
+        'edges_removed': len(delta['edges']['removed']),
+        'cycles_introduced': len(delta['cycles']['introduced'])
+    }
+    return delta
+
+
+class SnapshotStore:
+    """Ultimele snapshot-uri ale fiecărui proiect, limitate ca număr
+
+    Cu shared setat (un SharedStore cu max_entries = numărul de proiecte),
+    snapshot-urile unui proiect stau într-o singură intrare a bazei comune,
+    actualizată tranzacțional, deci orice worker poate compara versiunile.
+    """
+
+    def __init__(self, max_per_project: int = 10, max_projects: int = 100, shared=None):
+        self.projects: 'OrderedDict[str, OrderedDict[str, AnalysisSnapshot]]' = OrderedDict()
+        self.max_per_project = max_per_project
+        self.max_projects = max_projects
+        self.shared = shared
+        self.lock = threading.Lock()
+
+    def add(self, snapshot: AnalysisSnapshot) -> bool:
+        """Adaugă snapshot-ul; returnează False dacă este identic cu ultimul"""
+        if self.shared is not None:
+            def apply(snapshots):
+                snapshots = snapshots if snapshots is not None else OrderedDict()
+                return snapshots, self._append(snapshots, snapshot)
+            return self.shared.update(snapshot.project_key, apply)
+
+        with self.lock:
+            snapshots = self.projects.setdefault(snapshot.project_key, OrderedDict())
+            self.projects.move_to_end(snapshot.project_key)
+            added = self._append(snapshots, snapshot)
+            while len(self.projects) > self.max_projects:
+                self.projects.popitem(last=False)
+            return added
+
+    def get(self, project_key: str, snapshot_id: str) -> Optional[AnalysisSnapshot]:
+        return self._snapshots(project_key).get(snapshot_id)
+
+    def list(self, project_key: str) -> List[AnalysisSnapshot]:
+        """Snapshot-urile proiectului, de la cel mai vechi la cel mai nou"""
+        return list(self._snapshots(project_key).values())
+
+    def _snapshots(self, project_key: str) -> 'OrderedDict[str, AnalysisSnapshot]':
+        if self.shared is not None:
+            return self.shared.get(project_key) or OrderedDict()
+        with self.lock:
+            return OrderedDict(self.projects.get(project_key, {}))
+
+    def _append(self, snapshots: 'OrderedDict[str, AnalysisSnapshot]', snapshot: AnalysisSnapshot) -> bool:
+        if snapshots and next(reversed(snapshots)) == snapshot.snapshot_id:
+            return False
+
+        snapshots.pop(snapshot.snapshot_id, None)
+        snapshots[snapshot.snapshot_id] = snapshot
+        while len(snapshots) > self.max_per_project:
+            snapshots.popitem(last=False)
+        return True
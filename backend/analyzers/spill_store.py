@@ -0,0 +1,92 @@
+"""
+Stocare pe disc a analizelor per fișier pentru Python Forensics
+Folosită de modul streaming al ProjectAnalyzer: în RAM rămân doar rezumatele compacte
+"""
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, Optional
+
+
+# Numărul de scrieri grupate într-o tranzacție
+SPILL_BATCH_SIZE = 256
+
+
+class AnalysisSpillStore(Mapping):
+    """Analizele complete per fișier, păstrate într-o bază SQLite și citite la cerere
+
+    Se comportă ca un dicționar read-only (nume fișier -> analiză), deci poate
+    înlocui ProjectAnalyzer.file_analyses fără a încărca totul în memorie.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.temporary = path is None
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix='p4n6-analyses-', suffix='.sqlite')
+            os.close(handle)
+        self.path = path
+        self.lock = threading.Lock()
+        self.pending = 0
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        # Datele sunt temporare: durabilitatea nu contează, viteza de scriere da
+        self.connection.execute('PRAGMA journal_mode=OFF')
+        self.connection.execute('PRAGMA synchronous=OFF')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS analyses (filename TEXT PRIMARY KEY, data BLOB NOT NULL)'
+        )
+
+    def put(self, filename: str, analysis: Dict[str, Any]):
+        """Scrie analiza unui fișier (tranzacțiile sunt grupate pentru viteză)"""
+        data = pickle.dumps(analysis, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO analyses (filename, data) VALUES (?, ?)', (filename, data)
+            )
+            self.pending += 1
+            if self.pending >= SPILL_BATCH_SIZE:
+                self.connection.commit()
+                self.pending = 0
+
+    def flush(self):
+        """Confirmă scrierile în așteptare"""
+        with self.lock:
+            self.connection.commit()
+            self.pending = 0
+
+    def __getitem__(self, filename: str) -> Dict[str, Any]:
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT data FROM analyses WHERE filename = ?', (filename,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(filename)
+        return pickle.loads(row[0])
+
+    def __iter__(self) -> Iterator[str]:
+        with self.lock:
+            filenames = [row[0] for row in self.connection.execute('SELECT filename FROM analyses ORDER BY rowid')]
+        return iter(filenames)
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM analyses').fetchone()[0]
+
+    def close(self):
+        """Închide baza și șterge fișierul temporar"""
+        with self.lock:
+            if self.connection is None:
+                return
+            self.connection.close()
+            self.connection = None
+        if self.temporary and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -1,4 +1,7 @@
-from flask import Flask, request, jsonify, send_file, Response, session
+from flask import (
+    Flask, request, jsonify, send_file, Response, session, stream_with_context, has_request_context, g,
+    after_this_request
+)
 from flask_cors import CORS
 import os
 import re
@@ -9,10 +12,20 @@ import requests
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import base64
+import binascii
+import itertools
 import hashlib
+import hmac
 import threading
 import time
-from collections import OrderedDict
+import uuid
+import dataclasses
+import posixpath
+import tarfile
+import tempfile
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Încărcare variabile din .env
 load_dotenv()
@@ -27,58 +40,160 @@ app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=int(os.getenv('SESSIO
 # FAZA 2.1 - Limite pentru prevenirea memory leak
 MAX_SESSION_EDITS = int(os.getenv('MAX_SESSION_FILES', 100))
 MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 10485760))  # 10MB
+MAX_SESSION_EDIT_BYTES = int(os.getenv('MAX_SESSION_EDIT_BYTES', 20 * 1024 * 1024))
+MAX_EDIT_STORE_BYTES = int(os.getenv('MAX_EDIT_STORE_BYTES', 256 * 1024 * 1024))
+# Fișier SQLite pentru editări (gol = doar în memorie)
+EDIT_STORE_PATH = os.getenv('EDIT_STORE_PATH', '')
+
+# Stările de proiect per sesiune; opțional scrise asincron în principal.txt/entities.json/secundare.txt
+MAX_PROJECT_STATES = int(os.getenv('MAX_PROJECT_STATES', 1000))
+PROJECT_STATE_FLUSH = os.getenv('PROJECT_STATE_FLUSH', 'False').lower() == 'true'
 SESSION_CLEANUP_INTERVAL = 3600  # 1 oră
 
-# FAZA 2.1 - Cache pentru fișiere editate cu limită și LRU
-class LimitedSessionCache:
-    """Cache cu limită pentru editările din sesiune"""
-    def __init__(self, max_size=MAX_SESSION_EDITS):
-        self.cache = OrderedDict()
-        self.max_size = max_size
-        self.lock = threading.Lock()
-    
-    def get(self, key):
-        with self.lock:
-            if key in self.cache:
-                # Mută la final (most recently used)
-                self.cache.move_to_end(key)
-                return self.cache[key]
-            return None
-    
-    def set(self, key, value):
-        with self.lock:
-            if key in self.cache:
-                # Actualizează și mută la final
-                self.cache.move_to_end(key)
-            self.cache[key] = value
-            
-            # Elimină cele mai vechi dacă depășim limita
-            while len(self.cache) > self.max_size:
-                self.cache.popitem(last=False)
-    
-    def delete(self, key):
-        with self.lock:
-            if key in self.cache:
-                del self.cache[key]
-    
-    def clear(self):
-        with self.lock:
-            self.cache.clear()
-    
-    def size(self):
-        with self.lock:
-            return len(self.cache)
-    
-    def items(self):
-        with self.lock:
-            return list(self.cache.items())
+# Job-uri asincrone: thread-uri de execuție, coada, păstrarea rezultatelor și durata maximă (0 = nelimitat)
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', 100))
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 3600))
+JOB_MAX_RUNTIME = float(os.getenv('JOB_MAX_RUNTIME', 0))
+
+# Compresia răspunsurilor: dimensiunea minimă (bytes) și nivelul (1-9)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+
+# Paginarea file_analyses din /analyze_directory (fișiere per pagină)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 1000))
+
+# Număr maxim de intervale în histogramele din /complexity_distribution
+MAX_HISTOGRAM_BINS = 1000
+
+# Număr maxim de fișiere într-o cerere /analyze_batch
+MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES', 1000))
+
+# Procese pentru analiza proiectelor (1 = secvențial, 0 = câte unul per nucleu)
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', 1))
+
+# Metrici Prometheus pe /metrics (contoarele sunt per thread, fără lock pe calea cererilor)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+
+# Profilarea la cerere (antetul X-Profile, doar cu ADMIN_KEY setat) și numărul de profiluri păstrate
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'True').lower() == 'true'
+MAX_PROFILES = int(os.getenv('MAX_PROFILES', 50))
+
+# Număr maxim de rezultate per fișier păstrate pentru reanaliza incrementală
+ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', 5000))
+
+# Limite pentru arhivele încărcate (protecție zip bomb)
+ARCHIVE_MAX_TOTAL_SIZE = int(os.getenv('ARCHIVE_MAX_TOTAL_SIZE', 512 * 1024 * 1024))
+ARCHIVE_MAX_RATIO = float(os.getenv('ARCHIVE_MAX_RATIO', 100))
+ARCHIVE_MAX_MEMBERS = int(os.getenv('ARCHIVE_MAX_MEMBERS', 100000))
+
+# Directoare locale ale serverului care pot fi analizate direct (separate prin os.pathsep)
+ANALYSIS_ROOTS = [
+    os.path.realpath(root) for root in os.getenv('ANALYSIS_ROOTS', '').split(os.pathsep) if root.strip()
+]
+
+# Numărul implicit și maxim de commit-uri parcurse de /analyze_git_history
+HISTORY_DEFAULT_COMMITS = 500
+HISTORY_MAX_COMMITS = int(os.getenv('HISTORY_MAX_COMMITS', 500))
+
+# Analiză distribuită: token partajat cu workerii și durata unui lease (secunde)
+CLUSTER_TOKEN = os.getenv('CLUSTER_TOKEN', '')
+CLUSTER_LEASE_TIMEOUT = float(os.getenv('CLUSTER_LEASE_TIMEOUT', 60))
+
+# Structuri de directoare încărcate: timp de viață (secunde de la ultima folosire) și buget de memorie
+STRUCTURE_TTL = int(os.getenv('STRUCTURE_TTL', 24 * 3600))
+STRUCTURE_STORE_MAX_BYTES = int(os.getenv('STRUCTURE_STORE_MAX_BYTES', 512 * 1024 * 1024))
+STRUCTURE_STORE_MAX_ENTRIES = int(os.getenv('STRUCTURE_STORE_MAX_ENTRIES', 1000))
+
+# Bază SQLite (WAL) comună workerilor: rezultatele analizelor și structurile încărcate (gol = doar în proces)
+SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH', '')
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv('SHARED_CACHE_MAX_ENTRIES', 100000))
+
+# Conținutul fișierelor după SHA-256, partajat între structuri; implicit pe disc, ca arhivele
+# și upload-urile mari să nu țină conținutul în memoria procesului
+BLOB_STORE_MAX_BYTES = int(os.getenv('BLOB_STORE_MAX_BYTES', 1024 * 1024 * 1024))
+BLOB_STORE_PATH = os.getenv('BLOB_STORE_PATH') or os.path.join(tempfile.gettempdir(), 'p4n6-blobs')
+# BLOB_STORE_PATH=memory păstrează blob-urile în proces, cu acest buget separat (mult mai mic)
+BLOB_STORE_MEMORY_MAX_BYTES = int(os.getenv('BLOB_STORE_MEMORY_MAX_BYTES', 64 * 1024 * 1024))
+
+# Încărcări în chunk-uri: durata unei sesiuni inactive, număr de sesiuni, bytes per sesiune și per chunk
+UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', 6 * 3600))
+MAX_UPLOAD_SESSIONS = int(os.getenv('MAX_UPLOAD_SESSIONS', 100))
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', 512 * 1024 * 1024))
+MAX_UPLOAD_CHUNK_BYTES = int(os.getenv('MAX_UPLOAD_CHUNK_BYTES', 8 * 1024 * 1024))
+
+# Marcaj folosit de frontend pentru fișierele al căror conținut nu a fost încărcat
+TOO_LARGE_PLACEHOLDER = '[Fișier prea mare - conținutul nu a fost încărcat automat]'
+
+# Store-uri partajate între procese (serverul de producție pornește mai mulți workeri)
+from utils.shared_store import SharedStore
+
+def shared_table(table, max_entries=None):
+    """Tabelul din baza comună a workerilor, sau None dacă SHARED_CACHE_PATH nu este setat"""
+    return SharedStore(SHARED_CACHE_PATH, table, max_entries) if SHARED_CACHE_PATH else None
+
+# Starea proiectului per sesiune (script principal, entități, scripturi secundare)
+from utils.project_state import ProjectStateStore
+
+project_states = ProjectStateStore(
+    max_sessions=MAX_PROJECT_STATES,
+    flush_paths={
+        'principal': os.path.join(os.path.dirname(__file__), 'principal.txt'),
+        'entities': os.path.join(os.path.dirname(__file__), 'entities.json'),
+        'secondary': os.path.join(os.path.dirname(os.path.abspath(os.path.dirname(__file__))), 'secundare.txt')
+    } if PROJECT_STATE_FLUSH else None,
+    shared=shared_table('project_states', MAX_PROJECT_STATES)
+)
+
+# FAZA 2.1 - Editări separate pe sesiuni, cu cote de bytes și LRU (opțional persistente în SQLite)
+from utils.edit_store import SessionEditStore, EditQuotaError
+
+session_edits = SessionEditStore(
+    max_session_bytes=MAX_SESSION_EDIT_BYTES,
+    max_total_bytes=MAX_EDIT_STORE_BYTES,
+    max_session_files=MAX_SESSION_EDITS,
+    # Cu mai mulți workeri editările stau în baza comună, ca orice worker să le vadă
+    path=EDIT_STORE_PATH or SHARED_CACHE_PATH
+)
+
+# Cache pentru structura de directoare (TTL + buget de bytes, evacuare LRU)
+from utils.structure_store import StructureStore, StructureTooLargeError, strip_structure_contents
 
-# Înlocuiește dicționarul simplu cu cache-ul limitat
-session_edits = LimitedSessionCache()
+structure_store = StructureStore(
+    ttl_seconds=STRUCTURE_TTL,
+    max_bytes=STRUCTURE_STORE_MAX_BYTES,
+    max_entries=STRUCTURE_STORE_MAX_ENTRIES,
+    shared=shared_table('structures', STRUCTURE_STORE_MAX_ENTRIES)
+)
 
-# Cache pentru structura de directoare
-directory_structures = {}
-directory_files = {}
+# Blob-uri adresate după conținut: la reîncărcare se trimit doar fișierele pe care serverul nu le are
+from utils.blob_store import BlobStore, MissingBlobError, is_valid_digest
+
+if BLOB_STORE_PATH == 'memory':
+    blob_store = BlobStore(max_bytes=BLOB_STORE_MEMORY_MAX_BYTES)
+else:
+    blob_store = BlobStore(max_bytes=BLOB_STORE_MAX_BYTES, path=BLOB_STORE_PATH)
+
+# Sesiuni de încărcare în chunk-uri (reluabile de la ultimul chunk confirmat)
+from utils.upload_sessions import UploadSessionStore, UploadChunkError, chunk_checksum
+
+upload_sessions = UploadSessionStore(
+    ttl_seconds=UPLOAD_SESSION_TTL,
+    max_sessions=MAX_UPLOAD_SESSIONS,
+    max_session_bytes=MAX_UPLOAD_BYTES,
+    shared=shared_table('upload_sessions'),
+    shared_chunks=shared_table('upload_chunks')
+)
+
+# Profilurile cererilor marcate cu X-Profile, după id-ul cererii (descărcabile prin /profiles)
+from utils.profiling import ProfileStore, RequestProfile, ActiveProfile, PROFILE_MODES, PROFILE_FORMATS
+
+profile_store = ProfileStore(
+    MAX_PROFILES,
+    shared=shared_table('request_profiles', MAX_PROFILES),
+    shared_summaries=shared_table('request_profile_summaries', MAX_PROFILES)
+)
 
 # FAZA 2.1 - Thread pentru curățare periodică
 def cleanup_old_sessions():
@@ -86,40 +201,174 @@ def cleanup_old_sessions():
     while True:
         time.sleep(SESSION_CLEANUP_INTERVAL)
         try:
-            # Curăță structurile de directoare mai vechi de 24 ore
-            current_time = datetime.now()
-            structures_to_remove = []
+            # Curăță structurile de directoare nefolosite mai mult de STRUCTURE_TTL
+            removed = structure_store.evict_expired()
+            if removed:
+                print(f"Curățat {removed} structuri vechi")
             
-            for struct_id in list(directory_structures.keys()):
-                # Verifică dacă există timestamp
-                if hasattr(directory_structures[struct_id], '_timestamp'):
-                    if current_time - directory_structures[struct_id]._timestamp > timedelta(hours=24):
-                        structures_to_remove.append(struct_id)
-                        
-            for struct_id in structures_to_remove:
-                del directory_structures[struct_id]
-                if struct_id in directory_files:
-                    del directory_files[struct_id]
-                    
-            if structures_to_remove:
-                print(f"Curățat {len(structures_to_remove)} structuri vechi")
+            # Editările sesiunilor expirate
+            max_idle = app.config['PERMANENT_SESSION_LIFETIME'].total_seconds()
+            idle = session_edits.evict_idle(max_idle)
+            if idle:
+                print(f"Curățat editările a {idle} sesiuni inactive")
+            project_states.evict_idle(max_idle)
+            job_manager.evict_expired()
+            upload_sessions.evict_expired()
                 
         except Exception as e:
             print(f"Eroare la curățarea sesiunilor: {e}")
 
-# Pornește thread-ul de curățare
-cleanup_thread = threading.Thread(target=cleanup_old_sessions, daemon=True)
-cleanup_thread.start()
+# Procesul în care rulează thread-ul de curățare (pornit de create_app, câte unul per worker)
+background_services_pid = None
+
+def start_background_services():
+    """Pornește thread-ul de curățare o singură dată în procesul curent"""
+    global background_services_pid
+    if background_services_pid == os.getpid():
+        return
+    background_services_pid = os.getpid()
+    threading.Thread(target=cleanup_old_sessions, daemon=True).start()
 
 # Import analizoare actualizate
-from analyzers.ast_analyzer import ASTAnalyzer
+from analyzers.ast_analyzer import ASTAnalyzer, set_phase_observer, run_with_phase_timings, report_phase_timings
 from analyzers.dependency_analyzer import DependencyAnalyzer
 from analyzers.project_analyzer import ProjectAnalyzer
+from analyzers.graph_export import GraphExporter, CallGraphBuilder, EXPORT_FORMATS
+from analyzers.history_analyzer import HistoryAnalyzer, GitCommandError
+from analyzers.metrics_store import MetricsStore, FUNCTION_COLUMNS, FILE_COLUMNS
+from analyzers.query_index import AnalysisIndex, QueryError
+from analyzers.snapshot_diff import SnapshotStore, build_snapshot, diff_snapshots
+from analyzers.distributed import ShardCoordinator, CLUSTER_TOKEN_HEADER, DEFAULT_SHARD_FILES
+from utils.file_utils import scan_directory, read_file_safe, build_structure_tree
+from utils.archive_utils import iter_archive_members, is_supported_archive, ArchiveLimits, ArchiveLimitError
+from utils.serialization import encode, dumps, dumps_str, negotiate_mimetype
+from utils.compression import (
+    choose_encoding, compress_body, is_compressible, strong_etag, etag_matches, matching_etag, ENCODING_SUFFIXES
+)
+from utils.job_manager import JobManager, JobQueueFullError, FINISHED_STATES
+from utils.metrics import MetricsRegistry, SIZE_BUCKETS, PROMETHEUS_MIMETYPE, process_memory
+from analyzers.incremental import (
+    AnalysisResultCache, ManifestStore, ManifestEntry,
+    analysis_key, key_for_hash, content_hash, file_fingerprint, build_file_result, analyze_source
+)
 
 # Inițializare analizoare
 ast_analyzer = ASTAnalyzer()
 dependency_analyzer = DependencyAnalyzer()
-project_analyzer = ProjectAnalyzer()
+
+# Rezultate per fișier (după conținut) și manifeste per proiect pentru reanaliză incrementală
+analysis_results_cache = AnalysisResultCache(
+    ANALYSIS_CACHE_SIZE, shared=shared_table('analysis_results', SHARED_CACHE_MAX_ENTRIES)
+)
+project_manifests = ManifestStore()
+
+# Coordonatorul analizei distribuite (conținutul se citește doar la predarea shard-ului)
+cluster_coordinator = ShardCoordinator(
+    content_loader=lambda file_data: cluster_file_content(file_data),
+    lease_timeout=CLUSTER_LEASE_TIMEOUT,
+    shared=shared_table('cluster_jobs'),
+    shared_results=shared_table('cluster_shard_results', 10000)
+)
+
+# Operațiile lungi (analiză director, raport proiect, workflow) rulate ca job-uri
+job_manager = JobManager(
+    workers=JOB_WORKERS,
+    max_queue=JOB_QUEUE_SIZE,
+    result_ttl=JOB_RESULT_TTL,
+    max_runtime=JOB_MAX_RUNTIME or None,
+    shared=shared_table('jobs')
+)
+
+# Metrici per endpoint, durata fazelor analizei și starea cache-urilor, în format Prometheus
+metrics = MetricsRegistry(shared=shared_table('worker_metrics'))
+metrics.counter('p4n6_http_requests_total', 'Cereri HTTP după endpoint, metodă și status')
+metrics.histogram('p4n6_http_request_duration_seconds', 'Durata cererilor, până la închiderea răspunsului')
+metrics.histogram('p4n6_http_request_size_bytes', 'Dimensiunea corpului cererilor', SIZE_BUCKETS)
+metrics.histogram('p4n6_http_response_size_bytes', 'Dimensiunea răspunsurilor (după compresie)', SIZE_BUCKETS)
+metrics.histogram('p4n6_analysis_phase_seconds', 'Durata fazelor analizei: parse, extract (per fișier), graph (per proiect)')
+
+def collect_store_metrics():
+    """Statisticile cache-urilor și store-urilor, citite la fiecare cerere /metrics"""
+    structures = structure_store.stats()
+    blobs = blob_store.stats()
+    edits = session_edits.stats()
+    uploads = upload_sessions.stats()
+    yield 'p4n6_analysis_cache_hits_total', 'counter', 'Rezultate de analiză găsite în cache', [
+        ({'tier': 'local'}, analysis_results_cache.hits - analysis_results_cache.shared_hits),
+        ({'tier': 'shared'}, analysis_results_cache.shared_hits)
+    ]
+    yield 'p4n6_analysis_cache_misses_total', 'counter', 'Rezultate de analiză absente din cache', [
+        ({}, analysis_results_cache.misses)
+    ]
+    yield 'p4n6_analysis_cache_entries', 'gauge', 'Rezultate de analiză păstrate în memoria procesului', [
+        ({}, len(analysis_results_cache.cache))
+    ]
+    yield 'p4n6_structure_store_hits_total', 'counter', 'Structuri găsite în store', [({}, structures['hits'])]
+    yield 'p4n6_structure_store_misses_total', 'counter', 'Structuri absente din store', [({}, structures['misses'])]
+    yield 'p4n6_structure_store_evictions_total', 'counter', 'Structuri evacuate, după motiv', [
+        ({'reason': reason}, count) for reason, count in structures['evictions'].items()
+    ]
+    yield 'p4n6_structure_store_entries', 'gauge', 'Structuri încărcate', [({}, structures['entries'])]
+    yield 'p4n6_structure_store_bytes', 'gauge', 'Memoria estimată a structurilor', [({}, structures['bytes'])]
+    yield 'p4n6_blob_store_blobs', 'gauge', 'Blob-uri în blob store', [({}, blobs['blobs'])]
+    yield 'p4n6_blob_store_bytes', 'gauge', 'Bytes ocupați de blob-uri', [({}, blobs['bytes'])]
+    yield 'p4n6_blob_store_evictions_total', 'counter', 'Blob-uri evacuate', [({}, blobs['evictions'])]
+    yield 'p4n6_session_edits', 'gauge', 'Editări păstrate în sesiuni', [({}, edits['edits'])]
+    yield 'p4n6_session_edit_sessions', 'gauge', 'Sesiuni cu editări', [({}, edits['sessions'])]
+    yield 'p4n6_session_edit_bytes', 'gauge', 'Bytes ocupați de editări', [({}, edits['bytes'])]
+    yield 'p4n6_session_edit_evictions_total', 'counter', 'Editări evacuate (cote sau LRU)', [({}, edits['evictions'])]
+    yield 'p4n6_jobs', 'gauge', 'Job-uri după stare', [
+        ({'state': state}, count) for state, count in job_manager.stats().items()
+    ]
+    yield 'p4n6_upload_sessions', 'gauge', 'Încărcări în chunk-uri active', [({}, uploads['sessions'])]
+    memory = process_memory()
+    if 'resident' in memory:
+        yield 'p4n6_process_resident_memory_bytes', 'gauge', 'Memoria rezidentă a procesului', [
+            ({}, memory['resident'])
+        ]
+    if 'max_resident' in memory:
+        yield 'p4n6_process_max_resident_memory_bytes', 'gauge', 'Memoria rezidentă maximă a procesului', [
+            ({}, memory['max_resident'])
+        ]
+
+if METRICS_ENABLED:
+    metrics.register_collector(collect_store_metrics)
+    set_phase_observer(lambda phase, seconds: metrics.observe('p4n6_analysis_phase_seconds', seconds, phase=phase))
+
+# Snapshot-uri compacte ale analizelor, pentru compararea versiunilor unui proiect
+analysis_snapshots = SnapshotStore(shared=shared_table('analysis_snapshots', 100))
+
+# Analizoare de istoric git per repository (cache-ul după SHA blob se păstrează între cereri)
+history_analyzers = OrderedDict()
+history_analyzers_lock = threading.Lock()
+MAX_HISTORY_REPOSITORIES = 8
+
+archive_limits = ArchiveLimits(
+    max_member_size=MAX_FILE_SIZE,
+    max_total_size=ARCHIVE_MAX_TOTAL_SIZE,
+    max_ratio=ARCHIVE_MAX_RATIO,
+    max_members=ARCHIVE_MAX_MEMBERS
+)
+
+# Pool de procese pentru analiză, creat la prima utilizare
+analysis_pool = None
+analysis_pool_lock = threading.Lock()
+
+def analysis_worker_count():
+    """Numărul efectiv de procese de analiză"""
+    return ANALYSIS_WORKERS if ANALYSIS_WORKERS > 0 else (os.cpu_count() or 1)
+
+def get_analysis_pool():
+    """Returnează pool-ul de procese sau None dacă analiza este secvențială"""
+    global analysis_pool
+    workers = analysis_worker_count()
+    if workers <= 1:
+        return None
+    
+    with analysis_pool_lock:
+        if analysis_pool is None:
+            analysis_pool = ProcessPoolExecutor(max_workers=workers)
+        return analysis_pool
 
 def calculate_complexity(node):
     """Calculează complexitatea ciclomatică a unei funcții"""
@@ -156,13 +405,10 @@ def extract_entities_from_code(code):
                     entities['classes'].append(match.group(1))
     return entities
 
-def analyze_imports_detailed(content, modul_principal, entities):
-    """FAZA 1.3 - Analizează detaliat ce entități sunt importate, folosind AST analyzer actualizat"""
+def analyze_imports_detailed(imports_detail, modul_principal, state):
+    """FAZA 1.3 - Analizează detaliat ce entități sunt importate, din importurile deja extrase de AST analyzer"""
     imported_entities = {'functions': [], 'classes': []}
-    
-    # Folosește AST analyzer pentru detectare precisă
-    analysis = ast_analyzer.analyze_code(content)
-    imports_detail = analysis.get('imports_detail', {})
+    entities = state.entities()
     
     # Verifică importurile pentru modulul principal
     if modul_principal in imports_detail:
@@ -175,9 +421,9 @@ def analyze_imports_detailed(content, modul_principal, entities):
         else:
             # Import specific
             for item in items:
-                if item in entities['functions']:
+                if item in state.function_names:
                     imported_entities['functions'].append(item)
-                elif item in entities['classes']:
+                elif item in state.class_names:
                     imported_entities['classes'].append(item)
     
     # Verifică și importurile de tip "import modul"
@@ -230,39 +476,995 @@ def count_directories(structure):
     count_recursive(structure)
     return count
 
-def get_edited_content(filename):
-    """Obține conținutul editat dintr-un fișier din sesiune"""
-    return session_edits.get(filename)
+def current_edit_namespace():
+    """Namespace-ul editărilor: antetul X-Session-Id sau un id păstrat în sesiunea Flask"""
+    client_id = request.headers.get('X-Session-Id', '').strip()
+    if client_id:
+        return f'client:{client_id[:128]}'
+    
+    if 'edit_namespace' not in session:
+        session.permanent = True
+        session['edit_namespace'] = uuid.uuid4().hex
+    return session['edit_namespace']
+
+def get_edited_content(filename, namespace=None):
+    """Obține conținutul editat dintr-un fișier din sesiune
+    
+    Fără namespace explicit se folosește sesiunea cererii curente (în afara
+    unei cereri nu există editări).
+    """
+    if namespace is None:
+        if not has_request_context():
+            return None
+        namespace = current_edit_namespace()
+    return session_edits.get(namespace, filename)
+
+def resolve_allowed_path(path):
+    """Returnează calea reală dacă se află într-unul din ANALYSIS_ROOTS, altfel None"""
+    if not path:
+        return None
+    
+    real_path = os.path.realpath(path)
+    for root in ANALYSIS_ROOTS:
+        try:
+            if os.path.commonpath([real_path, root]) == root:
+                return real_path
+        except ValueError:
+            # Drive-uri diferite pe Windows
+            continue
+    return None
+
+def load_file_content(file_data):
+    """Obține conținutul unui fișier: inline sau citit la cerere de pe disc"""
+    content = file_data.get('content', '')
+    if content:
+        return content
+    
+    # Fișierele înregistrate din disc local nu își păstrează conținutul în memorie
+    local_path = resolve_allowed_path(file_data.get('local_path'))
+    if local_path:
+        content, _ = read_file_safe(local_path, size_limit=MAX_FILE_SIZE)
+        return content or ''
+    
+    # Fișierele trimise doar cu hash-ul își iau conținutul din blob store
+    digest = file_data.get('sha256')
+    if digest:
+        return blob_store.get(digest) or ''
+    
+    return ''
+
+def cluster_file_content(file_data):
+    """Conținutul unui fișier trimis workerilor (inclusiv editările sesiunii care a creat job-ul)"""
+    namespace = file_data.get('edit_namespace')
+    edited = get_edited_content(file_data.get('name', ''), namespace) if namespace else None
+    content = edited or load_file_content(file_data)
+    return '' if content == TOO_LARGE_PLACEHOLDER else content
+
+def check_cluster_token():
+    """Verifică token-ul workerilor; fără CLUSTER_TOKEN configurat protocolul este închis"""
+    if not CLUSTER_TOKEN:
+        return False
+    token = request.headers.get(CLUSTER_TOKEN_HEADER) or ''
+    return hmac.compare_digest(token.encode(), CLUSTER_TOKEN.encode())
+
+def missing_blobs_response(error):
+    """409 cu fișierele și hash-urile de reîncărcat (POST /blobs sau arhiva din nou)"""
+    return jsonify({
+        'status': 'error',
+        'message': str(error),
+        'missing_files': sorted(error.missing),
+        'missing_blobs': error.digests
+    }), 409
+
+def evicted_blob(file_data):
+    """Hash-ul unui fișier trimis doar prin hash al cărui conținut a fost evacuat din blob store (None altfel)"""
+    if file_data.get('content') or file_data.get('local_path'):
+        return None
+    digest = file_data.get('sha256')
+    return digest if digest and digest not in blob_store else None
+
+def unresolved_blobs(files):
+    """Cale -> hash pentru fișierele al căror conținut trebuie retrimis (POST /blobs)"""
+    unresolved = {}
+    for file_data in files:
+        digest = evicted_blob(file_data)
+        if digest:
+            unresolved[file_data.get('path') or file_data.get('name', '')] = digest
+    return unresolved
+
+def has_file_source(file_data):
+    """Verifică dacă un fișier are conținut inline, o cale locală sau un hash cunoscut"""
+    return bool(file_data.get('content') or file_data.get('local_path') or file_data.get('sha256'))
+
+def get_file_result(file_data, analyzer=None, namespace=None):
+    """Rezultatul analizei unui fișier: din cache (după hash) sau calculat acum"""
+    filename = file_data.get('name', '')
+    edited_content = get_edited_content(filename, namespace)
+    
+    # Hash-ul e de încredere doar când conținutul nu e trimis (calculat de server)
+    if not edited_content and not file_data.get('content') and file_data.get('sha256'):
+        result = analysis_results_cache.get(key_for_hash(file_data['sha256']))
+        if result is not None:
+            return result
+    
+    content = edited_content or load_file_content(file_data)
+    if not content:
+        digest = evicted_blob(file_data)
+        if digest:
+            raise MissingBlobError({file_data.get('path') or filename: digest})
+    if not content or content == TOO_LARGE_PLACEHOLDER:
+        return None
+    
+    key = analysis_key(content)
+    result = analysis_results_cache.get(key)
+    if result is None:
+        result = build_file_result((analyzer or ASTAnalyzer()).analyze_code(content, filename))
+        analysis_results_cache.set(key, result)
+    return result
+
+def iter_python_results(structure_id):
+    """
+    Generează (file_data, rezultat analiză) pentru fișierele Python ale unei structuri
+
+    Raises:
+        MissingBlobError: la final, dacă unele fișiere au conținutul evacuat din blob store
+    """
+    # Analizor local - generatorul poate rula în paralel cu alte cereri
+    analyzer = ASTAnalyzer()
+    entry = structure_store.get(structure_id)
+    unresolved = {}
+    for file_data in (entry.files if entry else []):
+        if file_data.get('type') != 'python':
+            continue
+        
+        try:
+            result = get_file_result(file_data, analyzer)
+        except MissingBlobError as e:
+            unresolved.update(e.missing)
+            continue
+        if result is not None:
+            yield file_data, result
+    
+    if unresolved:
+        raise MissingBlobError(unresolved)
 
-def analyze_directory_dependencies(files):
-    """Analizează dependențele între fișierele unui director"""
+def analyze_directory_dependencies(files, imports_by_file=None, namespace=None):
+    """Analizează dependențele între fișierele unui director
+    
+    imports_by_file (nume fișier -> module importate) permite reutilizarea
+    importurilor deja extrase; fișierele lipsă sunt analizate din nou.
+    """
     dependencies = {}
+    imports_by_file = imports_by_file or {}
+    
+    # Index nume modul local -> fișiere, în locul comparării fiecărei perechi
+    local_modules = {}
+    for other_file in files:
+        other_name = other_file.get('name', '').replace('.py', '')
+        local_modules.setdefault(other_name, []).append(other_file.get('name', ''))
     
     for file in files:
         filename = file.get('name', '')
         if not filename.endswith('.py'):
             continue
+        
+        imported_modules = imports_by_file.get(filename)
+        if imported_modules is None:
+            content = get_edited_content(filename, namespace) or load_file_content(file)
+            if not content:
+                continue
             
-        content = get_edited_content(filename) or file.get('content', '')
-        if not content:
-            continue
+            analysis = ast_analyzer.analyze_code(content, filename)
+            imported_modules = analysis.get('imports_detail', {}).keys()
         
-        analysis = ast_analyzer.analyze_code(content, filename)
         deps = set()
         
-        # Verifică importurile locale
-        imports_detail = analysis.get('imports_detail', {})
-        for imp_module in imports_detail:
-            # Verifică dacă este un import local
-            for other_file in files:
-                other_name = other_file.get('name', '').replace('.py', '')
-                if imp_module == other_name or imp_module.endswith(f'.{other_name}'):
-                    deps.add(other_file.get('name', ''))
+        # Verifică importurile locale: modulul complet sau un sufix după '.'
+        for imp_module in imported_modules:
+            parts = imp_module.split('.')
+            for start in range(len(parts)):
+                deps.update(local_modules.get('.'.join(parts[start:]), []))
         
         dependencies[filename] = list(deps)
     
     return dependencies
 
+def derive_project_key(structure, files, project_id=None):
+    """Determină cheia proiectului folosită de manifestul incremental"""
+    if project_id:
+        return str(project_id)
+    
+    # Primul director din căile relative (webkitRelativePath) identifică proiectul
+    for file_data in files:
+        path = file_data.get('path', '')
+        if '/' in path:
+            return path.split('/', 1)[0]
+    
+    return structure.get('name', 'root')
+
+def compute_structure_id(structure, files):
+    """ID-ul structurii: arborele plus hash-urile fișierelor (fără conținut, arborele nu le mai distinge)"""
+    file_hashes = [[f.get('path', ''), f.get('sha256', '')] for f in files if f.get('sha256')]
+    return hashlib.md5(
+        json.dumps([structure, file_hashes] if file_hashes else structure, sort_keys=True).encode()
+    ).hexdigest()[:8]
+
+def directory_fingerprint(structure_id, file_count, keys_by_path):
+    """Amprenta analizei unei structuri: id-ul, numărul de fișiere și cheia de analiză a fiecărui fișier"""
+    return strong_etag(structure_id, file_count, *sorted(f'{path}={key}' for path, key in keys_by_path.items()))
+
+def expected_directory_fingerprint(structure_id, namespace=None):
+    """
+    Amprenta pe care ar avea-o analiza structurii, calculată fără a o rula
+
+    Folosește doar manifestul (fișiere neschimbate după hash/mtime) și editările
+    sesiunii; None dacă un fișier ar trebui citit sau analizat (amprenta nu se
+    poate stabili fără analiză).
+    """
+    stored = structure_store.get(structure_id)
+    if stored is None:
+        return None
+    manifest = project_manifests.get(stored.project_key or derive_project_key(stored.structure, stored.files))
+    keys = {}
+    for file_data in stored.files:
+        if file_data.get('type') != 'python' or not has_file_source(file_data):
+            continue
+        path = file_data.get('path') or file_data['name']
+        edited_content = get_edited_content(file_data['name'], namespace)
+        if edited_content:
+            keys[path] = analysis_key(edited_content)
+            continue
+        entry = manifest.get(path)
+        size = file_data.get('size')
+        if not entry or size is None or not entry.matches(size, file_fingerprint(file_data)):
+            return None
+        keys[path] = entry.analysis_key
+    return directory_fingerprint(structure_id, len(stored.files), keys)
+
+def iter_directory_analysis(structure_id, namespace=None, extras=None):
+    """Analizează o structură și generează evenimente de progres (eveniment, date)
+    
+    Evenimente: 'phase' la schimbarea fazei (parse, dependencies, import_graph),
+    'file' după fiecare fișier analizat (cu totalurile curente) și 'done' cu
+    rezultatul complet, identic cu cel returnat de /analyze_directory.
+    namespace selectează editările din sesiune (implicit sesiunea cererii curente).
+    extras (dicționar), dacă este dat, primește datele derivate ('metrics', 'index',
+    'analysis') chiar dacă structura este evacuată din store între timp.
+    """
+    stored = structure_store.get(structure_id)
+    if stored is None:
+        raise KeyError(f'Structură necunoscută: {structure_id}')
+    structure = stored.structure
+    files = stored.files
+    
+    # Filtrează doar fișierele Python
+    python_files = [f for f in files if f.get('type') == 'python' and has_file_source(f)]
+    
+    analysis_results = {
+        'structure_id': structure_id,
+        'timestamp': datetime.now().isoformat(),
+        'files_analyzed': 0,
+        'total_files': len(files),
+        'total_functions': 0,
+        'total_classes': 0,
+        'total_lines': 0,
+        'dependencies': {},
+        'entry_points': find_entry_points(structure),
+        'file_analyses': {},
+        'import_graph': {},
+        'complexity_metrics': {},
+        'directories': count_directories(structure)
+    }
+    
+    # Analizor local - generatorul poate rula în paralel cu alte cereri
+    analyzer = ASTAnalyzer()
+    total = len(python_files)
+    yield 'phase', {'phase': 'parse', 'total': total}
+    
+    # Manifestul proiectului: fișierele neschimbate își reutilizează rezultatele
+    project_key = stored.project_key or derive_project_key(structure, files)
+    manifest = project_manifests.get(project_key)
+    new_entries = {}
+    imports_by_file = {}
+    metrics_store = MetricsStore()
+    reused, recomputed = [], []
+    # Fișiere referite prin hash al căror conținut nu mai poate fi citit
+    unresolved = {}
+    # Analizele după cale (file_analyses e după nume: fișierele __init__.py s-ar suprapune)
+    analyses_by_path = {}
+    
+    # Analizează fiecare fișier Python
+    for index, file_data in enumerate(python_files, 1):
+        filename = file_data['name']
+        path = file_data.get('path') or filename
+        edited_content = get_edited_content(filename, namespace)
+        size = file_data.get('size')
+        fingerprint = None if edited_content else file_fingerprint(file_data)
+        
+        # Fișier neschimbat după manifest: conținutul nu mai e citit sau hash-uit
+        result = None
+        key = None
+        entry = manifest.get(path)
+        if entry and size is not None and entry.matches(size, fingerprint):
+            key = entry.analysis_key
+            result = analysis_results_cache.get(key)
+        
+        # Hash-ul e de încredere doar când conținutul nu e trimis (calculat de server)
+        if result is None and not edited_content and not file_data.get('content') and file_data.get('sha256'):
+            key = key_for_hash(file_data['sha256'])
+            result = analysis_results_cache.get(key)
+        
+        if result is None:
+            content = edited_content or load_file_content(file_data)
+            
+            if not content and file_data.get('sha256') and not file_data.get('local_path'):
+                # Nu se omite în tăcere: analiza ar raporta un proiect incomplet ca reușit
+                unresolved[path] = file_data['sha256']
+                continue
+            
+            if not content or content == TOO_LARGE_PLACEHOLDER:
+                continue
+            
+            if size is None:
+                size = len(content)
+            
+            key = analysis_key(content)
+            result = analysis_results_cache.get(key)
+        
+        if result is None:
+            # Analiză detaliată folosind AST analyzer actualizat
+            result = build_file_result(analyzer.analyze_code(content, filename))
+            analysis_results_cache.set(key, result)
+            recomputed.append(path)
+            was_reused = False
+        else:
+            reused.append(path)
+            was_reused = True
+        
+        # Conținutul nu mai este necesar după extragerea rezultatelor
+        content = None
+        
+        new_entries[path] = ManifestEntry(path=path, size=size, fingerprint=fingerprint, analysis_key=key)
+        
+        file_analysis = result['analysis']
+        if file_analysis.get('filename') != filename:
+            # Același conținut sub alt nume
+            file_analysis = {**file_analysis, 'filename': filename}
+        
+        analysis_results['file_analyses'][filename] = file_analysis
+        analyses_by_path[path] = file_analysis
+        imports_by_file[filename] = result['imports']
+        metrics_store.add_file(filename, file_analysis)
+        
+        # Actualizează statistici globale
+        if 'error' not in file_analysis:
+            analysis_results['files_analyzed'] += 1
+            analysis_results['total_functions'] += len(file_analysis.get('functions', []))
+            analysis_results['total_classes'] += len(file_analysis.get('classes', []))
+            analysis_results['total_lines'] += file_analysis.get('metrics', {}).get('total_lines', 0)
+            
+            # Complexitate
+            if result['complexity']:
+                analysis_results['complexity_metrics'][filename] = result['complexity']
+        
+        yield 'file', {
+            'filename': filename,
+            'index': index,
+            'total': total,
+            'reused': was_reused,
+            'analysis': file_analysis,
+            'complexity': result['complexity'],
+            'totals': {
+                name: analysis_results[name]
+                for name in ('files_analyzed', 'total_functions', 'total_classes', 'total_lines')
+            }
+        }
+    
+    if unresolved:
+        raise MissingBlobError(unresolved)
+    
+    derived = extras if extras is not None else {}
+    
+    # Distribuția complexității, calculată pe coloane
+    derived['metrics'] = metrics_store
+    structure_store.set_extra(structure_id, 'metrics', metrics_store, size=metrics_store.estimated_bytes())
+    analysis_results['complexity_summary'] = metrics_store.summary()
+    
+    removed = manifest.replace(new_entries)
+    
+    # ETag după conținut: aceleași fișiere (cheile includ versiunea analizorului) -> același ETag
+    analysis_results['fingerprint'] = directory_fingerprint(
+        structure_id, len(files), {path: item.analysis_key for path, item in new_entries.items()}
+    )
+    analysis_results['incremental'] = {
+        'project_key': project_key,
+        'reused': reused,
+        'recomputed': recomputed,
+        'removed': removed
+    }
+    
+    # Analizează dependențele din importurile deja extrase
+    graph_started = time.perf_counter()
+    yield 'phase', {'phase': 'dependencies'}
+    analysis_results['dependencies'] = analyze_directory_dependencies(python_files, imports_by_file, namespace)
+    
+    # Construiește graful de importuri
+    yield 'phase', {'phase': 'import_graph'}
+    for filename, deps in analysis_results['dependencies'].items():
+        analysis_results['import_graph'][filename] = {
+            'imports': deps,
+            'imported_by': []
+        }
+    
+    # Populează imported_by
+    for filename, graph_data in analysis_results['import_graph'].items():
+        for dep in graph_data['imports']:
+            if dep in analysis_results['import_graph']:
+                analysis_results['import_graph'][dep]['imported_by'].append(filename)
+    
+    if METRICS_ENABLED:
+        metrics.observe('p4n6_analysis_phase_seconds', time.perf_counter() - graph_started, phase='graph')
+    
+    # Snapshot pentru compararea cu versiunile anterioare ale proiectului
+    snapshot = build_snapshot(project_key, analyses_by_path, analysis_results['dependencies'])
+    analysis_snapshots.add(snapshot)
+    analysis_results['snapshot_id'] = snapshot.snapshot_id
+    
+    # Index secundar pentru /query
+    derived['index'] = AnalysisIndex.build(analysis_results['file_analyses'], analysis_results['dependencies'])
+    structure_store.set_extra(structure_id, 'index', derived['index'], size=derived['index'].estimated_bytes())
+    
+    # Ultima analiză, pentru paginile următoare din /analyze_directory/files
+    # (dimensiunea serializată intră în bugetul store-ului)
+    derived['analysis'] = analysis_results
+    structure_store.set_extra(structure_id, 'analysis', analysis_results, size=len(dumps(analysis_results)))
+    
+    yield 'done', {'status': 'ok', 'analysis': analysis_results}
+
+def run_directory_analysis(structure_id, namespace=None, extras=None):
+    """Rulează analiza completă a unei structuri și returnează rezultatul final"""
+    analysis_results = None
+    for event, payload in iter_directory_analysis(structure_id, namespace, extras):
+        if event == 'done':
+            analysis_results = payload['analysis']
+    return analysis_results
+
+def get_structure_extra(structure_id, key):
+    """Date derivate din analiza structurii ('metrics', 'index'), reconstruite dacă lipsesc
+    
+    Valoarea reconstruită este luată direct din analiză: intrarea poate fi
+    evacuată înainte de o nouă citire din store.
+    """
+    value = structure_store.get_extra(structure_id, key)
+    if value is None:
+        extras = {}
+        run_directory_analysis(structure_id, extras=extras)
+        value = extras[key]
+    return value
+
+def request_flag(data, name):
+    """Valoare booleană din JSON (true) sau din query string ('1', 'true')"""
+    value = data.get(name, False)
+    return value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes')
+
+def summarize_directory_analysis(analysis_results):
+    """Analiza fără file_analyses: totaluri, import_graph, complexity_metrics etc."""
+    summary = {key: value for key, value in analysis_results.items() if key != 'file_analyses'}
+    summary['file_analyses_count'] = len(analysis_results['file_analyses'])
+    return summary
+
+def encode_page_cursor(fingerprint, offset):
+    """Cursor opac: analiza (fingerprint) și poziția în file_analyses"""
+    return base64.urlsafe_b64encode(f'{fingerprint}:{offset}'.encode()).decode().rstrip('=')
+
+def decode_page_cursor(cursor):
+    """(fingerprint, offset) dintr-un cursor; ValueError dacă este invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        fingerprint, offset = raw.rsplit(':', 1)
+        return fingerprint, max(0, int(offset))
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('Cursor invalid')
+
+def parse_page_request(data):
+    """(page_size, fields) din cerere; fields poate fi listă sau text separat prin virgule"""
+    page_size = min(MAX_PAGE_SIZE, max(0, int(data.get('page_size', DEFAULT_PAGE_SIZE))))
+    fields = data.get('fields') or None
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    return page_size, fields
+
+def file_analyses_page(analysis_results, offset, page_size, fields=None):
+    """O pagină din file_analyses, cu doar câmpurile cerute ('filename' și 'error' sunt păstrate mereu)"""
+    file_analyses = analysis_results['file_analyses']
+    page = {}
+    for filename, file_analysis in itertools.islice(file_analyses.items(), offset, offset + page_size):
+        if fields:
+            file_analysis = {
+                key: value for key, value in file_analysis.items()
+                if key in fields or key in ('filename', 'error')
+            }
+        page[filename] = file_analysis
+    
+    next_offset = offset + len(page)
+    return {
+        'file_analyses': page,
+        'next_cursor': encode_page_cursor(analysis_results['fingerprint'], next_offset)
+                       if next_offset < len(file_analyses) else None,
+        'total': len(file_analyses)
+    }
+
+def stream_directory_analysis(structure_id, stream_format='sse', summary_only=False):
+    """Răspuns în flux cu evenimentele generate de iter_directory_analysis"""
+    def generate():
+        try:
+            for event, payload in iter_directory_analysis(structure_id):
+                if event == 'done' and summary_only:
+                    # Detaliile per fișier au fost deja trimise în evenimentele 'file'
+                    payload = {**payload, 'analysis': summarize_directory_analysis(payload['analysis'])}
+                yield format_stream_event(event, payload, stream_format)
+        except MissingBlobError as e:
+            yield format_stream_event('error', {
+                'status': 'error',
+                'message': str(e),
+                'missing_files': sorted(e.missing),
+                'missing_blobs': e.digests
+            }, stream_format)
+        except Exception as e:
+            yield format_stream_event('error', {
+                'status': 'error',
+                'message': f'Eroare la analiza directorului: {str(e)}'
+            }, stream_format)
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            'Cache-Control': 'no-cache',
+            # Dezactivează buffering-ul în proxy-uri (nginx)
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+def get_history_analyzer(repo_root):
+    """Returnează analizorul de istoric al unui repository, păstrând cache-ul de blob-uri"""
+    with history_analyzers_lock:
+        analyzer = history_analyzers.get(repo_root)
+        if analyzer is None:
+            analyzer = HistoryAnalyzer(repo_root)
+            history_analyzers[repo_root] = analyzer
+        history_analyzers.move_to_end(repo_root)
+        
+        while len(history_analyzers) > MAX_HISTORY_REPOSITORIES:
+            history_analyzers.popitem(last=False)
+        
+        return analyzer
+
+def iter_history_analysis(analyzer, rev, max_commits):
+    """Evenimente ('commit', ...) pentru fiecare commit, apoi ('done', statistici)"""
+    commits = 0
+    # Per cerere, din snapshot-uri: analizorul este partajat cu alte cereri pe același repository
+    blobs_analyzed = 0
+    for snapshot in analyzer.iter_history(rev, max_commits, executor=get_analysis_pool()):
+        commits += 1
+        blobs_analyzed += snapshot.new_blobs
+        yield 'commit', dataclasses.asdict(snapshot)
+    
+    yield 'done', {
+        'status': 'ok',
+        'commits': commits,
+        'unique_blobs': len(analyzer.blob_cache),
+        'blobs_analyzed': blobs_analyzed
+    }
+
+def register_local_structure(local_root, project_id=None):
+    """Înregistrează un director local ca structură, fără a-i încărca conținutul"""
+    scanned = scan_directory(local_root, extensions=['py', 'pyw'])
+    
+    # Doar metadate: conținutul se citește fișier cu fișier în timpul analizei
+    files = [{
+        'name': info['name'],
+        'path': info['path'].replace(os.sep, '/'),
+        'size': info['size'],
+        'modified': info['modified'],
+        'type': info['type'],
+        'local_path': info['absolute_path']
+    } for info in scanned]
+    files.sort(key=lambda f: f['path'])
+    
+    structure = build_structure_tree(files, os.path.basename(local_root) or local_root)
+    structure_id = hashlib.md5(f'local:{local_root}'.encode()).hexdigest()[:8]
+    
+    structure_store.put(structure_id, structure, files, project_id or f'local:{local_root}')
+    
+    return structure_id, files
+
+def ingest_archive(stream, archive_name):
+    """Citește membrii Python ai unei arhive și îi analizează pe măsură ce sosesc
+    
+    Fiecare membru este analizat (în pool-ul de procese, dacă există) și scris
+    în blob store, deci poate fi reanalizat după ce rezultatul iese din cache.
+    """
+    files = []
+    pool = get_analysis_pool()
+    pending = deque()
+    # Limitează membrii aflați simultan în memorie
+    max_pending = analysis_worker_count() * 2
+    
+    for path, size, content in iter_archive_members(stream, archive_name, archive_limits):
+        name = posixpath.basename(path)
+        digest = content_hash(content)
+        key = key_for_hash(digest)
+        files.append({
+            'name': name,
+            'path': path,
+            'size': size,
+            'type': 'python',
+            'sha256': digest
+        })
+        
+        blob_store.put(content, expected_digest=digest)
+        
+        if analysis_results_cache.get(key) is not None:
+            continue
+        
+        if pool is None:
+            analysis_results_cache.set(key, analyze_source(content, name))
+            continue
+        
+        pending.append((key, pool.submit(run_with_phase_timings, analyze_source, content, name)))
+        while len(pending) > max_pending:
+            done_key, future = pending.popleft()
+            analysis_results_cache.set(done_key, report_phase_timings(future.result()))
+    
+    while pending:
+        done_key, future = pending.popleft()
+        analysis_results_cache.set(done_key, report_phase_timings(future.result()))
+    
+    return files
+
+def register_archive_structure(archive_name, files, project_id=None):
+    """Înregistrează fișierele unei arhive ca structură (doar metadate și hash-uri)"""
+    root_name = archive_name
+    for suffix in ('.zip', '.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tbz2', '.txz', '.tar'):
+        if root_name.lower().endswith(suffix):
+            root_name = root_name[:-len(suffix)]
+            break
+    
+    structure = build_structure_tree(files, root_name or 'root')
+    fingerprint = json.dumps([(f['path'], f['sha256']) for f in files], sort_keys=True)
+    structure_id = hashlib.md5(fingerprint.encode()).hexdigest()[:8]
+    
+    structure_store.put(structure_id, structure, files, project_id or f'archive:{root_name}')
+    
+    return structure_id
+
+def prepare_upload_chunk(files):
+    """
+    Separă fișierele unui chunk în metadate și conținut
+    
+    Returns:
+        (metadate cu sha256 în loc de conținut, {sha256: conținut}, bytes de conținut)
+    
+    Raises:
+        ValueError: dacă un fișier nu are path sau depășește MAX_FILE_SIZE
+    """
+    entries = []
+    blobs = {}
+    size = 0
+    for file_data in files:
+        if not isinstance(file_data, dict) or not (file_data.get('path') or file_data.get('name')):
+            raise ValueError('Fiecare fișier trebuie să aibă cel puțin path sau name')
+        
+        path = str(file_data.get('path') or file_data.get('name'))
+        entry = {key: value for key, value in file_data.items() if key != 'content'}
+        entry['path'] = path
+        entry['name'] = file_data.get('name') or posixpath.basename(path)
+        entry.setdefault('type', 'python' if entry['name'].endswith('.py') else 'unknown')
+        
+        content = file_data.get('content')
+        if content == TOO_LARGE_PLACEHOLDER:
+            entry['content'] = content
+        elif isinstance(content, str) and content:
+            content_size = len(content.encode('utf-8', errors='surrogatepass'))
+            if content_size > MAX_FILE_SIZE:
+                raise ValueError(f'{path}: fișierul depășește limita de {MAX_FILE_SIZE // 1024 // 1024}MB')
+            entry['sha256'] = content_hash(content)
+            blobs[entry['sha256']] = content
+            size += content_size
+        entries.append(entry)
+    
+    return entries, blobs, size
+
+def upload_chunk_sources(entries):
+    """Fișierele Python dintr-un chunk încă neanalizate, ca (cheie, sha256, nume), și hash-urile fără conținut"""
+    digests = [entry['sha256'] for entry in entries if entry.get('sha256')]
+    missing = set(blob_store.missing(digests))
+    sources = []
+    for entry in entries:
+        digest = entry.get('sha256')
+        if not digest or digest in missing or entry.get('type') != 'python':
+            continue
+        key = key_for_hash(digest)
+        if analysis_results_cache.get(key) is None:
+            sources.append((key, digest, entry['name']))
+    return sources, sorted(missing)
+
+def upload_analysis_job(upload):
+    """
+    Job-ul unic al unui upload: analizează fișierele din coada lui pe măsură ce sosesc chunk-urile
+    
+    Se încheie când coada este goală; un chunk confirmat după aceea pornește un
+    job nou. Conținutul este citit din blob store doar pentru lotul curent, iar
+    rezultatele rămân în cache pentru analiza după commit.
+    """
+    def run(context):
+        analyzed = 0
+        batch = []
+        try:
+            while True:
+                batch = upload_sessions.next_analysis_batch(upload, analyzed=len(batch))
+                if not batch:
+                    return {'analyzed': analyzed}
+                sources = []
+                for key, digest, filename in batch:
+                    content = blob_store.get(digest)
+                    if content is not None:
+                        sources.append((key, content, filename, None))
+                analyze_batch_sources(sources)
+                analyzed += len(batch)
+                context.report(analyzed=analyzed)
+        except BaseException:
+            upload_sessions.stop_analysis(upload)
+            raise
+    return run
+
+def start_upload_analysis(upload, sources):
+    """Pune fișierele în coada upload-ului și pornește job-ul lui dacă nu rulează; False dacă coada job-urilor este plină"""
+    if not upload_sessions.queue_analysis(upload, sources):
+        return True
+    try:
+        job = job_manager.submit('upload_analysis', upload_analysis_job(upload))
+    except JobQueueFullError:
+        # Fișierele rămân în coada upload-ului; următorul chunk reîncearcă pornirea job-ului
+        upload_sessions.stop_analysis(upload)
+        return False
+    upload_sessions.analysis_started(upload, job.job_id)
+    return True
+
+def upload_status(upload):
+    """Starea publică a unei sesiuni de încărcare (next_chunk este punctul de reluare)"""
+    job = job_manager.get(upload.analysis_job) if upload.analysis_job else None
+    analysis = {
+        'job_id': upload.analysis_job,
+        'state': job.state if job is not None else None,
+        'queued_files': len(upload.analysis_queue),
+        'analyzed_files': upload.analyzed_files,
+        'active': upload.analysis_active
+    }
+    
+    status = {
+        'status': 'ok',
+        'upload_id': upload.upload_id,
+        'next_chunk': upload.next_chunk,
+        'files_received': upload.files_received,
+        'bytes_received': upload.bytes_received,
+        'committed': upload.committed,
+        'analysis': analysis
+    }
+    if upload.committed:
+        status['result'] = upload.result
+    return status
+
+def register_upload(upload, files, analyze=False):
+    """
+    Înregistrează fișierele unui upload ca structură și pornește opțional analiza
+    
+    Raises:
+        StructureTooLargeError: dacă structura depășește limita store-ului
+    """
+    structure = upload.structure or build_structure_tree(files, upload.root_name)
+    structure_id = compute_structure_id(structure, files)
+    structure_store.put(
+        structure_id, structure, files, derive_project_key(structure, files, upload.project_id)
+    )
+    
+    result = {
+        'status': 'ok',
+        'structure_id': structure_id,
+        'entry_points': find_entry_points(structure),
+        'total_files': len(files),
+        'python_files': len([f for f in files if f.get('type') == 'python']),
+        'missing_blobs': blob_store.missing(f['sha256'] for f in files if f.get('sha256'))
+    }
+    
+    if analyze:
+        try:
+            job = job_manager.submit(
+                'analyze_directory', directory_analysis_job(structure_id, current_edit_namespace())
+            )
+            result['job_id'] = job.job_id
+        except JobQueueFullError as e:
+            result['job_error'] = str(e)
+    
+    return result
+
+def api_response(payload, status=200):
+    """Răspuns serializat direct în bytes (orjson), sau msgpack dacă clientul îl cere prin Accept"""
+    mimetype = negotiate_mimetype(value for value, _ in request.accept_mimetypes)
+    return Response(encode(payload, mimetype), status=status, mimetype=mimetype, headers={'Vary': 'Accept'})
+
+def conditional_response(response, fingerprint, weak=False):
+    """Atașează un ETag; returnează 304 dacă clientul are deja această reprezentare
+    
+    fingerprint identifică conținutul (ex. hash-urile fișierelor plus versiunea
+    analizorului); tipul MIME este inclus, deoarece JSON și msgpack sunt reprezentări diferite.
+    weak marchează ETag-ul ca W/ pentru răspunsurile echivalente, dar nu identice
+    byte cu byte (ex. analiza, care conține timestamp-ul și statisticile reanalizei).
+    """
+    etag = strong_etag(fingerprint, response.mimetype)
+    if etag_matches(request.headers.get('If-None-Match', ''), etag):
+        # Același ETag ca în răspunsul 200 pe care clientul îl are (inclusiv sufixul compresiei)
+        encoding = response_encoding(response)
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag + ENCODING_SUFFIXES[encoding] if encoding else etag, weak)
+        not_modified.headers['Vary'] = response.headers.get('Vary', 'Accept')
+        not_modified.vary.add('Accept-Encoding')
+        return not_modified
+    response.set_etag(etag, weak)
+    return response
+
+def not_modified_before_work(fingerprint, weak=False):
+    """
+    304 dacă If-None-Match corespunde amprentei, înainte de a construi răspunsul (altfel None)
+
+    ETag-ul este calculat ca în conditional_response, pentru tipul MIME negociat;
+    304 repetă ETag-ul clientului, cu sufixul compresiei pe care îl avea.
+    """
+    if_none_match = request.headers.get('If-None-Match', '')
+    if not if_none_match or fingerprint is None:
+        return None
+    mimetype = negotiate_mimetype(value for value, _ in request.accept_mimetypes)
+    matched = matching_etag(if_none_match, strong_etag(fingerprint, mimetype))
+    if matched is None:
+        return None
+    not_modified = Response(status=304)
+    not_modified.set_etag(matched, weak)
+    not_modified.headers['Vary'] = 'Accept'
+    not_modified.vary.add('Accept-Encoding')
+    return not_modified
+
+def response_encoding(response):
+    """Codificarea cu care va fi comprimat răspunsul sau None (mic, în flux sau necomprimabil)"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or not is_compressible(response.mimetype)):
+        return None
+    if response.calculate_content_length() < COMPRESSION_MIN_SIZE:
+        return None
+    return choose_encoding(request.accept_encodings)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+def admin_key_valid(required=False):
+    """Verifică antetul X-Admin-Key; fără ADMIN_KEY setat trece doar dacă required este False"""
+    expected_key = os.getenv('ADMIN_KEY')
+    if not expected_key:
+        return not required
+    admin_key = request.headers.get('X-Admin-Key') or ''
+    return hmac.compare_digest(admin_key.encode(), expected_key.encode())
+
+@app.before_request
+def start_request_profile():
+    """Rulează cererea sub profiler dacă are antetul X-Profile (cprofile sau trace) și cheia de administrare
+    
+    Cererile fără antet ies după o singură căutare în antete; profilerul este
+    pornit doar pe thread-ul cererii și oprit la închiderea răspunsului, deci
+    include și răspunsurile în flux. Munca predată job-urilor sau altor procese
+    nu apare în profil.
+    """
+    mode = request.headers.get('X-Profile')
+    if mode is None:
+        return None
+    mode = mode.strip().lower() or 'cprofile'
+    if mode in ('1', 'true'):
+        mode = 'cprofile'
+    
+    # Profilarea expune codul serverului, deci cere ADMIN_KEY setat (spre deosebire de /clear_session_cache)
+    if not PROFILING_ENABLED or not admin_key_valid(required=True):
+        return jsonify({
+            'status': 'error',
+            'message': 'Profilarea necesită o cheie de administrare validă (X-Admin-Key)'
+        }), 403
+    if mode not in PROFILE_MODES:
+        return jsonify({
+            'status': 'error',
+            'message': f'Profiler necunoscut. Valori acceptate pentru X-Profile: {", ".join(PROFILE_MODES)}'
+        }), 400
+    
+    profile_id = request.headers.get('X-Request-Id', '')
+    if not re.fullmatch(r'[A-Za-z0-9_.-]{1,64}', profile_id):
+        profile_id = uuid.uuid4().hex
+    active = ActiveProfile(RequestProfile(profile_id, mode, request.method, request.full_path.rstrip('?')))
+    try:
+        active.start()
+    except ValueError:
+        # Alt profiler este deja activ în proces (Python 3.12+); cererea rulează neprofilată
+        g.profile_status = 'busy'
+        active = None
+    
+    @after_this_request
+    def finish_request_profile(response):
+        response.headers['X-Request-Id'] = profile_id
+        if active is None:
+            response.headers['X-Profile-Status'] = g.get('profile_status', 'busy')
+            return response
+        response.headers['X-Profile-Id'] = profile_id
+        
+        def stop():
+            profile = active.stop()
+            profile.status = response.status_code
+            profile_store.put(profile)
+        
+        response.call_on_close(stop)
+        return response
+    
+    return None
+
+@app.after_request
+def record_request_metrics(response):
+    """Contoare și histograme per endpoint, înregistrate la închiderea răspunsului
+    
+    Înregistrată înaintea compresiei, deci rulează după ea (Flask aplică after_request
+    în ordine inversă); la închidere răspunsurile în flux sunt și ele complet trimise.
+    """
+    started = g.get('request_started')
+    if not METRICS_ENABLED or started is None:
+        return response
+    
+    # Regula rutei (ex. /jobs/<job_id>), nu URL-ul concret, ca numărul de serii să rămână mic
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    method = request.method
+    status = str(response.status_code)
+    request_size = request.content_length
+    
+    def record():
+        metrics.inc('p4n6_http_requests_total', endpoint=endpoint, method=method, status=status)
+        metrics.observe('p4n6_http_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint)
+        if request_size is not None:
+            metrics.observe('p4n6_http_request_size_bytes', request_size, endpoint=endpoint)
+        if response.content_length is not None:
+            metrics.observe('p4n6_http_response_size_bytes', response.content_length, endpoint=endpoint)
+    
+    response.call_on_close(record)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Comprimă (br/gzip) răspunsurile mari care nu sunt în flux"""
+    encoding = response_encoding(response)
+    if encoding is None:
+        if response.status_code == 200 and is_compressible(response.mimetype) and not response.is_streamed:
+            response.vary.add('Accept-Encoding')
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    response.set_data(compress_body(response.get_data(), encoding, COMPRESSION_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+    # Reprezentare diferită -> ETag diferit (conditional_response acceptă ambele forme)
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + ENCODING_SUFFIXES[encoding], weak)
+    return response
+
+def format_stream_event(event, payload, stream_format='sse'):
+    """Formatează un eveniment de progres ca SSE sau ca linie NDJSON"""
+    if stream_format == 'ndjson':
+        return dumps_str({'event': event, 'data': payload}) + '\n'
+    return f"event: {event}\ndata: {dumps_str(payload)}\n\n"
+
 def calculate_analysis_times(project_data):
     """Calculează timpii estimați pentru analiză"""
     num_files = len(project_data.get('secondary_scripts', [])) + 1
@@ -326,328 +1528,1424 @@ def set_principal():
             }), 413
         
         # Salvează în cache sesiune cu limită
-        session_edits.set(filename, content)
+        session_edits.set(current_edit_namespace(), filename, content)
         
         # Analiză folosind AST analyzer actualizat
         analysis = ast_analyzer.analyze_code(content, filename)
         
-        # Extrage entitățile pentru compatibilitate
-        entities = {
-            'functions': [f.name for f in analysis.get('functions', [])],
-            'classes': [c.name for c in analysis.get('classes', [])]
-        }
+        # Extrage entitățile pentru compatibilitate
+        entities = {
+            'functions': [f.name for f in analysis.get('functions', [])],
+            'classes': [c.name for c in analysis.get('classes', [])]
+        }
+        
+        # Păstrează în starea sesiunii (scrierea pe disc, dacă este activă, e asincronă)
+        project_states.update(current_edit_namespace(), lambda state: state.set_principal(
+            data.get('filename', 'principal'), entities['functions'], entities['classes']
+        ))
+        
+        return api_response({
+            'status': 'ok',
+            'entities': entities,
+            'analysis': analysis
+        })
+        
+    except EditQuotaError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 413
+    except Exception as e:
+        # FAZA 3.2 - Gestionare erori user-friendly
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la setarea scriptului principal: {str(e)}'
+        }), 500
+
+@app.route('/add_secundar', methods=['POST'])
+def add_secundar():
+    """Adaugă un script secundar pentru analiză"""
+    try:
+        data = request.get_json()
+        filename = data.get('filename', '')
+        content = data.get('content', '')
+        
+        if not filename:
+            return jsonify({'status': 'error', 'message': 'Numele fișierului este necesar'}), 400
+        
+        # FAZA 2.1 - Verifică dimensiunea
+        if len(content.encode('utf-8')) > MAX_FILE_SIZE:
+            return jsonify({
+                'status': 'error',
+                'message': f'Fișierul depășește limita de {MAX_FILE_SIZE // 1024 // 1024}MB'
+            }), 413
+        
+        # Salvează în cache sesiune cu limită
+        session_edits.set(current_edit_namespace(), filename, content)
+        
+        # Lista scripturilor secundare ale sesiunii (fără duplicate)
+        project_states.update(current_edit_namespace(), lambda state: state.add_secondary(filename))
+        
+        return jsonify({
+            'status': 'ok',
+            'message': 'Script secundar adăugat cu succes',
+            'cache_size': session_edits.size(current_edit_namespace())
+        })
+        
+    except EditQuotaError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 413
+    except Exception as e:
+        # FAZA 3.2 - Gestionare erori user-friendly
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la adăugarea scriptului secundar: {str(e)}'
+        }), 500
+
+@app.route('/analyze_imports', methods=['POST'])
+def analyze_imports():
+    """Analizează importurile dintr-un script secundar"""
+    try:
+        data = request.get_json()
+        content = data.get('content', '')
+        filename = data.get('filename', '')
+        
+        # Modulul principal și entitățile lui, din starea sesiunii
+        state = project_states.get(current_edit_namespace())
+        modul_principal = state.principal_module
+        
+        # FAZA 1.3 - Folosește AST analyzer actualizat pentru analiză completă
+        analysis = ast_analyzer.analyze_code(content, filename)
+        imports_detail = analysis.get('imports_detail', {})
+        
+        # Verifică dacă importă modulul principal
+        imports_module = modul_principal in imports_detail
+        
+        result = {
+            'imports': imports_module,
+            'entities': {'functions': [], 'classes': []},
+            'analysis': analysis
+        }
+        
+        if imports_module:
+            # Analizează detaliat ce importă
+            result['entities'] = analyze_imports_detailed(imports_detail, modul_principal, state)
+        
+        return api_response(result)
+        
+    except Exception as e:
+        # FAZA 3.2 - Gestionare erori user-friendly
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la analiza importurilor: {str(e)}',
+            'imports': False,
+            'entities': {'functions': [], 'classes': []},
+            'analysis': {}
+        }), 500
+
+def analyze_batch_sources(sources):
+    """Rezultatele (după cheia de cache) pentru (cheie, conținut, nume, rezultat deja citit), în paralel dacă există pool
+    
+    Un rezultat citit din cache la validarea cererii este folosit direct: intrarea
+    poate fi evacuată între timp, iar pentru fișierele trimise doar cu hash
+    conținutul nu este disponibil.
+    """
+    results = {}
+    pending = []
+    pool = get_analysis_pool()
+    
+    for key, content, filename, result in sources:
+        if key in results:
+            continue
+        if result is None:
+            result = analysis_results_cache.get(key)
+        if result is not None:
+            results[key] = result
+        elif pool is None:
+            results[key] = analyze_source(content, filename)
+            analysis_results_cache.set(key, results[key])
+        else:
+            results[key] = None
+            pending.append((key, pool.submit(run_with_phase_timings, analyze_source, content, filename)))
+    
+    for key, future in pending:
+        results[key] = report_phase_timings(future.result())
+        analysis_results_cache.set(key, results[key])
+    
+    return results
+
+@app.route('/analyze_batch', methods=['POST'])
+def analyze_batch():
+    """Analizează mai multe scripturi secundare într-o singură cerere
+    
+    Fiecare fișier are 'filename' și fie 'content', fie 'sha256' (un hash deja
+    trimis anterior). Hash-urile necunoscute serverului sunt returnate în
+    'missing', ca clientul să retrimită conținutul.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'status': 'error', 'message': 'Corpul cererii trebuie să fie un obiect JSON'}), 400
+        files = data.get('files') or []
+        include_analysis = data.get('include_analysis', True)
+        
+        if not isinstance(files, list) or not all(isinstance(file_data, dict) for file_data in files):
+            return jsonify({'status': 'error', 'message': 'files trebuie să fie o listă de obiecte'}), 400
+        
+        if len(files) > MAX_BATCH_FILES:
+            return jsonify({
+                'status': 'error',
+                'message': f'Prea multe fișiere într-o cerere (maxim {MAX_BATCH_FILES})'
+            }), 413
+        
+        namespace = current_edit_namespace()
+        state = project_states.get(namespace)
+        modul_principal = state.principal_module
+        
+        sources = []
+        digests = {}
+        errors = {}
+        missing = []
+        for file_data in files:
+            filename = file_data.get('filename') or file_data.get('name') or ''
+            if not filename:
+                continue
+            if not isinstance(filename, str):
+                return jsonify({'status': 'error', 'message': 'filename trebuie să fie text'}), 400
+            
+            # Un fișier malformat este raportat individual, fără a opri restul lotului
+            if file_data.get('content') is not None and not isinstance(file_data['content'], str):
+                errors[filename] = 'content trebuie să fie text'
+                continue
+            if file_data.get('sha256') is not None and not is_valid_digest(file_data['sha256']):
+                errors[filename] = 'sha256 trebuie să fie un hash SHA-256 hexazecimal'
+                continue
+            
+            content = file_data.get('content') or get_edited_content(filename, namespace)
+            result = None
+            if content:
+                if len(content.encode('utf-8')) > MAX_FILE_SIZE:
+                    errors[filename] = f'Fișierul depășește limita de {MAX_FILE_SIZE // 1024 // 1024}MB'
+                    continue
+                digest = content_hash(content)
+            elif file_data.get('sha256'):
+                digest = file_data['sha256']
+                result = analysis_results_cache.get(key_for_hash(digest))
+                if result is None:
+                    # Rezultatul nu mai e în cache, dar conținutul poate fi în blob store
+                    content = blob_store.get(digest)
+                    if not content:
+                        missing.append(filename)
+                        continue
+            else:
+                errors[filename] = 'Lipsește conținutul sau hash-ul'
+                continue
+            
+            digests[filename] = digest
+            sources.append((key_for_hash(digest), content, filename, result))
+        
+        cached = analyze_batch_sources(sources)
+        
+        results = {}
+        connections = []
+        for filename, digest in digests.items():
+            file_result = cached[key_for_hash(digest)]
+            analysis = file_result['analysis']
+            imports_detail = analysis.get('imports_detail', {})
+            
+            imports_module = bool(modul_principal) and modul_principal in imports_detail
+            entities = (analyze_imports_detailed(imports_detail, modul_principal, state)
+                        if imports_module else {'functions': [], 'classes': []})
+            
+            results[filename] = {
+                'sha256': digest,
+                'imports': imports_module,
+                'entities': entities,
+                'script_type': analysis.get('script_type')
+            }
+            if include_analysis:
+                results[filename]['analysis'] = analysis
+            
+            if imports_module:
+                connections.append({
+                    'main': f'{modul_principal}.py',
+                    'secondary': filename,
+                    'entities': entities
+                })
+        
+        return api_response({
+            'status': 'ok',
+            'principal': modul_principal,
+            'results': results,
+            'connections': connections,
+            'missing': missing,
+            'errors': errors
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la analiza în lot: {str(e)}'
+        }), 500
+
+@app.route('/get_analysis', methods=['GET'])
+def get_analysis():
+    """Returnează analiza completă salvată"""
+    try:
+        base_dir = os.path.dirname(__file__)
+        analysis_path = os.path.join(base_dir, 'analysis.json')
+        
+        result = {
+            'status': 'ok',
+            'has_analysis': os.path.exists(analysis_path),
+            'session_edits': session_edits.size(current_edit_namespace()),
+            'detailed_imports': {}
+        }
+        
+        # Returnează analiza detaliată dacă există
+        if os.path.exists(analysis_path):
+            with open(analysis_path, 'r', encoding='utf-8') as f:
+                result['detailed_imports'] = json.load(f)
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        # FAZA 3.2
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la obținerea analizei: {str(e)}'
+        }), 500
+
+@app.route('/save_directory_structure', methods=['POST'])
+def save_directory_structure():
+    """Salvează structura de directoare pentru analiză ulterioară"""
+    try:
+        data = request.get_json()
+        structure = data.get('structure', {})
+        files = data.get('files', [])
+        
+        # Generează un ID unic pentru structură
+        structure_id = compute_structure_id(structure, files)
+        
+        # Salvează în cache (store-ul limitează memoria și expiră structurile nefolosite)
+        try:
+            structure_store.put(
+                structure_id, structure, files, derive_project_key(structure, files, data.get('project_id'))
+            )
+        except StructureTooLargeError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 413
+        
+        # Analiză punctele de intrare
+        entry_points = find_entry_points(structure)
+        
+        return jsonify({
+            'status': 'ok',
+            'structure_id': structure_id,
+            'entry_points': entry_points,
+            'total_files': len(files),
+            'python_files': len([f for f in files if f.get('type') == 'python']),
+            # Fișierele trimise fără conținut al căror hash nu este în blob store (de încărcat prin /blobs)
+            'missing_blobs': blob_store.missing(f['sha256'] for f in files if f.get('sha256') and not f.get('content'))
+        })
+        
+    except Exception as e:
+        # FAZA 3.2
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la salvarea structurii: {str(e)}'
+        }), 500
+
+@app.route('/blobs/missing', methods=['POST'])
+def blobs_missing():
+    """Primește o listă de hash-uri SHA-256 și returnează cele al căror conținut lipsește"""
+    data = request.get_json(silent=True) or {}
+    hashes = data.get('hashes', [])
+    if not isinstance(hashes, list):
+        return jsonify({'status': 'error', 'message': 'hashes trebuie să fie o listă'}), 400
+    
+    return jsonify({'status': 'ok', 'missing': blob_store.missing(hashes)})
+
+@app.route('/blobs', methods=['POST'])
+def upload_blobs():
+    """
+    Încarcă conținutul fișierelor după hash: {"blobs": {"<sha256>": "<conținut>", ...}}
+    
+    Hash-ul este recalculat pe server; blob-urile care nu corespund sunt respinse.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        blobs = data.get('blobs', {})
+        if not isinstance(blobs, dict):
+            return jsonify({'status': 'error', 'message': 'blobs trebuie să fie un obiect hash -> conținut'}), 400
+        
+        stored = []
+        rejected = {}
+        for digest, content in blobs.items():
+            if not is_valid_digest(digest) or not isinstance(content, str):
+                rejected[digest] = 'Hash sau conținut invalid'
+            elif len(content.encode('utf-8', errors='surrogatepass')) > MAX_FILE_SIZE:
+                rejected[digest] = f'Fișierul depășește limita de {MAX_FILE_SIZE // 1024 // 1024}MB'
+            else:
+                try:
+                    stored.append(blob_store.put(content, expected_digest=digest))
+                except ValueError as e:
+                    rejected[digest] = str(e)
+        
+        return jsonify({
+            'status': 'ok',
+            'stored': stored,
+            'rejected': rejected
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la salvarea blob-urilor: {str(e)}'
+        }), 500
+
+@app.route('/blob_store/stats', methods=['GET'])
+def blob_store_stats():
+    """Ocuparea blob store-ului: blob-uri, bytes și evacuări"""
+    return jsonify({'status': 'ok', **blob_store.stats()})
+
+@app.route('/get_file_content', methods=['GET', 'POST'])
+def get_file_content():
+    """Obține conținutul unui fișier din structura salvată (ETag după hash-ul conținutului)"""
+    try:
+        data = request.get_json(silent=True) or request.args
+        structure_id = data.get('structure_id', '')
+        file_path = data.get('file_path', '')
+        
+        entry = structure_store.get(structure_id)
+        if entry is None:
+            return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
+        
+        files = entry.files
+        
+        # Caută fișierul după path
+        for file_data in files:
+            if file_data.get('path', '') == file_path or file_data.get('name', '') == file_path:
+                # Verifică dacă există o versiune editată (fără a modifica structura salvată)
+                edited_content = get_edited_content(file_data.get('name', ''))
+                content = edited_content or load_file_content(file_data)
+                if not content and evicted_blob(file_data):
+                    return missing_blobs_response(MissingBlobError({file_path: file_data['sha256']}))
+                
+                response = jsonify({
+                    'status': 'ok',
+                    'file': {
+                        'name': file_data.get('name', ''),
+                        'content': content,
+                        'type': file_data.get('type', 'unknown')
+                    }
+                })
+                return conditional_response(
+                    response, f"{file_data.get('name', '')}:{file_data.get('type', '')}:{content_hash(content)}"
+                )
+        
+        return jsonify({'status': 'error', 'message': 'Fișier negăsit'}), 404
+        
+    except Exception as e:
+        # FAZA 3.2
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la obținerea conținutului: {str(e)}'
+        }), 500
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Metricile în format text Prometheus (contoarele și histogramele însumate pe toți workerii)"""
+    if not METRICS_ENABLED:
+        return jsonify({'status': 'error', 'message': 'Metricile sunt dezactivate (METRICS_ENABLED)'}), 404
+    return Response(metrics.render(), content_type=PROMETHEUS_MIMETYPE)
+
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    """Profilurile cererilor marcate cu X-Profile, cele mai recente primele (ale tuturor workerilor, cu baza comună)"""
+    if not admin_key_valid(required=True):
+        return jsonify({'status': 'error', 'message': 'Cheie de administrare invalidă'}), 403
+    return jsonify({'status': 'ok', **profile_store.stats(), 'items': list(profile_store.iter_summaries())})
+
+@app.route('/profiles/<profile_id>', methods=['GET', 'DELETE'])
+def request_profile(profile_id):
+    """Descarcă profilul unei cereri: text (pstats sortat), pstats (fișier marshal) sau collapsed (flamegraph)"""
+    if not admin_key_valid(required=True):
+        return jsonify({'status': 'error', 'message': 'Cheie de administrare invalidă'}), 403
+    
+    if request.method == 'DELETE':
+        if not profile_store.discard(profile_id):
+            return jsonify({'status': 'error', 'message': 'Profil necunoscut'}), 404
+        return jsonify({'status': 'ok', 'profile_id': profile_id})
+    
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        return jsonify({'status': 'error', 'message': 'Profil necunoscut'}), 404
+    
+    profile_format = request.args.get('format', profile.formats()[0])
+    if profile_format not in PROFILE_FORMATS:
+        return jsonify({
+            'status': 'error',
+            'message': f'Format necunoscut. Formate suportate: {", ".join(PROFILE_FORMATS)}'
+        }), 400
+    if profile_format not in profile.formats():
+        return jsonify({
+            'status': 'error',
+            'message': f'Profilul {profile.mode} este disponibil doar ca: {", ".join(profile.formats())}'
+        }), 400
+    
+    if profile_format == 'pstats':
+        return Response(
+            profile.pstats_bytes(),
+            content_type='application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename="{profile_id}.pstats"'}
+        )
+    if profile_format == 'collapsed':
+        return Response(
+            profile.collapsed_text(),
+            content_type='text/plain; charset=utf-8',
+            headers={'Content-Disposition': f'attachment; filename="{profile_id}.collapsed"'}
+        )
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'calls', 'ncalls'):
+        sort = 'cumulative'
+    return Response(profile.text(sort), content_type='text/plain; charset=utf-8')
+
+@app.route('/structure_store/stats', methods=['GET'])
+def structure_store_stats():
+    """Ocuparea store-ului de structuri: intrări, bytes, hit-uri și evacuări"""
+    return jsonify({'status': 'ok', **structure_store.stats()})
+
+@app.route('/analyze_directory', methods=['GET', 'POST'])
+def analyze_directory():
+    """Analizează complet o structură de directoare
+    
+    ETag-ul derivă din hash-urile fișierelor și versiunea analizorului, deci o
+    reinterogare fără modificări primește 304 (If-None-Match).
+    """
+    try:
+        data = request.get_json(silent=True) or request.args
+        structure_id = data.get('structure_id', '')
+        
+        if structure_id not in structure_store:
+            return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
+        
+        paged = any(name in data for name in ('page_size', 'fields', 'summary'))
+        if paged:
+            page_size, fields = parse_page_request(data)
+            if request_flag(data, 'summary'):
+                page_size = 0
+        
+        # Clientul are deja analiza acestor fișiere: 304 fără a rula analiza
+        expected = expected_directory_fingerprint(structure_id)
+        if expected is not None:
+            not_modified = not_modified_before_work(
+                f'{expected}:0:{page_size}:{fields}' if paged else expected, weak=True
+            )
+            if not_modified is not None:
+                return not_modified
+        
+        analysis_results = run_directory_analysis(structure_id)
+        
+        # Fără paginare: răspunsul complet, ca înainte
+        if not paged:
+            response = api_response({
+                'status': 'ok',
+                'analysis': analysis_results
+            })
+            # Corpul conține timestamp și incremental (variabile între rulări): validator slab
+            return conditional_response(response, analysis_results['fingerprint'], weak=True)
+        
+        # Sumarul plus prima pagină din file_analyses; restul prin /analyze_directory/files
+        response = api_response({
+            'status': 'ok',
+            'analysis': summarize_directory_analysis(analysis_results),
+            **file_analyses_page(analysis_results, 0, page_size, fields)
+        })
+        return conditional_response(
+            response, f"{analysis_results['fingerprint']}:0:{page_size}:{fields}", weak=True
+        )
+        
+    except MissingBlobError as e:
+        return missing_blobs_response(e)
+    except (ValueError, TypeError) as e:
+        return jsonify({'status': 'error', 'message': f'Parametri de paginare invalizi: {str(e)}'}), 400
+    except Exception as e:
+        # FAZA 3.2
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la analiza directorului: {str(e)}'
+        }), 500
+
+@app.route('/analyze_directory/files', methods=['GET', 'POST'])
+def analyze_directory_files():
+    """Pagina următoare din file_analyses, după cursorul primit de la /analyze_directory"""
+    try:
+        data = request.get_json(silent=True) or request.args
+        structure_id = data.get('structure_id', '')
+        page_size, fields = parse_page_request(data)
+        fingerprint, offset = decode_page_cursor(data.get('cursor', ''))
+        
+        if structure_id not in structure_store:
+            return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
+        
+        # Analiza păstrată la ultima rulare; dacă lipsește sau diferă, se reface (incremental)
+        analysis_results = structure_store.get_extra(structure_id, 'analysis')
+        if analysis_results is None or analysis_results['fingerprint'] != fingerprint:
+            analysis_results = run_directory_analysis(structure_id)
+        if analysis_results['fingerprint'] != fingerprint:
+            return jsonify({
+                'status': 'error',
+                'message': 'Fișierele s-au modificat de la prima pagină; reluați paginarea din /analyze_directory'
+            }), 409
+        
+        response = api_response({
+            'status': 'ok',
+            'structure_id': structure_id,
+            **file_analyses_page(analysis_results, offset, page_size, fields)
+        })
+        return conditional_response(response, f'{fingerprint}:{offset}:{page_size}:{fields}')
+        
+    except MissingBlobError as e:
+        return missing_blobs_response(e)
+    except (ValueError, TypeError) as e:
+        return jsonify({'status': 'error', 'message': f'Parametri de paginare invalizi: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la obținerea paginii: {str(e)}'
+        }), 500
+
+@app.route('/analyze_directory/stream', methods=['GET', 'POST'])
+def analyze_directory_stream():
+    """Analizează o structură și transmite progresul ca Server-Sent Events sau NDJSON"""
+    data = request.get_json(silent=True) or request.args
+    structure_id = data.get('structure_id', '')
+    stream_format = data.get('format', 'sse')
+    
+    if structure_id not in structure_store:
+        return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
+    
+    if stream_format not in ('sse', 'ndjson'):
+        return jsonify({'status': 'error', 'message': 'Format necunoscut (sse sau ndjson)'}), 400
+    
+    return stream_directory_analysis(structure_id, stream_format, summary_only=request_flag(data, 'summary'))
+
+@app.route('/complexity_distribution', methods=['POST'])
+def complexity_distribution():
+    """Distribuția unei metrici: agregate, percentile, histogramă și funcțiile dintr-un interval"""
+    try:
+        data = request.get_json()
+        structure_id = data.get('structure_id', '')
+        column = data.get('column', 'complexity')
+        
+        if structure_id not in structure_store:
+            return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
+        
+        if column not in FUNCTION_COLUMNS and column not in FILE_COLUMNS:
+            return jsonify({'status': 'error', 'message': f'Coloană necunoscută: {column}'}), 400
+        
+        # Coloanele se construiesc la analiza directorului
+        metrics_store = get_structure_extra(structure_id, 'metrics')
+        
+        percents = data.get('percentiles') or [50, 90, 99]
+        if not isinstance(percents, list) or not all(
+            isinstance(p, (int, float)) and not isinstance(p, bool) and 0 <= p <= 100 for p in percents
+        ):
+            return jsonify({'status': 'error', 'message': 'percentiles trebuie să fie o listă de numere între 0 și 100'}), 400
+        
+        bounds = (data.get('min'), data.get('max'))
+        if any(v is not None and (not isinstance(v, (int, float)) or isinstance(v, bool)) for v in bounds):
+            return jsonify({'status': 'error', 'message': 'min și max trebuie să fie numere'}), 400
+        try:
+            bins = max(1, min(int(data.get('bins', 10)), MAX_HISTOGRAM_BINS))
+            limit = int(data.get('limit', 100))
+        except (TypeError, ValueError):
+            return jsonify({'status': 'error', 'message': 'bins și limit trebuie să fie numere întregi'}), 400
+        
+        result = {
+            'status': 'ok',
+            'column': column,
+            'summary': metrics_store.summary(),
+            'percentiles': metrics_store.percentiles(column, percents),
+            'histogram': metrics_store.histogram(column, bins)
+        }
+        
+        # Filtru pe prag, doar pentru coloanele per funcție
+        if column in FUNCTION_COLUMNS and (bounds[0] is not None or bounds[1] is not None):
+            result['functions'] = metrics_store.select_functions(column, bounds[0], bounds[1], limit)
+        
+        return api_response(result)
+        
+    except MissingBlobError as e:
+        return missing_blobs_response(e)
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la calculul distribuției: {str(e)}'
+        }), 500
+
+@app.route('/query', methods=['POST'])
+def query_analysis():
+    """Interogează funcțiile, clasele, importurile sau modulele unei structuri analizate"""
+    try:
+        data = request.get_json()
+        structure_id = data.get('structure_id', '')
+        
+        if structure_id not in structure_store:
+            return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
+        
+        # Indexul se construiește la analiza directorului
+        index = get_structure_extra(structure_id, 'index')
+        
+        result = index.query(
+            data.get('kind', 'function'),
+            data.get('where', ''),
+            page=data.get('page', 1),
+            page_size=data.get('page_size', 50),
+            sort=data.get('sort')
+        )
+        
+        return api_response({'status': 'ok', **result})
+        
+    except MissingBlobError as e:
+        return missing_blobs_response(e)
+    except QueryError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la interogare: {str(e)}'
+        }), 500
+
+def resolve_project_key(data):
+    """Cheia proiectului din cerere: explicită sau derivată din structure_id"""
+    project_key = data.get('project_key')
+    if project_key:
+        return project_key
+    entry = structure_store.get(data.get('structure_id', ''))
+    if entry is not None:
+        return entry.project_key or derive_project_key(entry.structure, entry.files)
+    return None
+
+@app.route('/snapshots', methods=['GET'])
+def list_snapshots():
+    """Listează snapshot-urile de analiză ale unui proiect"""
+    try:
+        project_key = resolve_project_key(request.args)
+        if not project_key:
+            return jsonify({'status': 'error', 'message': 'Proiect necunoscut'}), 404
+        
+        return jsonify({
+            'status': 'ok',
+            'project_key': project_key,
+            'snapshots': [snapshot.describe() for snapshot in analysis_snapshots.list(project_key)]
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la listarea snapshot-urilor: {str(e)}'
+        }), 500
+
+@app.route('/diff_snapshots', methods=['POST'])
+def diff_analysis_snapshots():
+    """Compară două snapshot-uri ale unui proiect (implicit: penultimul cu ultimul)"""
+    try:
+        data = request.get_json()
+        project_key = resolve_project_key(data)
+        if not project_key:
+            return jsonify({'status': 'error', 'message': 'Proiect necunoscut'}), 404
+        
+        snapshots = analysis_snapshots.list(project_key)
+        base_id = data.get('base')
+        target_id = data.get('target')
+        
+        if not base_id or not target_id:
+            if len(snapshots) < 2:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Sunt necesare cel puțin două analize ale proiectului'
+                }), 400
+            base_id = base_id or snapshots[-2].snapshot_id
+            target_id = target_id or snapshots[-1].snapshot_id
+        
+        base = analysis_snapshots.get(project_key, base_id)
+        target = analysis_snapshots.get(project_key, target_id)
+        if base is None or target is None:
+            return jsonify({'status': 'error', 'message': 'Snapshot necunoscut'}), 404
+        
+        return api_response({
+            'status': 'ok',
+            'project_key': project_key,
+            'diff': diff_snapshots(base, target)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la compararea snapshot-urilor: {str(e)}'
+        }), 500
+
+@app.route('/cluster/jobs', methods=['POST'])
+def create_cluster_job():
+    """Împarte o structură în shard-uri pentru analiza distribuită"""
+    # Lease-urile conțin codul fișierelor: fără token oricine le-ar putea prelua
+    if not CLUSTER_TOKEN:
+        return jsonify({
+            'status': 'error',
+            'message': 'Analiza distribuită nu este activată. Configurați CLUSTER_TOKEN în fișierul .env'
+        }), 403
+    
+    try:
+        data = request.get_json()
+        structure_id = data.get('structure_id', '')
+        
+        entry = structure_store.get(structure_id)
+        if entry is None:
+            return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
+        
+        # Lease-urile vin de la workeri, deci sesiunea editărilor este reținută per fișier
+        namespace = current_edit_namespace()
+        python_files = [{**f, 'edit_namespace': namespace} for f in entry.files if f.get('type') == 'python']
+        
+        # Un fișier evacuat din blob store ar lipsi în tăcere din shard-uri
+        unresolved = unresolved_blobs(python_files)
+        if unresolved:
+            return missing_blobs_response(MissingBlobError(unresolved))
+        
+        job = cluster_coordinator.create_job(
+            python_files,
+            project_name=data.get('project_name') or entry.structure.get('name', 'Python Project'),
+            shard_files=max(1, int(data.get('shard_size', DEFAULT_SHARD_FILES)))
+        )
+        
+        return jsonify({'status': 'ok', **cluster_coordinator.job_status(job)})
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la crearea analizei distribuite: {str(e)}'
+        }), 500
+
+@app.route('/cluster/jobs/<job_id>', methods=['GET'])
+def get_cluster_job(job_id):
+    """Starea unei analize distribuite și raportul combinat, când toate shard-urile sunt gata"""
+    try:
+        job = cluster_coordinator.get_job(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Analiză distribuită necunoscută'}), 404
+        
+        result = {'status': 'ok', **cluster_coordinator.job_status(job)}
+        if result['state'] == 'done':
+            try:
+                result['report'] = cluster_coordinator.merge(job)
+            except RuntimeError as e:
+                # Rezultate evacuate din baza comună: shard-urile au fost repuse în coadă
+                job = cluster_coordinator.get_job(job_id) or job
+                result = {'status': 'ok', **cluster_coordinator.job_status(job), 'message': str(e)}
+        
+        return api_response(result)
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la obținerea analizei distribuite: {str(e)}'
+        }), 500
+
+@app.route('/cluster/lease', methods=['POST'])
+def lease_cluster_shard():
+    """Predă unui worker următorul shard disponibil"""
+    if not check_cluster_token():
+        return jsonify({'status': 'error', 'message': 'Token invalid'}), 403
+    
+    try:
+        data = request.get_json() or {}
+        worker_id = data.get('worker_id') or request.remote_addr
+        
+        lease = cluster_coordinator.lease(worker_id)
+        if lease is None:
+            return jsonify({'status': 'ok', 'shard': None})
         
-        # Salvează pentru compatibilitate cu analiza existentă
-        base_dir = os.path.dirname(__file__)
-        principal_path = os.path.join(base_dir, 'principal.txt')
-        entities_path = os.path.join(base_dir, 'entities.json')
+        return api_response({'status': 'ok', 'shard': cluster_coordinator.shard_payload(lease)})
         
-        with open(principal_path, 'w', encoding='utf-8') as f:
-            f.write(data.get('filename', 'principal'))
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la predarea shard-ului: {str(e)}'
+        }), 500
+
+@app.route('/cluster/complete', methods=['POST'])
+def complete_cluster_shard():
+    """Primește rezultatele compacte ale unui shard"""
+    if not check_cluster_token():
+        return jsonify({'status': 'error', 'message': 'Token invalid'}), 403
+    
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'status': 'error', 'message': 'Corpul cererii trebuie să fie un obiect JSON'}), 400
+        accepted = cluster_coordinator.complete(
+            data.get('worker_id', ''), data.get('job_id', ''), data.get('shard_id', ''), data.get('results', [])
+        )
         
-        with open(entities_path, 'w', encoding='utf-8') as f:
-            json.dump(entities, f, ensure_ascii=False, indent=2)
+        return jsonify({'status': 'ok', 'accepted': accepted})
         
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
         return jsonify({
+            'status': 'error',
+            'message': f'Eroare la înregistrarea rezultatelor: {str(e)}'
+        }), 500
+
+def build_project_report(stored, data, context=None):
+    """Raportul ProjectReport al unei structuri salvate
+    
+    context (JobContext) primește progresul per fișier și permite anularea între fișiere.
+    """
+    python_files = [f for f in stored.files if f.get('type') == 'python']
+    
+    def iter_files_with_content():
+        # Conținutul este citit fișier cu fișier; fișierele din arhive și upload-uri vin din blob store
+        unresolved = {}
+        for index, file_data in enumerate(python_files, 1):
+            if context is not None:
+                context.report(phase='read', current=index, total=len(python_files))
+            content = load_file_content(file_data)
+            if not content and file_data.get('sha256') and not file_data.get('local_path'):
+                unresolved[file_data.get('path') or file_data.get('name', '')] = file_data['sha256']
+            elif content and content != TOO_LARGE_PLACEHOLDER:
+                yield {**file_data, 'content': content}
+        # Un raport fără aceste fișiere ar fi incomplet, nu gol în tăcere
+        if unresolved:
+            raise MissingBlobError(unresolved)
+    
+    project_name = data.get('project_name') or stored.structure.get('name', 'Python Project')
+    
+    if data.get('low_memory'):
+        # Analizele complete nu sunt păstrate (nici pe disc); răspunsul conține doar agregatele
+        analyzer = ProjectAnalyzer(workers=ANALYSIS_WORKERS)
+        report = analyzer.analyze_project_stream(
+            iter_files_with_content(), project_name, executor=get_analysis_pool(), keep_analyses=False
+        )
+        return dataclasses.replace(report, file_analyses={})
+    
+    files = list(iter_files_with_content())
+    progress = None
+    if context is not None:
+        progress = lambda current, total: context.report(phase='analyze', current=current, total=total)
+    
+    # Analizor per apel: ProjectAnalyzer păstrează starea analizei curente, iar cererile rulează în paralel
+    return ProjectAnalyzer(workers=ANALYSIS_WORKERS).analyze_project(
+        files, project_name, progress=progress, executor=get_analysis_pool()
+    )
+
+@app.route('/project_report', methods=['POST'])
+def project_report():
+    """Returnează raportul complet ProjectReport pentru o structură salvată"""
+    try:
+        data = request.get_json()
+        structure_id = data.get('structure_id', '')
+        
+        entry = structure_store.get(structure_id)
+        if entry is None:
+            return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
+        
+        report = build_project_report(entry, data)
+        
+        return api_response({
             'status': 'ok',
-            'entities': entities,
-            'analysis': analysis
+            'report': report
         })
         
+    except MissingBlobError as e:
+        return missing_blobs_response(e)
     except Exception as e:
-        # FAZA 3.2 - Gestionare erori user-friendly
         return jsonify({
             'status': 'error',
-            'message': f'Eroare la setarea scriptului principal: {str(e)}'
+            'message': f'Eroare la generarea raportului: {str(e)}'
         }), 500
 
-@app.route('/add_secundar', methods=['POST'])
-def add_secundar():
-    """Adaugă un script secundar pentru analiză"""
+def directory_analysis_job(structure_id, namespace):
+    """Job pentru analiza unei structuri: progres per fișier, totalurile curente ca rezultat parțial"""
+    def run(context):
+        analysis_results = None
+        for event, payload in iter_directory_analysis(structure_id, namespace):
+            if event == 'phase':
+                context.report(phase=payload['phase'])
+            elif event == 'file':
+                context.report(partial=payload['totals'], current=payload['index'], total=payload['total'])
+            elif event == 'done':
+                analysis_results = payload['analysis']
+        return analysis_results
+    return run
+
+def create_job(data, namespace):
+    """Funcția job-ului cerut prin POST /jobs; (None, mesaj) dacă cererea este invalidă"""
+    job_type = data.get('type', '')
+    
+    if job_type in ('analyze_directory', 'project_report'):
+        structure_id = data.get('structure_id', '')
+        entry = structure_store.get(structure_id)
+        if entry is None:
+            return None, 'Structură necunoscută'
+        if job_type == 'analyze_directory':
+            return directory_analysis_job(structure_id, namespace), None
+        return lambda context: build_project_report(entry, data, context), None
+    
+    if job_type == 'generate_workflow':
+        def run(context):
+            payload, status = run_generate_workflow(data)
+            if status != 200:
+                raise RuntimeError(payload.get('message', f'Status {status}'))
+            return payload
+        return run, None
+    
+    return None, f'Tip de job necunoscut: {job_type} (analyze_directory, project_report sau generate_workflow)'
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Pornește o operație lungă în fundal și returnează imediat job_id"""
+    try:
+        data = request.get_json() or {}
+        function, error = create_job(data, current_edit_namespace())
+        if function is None:
+            return jsonify({'status': 'error', 'message': error}), 400
+        
+        job = job_manager.submit(data['type'], function)
+        response = jsonify({'status': 'ok', **job_manager.status(job)})
+        response.headers['Location'] = f'/jobs/{job.job_id}'
+        return response, 202
+        
+    except JobQueueFullError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 503
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Eroare la pornirea job-ului: {str(e)}'
+        }), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Starea unui job: progres, rezultat parțial sau, la final, rezultatul complet"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job necunoscut sau expirat'}), 404
+    return api_response({'status': 'ok', **job_manager.status(job)})
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Anulează un job (cooperativ: cel în execuție se oprește la următorul fișier)"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job necunoscut sau expirat'}), 404
+    status = job_manager.status(job, include_result=False)
+    return jsonify({'status': 'ok', **status}), 200 if job.state in FINISHED_STATES else 202
+
+@app.route('/analyze_local_path', methods=['POST'])
+def analyze_local_path():
+    """Analizează un director local al serverului, fără încărcarea fișierelor prin browser"""
     try:
         data = request.get_json()
-        filename = data.get('filename', '')
-        content = data.get('content', '')
+        requested_path = data.get('path', '')
         
-        if not filename:
-            return jsonify({'status': 'error', 'message': 'Numele fișierului este necesar'}), 400
+        if not ANALYSIS_ROOTS:
+            return jsonify({
+                'status': 'error',
+                'message': 'Analiza locală nu este activată. Configurați ANALYSIS_ROOTS în fișierul .env'
+            }), 403
         
-        # FAZA 2.1 - Verifică dimensiunea
-        if len(content.encode('utf-8')) > MAX_FILE_SIZE:
+        local_root = resolve_allowed_path(requested_path)
+        if not local_root or not os.path.isdir(local_root):
             return jsonify({
                 'status': 'error',
-                'message': f'Fișierul depășește limita de {MAX_FILE_SIZE // 1024 // 1024}MB'
-            }), 413
+                'message': 'Calea nu există sau nu se află într-un director permis'
+            }), 403
         
-        # Salvează în cache sesiune cu limită
-        session_edits.set(filename, content)
+        structure_id, files = register_local_structure(local_root, data.get('project_id'))
         
-        # Pentru compatibilitate cu sistemul existent
-        base_dir = os.path.dirname(__file__)
-        parent_dir = os.path.abspath(os.path.join(base_dir, ".."))
-        secundare_path = os.path.join(parent_dir, 'secundare.txt')
+        if data.get('stream'):
+            stream_format = data.get('format', 'ndjson')
+            if stream_format not in ('sse', 'ndjson'):
+                return jsonify({'status': 'error', 'message': 'Format necunoscut (sse sau ndjson)'}), 400
+            return stream_directory_analysis(structure_id, stream_format)
         
-        with open(secundare_path, 'a', encoding='utf-8') as f:
-            f.write(f"{filename}\n")
+        analysis_results = run_directory_analysis(structure_id)
         
-        return jsonify({
+        return api_response({
             'status': 'ok',
-            'message': 'Script secundar adăugat cu succes',
-            'cache_size': session_edits.size()
+            'structure_id': structure_id,
+            'entry_points': analysis_results['entry_points'],
+            'total_files': len(files),
+            'python_files': len(files),
+            'analysis': analysis_results
         })
         
     except Exception as e:
-        # FAZA 3.2 - Gestionare erori user-friendly
         return jsonify({
             'status': 'error',
-            'message': f'Eroare la adăugarea scriptului secundar: {str(e)}'
+            'message': f'Eroare la analiza directorului local: {str(e)}'
         }), 500
 
-@app.route('/analyze_imports', methods=['POST'])
-def analyze_imports():
-    """Analizează importurile dintr-un script secundar"""
+@app.route('/analyze_git_history', methods=['POST'])
+def analyze_git_history():
+    """Evoluția metricilor și a grafului de importuri de-a lungul commit-urilor unui repository local"""
     try:
         data = request.get_json()
-        content = data.get('content', '')
-        filename = data.get('filename', '')
-        
-        base_dir = os.path.dirname(__file__)
-        principal_path = os.path.join(base_dir, 'principal.txt')
-        entities_path = os.path.join(base_dir, 'entities.json')
         
-        # Citește modulul principal și entitățile
-        modul_principal = ''
-        if os.path.exists(principal_path):
-            with open(principal_path, 'r', encoding='utf-8') as f:
-                modul_principal = f.read().strip()
-        
-        entities = {'functions': [], 'classes': []}
-        if os.path.exists(entities_path):
-            with open(entities_path, 'r', encoding='utf-8') as f:
-                entities = json.load(f)
-        
-        # FAZA 1.3 - Folosește AST analyzer actualizat pentru analiză completă
-        analysis = ast_analyzer.analyze_code(content, filename)
-        imports_detail = analysis.get('imports_detail', {})
+        if not ANALYSIS_ROOTS:
+            return jsonify({
+                'status': 'error',
+                'message': 'Analiza locală nu este activată. Configurați ANALYSIS_ROOTS în fișierul .env'
+            }), 403
         
-        # Verifică dacă importă modulul principal
-        imports_module = modul_principal in imports_detail
+        repo_root = resolve_allowed_path(data.get('path', ''))
+        if not repo_root or not os.path.isdir(repo_root):
+            return jsonify({
+                'status': 'error',
+                'message': 'Calea nu există sau nu se află într-un director permis'
+            }), 403
         
-        result = {
-            'imports': imports_module,
-            'entities': {'functions': [], 'classes': []},
-            'analysis': analysis
-        }
+        rev = data.get('rev', 'HEAD')
+        if not rev or rev.startswith('-'):
+            return jsonify({'status': 'error', 'message': 'Revizie invalidă'}), 400
+        try:
+            max_commits = int(data.get('max_commits', HISTORY_DEFAULT_COMMITS))
+        except (TypeError, ValueError):
+            return jsonify({'status': 'error', 'message': 'max_commits trebuie să fie un număr întreg'}), 400
+        if max_commits <= 0:
+            return jsonify({'status': 'error', 'message': 'max_commits trebuie să fie pozitiv'}), 400
+        # Fără limită superioară un client ar putea parcurge tot istoricul
+        max_commits = min(max_commits, HISTORY_MAX_COMMITS)
+        
+        analyzer = get_history_analyzer(repo_root)
+        
+        if data.get('stream'):
+            stream_format = data.get('format', 'ndjson')
+            if stream_format not in ('sse', 'ndjson'):
+                return jsonify({'status': 'error', 'message': 'Format necunoscut (sse sau ndjson)'}), 400
+            
+            def generate():
+                try:
+                    for event, payload in iter_history_analysis(analyzer, rev, max_commits):
+                        yield format_stream_event(event, payload, stream_format)
+                except Exception as e:
+                    yield format_stream_event('error', {
+                        'status': 'error',
+                        'message': f'Eroare la analiza istoricului: {str(e)}'
+                    }, stream_format)
+            
+            mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+            return Response(
+                stream_with_context(generate()),
+                mimetype=mimetype,
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
         
-        if imports_module:
-            # Analizează detaliat ce importă
-            result['entities'] = analyze_imports_detailed(content, modul_principal, entities)
+        commits = []
+        summary = {}
+        for event, payload in iter_history_analysis(analyzer, rev, max_commits):
+            if event == 'commit':
+                commits.append(payload)
+            else:
+                summary = payload
         
-        return jsonify(result)
+        return api_response({**summary, 'history': commits})
         
+    except GitCommandError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
     except Exception as e:
-        # FAZA 3.2 - Gestionare erori user-friendly
         return jsonify({
             'status': 'error',
-            'message': f'Eroare la analiza importurilor: {str(e)}',
-            'imports': False,
-            'entities': {'functions': [], 'classes': []},
-            'analysis': {}
+            'message': f'Eroare la analiza istoricului: {str(e)}'
         }), 500
 
-@app.route('/get_analysis', methods=['GET'])
-def get_analysis():
-    """Returnează analiza completă salvată"""
+@app.route('/upload_archive', methods=['POST'])
+def upload_archive():
+    """Încarcă o arhivă .zip sau .tar(.gz) și o analizează în flux, fără extragere pe disc"""
     try:
-        base_dir = os.path.dirname(__file__)
-        analysis_path = os.path.join(base_dir, 'analysis.json')
+        archive = request.files.get('archive')
         
-        result = {
-            'status': 'ok',
-            'has_analysis': os.path.exists(analysis_path),
-            'session_edits': session_edits.size(),
-            'detailed_imports': {}
-        }
+        if archive is None or not archive.filename:
+            return jsonify({'status': 'error', 'message': 'Arhiva este necesară (câmpul "archive")'}), 400
         
-        # Returnează analiza detaliată dacă există
-        if os.path.exists(analysis_path):
-            with open(analysis_path, 'r', encoding='utf-8') as f:
-                result['detailed_imports'] = json.load(f)
+        if not is_supported_archive(archive.filename):
+            return jsonify({
+                'status': 'error',
+                'message': 'Format nesuportat. Folosiți .zip, .tar, .tar.gz, .tar.bz2 sau .tar.xz'
+            }), 400
         
-        return jsonify(result)
+        try:
+            files = ingest_archive(archive.stream, archive.filename)
+        except (ArchiveLimitError, ValueError) as e:
+            # ValueError: un membru nu încape în blob store (BLOB_STORE_MAX_BYTES)
+            return jsonify({'status': 'error', 'message': f'Arhivă respinsă: {str(e)}'}), 413
+        
+        if not files:
+            return jsonify({'status': 'error', 'message': 'Arhiva nu conține fișiere Python'}), 400
+        
+        structure_id = register_archive_structure(archive.filename, files, request.form.get('project_id'))
+        analysis_results = run_directory_analysis(structure_id)
+        
+        return api_response({
+            'status': 'ok',
+            'structure_id': structure_id,
+            'entry_points': analysis_results['entry_points'],
+            'total_files': len(files),
+            'python_files': len(files),
+            'analysis': analysis_results
+        })
         
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        return jsonify({'status': 'error', 'message': f'Arhivă invalidă: {str(e)}'}), 400
+    except MissingBlobError as e:
+        return missing_blobs_response(e)
     except Exception as e:
-        # FAZA 3.2
         return jsonify({
             'status': 'error',
-            'message': f'Eroare la obținerea analizei: {str(e)}'
+            'message': f'Eroare la procesarea arhivei: {str(e)}'
         }), 500
 
-@app.route('/save_directory_structure', methods=['POST'])
-def save_directory_structure():
-    """Salvează structura de directoare pentru analiză ulterioară"""
+@app.route('/uploads', methods=['POST'])
+def open_upload():
+    """
+    Deschide o încărcare în chunk-uri pentru structuri mari
+    
+    Opțional: structure (arborele fără conținut), root_name, project_id.
+    Fișierele se trimit apoi la /uploads/<id>/chunks, iar /uploads/<id>/commit înregistrează structura.
+    """
+    data = request.get_json(silent=True) or {}
+    structure = data.get('structure')
+    if structure is not None and not isinstance(structure, dict):
+        return jsonify({'status': 'error', 'message': 'structure trebuie să fie un obiect'}), 400
+    
+    upload = upload_sessions.open(
+        root_name=data.get('root_name', 'root'),
+        project_id=data.get('project_id'),
+        structure=strip_structure_contents(structure) if structure else None
+    )
+    response = jsonify({
+        'status': 'ok',
+        'upload_id': upload.upload_id,
+        'next_chunk': 0,
+        'max_chunk_bytes': MAX_UPLOAD_CHUNK_BYTES
+    })
+    response.headers['Location'] = f'/uploads/{upload.upload_id}'
+    return response, 201
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """Starea încărcării: de la next_chunk se reia după o conexiune întreruptă"""
+    upload = upload_sessions.get(upload_id)
+    if upload is None:
+        return jsonify({'status': 'error', 'message': 'Upload necunoscut sau expirat'}), 404
+    return jsonify(upload_status(upload))
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def abort_upload(upload_id):
+    """Renunță la o încărcare (blob-urile deja primite rămân în blob store)"""
+    if not upload_sessions.discard(upload_id):
+        return jsonify({'status': 'error', 'message': 'Upload necunoscut sau expirat'}), 404
+    return jsonify({'status': 'ok'})
+
+@app.route('/uploads/<upload_id>/chunks', methods=['POST'])
+def append_upload_chunk(upload_id):
+    """
+    Adaugă un lot de fișiere: {"index": n, "checksum": sha256(data), "data": "[{path, content | sha256, ...}]"}
+    
+    data este lista de fișiere serializată JSON, iar checksum-ul se verifică pe textul primit.
+    Fișierele Python din chunk sunt analizate în fundal, în timp ce clientul trimite următoarele chunk-uri.
+    """
     try:
-        data = request.get_json()
-        structure = data.get('structure', {})
-        files = data.get('files', [])
+        upload = upload_sessions.get(upload_id)
+        if upload is None:
+            return jsonify({'status': 'error', 'message': 'Upload necunoscut sau expirat'}), 404
         
-        # Generează un ID unic pentru structură
-        structure_id = hashlib.md5(json.dumps(structure, sort_keys=True).encode()).hexdigest()[:8]
+        data = request.get_json(silent=True) or {}
+        chunk_data = data.get('data')
+        index = data.get('index')
+        if not isinstance(chunk_data, str) or not isinstance(index, int) or index < 0:
+            return jsonify({'status': 'error', 'message': 'Sunt necesare index (întreg) și data (text JSON)'}), 400
         
-        # FAZA 2.1 - Adaugă timestamp pentru curățare ulterioară
-        structure._timestamp = datetime.now()
+        if len(chunk_data) > MAX_UPLOAD_CHUNK_BYTES:
+            return jsonify({
+                'status': 'error',
+                'message': f'Chunk-ul depășește limita de {MAX_UPLOAD_CHUNK_BYTES // 1024 // 1024}MB',
+                'next_chunk': upload.next_chunk
+            }), 413
         
-        # Salvează în cache
-        directory_structures[structure_id] = structure
-        directory_files[structure_id] = files
+        checksum = chunk_checksum(chunk_data)
+        if data.get('checksum') != checksum:
+            # Chunk corupt pe drum: clientul îl retrimite
+            return jsonify({
+                'status': 'error',
+                'message': 'Checksum invalid pentru chunk',
+                'next_chunk': upload.next_chunk
+            }), 422
         
-        # Analiză punctele de intrare
-        entry_points = find_entry_points(structure)
+        try:
+            files = json.loads(chunk_data)
+            if not isinstance(files, list):
+                raise ValueError('data trebuie să fie o listă de fișiere')
+            entries, blobs, size = prepare_upload_chunk(files)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e), 'next_chunk': upload.next_chunk}), 400
         
-        return jsonify({
+        try:
+            # Conținutul se salvează înainte de confirmare: un chunk confirmat nu mai este
+            # primit a doua oară, deci un put eșuat după append i-ar pierde fișierele
+            if upload_sessions.check(upload, index, checksum, size):
+                for digest, content in blobs.items():
+                    blob_store.put(content, expected_digest=digest)
+            accepted = upload_sessions.append(upload, index, checksum, entries, size)
+        except UploadChunkError as e:
+            return jsonify({'status': 'error', 'message': str(e), 'next_chunk': e.next_chunk}), e.status
+        
+        response = {
             'status': 'ok',
-            'structure_id': structure_id,
-            'entry_points': entry_points,
-            'total_files': len(files),
-            'python_files': len([f for f in files if f.get('type') == 'python'])
-        })
+            'index': index,
+            'duplicate': not accepted,
+            'next_chunk': upload.next_chunk
+        }
+        if not accepted:
+            return jsonify(response)
+        
+        sources, missing = upload_chunk_sources(entries)
+        response['missing_blobs'] = missing
+        if not start_upload_analysis(upload, sources):
+            # Analiza în fundal reia la următorul chunk (sau se face la cerere, după commit)
+            response['analysis_deferred'] = True
+        response['analysis_job'] = upload.analysis_job
+        
+        return jsonify(response)
         
     except Exception as e:
-        # FAZA 3.2
         return jsonify({
             'status': 'error',
-            'message': f'Eroare la salvarea structurii: {str(e)}'
+            'message': f'Eroare la primirea chunk-ului: {str(e)}'
         }), 500
 
-@app.route('/get_file_content', methods=['POST'])
-def get_file_content():
-    """Obține conținutul unui fișier din structura salvată"""
+@app.route('/uploads/<upload_id>/commit', methods=['POST'])
+def commit_upload(upload_id):
+    """
+    Înregistrează fișierele primite ca structură (răspuns ca /save_directory_structure)
+    
+    Cu analyze: true pornește și analiza directorului ca job; fișierele analizate
+    deja în timpul încărcării sunt luate din cache. Repetarea commit-ului returnează același rezultat.
+    """
     try:
-        data = request.get_json()
-        structure_id = data.get('structure_id', '')
-        file_path = data.get('file_path', '')
-        
-        if structure_id not in directory_files:
-            return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
-        
-        files = directory_files[structure_id]
+        upload = upload_sessions.get(upload_id)
+        if upload is None:
+            return jsonify({'status': 'error', 'message': 'Upload necunoscut sau expirat'}), 404
+        if upload.committed:
+            return jsonify(upload.result)
         
-        # Caută fișierul după path
-        for file_data in files:
-            if file_data.get('path', '') == file_path or file_data.get('name', '') == file_path:
-                # Verifică dacă există o versiune editată
-                edited_content = get_edited_content(file_data.get('name', ''))
-                if edited_content:
-                    file_data['content'] = edited_content
-                    
-                return jsonify({
-                    'status': 'ok',
-                    'file': {
-                        'name': file_data.get('name', ''),
-                        'content': file_data.get('content', ''),
-                        'type': file_data.get('type', 'unknown')
-                    }
-                })
+        data = request.get_json(silent=True) or {}
+        try:
+            # Copia fișierelor și blocarea chunk-urilor noi se fac sub același lock
+            files = upload_sessions.begin_commit(upload, data.get('chunks'))
+        except UploadChunkError as e:
+            if upload.committed:
+                return jsonify(upload.result)
+            return jsonify({'status': 'error', 'message': str(e), 'next_chunk': e.next_chunk}), e.status
         
-        return jsonify({'status': 'error', 'message': 'Fișier negăsit'}), 404
+        try:
+            result = register_upload(upload, files, data.get('analyze'))
+        except StructureTooLargeError as e:
+            upload_sessions.abort_commit(upload)
+            return jsonify({'status': 'error', 'message': str(e)}), 413
+        except Exception:
+            upload_sessions.abort_commit(upload)
+            raise
+        
+        upload_sessions.commit(upload, result)
+        return jsonify(result)
         
     except Exception as e:
-        # FAZA 3.2
         return jsonify({
             'status': 'error',
-            'message': f'Eroare la obținerea conținutului: {str(e)}'
+            'message': f'Eroare la finalizarea upload-ului: {str(e)}'
         }), 500
 
-@app.route('/analyze_directory', methods=['POST'])
-def analyze_directory():
-    """Analizează complet o structură de directoare"""
+@app.route('/uploads/stats', methods=['GET'])
+def upload_sessions_stats():
+    """Sesiunile de încărcare active și bytes primiți"""
+    return jsonify({'status': 'ok', **upload_sessions.stats()})
+
+@app.route('/export_graph', methods=['GET', 'POST'])
+def export_graph():
+    """Exportă graful de module sau de apeluri ca flux DOT, GraphML sau binar"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or request.args
         structure_id = data.get('structure_id', '')
+        graph_type = data.get('graph', 'module')
+        export_format = data.get('format', 'dot')
         
-        if structure_id not in directory_structures:
+        if structure_id not in structure_store:
             return jsonify({'status': 'error', 'message': 'Structură necunoscută'}), 404
         
-        structure = directory_structures[structure_id]
-        files = directory_files.get(structure_id, [])
-        
-        # Filtrează doar fișierele Python
-        python_files = [f for f in files if f.get('type') == 'python' and f.get('content')]
-        
-        analysis_results = {
-            'structure_id': structure_id,
-            'timestamp': datetime.now().isoformat(),
-            'files_analyzed': 0,
-            'total_files': len(files),
-            'total_functions': 0,
-            'total_classes': 0,
-            'total_lines': 0,
-            'dependencies': {},
-            'entry_points': find_entry_points(structure),
-            'file_analyses': {},
-            'import_graph': {},
-            'complexity_metrics': {},
-            'directories': count_directories(structure)
-        }
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'status': 'error',
+                'message': f'Format necunoscut. Formate suportate: {", ".join(EXPORT_FORMATS)}'
+            }), 400
         
-        # Analizează fiecare fișier Python
-        for file_data in python_files:
-            filename = file_data['name']
-            content = get_edited_content(filename) or file_data.get('content', '')
+        if graph_type not in ('module', 'call'):
+            return jsonify({'status': 'error', 'message': 'Tip de graf necunoscut (module sau call)'}), 400
+        
+        if graph_type == 'module':
+            # Reține doar importurile fiecărui fișier, nu analiza completă
+            graph_files = []
+            for file_data, result in iter_python_results(structure_id):
+                graph_files.append({
+                    'name': file_data['name'],
+                    'path': file_data.get('path', file_data['name']),
+                    'type': 'python',
+                    'analysis': {'imports_detail': result['analysis'].get('imports_detail', {})}
+                })
             
-            if not content or content == '[Fișier prea mare - conținutul nu a fost încărcat automat]':
-                continue
+            graph_analyzer = DependencyAnalyzer()
+            graph_analyzer.build_graph(graph_files)
+            graph_files.clear()
             
-            # Analiză detaliată folosind AST analyzer actualizat
-            file_analysis = ast_analyzer.analyze_code(content, filename)
-            analysis_results['file_analyses'][filename] = file_analysis
+            exporter = GraphExporter(
+                'modules',
+                graph_analyzer.iter_module_nodes,
+                graph_analyzer.iter_module_edges,
+                node_keys={
+                    'label': 'string',
+                    'file': 'string',
+                    'imports_count': 'int',
+                    'imported_by_count': 'int'
+                }
+            )
+        else:
+            builder = CallGraphBuilder()
+            for file_data, result in iter_python_results(structure_id):
+                module_name = os.path.splitext(file_data['name'])[0]
+                builder.add_module(module_name, result['analysis'].get('functions', []))
             
-            # Actualizează statistici globale
-            if 'error' not in file_analysis:
-                analysis_results['files_analyzed'] += 1
-                analysis_results['total_functions'] += len(file_analysis.get('functions', []))
-                analysis_results['total_classes'] += len(file_analysis.get('classes', []))
-                analysis_results['total_lines'] += file_analysis.get('metrics', {}).get('total_lines', 0)
-                
-                # Complexitate
-                functions = file_analysis.get('functions', [])
-                if functions:
-                    total_complexity = sum(f.complexity for f in functions)
-                    avg_complexity = total_complexity / len(functions)
-                    max_complexity = max(f.complexity for f in functions)
-                    
-                    analysis_results['complexity_metrics'][filename] = {
-                        'total': total_complexity,
-                        'average': round(avg_complexity, 2),
-                        'max': max_complexity
-                    }
-        
-        # Analizează dependențele
-        analysis_results['dependencies'] = analyze_directory_dependencies(python_files)
-        
-        # Construiește graful de importuri
-        for filename, deps in analysis_results['dependencies'].items():
-            analysis_results['import_graph'][filename] = {
-                'imports': deps,
-                'imported_by': []
-            }
+            exporter = GraphExporter(
+                'calls',
+                builder.iter_nodes,
+                builder.iter_edges,
+                node_keys={'label': 'string', 'module': 'string'}
+            )
         
-        # Populează imported_by
-        for filename, graph_data in analysis_results['import_graph'].items():
-            for dep in graph_data['imports']:
-                if dep in analysis_results['import_graph']:
-                    analysis_results['import_graph'][dep]['imported_by'].append(filename)
+        format_info = EXPORT_FORMATS[export_format]
+        download_name = f"{graph_type}_graph_{structure_id}.{format_info['extension']}"
         
-        return jsonify({
-            'status': 'ok',
-            'analysis': analysis_results
-        })
+        return Response(
+            exporter.iter_format(export_format),
+            content_type=format_info['mimetype'],
+            headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+        )
         
+    except MissingBlobError as e:
+        return missing_blobs_response(e)
     except Exception as e:
-        # FAZA 3.2
         return jsonify({
             'status': 'error',
-            'message': f'Eroare la analiza directorului: {str(e)}'
+            'message': f'Eroare la exportul grafului: {str(e)}'
         }), 500
 
 @app.route('/save_session_edit', methods=['POST'])
@@ -669,14 +2967,16 @@ def save_session_edit():
             }), 413
         
         # Salvează cu cache limitat
-        session_edits.set(filename, content)
+        session_edits.set(current_edit_namespace(), filename, content)
         
         return jsonify({
             'status': 'ok',
             'message': 'Editare salvată în sesiune',
-            'total_edits': session_edits.size()
+            'total_edits': session_edits.size(current_edit_namespace())
         })
         
+    except EditQuotaError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 413
     except Exception as e:
         # FAZA 3.2
         return jsonify({
@@ -688,11 +2988,14 @@ def save_session_edit():
 def get_session_edits():
     """Returnează toate editările din sesiune"""
     try:
-        edits_dict = dict(session_edits.items())
-        return jsonify({
+        edits_dict = dict(session_edits.items(current_edit_namespace()))
+        response = jsonify({
             'edits': edits_dict,
             'count': len(edits_dict)
         })
+        return conditional_response(response, strong_etag(
+            *sorted(f'{filename}={content_hash(content)}' for filename, content in edits_dict.items())
+        ))
     except Exception as e:
         # FAZA 3.2
         return jsonify({
@@ -702,19 +3005,16 @@ def get_session_edits():
             'count': 0
         }), 500
 
-@app.route('/generate_workflow', methods=['POST'])
-def generate_workflow():
-    """Generează workflow profesional folosind Claude API"""
+def run_generate_workflow(data):
+    """Generează workflow-ul prin Claude API; returnează (răspuns, cod HTTP)"""
     try:
-        data = request.get_json()
-        
         # FAZA 3.2 - Verifică cheia API cu mesaj user-friendly
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key or api_key == 'your-anthropic-api-key-here':
-            return jsonify({
+            return {
                 'status': 'error',
                 'message': 'Cheia API Anthropic nu este configurată. Vă rugăm să adăugați ANTHROPIC_API_KEY în fișierul .env'
-            }), 400
+            }, 400
         
         # Pregătește datele proiectului
         project_data = {
@@ -847,48 +3147,54 @@ NU menționa niciun tool extern sau platformă specifică. Concentrează-te pe a
                 result = response.json()
                 workflow_content = result['content'][0]['text']
                 
-                return jsonify({
+                return {
                     'status': 'ok',
                     'workflow': workflow_content
-                })
+                }, 200
             elif response.status_code == 401:
-                return jsonify({
+                return {
                     'status': 'error',
                     'message': 'Cheia API este invalidă. Verificați ANTHROPIC_API_KEY în fișierul .env'
-                }), 401
+                }, 401
             elif response.status_code == 429:
-                return jsonify({
+                return {
                     'status': 'error',
                     'message': 'Limită de rate atinsă. Vă rugăm să încercați din nou în câteva momente'
-                }), 429
+                }, 429
             else:
-                return jsonify({
+                return {
                     'status': 'error',
                     'message': f'Eroare API Claude: Status {response.status_code}'
-                }), response.status_code
+                }, response.status_code
                 
         except requests.exceptions.Timeout:
-            return jsonify({
+            return {
                 'status': 'error',
                 'message': 'Timpul de așteptare pentru API a expirat. Vă rugăm să încercați din nou'
-            }), 504
+            }, 504
         except requests.exceptions.ConnectionError:
-            return jsonify({
+            return {
                 'status': 'error',
                 'message': 'Nu s-a putut conecta la API-ul Claude. Verificați conexiunea la internet'
-            }), 503
+            }, 503
         except Exception as api_error:
-            return jsonify({
+            return {
                 'status': 'error',
                 'message': f'Eroare la comunicarea cu API: {str(api_error)}'
-            }), 500
+            }, 500
             
     except Exception as e:
         # FAZA 3.2 - Eroare generală
-        return jsonify({
+        return {
             'status': 'error',
             'message': f'Eroare la generarea workflow: {str(e)}'
-        }), 500
+        }, 500
+
+@app.route('/generate_workflow', methods=['POST'])
+def generate_workflow():
+    """Generează workflow profesional folosind Claude API"""
+    payload, status = run_generate_workflow(request.get_json())
+    return jsonify(payload), status
 
 @app.route('/export_pdf', methods=['POST'])
 def export_pdf():
@@ -924,16 +3230,7 @@ def export_pdf():
 def get_secundare():
     """Returnează lista scripturilor secundare"""
     try:
-        base_dir = os.path.dirname(__file__)
-        parent_dir = os.path.abspath(os.path.join(base_dir, ".."))
-        secundare_txt_path = os.path.join(parent_dir, 'secundare.txt')
-        
-        if not os.path.isfile(secundare_txt_path):
-            return "", 200
-            
-        with open(secundare_txt_path, 'r', encoding='utf-8') as f:
-            continut = f.read()
-            
+        continut = project_states.get(current_edit_namespace()).secondary_listing()
         return continut, 200, {'Content-Type': 'text/plain; charset=utf-8'}
         
     except Exception as e:
@@ -946,10 +3243,7 @@ def clear_session_cache():
     """Curăță manual cache-ul sesiunii"""
     try:
         # Verifică dacă există o cheie de administrare
-        admin_key = request.headers.get('X-Admin-Key')
-        expected_key = os.getenv('ADMIN_KEY')
-        
-        if expected_key and admin_key != expected_key:
+        if not admin_key_valid():
             return jsonify({
                 'status': 'error',
                 'message': 'Cheie de administrare invalidă'
@@ -969,10 +3263,23 @@ def clear_session_cache():
             'message': f'Eroare la curățarea cache-ului: {str(e)}'
         }), 500
 
+def create_app(config=None):
+    """
+    Fabrica aplicației pentru serverele WSGI (wsgi.py, serve.py, `flask run`)
+    
+    Rutele și store-urile sunt definite la nivelul modulului; fabrica aplică
+    configurarea suplimentară și pornește serviciile de fundal în procesul
+    curent, deci trebuie apelată în fiecare worker, după fork.
+    """
+    if config:
+        app.config.update(config)
+    start_background_services()
+    return app
+
 if __name__ == '__main__':
     # Configurare din environment
     host = os.getenv('HOST', '0.0.0.0')
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
     
-    app.run(host=host, port=port, debug=debug)
\ No newline at end of file
+    create_app().run(host=host, port=port, debug=debug)
\ No newline at end of file
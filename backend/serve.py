@@ -0,0 +1,184 @@
+"""
+Server de producție pentru Python Forensics
+Workeri preforked (procese), fiecare cu un număr fix de thread-uri: python serve.py --workers 4 --threads 8
+
+Folosește gunicorn dacă este instalat; altfel un launcher propriu bazat pe
+fork și serverul WSGI din werkzeug. Cu mai mulți workeri, toată starea
+(cache-ul de analize, structurile, editările, starea proiectului, job-urile,
+încărcările în chunk-uri, analizele distribuite, snapshot-urile și
+profilurile) stă într-un backend local comun (SQLite WAL și un director de
+blob-uri), deci orice worker poate servi orice cerere.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+from werkzeug.serving import BaseWSGIServer
+
+
+def configure_shared_storage(workers: int):
+    """Setează SHARED_CACHE_PATH și BLOB_STORE_PATH (dacă lipsesc) înainte ca workerii să importe aplicația"""
+    if workers <= 1:
+        return
+    base = os.path.join(tempfile.gettempdir(), 'p4n6-shared')
+    os.makedirs(base, exist_ok=True)
+    if not os.environ.get('SHARED_CACHE_PATH'):
+        os.environ['SHARED_CACHE_PATH'] = os.path.join(base, 'cache.sqlite')
+    if not os.environ.get('BLOB_STORE_PATH'):
+        os.environ['BLOB_STORE_PATH'] = os.path.join(base, 'blobs')
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Server WSGI werkzeug cu un pool fix de thread-uri (nu câte un thread nou per conexiune)"""
+
+    def __init__(self, *args, threads: int = 8, **kwargs):
+        self.pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix='http')
+        super().__init__(*args, **kwargs)
+
+    def serve_forever(self, poll_interval: float = 0.5):
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            # Cererile în curs se termină înainte de ieșirea workerului
+            self.pool.shutdown(wait=True)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def run_worker(host: str, port: int, threads: int, fd=None):
+    """Procesul unui worker: importă aplicația (după fork) și servește cererile"""
+    from app import create_app
+
+    server = PooledWSGIServer(host, port, create_app(), threads=threads, fd=fd)
+    # shutdown() blochează până se oprește bucla, deci se apelează din alt thread
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def serve_prefork(host: str, port: int, workers: int, threads: int):
+    """Procesul master: deschide socket-ul, pornește workerii și îi repornește dacă se opresc"""
+    listener = socket.create_server((host, port), backlog=1024)
+    listener.set_inheritable(True)
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # Ctrl+C ajunge la tot grupul de procese; oprirea workerilor o coordonează masterul
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            code = 0
+            try:
+                run_worker(host, port, threads, fd=listener.fileno())
+            except Exception as e:
+                print(f'Eroare în worker {os.getpid()}: {e}', file=sys.stderr)
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.time()
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+    print(f'Python Forensics: {workers} workeri x {threads} thread-uri pe http://{host}:{port}')
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if not stopping and started is not None:
+            # Un worker care cade imediat după pornire nu este repornit în buclă strânsă
+            if time.time() - started < 1:
+                time.sleep(1)
+            spawn()
+
+    listener.close()
+
+
+def serve_gunicorn(host: str, port: int, workers: int, threads: int):
+    """Aceeași configurație rulată de gunicorn (worker gthread, aplicația încărcată după fork)"""
+
+    class GunicornServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('preload_app', False)
+            self.cfg.set('timeout', int(os.getenv('SERVER_TIMEOUT', 300)))
+
+        def load(self):
+            from app import create_app
+            return create_app()
+
+    GunicornServer().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Server de producție Python Forensics')
+    parser.add_argument('--host', default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SERVER_WORKERS', 2)),
+                        help='Procese worker (0 = câte unul per nucleu)')
+    parser.add_argument('--threads', type=int, default=int(os.getenv('SERVER_THREADS', 8)),
+                        help='Thread-uri per worker')
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'builtin'), default=os.getenv('SERVER_BACKEND', 'auto'))
+    args = parser.parse_args()
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    configure_shared_storage(workers)
+    if workers > 1 and os.environ.get('BLOB_STORE_PATH') == 'memory':
+        print('Atenție: cu BLOB_STORE_PATH=memory fiecare worker are propriile blob-uri; '
+              'conținutul încărcat printr-un worker lipsește în ceilalți', file=sys.stderr)
+
+    if args.server == 'gunicorn' and BaseApplication is None:
+        parser.error('gunicorn nu este instalat')
+    if args.server != 'builtin' and BaseApplication is not None:
+        serve_gunicorn(args.host, args.port, workers, args.threads)
+    elif workers > 1 and hasattr(os, 'fork'):
+        serve_prefork(args.host, args.port, workers, args.threads)
+    else:
+        # Fără fork (Windows) sau un singur worker: un proces cu pool de thread-uri
+        run_worker(args.host, args.port, args.threads)
+
+
+if __name__ == '__main__':
+    main()
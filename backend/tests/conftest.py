@@ -0,0 +1,10 @@
+"""
+Configurație comună pentru testele Python Forensics
+Testele importă modulele din backend (analyzers, utils) ca aplicația
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,78 @@
+"""
+Teste pentru BlobStore, în memorie și în director (index comun proceselor)
+"""
+import pytest
+
+from utils import blob_store
+from utils.blob_store import BlobStore, MissingBlobError, blob_digest
+
+
+@pytest.fixture(params=['memory', 'directory'])
+def make_store(request, tmp_path):
+    def make(max_bytes=1024):
+        path = str(tmp_path / 'blobs') if request.param == 'directory' else None
+        return BlobStore(max_bytes=max_bytes, path=path)
+    return make
+
+
+def test_put_get_and_missing(make_store):
+    store = make_store()
+    digest = store.put('print("ă")\n')
+    assert digest == blob_digest('print("ă")\n')
+    assert store.get(digest) == 'print("ă")\n'
+    assert digest in store
+
+    unknown = blob_digest('altceva')
+    assert store.missing([digest, unknown, unknown, 'invalid']) == [unknown]
+    assert store.get(unknown) is None
+
+
+def test_put_checks_expected_digest(make_store):
+    store = make_store()
+    with pytest.raises(ValueError):
+        store.put('a = 1\n', expected_digest=blob_digest('a = 2\n'))
+    with pytest.raises(ValueError):
+        store.put('x' * 2048)
+
+
+def test_identical_content_is_stored_once(make_store):
+    store = make_store()
+    store.put('a' * 100)
+    store.put('a' * 100)
+    assert store.stats()['blobs'] == 1
+    assert store.stats()['bytes'] == 100
+
+
+def test_budget_evicts_least_recently_used(make_store, monkeypatch):
+    # Fiecare citire actualizează ultima folosire din indexul comun
+    monkeypatch.setattr(blob_store, 'TOUCH_INTERVAL', 0)
+    store = make_store(max_bytes=300)
+    first = store.put('a' * 100)
+    second = store.put('b' * 100)
+    third = store.put('c' * 100)
+    # Citirea lui first îl face cel mai recent folosit
+    assert store.get(first) is not None
+
+    store.put('d' * 100)
+    assert store.stats()['bytes'] <= 300
+    assert second not in store
+    assert first in store and third in store
+
+
+def test_directory_is_shared_between_stores(tmp_path):
+    path = str(tmp_path / 'blobs')
+    one, other = BlobStore(max_bytes=250, path=path), BlobStore(max_bytes=250, path=path)
+    first = one.put('a' * 100)
+    assert other.get(first) == 'a' * 100
+
+    other.put('b' * 100)
+    one.put('c' * 100)
+    # Bugetul este impus pe totalul ambelor instanțe
+    assert one.stats()['bytes'] <= 250
+    assert first not in other
+
+
+def test_missing_blob_error_lists_paths():
+    error = MissingBlobError({f'f{i}.py': 'd' for i in range(12)})
+    assert 'și încă 2' in str(error)
+    assert error.digests == ['d']
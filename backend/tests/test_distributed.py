@@ -0,0 +1,250 @@
+"""
+Teste pentru analiza distribuită: coordonatorul, validarea rezultatelor și un cluster local complet
+"""
+import dataclasses
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+from analyzers.distributed import (
+    ShardCoordinator, analyze_shard_files, run_worker, validate_shard_result,
+    CLUSTER_TOKEN_HEADER, SHARD_DONE, SHARD_FAILED
+)
+from analyzers.project_analyzer import ProjectAnalyzer, summarize_file_analysis
+from utils.serialization import dumps
+from utils.shared_store import SharedStore
+
+from conftest import BACKEND_DIR
+
+TOKEN = 'test-token'
+
+
+def make_files(count):
+    """Module care se importă între ele, cu complexitate și documentație diferite"""
+    files = []
+    for i in range(count):
+        functions = '\n'.join(f'def f{k}(y):\n    return y * {k}\n' for k in range(i % 7))
+        content = (
+            f'import os\nfrom pkg import m{(i + 1) % count}\n\n'
+            f'class C{i}:\n    """Clasa {i}"""\n\n'
+            f'    def run(self, x):\n'
+            f'        if x > {i}:\n'
+            f'            for k in range(x):\n'
+            f'                if k % 2:\n'
+            f'                    x += k\n'
+            f'        return x\n\n'
+            f'{functions}'
+        )
+        files.append({'name': f'm{i}.py', 'path': f'pkg/m{i}.py', 'type': 'python', 'content': content})
+    files.append({'name': 'broken.py', 'path': 'pkg/broken.py', 'type': 'python', 'content': 'def broken(:\n'})
+    return files
+
+
+def normalized(report):
+    return json.loads(dumps(report))
+
+
+def assert_same_report(merged, files):
+    """Raportul combinat este cel al analizei pe o singură mașină (fișierele în ordinea căilor)"""
+    ordered = sorted(files, key=lambda f: f['path'])
+    local = ProjectAnalyzer().analyze_project(ordered, merged['project_name'])
+    expected = normalized(local)
+
+    for key in ('project_name', 'root_path', 'metrics', 'dependency_graph', 'issues', 'recommendations'):
+        assert merged[key] == expected[key], key
+    # Workerii trimit doar agregatele per fișier, nu analiza completă
+    assert merged['file_analyses'] == {
+        name: normalized(dataclasses.asdict(summarize_file_analysis(name, analysis)))
+        for name, analysis in local.file_analyses.items()
+    }
+
+
+def content_of(file_data):
+    return file_data.get('content', '')
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def coordinator(request, tmp_path):
+    shared = shared_results = None
+    if request.param == 'shared':
+        path = str(tmp_path / 'cluster.sqlite')
+        shared, shared_results = SharedStore(path, 'cluster_jobs'), SharedStore(path, 'cluster_shard_results')
+    return ShardCoordinator(content_of, lease_timeout=0.2, max_attempts=3,
+                            shared=shared, shared_results=shared_results)
+
+
+def work(coordinator, worker_id):
+    """Analizează toate shard-urile disponibile, ca run_worker, fără HTTP"""
+    while True:
+        lease = coordinator.lease(worker_id)
+        if lease is None:
+            return
+        payload = coordinator.shard_payload(lease)
+        assert coordinator.complete(worker_id, lease['job_id'], lease['shard_id'], analyze_shard_files(payload['files']))
+
+
+def test_merged_report_matches_single_host(coordinator):
+    files = make_files(25)
+    job = coordinator.create_job(files, project_name='demo', shard_files=4)
+    assert len(job.shards) == 7
+
+    work(coordinator, 'w-1')
+    job = coordinator.get_job(job.job_id)
+    assert job.state == SHARD_DONE
+    assert_same_report(normalized(coordinator.merge(job)), files)
+
+
+def test_expired_lease_is_reassigned(coordinator):
+    job = coordinator.create_job(make_files(8), shard_files=4)
+    crashed = coordinator.lease('crashed')
+    assert crashed is not None
+
+    time.sleep(0.3)
+    work(coordinator, 'w-1')
+    status = coordinator.job_status(coordinator.get_job(job.job_id))
+    assert status['state'] == SHARD_DONE
+    assert status['workers'] == ['w-1']
+
+    # Confirmarea întârziată a workerului căzut nu mai este acceptată
+    results = analyze_shard_files(coordinator.shard_payload(crashed)['files'])
+    assert not coordinator.complete('crashed', crashed['job_id'], crashed['shard_id'], results)
+
+
+def test_shard_fails_after_max_attempts(coordinator):
+    job = coordinator.create_job(make_files(2), shard_files=10)
+    for _ in range(3):
+        assert coordinator.lease('crashing') is not None
+        time.sleep(0.3)
+    assert coordinator.lease('crashing') is None
+    assert coordinator.get_job(job.job_id).state == SHARD_FAILED
+
+
+def test_unchanged_shards_reuse_results(coordinator):
+    files = make_files(12)
+    first = coordinator.create_job(files, shard_files=4)
+    work(coordinator, 'w-1')
+
+    files[0] = {**files[0], 'content': files[0]['content'] + '\nEXTRA = 1\n'}
+    second = coordinator.create_job(files, shard_files=4)
+    assert set(first.shards) & set(second.shards)
+    assert coordinator.job_status(second)['progress']['pending'] == 1
+    work(coordinator, 'w-1')
+    assert_same_report(normalized(coordinator.merge(coordinator.get_job(second.job_id))), files)
+
+
+def test_complete_rejects_results_for_other_files(coordinator):
+    coordinator.create_job(make_files(4), shard_files=2)
+    lease = coordinator.lease('w-1')
+    other = analyze_shard_files([{'name': 'x.py', 'path': 'pkg/x.py', 'content': 'x = 1\n'}])
+    assert not coordinator.complete('w-1', lease['job_id'], lease['shard_id'], other)
+
+
+def test_validate_shard_result():
+    result = analyze_shard_files([{'name': 'a.py', 'path': 'a.py', 'content': 'def f():\n    return 1\n'}])[0]
+    assert validate_shard_result(result) is None
+    assert validate_shard_result([]) is not None
+    assert 'aggregate.total_lines' in validate_shard_result(
+        {**result, 'aggregate': {**result['aggregate'], 'total_lines': '7'}})
+    assert 'necunoscute' in validate_shard_result(
+        {**result, 'aggregate': {**result['aggregate'], 'extra': 1}})
+    assert 'metrics.file' in validate_shard_result({**result, 'metrics': {**result['metrics'], 'file': [1]}})
+    assert 'imports_detail' in validate_shard_result({**result, 'imports_detail': {'os': 'import'}})
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(params=[1, 2], ids=['one-process', 'two-processes'])
+def cluster_server(request, tmp_path):
+    """Serverul (coordonatorul) pornit cu serve.py pe un port local"""
+    port = free_port()
+    env = {
+        **os.environ,
+        'CLUSTER_TOKEN': TOKEN,
+        'CLUSTER_LEASE_TIMEOUT': '1',
+        'SHARED_CACHE_PATH': str(tmp_path / 'cache.sqlite') if request.param > 1 else '',
+        'EDIT_STORE_PATH': '',
+        'BLOB_STORE_PATH': str(tmp_path / 'blobs'),
+        'PROJECT_STATE_FLUSH': 'False'
+    }
+    server = subprocess.Popen(
+        [sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(request.param), '--threads', '4', '--server', 'builtin'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                requests.get(f'{base_url}/metrics', timeout=2)
+                break
+            except requests.ConnectionError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError('Serverul nu a pornit')
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def test_cluster_with_crashing_worker(cluster_server):
+    files = make_files(40)
+    headers = {CLUSTER_TOKEN_HEADER: TOKEN}
+    saved = requests.post(f'{cluster_server}/save_directory_structure', json={
+        'structure': {'name': 'demo', 'files': [], 'children': {}}, 'files': files
+    }).json()
+    created = requests.post(f'{cluster_server}/cluster/jobs', json={
+        'structure_id': saved['structure_id'], 'shard_size': 4
+    }).json()
+    shards = (len(files) + 3) // 4
+    assert created['shards'] == shards
+    job_url = f"{cluster_server}/cluster/jobs/{created['job_id']}"
+
+    # Un worker care cade imediat după lease: shard-ul lui trebuie reatribuit
+    crashed = requests.post(f'{cluster_server}/cluster/lease', json={'worker_id': 'crashed'}, headers=headers)
+    assert crashed.json()['shard'] is not None
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(cluster_server,), kwargs={
+            'worker_id': f'w-{index}', 'token': TOKEN, 'poll_interval': 0.1, 'max_idle': 30
+        })
+        for index in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        # w-0 este oprit brusc după primul shard terminat (poate avea unul închiriat)
+        deadline = time.time() + 60
+        while requests.get(job_url).json()['progress']['done'] == 0:
+            assert time.time() < deadline
+            time.sleep(0.05)
+        workers[0].kill()
+
+        while True:
+            status = requests.get(job_url).json()
+            if 'report' in status:
+                break
+            assert status['state'] != SHARD_FAILED
+            assert time.time() < deadline
+            time.sleep(0.2)
+    finally:
+        for worker in workers:
+            worker.kill()
+            worker.join()
+
+    assert status['progress']['done'] == shards
+    assert 'w-1' in status['workers']
+    assert 'crashed' not in status['workers']
+    assert_same_report(status['report'], files)
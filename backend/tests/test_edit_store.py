@@ -0,0 +1,85 @@
+"""
+Teste pentru SessionEditStore, în memorie și în baza SQLite comună proceselor
+"""
+import multiprocessing
+
+import pytest
+
+from utils.edit_store import SessionEditStore, EditQuotaError
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    def make(**options):
+        path = str(tmp_path / 'edits.sqlite') if request.param == 'sqlite' else None
+        return SessionEditStore(path=path, **options)
+    return make
+
+
+def write_edits(path, namespace, count):
+    store = SessionEditStore(path=path, max_session_files=1000, max_total_bytes=250)
+    for index in range(count):
+        store.set(namespace, f'f{index}.py', 'x' * 10)
+
+
+def test_edits_are_separated_by_session(make_store):
+    store = make_store()
+    store.set('s1', 'a.py', 'unu')
+    store.set('s2', 'a.py', 'doi')
+    assert store.get('s1', 'a.py') == 'unu'
+    assert store.get('s2', 'a.py') == 'doi'
+    assert store.size() == 2 and store.size('s1') == 1
+
+    store.delete('s1', 'a.py')
+    assert store.get('s1', 'a.py') is None
+    store.clear('s2')
+    assert store.stats()['edits'] == 0
+
+
+def test_session_quota_evicts_oldest_edits(make_store):
+    store = make_store(max_session_bytes=30, max_session_files=2)
+    store.set('s1', 'a.py', 'a' * 10)
+    store.set('s1', 'b.py', 'b' * 10)
+    store.get('s1', 'a.py')
+    store.set('s1', 'c.py', 'c' * 10)
+    # Limita de fișiere: b.py este cel mai vechi folosit
+    assert [filename for filename, _ in store.items('s1')] == ['a.py', 'c.py']
+
+    store.set('s1', 'a.py', 'a' * 25)
+    assert [filename for filename, _ in store.items('s1')] == ['a.py']
+    with pytest.raises(EditQuotaError):
+        store.set('s1', 'd.py', 'd' * 31)
+    assert store.stats()['evictions'] == 2
+
+
+def test_global_quota_evicts_across_sessions(make_store):
+    store = make_store(max_session_bytes=100, max_total_bytes=30)
+    store.set('s1', 'a.py', 'a' * 10)
+    store.set('s2', 'a.py', 'b' * 10)
+    store.set('s3', 'a.py', 'c' * 10)
+    store.set('s3', 'b.py', 'd' * 10)
+    assert store.get('s1', 'a.py') is None
+    assert store.stats()['bytes'] == 30
+
+
+def test_idle_sessions_are_evicted(make_store):
+    store = make_store()
+    store.set('s1', 'a.py', 'a')
+    assert store.evict_idle(3600) == 0
+    assert store.evict_idle(-1) == 1
+    assert store.size() == 0
+
+
+def test_sqlite_edits_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'edits.sqlite')
+    store = SessionEditStore(path=path, max_session_files=1000, max_total_bytes=250)
+    processes = [multiprocessing.Process(target=write_edits, args=(path, f's{i}', 10)) for i in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    # Cota globală este impusă pe totalul tuturor proceselor
+    stats = store.stats()
+    assert stats['persistent'] and stats['bytes'] <= 250 and stats['edits'] == 25
+    assert SessionEditStore(path=path).size() == 25
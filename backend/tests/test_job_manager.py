@@ -0,0 +1,88 @@
+"""
+Teste pentru JobManager: coada limitată, anularea cooperativă și starea publicată în baza comună
+"""
+import threading
+import time
+
+import pytest
+
+from utils import job_manager
+from utils.job_manager import JobManager, JobQueueFullError, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from utils.shared_store import SharedStore
+
+
+def wait_for(manager, job_id, states, timeout=10, condition=lambda job: True):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job is not None and job.state in states and condition(job):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'Job-ul {job_id} nu a ajuns în {states}')
+
+
+def loop_until_cancelled(context):
+    for index in range(1000):
+        context.report(current=index)
+        time.sleep(0.01)
+    return 'terminat'
+
+
+def test_result_progress_and_failure():
+    manager = JobManager(workers=1)
+    done = manager.submit('sum', lambda context: context.report(partial=[1], current=1) or 3)
+    failed = manager.submit('fail', lambda context: 1 / 0)
+
+    status = manager.status(wait_for(manager, done.job_id, (JOB_DONE,)))
+    assert status['result'] == 3 and status['progress'] == {'current': 1}
+    assert wait_for(manager, failed.job_id, (JOB_FAILED,)).error == 'division by zero'
+
+
+def test_full_queue_is_rejected():
+    started, release = threading.Event(), threading.Event()
+
+    def block(context):
+        started.set()
+        release.wait(5)
+    manager = JobManager(workers=1, max_queue=1)
+    manager.submit('block', block)
+    started.wait(5)
+    manager.submit('queued', block)
+    with pytest.raises(JobQueueFullError):
+        manager.submit('rejected', block)
+    release.set()
+
+
+def test_cancel_running_and_queued_jobs():
+    manager = JobManager(workers=1)
+    running = manager.submit('loop', loop_until_cancelled)
+    queued = manager.submit('loop', loop_until_cancelled)
+    wait_for(manager, running.job_id, ('running',))
+
+    assert manager.cancel(queued.job_id).state == JOB_CANCELLED
+    manager.cancel(running.job_id)
+    assert wait_for(manager, running.job_id, (JOB_CANCELLED,)).error == 'Job anulat'
+
+
+def test_max_runtime_stops_job():
+    manager = JobManager(workers=1, max_runtime=0.1)
+    job = manager.submit('loop', loop_until_cancelled)
+    assert 'expirat' in wait_for(manager, job.job_id, (JOB_CANCELLED,)).error
+
+
+def test_shared_jobs_are_visible_and_cancellable_from_other_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_manager, 'SHARED_SYNC_INTERVAL', 0.05)
+    path = str(tmp_path / 'shared.sqlite')
+    owner = JobManager(workers=1, shared=SharedStore(path, 'jobs'))
+    other = JobManager(workers=1, shared=SharedStore(path, 'jobs'))
+
+    done = owner.submit('sum', lambda context: {'total': 3})
+    job = wait_for(other, done.job_id, (JOB_DONE,))
+    assert other.status(job)['result'] == {'total': 3}
+
+    running = owner.submit('loop', loop_until_cancelled)
+    # Progresul este publicat periodic în timpul execuției
+    wait_for(other, running.job_id, ('running',), condition=lambda job: job.progress.get('current', 0) > 0)
+    other.cancel(running.job_id)
+    assert wait_for(owner, running.job_id, (JOB_CANCELLED,)).error == 'Job anulat'
+    assert wait_for(other, running.job_id, (JOB_CANCELLED,))
@@ -0,0 +1,74 @@
+"""
+Teste pentru MetricsRegistry: formatul Prometheus și totalurile comune ale workerilor
+"""
+import threading
+import time
+
+from utils import metrics
+from utils.metrics import MetricsRegistry, RETIRED_KEY
+from utils.shared_store import SharedStore
+
+
+def make_registry(shared=None):
+    registry = MetricsRegistry(shared=shared, publish_interval=3600)
+    registry.counter('requests_total', 'Cereri')
+    registry.histogram('latency_seconds', 'Durata', buckets=(0.1, 1.0))
+    return registry
+
+
+def sample(text, line_prefix):
+    values = [line.rsplit(' ', 1)[1] for line in text.splitlines() if line.startswith(line_prefix + ' ')]
+    assert len(values) == 1, line_prefix
+    return float(values[0])
+
+
+def test_counters_and_histograms_across_threads():
+    registry = make_registry()
+
+    def work():
+        for _ in range(100):
+            registry.inc('requests_total', endpoint='/a')
+        registry.observe('latency_seconds', 0.5, endpoint='/a')
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.observe('latency_seconds', 2.0, endpoint='/a')
+
+    text = registry.render()
+    # Valorile thread-urilor terminate sunt păstrate
+    assert sample(text, 'requests_total{endpoint="/a"}') == 400
+    assert sample(text, 'latency_seconds_bucket{endpoint="/a",le="0.1"}') == 0
+    assert sample(text, 'latency_seconds_bucket{endpoint="/a",le="1"}') == 4
+    assert sample(text, 'latency_seconds_bucket{endpoint="/a",le="+Inf"}') == 5
+    assert sample(text, 'latency_seconds_count{endpoint="/a"}') == 5
+    assert '# TYPE latency_seconds histogram' in text
+
+
+def test_label_values_are_escaped():
+    registry = make_registry()
+    registry.inc('requests_total', endpoint='a"b\\c\nd')
+    assert 'requests_total{endpoint="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_workers_are_summed_and_stopped_workers_retired(tmp_path, monkeypatch):
+    path = str(tmp_path / 'metrics.sqlite')
+    one, other = make_registry(SharedStore(path, 'metrics')), make_registry(SharedStore(path, 'metrics'))
+    one.inc('requests_total', 3)
+    other.inc('requests_total', 2)
+    other.publish()
+    assert sample(one.render(), 'requests_total') == 5
+
+    # other nu mai publică: rândul lui este mutat în RETIRED_KEY, iar suma nu scade
+    monkeypatch.setattr(metrics, 'STALE_AFTER', 0.05)
+    time.sleep(0.1)
+    assert sample(one.render(), 'requests_total') == 5
+    assert one.shared.get(RETIRED_KEY) is not None
+    assert sample(one.render(), 'requests_total') == 5
+
+    # Un worker considerat oprit care publică din nou adaugă doar diferența
+    other.inc('requests_total', 1)
+    other.publish()
+    assert sample(one.render(), 'requests_total') == 6
+    assert sample(other.render(), 'requests_total') == 6
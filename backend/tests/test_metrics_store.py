@@ -0,0 +1,69 @@
+"""
+Teste pentru MetricsStore: coloanele per funcție și per fișier și agregatele calculate din ele
+"""
+import pytest
+
+from analyzers.ast_analyzer import ASTAnalyzer
+from analyzers.metrics_store import MetricsStore, compact_file_metrics
+
+SOURCE = '''
+class Documented:
+    """Clasă documentată"""
+
+def simple():
+    return 1
+
+def branching(x):
+    """Documentată"""
+    if x:
+        for i in range(x):
+            if i:
+                x += i
+    return x
+'''
+
+
+@pytest.fixture
+def store():
+    store = MetricsStore()
+    analyzer = ASTAnalyzer()
+    store.add_file('a.py', analyzer.analyze_code(SOURCE, 'a.py'))
+    store.add_compact('b.py', {'file': [10, 8, 2, 0, 0, 1], 'functions': [['f', 1, 3, 0, 0], ['g', 7, 5, 2, 1]]})
+    return store
+
+
+def test_summary(store):
+    summary = store.summary()
+    assert summary['total_files'] == 2
+    assert summary['total_functions'] == 4
+    assert summary['total_classes'] == 1
+    assert summary['complexity_max'] == 7
+    # 2 funcții documentate + 1 clasă documentată din 5 entități
+    assert summary['documentation_coverage'] == 60.0
+
+
+def test_percentiles_and_histogram(store):
+    complexities = sorted(int(value) for value in store.column('complexity'))
+    assert complexities[-1] == 7
+    assert store.percentiles('complexity', (0, 100)) == {'p0': complexities[0], 'p100': 7.0}
+    histogram = store.histogram('complexity', bins=2)
+    assert sum(histogram['counts']) == 4 and len(histogram['edges']) == 3
+    with pytest.raises(ValueError):
+        store.percentiles('complexity', (101,))
+
+
+def test_select_functions_and_count(store):
+    selected = store.select_functions('complexity', minimum=2)
+    assert selected[0] == {'file': 'b.py', 'function': 'g', 'complexity': 7}
+    assert [item['file'] for item in selected] == ['b.py', 'a.py']
+    assert store.count_above('complexity', 1) == 2
+    with pytest.raises(ValueError):
+        store.select_functions('total_lines')
+
+
+def test_compact_metrics_of_invalid_file():
+    compact = compact_file_metrics(ASTAnalyzer().analyze_code('def broken(:\n', 'x.py'))
+    assert compact == {'file': [0, 0, 0, 0, 0, 0], 'functions': []}
+    empty = MetricsStore()
+    assert empty.maximum('complexity') == 0
+    assert empty.percentiles() == {'p50': 0.0, 'p90': 0.0, 'p99': 0.0}
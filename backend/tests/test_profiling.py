@@ -0,0 +1,57 @@
+"""
+Teste pentru profilarea cererilor și ProfileStore (inclusiv lista comună a workerilor)
+"""
+import pytest
+
+from utils.profiling import ActiveProfile, ProfileStore, RequestProfile
+from utils.shared_store import SharedStore
+
+
+def recursive(n):
+    return 0 if n == 0 else 1 + recursive(n - 1)
+
+
+def record(profile_id, mode='cprofile'):
+    active = ActiveProfile(RequestProfile(profile_id=profile_id, mode=mode, method='GET', path='/x'))
+    active.start()
+    recursive(50)
+    return active.stop()
+
+
+@pytest.mark.parametrize('mode', ['cprofile', 'trace'])
+def test_profile_formats(mode):
+    profile = record('p1', mode)
+    assert profile.duration > 0
+    assert 'recursive' in profile.collapsed_text()
+    if mode == 'cprofile':
+        assert 'recursive' in profile.text()
+        assert profile.formats() != ('collapsed',)
+    else:
+        assert profile.formats() == ('collapsed',)
+
+
+def test_store_keeps_latest_profiles():
+    store = ProfileStore(max_profiles=2)
+    for profile_id in ('p1', 'p2', 'p3'):
+        store.put(record(profile_id))
+    assert [summary['profile_id'] for summary in store.iter_summaries()] == ['p3', 'p2']
+    assert 'p1' not in store
+    assert store.discard('p2') and not store.discard('p2')
+    assert store.stats() == {'profiles': 1, 'recorded': 3, 'max_profiles': 2}
+
+
+def test_shared_profiles_are_listed_by_every_worker(tmp_path):
+    path = str(tmp_path / 'shared.sqlite')
+
+    def make():
+        return ProfileStore(max_profiles=2, shared=SharedStore(path, 'profiles'),
+                            shared_summaries=SharedStore(path, 'profile_summaries'))
+    one, other = make(), make()
+    one.put(record('p1'))
+    other.put(record('p2'))
+    one.put(record('p3'))
+
+    assert [summary['profile_id'] for summary in other.iter_summaries()] == ['p3', 'p2']
+    assert other.get('p1').collapsed_text()
+    assert one.discard('p2')
+    assert 'p2' not in other
@@ -0,0 +1,57 @@
+"""
+Teste pentru ProjectStateStore, în memorie și în baza comună a workerilor
+"""
+import multiprocessing
+
+import pytest
+
+from utils.project_state import ProjectStateStore
+from utils.shared_store import SharedStore
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def make_store(request, tmp_path):
+    def make(**options):
+        shared = SharedStore(str(tmp_path / 'shared.sqlite'), 'project_states') if request.param == 'shared' else None
+        return ProjectStateStore(shared=shared, **options)
+    return make
+
+
+def add_secondaries(path, prefix, count):
+    store = ProjectStateStore(shared=SharedStore(path, 'project_states'))
+    for index in range(count):
+        store.update('s1', lambda state: state.add_secondary(f'{prefix}{index}.py'))
+
+
+def test_states_are_separated_by_session(make_store):
+    store = make_store()
+    store.update('s1', lambda state: state.set_principal('main', ['run'], ['App']))
+    store.update('s1', lambda state: state.add_secondary('util.py'))
+    store.update('s1', lambda state: state.add_secondary('util.py'))
+
+    state = store.get('s1')
+    assert state.principal_module == 'main'
+    assert 'run' in state.function_names
+    assert state.entities() == {'functions': ['run'], 'classes': ['App']}
+    assert state.secondary_listing() == 'util.py\n'
+    assert store.get('s2').principal_module == ''
+
+
+def test_idle_states_are_evicted(make_store):
+    store = make_store()
+    store.update('s1', lambda state: state.add_secondary('a.py'))
+    assert store.evict_idle(3600) == 0
+    assert store.evict_idle(-1) == 1
+    assert store.get('s1').secondary_listing() == ''
+
+
+def test_shared_updates_from_processes_are_not_lost(tmp_path):
+    path = str(tmp_path / 'shared.sqlite')
+    processes = [multiprocessing.Process(target=add_secondaries, args=(path, f'p{i}_', 20)) for i in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    state = ProjectStateStore(shared=SharedStore(path, 'project_states')).get('s1')
+    assert len(state.secondary) == 60
@@ -0,0 +1,89 @@
+"""
+Teste pentru indexul de interogare și limbajul de filtre
+"""
+import pytest
+
+from analyzers.ast_analyzer import ASTAnalyzer
+from analyzers.query_index import AnalysisIndex, QueryError, parse_query
+
+SOURCES = {
+    'app.py': '''
+import os
+from flask import Flask
+
+app = Flask(__name__)
+
+@app.route('/')
+def index():
+    """Pagina principală"""
+    return 'ok'
+
+async def fetch(url, timeout):
+    for attempt in range(3):
+        if attempt and timeout:
+            try:
+                return url
+            except OSError:
+                continue
+    return None
+''',
+    'models.py': '''
+from abc import ABC, abstractmethod
+
+class Base(ABC):
+    @abstractmethod
+    def save(self):
+        pass
+
+class User(Base):
+    def save(self):
+        return True
+'''
+}
+
+
+@pytest.fixture(scope='module')
+def index():
+    analyzer = ASTAnalyzer()
+    analyses = {filename: analyzer.analyze_code(code, filename) for filename, code in SOURCES.items()}
+    return AnalysisIndex.build(analyses, {'app.py': ['models.py']})
+
+
+def names(result):
+    return [record['name'] for record in result['results']]
+
+
+def test_parse_query():
+    conditions = parse_query("complexity >= 3 and name ~ 'fe*' and is_async = true")
+    assert [(c.field, c.operator, c.value) for c in conditions] == [
+        ('complexity', '>=', 3), ('name', '~', 'fe*'), ('is_async', '=', True)
+    ]
+    assert parse_query('  ') == []
+    with pytest.raises(QueryError):
+        parse_query('complexity == 3')
+
+
+def test_indexed_and_scanned_conditions(index):
+    assert names(index.query('function', 'is_async = true')) == ['fetch']
+    assert names(index.query('function', 'complexity > 1 and file = app.py')) == ['fetch']
+    assert names(index.query('function', 'decorator = app.route')) == ['index']
+    assert names(index.query('class', 'base = Base')) == ['User']
+    assert names(index.query('function', 'name = save', sort='-line')) == ['save', 'save']
+
+
+def test_relations_and_pagination(index):
+    modules = index.query('module', 'imports = models.py')
+    assert [record['file'] for record in modules['results']] == ['app.py']
+
+    page = index.query('import', '', page=2, page_size=2)
+    assert page['total'] == 3 and page['pages'] == 2
+    assert [record['module'] for record in page['results']] == ['abc']
+
+
+def test_invalid_queries(index):
+    with pytest.raises(QueryError):
+        index.query('variable')
+    with pytest.raises(QueryError):
+        index.query('function', 'bases = X')
+    with pytest.raises(QueryError):
+        index.query('function', sort='size')
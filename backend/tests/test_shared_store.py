@@ -0,0 +1,102 @@
+"""
+Teste pentru SharedStore: tranzacții, combinarea intrărilor vechi și accesul din mai multe procese
+"""
+import multiprocessing
+import time
+
+import pytest
+
+from utils.shared_store import SharedStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStore(str(tmp_path / 'shared.sqlite'), 'entries')
+
+
+def increment(path, times):
+    store = SharedStore(path, 'entries')
+    for _ in range(times):
+        store.update('counter', lambda value: ((value or 0) + 1, None))
+
+
+def test_get_set_delete(store):
+    assert store.get('a') is None
+    store.set('a', {'x': [1, 2]})
+    assert store.get('a') == {'x': [1, 2]}
+    store.delete('a')
+    assert store.get('a') is None
+
+
+def test_rejects_invalid_table_name(tmp_path):
+    with pytest.raises(ValueError):
+        SharedStore(str(tmp_path / 'shared.sqlite'), 'entries; DROP TABLE x')
+
+
+def test_update_returns_result_and_deletes_on_none(store):
+    assert store.update('a', lambda value: ([1], 'created')) == 'created'
+    assert store.update('a', lambda value: (value + [2], len(value))) == 1
+    assert store.get('a') == [1, 2]
+    assert store.update('a', lambda value: (None, 'deleted')) == 'deleted'
+    assert store.get('a') is None
+
+
+def test_update_rolls_back_on_error(store):
+    store.set('a', 1)
+
+    def fail(value):
+        raise RuntimeError('eșec')
+    with pytest.raises(RuntimeError):
+        store.update('a', fail)
+    assert store.get('a') == 1
+    # Conexiunea rămâne utilizabilă după rollback
+    store.update('a', lambda value: (value + 1, None))
+    assert store.get('a') == 2
+
+
+def test_concurrent_updates_from_processes_are_not_lost(store):
+    processes = [multiprocessing.Process(target=increment, args=(store.path, 50)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert store.get('counter') == 200
+
+
+def test_fold_older_than_keeps_excluded_keys(store):
+    store.set('w1', 1)
+    store.set('w2', 2)
+    store.set('own', 4)
+    time.sleep(0.05)
+    store.set('fresh', 8)
+
+    folded = store.fold_older_than(0.01, 'retired', lambda total, value: (total or 0) + value, keep=('own',))
+    assert folded == 2
+    assert store.get('retired') == 3
+    assert store.get('w1') is None and store.get('w2') is None
+    assert store.get('own') == 4 and store.get('fresh') == 8
+
+    # Rândul combinat nu este combinat cu el însuși
+    time.sleep(0.05)
+    store.fold_older_than(0.01, 'retired', lambda total, value: (total or 0) + value, keep=('own', 'fresh'))
+    assert store.get('retired') == 3
+
+
+def test_prefix_items_and_delete(store):
+    for key in ('u1:a', 'u1:b', 'u10:a', 'u2:a'):
+        store.set(key, key)
+    assert [key for key, _ in store.items('u1:')] == ['u1:a', 'u1:b']
+    assert store.delete_prefix('u1:') == 2
+    assert sorted(key for key, _ in store.items()) == ['u10:a', 'u2:a']
+
+
+def test_trim_and_evict(store):
+    for index in range(5):
+        store.set(f'k{index}', index)
+        time.sleep(0.01)
+    assert store.trim(3) == 2
+    assert store.get('k0') is None and store.get('k4') == 4
+    time.sleep(0.05)
+    store.touch('k2')
+    assert store.evict_older_than(0.04) == 2
+    assert [key for key, _ in store.items()] == ['k2']
@@ -0,0 +1,105 @@
+"""
+Teste pentru snapshot-urile analizei: cheile entităților, diferențe și SnapshotStore
+"""
+import pytest
+
+from analyzers.ast_analyzer import ASTAnalyzer
+from analyzers.snapshot_diff import SnapshotStore, build_snapshot, diff_snapshots, find_cycles
+from utils.shared_store import SharedStore
+
+ACCESSORS = '''
+from typing import overload
+
+class Config:
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, new):
+        self._value = new
+
+@overload
+def parse(x: int) -> int: ...
+@overload
+def parse(x: str) -> str: ...
+def parse(x):
+    return x
+
+if True:
+    def helper():
+        return 1
+else:
+    def helper():
+        return 2
+'''
+
+
+def snapshot(sources, dependencies=None, project_key='p'):
+    analyzer = ASTAnalyzer()
+    analyses = {path: analyzer.analyze_code(code, path.rsplit('/', 1)[-1]) for path, code in sources.items()}
+    return build_snapshot(project_key, analyses, dependencies or {})
+
+
+def test_entity_keys_separate_paths_and_variants():
+    functions = snapshot({
+        'pkg/a/__init__.py': 'def setup():\n    return 1\n',
+        'pkg/b/__init__.py': 'def setup():\n    return 2\n',
+        'pkg/config.py': ACCESSORS
+    }).functions
+
+    assert {'pkg/a/__init__.py:setup', 'pkg/b/__init__.py:setup'} <= set(functions)
+    assert {'pkg/config.py:Config.value', 'pkg/config.py:Config.value@setter'} <= set(functions)
+    assert {'pkg/config.py:parse@overload', 'pkg/config.py:parse@overload#2', 'pkg/config.py:parse'} <= set(functions)
+    assert {'pkg/config.py:helper', 'pkg/config.py:helper#2'} <= set(functions)
+
+
+def test_diff_reports_modified_renamed_and_cycles():
+    base = snapshot({
+        'a.py': 'def keep():\n    return 1\n\ndef old_name(x):\n    return x * 2\n',
+        'b.py': 'def change(x):\n    return x\n'
+    }, {'a.py': ['b.py']})
+    target = snapshot({
+        'a.py': 'def keep():\n    return 1\n\ndef new_name(x):\n    return x * 2\n',
+        'b.py': 'def change(x):\n    if x:\n        return x\n    return 0\n'
+    }, {'a.py': ['b.py'], 'b.py': ['a.py']})
+
+    delta = diff_snapshots(base, target)
+    assert delta['functions']['renamed'] == [{'from': 'a.py:old_name', 'to': 'a.py:new_name'}]
+    assert delta['functions']['added'] == [] and delta['functions']['removed'] == []
+    assert [item['function'] for item in delta['functions']['modified']] == ['b.py:change']
+    assert delta['summary']['complexity_delta'] == 1
+    assert delta['cycles']['introduced'] == [('a.py', 'b.py')]
+    assert delta['edges']['added'] == [('b.py', 'a.py')]
+
+
+def test_find_cycles():
+    edges = {('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd'), ('e', 'e')}
+    assert find_cycles(edges) == {('a', 'b', 'c'), ('e',)}
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def stores(request, tmp_path):
+    if request.param == 'memory':
+        store = SnapshotStore(max_per_project=2)
+        return store, store
+    path = str(tmp_path / 'shared.sqlite')
+    return (SnapshotStore(max_per_project=2, shared=SharedStore(path, 'snapshots')),
+            SnapshotStore(max_per_project=2, shared=SharedStore(path, 'snapshots')))
+
+
+def test_snapshot_store_keeps_latest_per_project(stores):
+    one, other = stores
+    first = snapshot({'a.py': 'x = 1\n\ndef f():\n    return 1\n'})
+    second = snapshot({'a.py': 'def f():\n    return 2\n'})
+    third = snapshot({'a.py': 'def f():\n    return 3\n'})
+
+    assert one.add(first)
+    # Reanaliza fără modificări nu adaugă un snapshot nou
+    assert not other.add(snapshot({'a.py': 'x = 1\n\ndef f():\n    return 1\n'}))
+    assert other.add(second) and one.add(third)
+
+    assert [s.snapshot_id for s in other.list('p')] == [second.snapshot_id, third.snapshot_id]
+    assert one.get('p', first.snapshot_id) is None
+    assert other.get('p', third.snapshot_id).functions == third.functions
+    assert one.list('altul') == []
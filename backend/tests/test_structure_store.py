@@ -0,0 +1,79 @@
+"""
+Teste pentru StructureStore: buget de bytes, TTL, date derivate și baza comună a workerilor
+"""
+import time
+
+import pytest
+
+from utils.shared_store import SharedStore
+from utils.structure_store import StructureStore, StructureTooLargeError, FILE_OVERHEAD_BYTES
+
+
+def files_of(size, count=1):
+    return [{'name': f'f{i}.py', 'path': f'f{i}.py', 'type': 'python', 'content': 'x' * size} for i in range(count)]
+
+
+STRUCTURE = {'name': 'p', 'files': [{'name': 'f0.py', 'content': 'nu se păstrează'}], 'children': {}}
+
+
+def test_put_get_strips_tree_contents():
+    store = StructureStore()
+    entry = store.put('s1', STRUCTURE, files_of(10), 'project')
+    assert entry.size == 10 + FILE_OVERHEAD_BYTES
+    assert 'content' not in store.get('s1').structure['files'][0]
+    assert store.get('s1').files[0]['content'] == 'x' * 10
+    assert store.get('missing') is None
+    assert store.stats()['hits'] == 2 and store.stats()['misses'] == 1
+
+
+def test_byte_budget_evicts_least_recently_used():
+    unit = 100 + FILE_OVERHEAD_BYTES
+    store = StructureStore(max_bytes=3 * unit)
+    for structure_id in ('a', 'b', 'c'):
+        store.put(structure_id, STRUCTURE, files_of(100), 'project')
+    store.get('a')
+    store.put('d', STRUCTURE, files_of(100), 'project')
+
+    assert 'b' not in store
+    assert all(structure_id in store for structure_id in ('a', 'c', 'd'))
+    assert store.stats()['evictions']['bytes'] == 1
+    with pytest.raises(StructureTooLargeError):
+        store.put('e', STRUCTURE, files_of(4 * unit), 'project')
+
+
+def test_ttl_expires_unused_entries():
+    store = StructureStore(ttl_seconds=0.05)
+    store.put('a', STRUCTURE, files_of(10), 'project')
+    time.sleep(0.1)
+    assert store.get('a') is None
+    assert store.stats()['entries'] == 0
+
+
+def test_extras_count_towards_budget():
+    unit = 100 + FILE_OVERHEAD_BYTES
+    store = StructureStore(max_bytes=2 * unit)
+    store.put('a', STRUCTURE, files_of(100), 'project')
+    store.put('b', STRUCTURE, files_of(100), 'project')
+
+    store.set_extra('b', 'index', {'built': True}, size=50)
+    assert store.get_extra('b', 'index') == {'built': True}
+    assert 'a' not in store
+
+    # Datele derivate mai mari decât bugetul nu sunt păstrate
+    store.set_extra('b', 'metrics', [1, 2, 3], size=10 * unit)
+    assert store.get_extra('b', 'metrics') is None
+    assert store.stats()['bytes'] == unit + 50
+
+
+def test_shared_structures_are_visible_to_other_workers(tmp_path):
+    path = str(tmp_path / 'shared.sqlite')
+    one = StructureStore(shared=SharedStore(path, 'structures'))
+    other = StructureStore(shared=SharedStore(path, 'structures'))
+
+    one.put('s1', STRUCTURE, files_of(10), 'project')
+    assert 's1' in other
+    entry = other.get('s1')
+    assert entry.files == files_of(10) and entry.project_key == 'project'
+
+    other.discard('s1')
+    assert StructureStore(shared=SharedStore(path, 'structures')).get('s1') is None
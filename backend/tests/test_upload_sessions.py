@@ -0,0 +1,138 @@
+"""
+Teste pentru UploadSessionStore, în memorie și în baza comună (chunk-uri trimise la workeri diferiți)
+"""
+import itertools
+import time
+
+import pytest
+
+from utils.shared_store import SharedStore
+from utils.upload_sessions import UploadSessionStore, UploadChunkError, chunk_checksum
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def stores(request, tmp_path):
+    """Store-urile a doi workeri; în memorie este același store"""
+    def make(**options):
+        if request.param == 'memory':
+            store = UploadSessionStore(**options)
+            return itertools.cycle([store])
+        path = str(tmp_path / 'shared.sqlite')
+        return itertools.cycle([
+            UploadSessionStore(shared=SharedStore(path, 'upload_sessions'),
+                               shared_chunks=SharedStore(path, 'upload_chunks'), **options)
+            for _ in range(2)
+        ])
+    return make
+
+
+def chunk(index):
+    files = [{'name': f'f{index}_{i}.py', 'path': f'p/f{index}_{i}.py', 'content': f'x = {index}'} for i in range(2)]
+    return files, chunk_checksum(repr(files)), 100
+
+
+def test_chunks_are_accepted_in_order_and_resends_ignored(stores):
+    workers = stores()
+    upload = next(workers).open('root', structure={'name': 'root', 'files': [], 'children': {}})
+
+    for index in range(3):
+        files, checksum, size = chunk(index)
+        current = next(workers).get(upload.upload_id)
+        assert next(workers).append(current, index, checksum, files, size)
+    files, checksum, size = chunk(1)
+    assert not next(workers).append(next(workers).get(upload.upload_id), 1, checksum, files, size)
+
+    current = next(workers).get(upload.upload_id)
+    assert current.next_chunk == 3
+    assert current.files_received == 6
+    assert current.bytes_received == 300
+
+
+def test_rejected_chunks_report_next_chunk(stores):
+    workers = stores(max_session_bytes=250)
+    store = next(workers)
+    upload = store.open()
+    files, checksum, size = chunk(0)
+    store.append(upload, 0, checksum, files, size)
+
+    with pytest.raises(UploadChunkError) as error:
+        store.append(upload, 2, chunk(2)[1], files, size)
+    assert error.value.status == 409 and error.value.next_chunk == 1
+    with pytest.raises(UploadChunkError) as error:
+        store.append(upload, 0, 'other', files, size)
+    assert error.value.status == 409
+    store.append(upload, 1, chunk(1)[1], files, size)
+    with pytest.raises(UploadChunkError) as error:
+        store.append(upload, 2, chunk(2)[1], files, size)
+    assert error.value.status == 413
+
+
+def test_commit_copies_files_and_blocks_new_chunks(stores):
+    workers = stores()
+    structure = {'name': 'root', 'files': [], 'children': {}}
+    upload = next(workers).open('root', structure=structure)
+    expected = []
+    for index in range(3):
+        files, checksum, size = chunk(index)
+        next(workers).append(next(workers).get(upload.upload_id), index, checksum, files, size)
+        expected.extend(files)
+
+    store = next(workers)
+    current = store.get(upload.upload_id)
+    with pytest.raises(UploadChunkError):
+        store.begin_commit(current, expected_chunks=4)
+    assert store.begin_commit(current, expected_chunks=3) == expected
+    assert current.structure == structure
+
+    # Un alt worker vede commit-ul în curs
+    other = next(workers)
+    with pytest.raises(UploadChunkError):
+        other.begin_commit(other.get(upload.upload_id))
+    with pytest.raises(UploadChunkError):
+        other.append(other.get(upload.upload_id), 3, chunk(3)[1], [], 10)
+
+    store.abort_commit(current)
+    assert other.begin_commit(other.get(upload.upload_id)) == expected
+    other.commit(other.get(upload.upload_id), {'structure_id': 's1'})
+    committed = store.get(upload.upload_id)
+    assert committed.committed and committed.result == {'structure_id': 's1'}
+
+
+def test_single_analysis_job_per_upload(stores):
+    workers = stores()
+    upload = next(workers).open()
+    sources = [(f'k{i}', f'h{i}', f'f{i}.py') for i in range(5)]
+
+    assert next(workers).queue_analysis(upload, sources[:3])
+    # Job-ul rulează deja: chunk-urile următoare doar adaugă în coadă
+    assert not next(workers).queue_analysis(upload, sources[3:])
+
+    store = next(workers)
+    assert store.next_analysis_batch(upload, limit=4) == sources[:4]
+    assert store.next_analysis_batch(upload, analyzed=4, limit=4) == sources[4:]
+    assert store.next_analysis_batch(upload, analyzed=1) == []
+    current = next(workers).get(upload.upload_id)
+    assert not current.analysis_active and current.analyzed_files == 5
+
+    assert next(workers).queue_analysis(upload, sources[:1])
+    # Un job oprit cu eroare lasă fișierele în coadă pentru următorul chunk
+    next(workers).stop_analysis(upload)
+    assert next(workers).queue_analysis(upload, [])
+
+
+def test_discarded_and_expired_uploads(stores):
+    workers = stores(ttl_seconds=0.05)
+    store = next(workers)
+    upload = store.open()
+    assert next(workers).discard(upload.upload_id)
+    assert store.get(upload.upload_id) is None
+    with pytest.raises(UploadChunkError) as error:
+        store.append(upload, 0, chunk(0)[1], [], 10)
+    assert error.value.status == 404
+    assert store.next_analysis_batch(upload) == []
+
+    stale = store.open()
+    time.sleep(0.1)
+    assert next(workers).evict_expired() == 1
+    assert store.get(stale.upload_id) is None
+    assert store.stats()['sessions'] == 0
@@ -10,7 +10,66 @@ from .file_utils import (
     is_python_file,
     get_file_size_formatted,
     scan_directory,
-    create_directory_structure
+    create_directory_structure,
+    build_structure_tree
+)
+from .archive_utils import (
+    iter_archive_members,
+    is_supported_archive,
+    ArchiveLimits,
+    ArchiveLimitError
+)
+from .blob_store import (
+    BlobStore,
+    MissingBlobError,
+    blob_digest
+)
+from .serialization import (
+    dumps,
+    packb,
+    to_builtin,
+    negotiate_mimetype
+)
+from .compression import (
+    choose_encoding,
+    compress_body,
+    strong_etag,
+    etag_matches,
+    matching_etag
+)
+from .edit_store import (
+    SessionEditStore,
+    EditQuotaError
+)
+from .job_manager import (
+    JobManager,
+    JobContext,
+    JobCancelled,
+    JobQueueFullError
+)
+from .metrics import (
+    MetricsRegistry,
+    process_memory
+)
+from .profiling import (
+    ProfileStore,
+    RequestProfile,
+    StackTracer
+)
+from .project_state import (
+    ProjectState,
+    ProjectStateStore
+)
+from .shared_store import SharedStore
+from .structure_store import (
+    StructureStore,
+    StructureTooLargeError
+)
+from .upload_sessions import (
+    UploadSession,
+    UploadSessionStore,
+    UploadChunkError,
+    chunk_checksum
 )
 
 __all__ = [
@@ -20,7 +79,44 @@ __all__ = [
     'is_python_file',
     'get_file_size_formatted',
     'scan_directory',
-    'create_directory_structure'
+    'create_directory_structure',
+    'build_structure_tree',
+    'iter_archive_members',
+    'is_supported_archive',
+    'ArchiveLimits',
+    'ArchiveLimitError',
+    'BlobStore',
+    'MissingBlobError',
+    'blob_digest',
+    'dumps',
+    'packb',
+    'to_builtin',
+    'negotiate_mimetype',
+    'choose_encoding',
+    'compress_body',
+    'strong_etag',
+    'etag_matches',
+    'matching_etag',
+    'SessionEditStore',
+    'EditQuotaError',
+    'JobManager',
+    'JobContext',
+    'JobCancelled',
+    'JobQueueFullError',
+    'MetricsRegistry',
+    'process_memory',
+    'ProfileStore',
+    'RequestProfile',
+    'StackTracer',
+    'ProjectState',
+    'ProjectStateStore',
+    'SharedStore',
+    'StructureStore',
+    'StructureTooLargeError',
+    'UploadSession',
+    'UploadSessionStore',
+    'UploadChunkError',
+    'chunk_checksum'
 ]
 
 # Versiune pachet
@@ -0,0 +1,193 @@
+"""
+Citire în flux a arhivelor zip și tar
+Python Forensics - Archive Utils
+"""
+import io
+import posixpath
+import tarfile
+import tokenize
+import zipfile
+from dataclasses import dataclass
+from typing import Iterator, Tuple, BinaryIO
+
+
+# Extensiile considerate cod Python în arhive
+PYTHON_LIKE_EXTENSIONS = ('.py', '.pyw', '.pyi')
+
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# Dimensiunea blocurilor citite din membrii arhivei
+READ_CHUNK_SIZE = 64 * 1024
+
+# Sub acest volum raportul de compresie nu este verificat (fișiere mici, foarte compresibile)
+RATIO_CHECK_MIN_BYTES = 1024 * 1024
+
+
+class ArchiveLimitError(ValueError):
+    """Arhiva depășește limitele de siguranță (posibil zip bomb)"""
+
+
+@dataclass
+class ArchiveLimits:
+    """Limite de siguranță pentru procesarea unei arhive"""
+    max_member_size: int = 10 * 1024 * 1024
+    max_total_size: int = 512 * 1024 * 1024
+    max_ratio: float = 100.0
+    max_members: int = 100000
+
+
+def is_supported_archive(filename: str) -> bool:
+    """Verifică dacă numele fișierului corespunde unei arhive suportate"""
+    lower = filename.lower()
+    return lower.endswith('.zip') or lower.endswith(TAR_SUFFIXES)
+
+
+def is_python_member(path: str) -> bool:
+    """Verifică dacă un membru al arhivei este cod Python"""
+    return path.lower().endswith(PYTHON_LIKE_EXTENSIONS)
+
+
+def decode_source(data: bytes) -> str:
+    """Decodează codul sursă respectând declarația de encoding (PEP 263)"""
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError:
+        encoding = 'utf-8'
+    return data.decode(encoding, errors='replace')
+
+
+def iter_archive_members(stream: BinaryIO, filename: str,
+                         limits: ArchiveLimits = None) -> Iterator[Tuple[str, int, str]]:
+    """
+    Iterează membrii Python ai unei arhive, fără extragere pe disc
+
+    Args:
+        stream: Fluxul binar al arhivei (zip necesită un flux seekable)
+        filename: Numele arhivei, folosit pentru a determina formatul
+        limits: Limite împotriva arhivelor malițioase
+
+    Returns:
+        Generator de (cale, mărime, conținut); un singur membru este în memorie la un moment dat
+
+    Raises:
+        ArchiveLimitError: la depășirea unei limite
+        ValueError: pentru formate nesuportate
+    """
+    limits = limits or ArchiveLimits()
+    lower = filename.lower()
+
+    if lower.endswith('.zip'):
+        return _iter_zip_members(stream, limits)
+    if lower.endswith(TAR_SUFFIXES):
+        return _iter_tar_members(stream, limits)
+    raise ValueError(f'Format de arhivă nesuportat: {filename}')
+
+
+def _normalize_member_path(name: str) -> str:
+    """Normalizează calea unui membru (fără '/' inițial sau componente '..')"""
+    path = posixpath.normpath(name.replace('\\', '/')).lstrip('/')
+    parts = [p for p in path.split('/') if p not in ('', '.', '..')]
+    return '/'.join(parts)
+
+
+def _read_limited(member_stream: BinaryIO, limit: int, path: str) -> bytes:
+    """Citește un membru în blocuri, verificând dimensiunea reală, nu cea declarată"""
+    chunks = []
+    size = 0
+    while True:
+        chunk = member_stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > limit:
+            raise ArchiveLimitError(f'Membrul {path} depășește limita de {limit} bytes')
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def _iter_zip_members(stream: BinaryIO, limits: ArchiveLimits) -> Iterator[Tuple[str, int, str]]:
+    """Iterează membrii Python ai unei arhive zip"""
+    with zipfile.ZipFile(stream) as archive:
+        infos = archive.infolist()
+        if len(infos) > limits.max_members:
+            raise ArchiveLimitError(f'Arhiva conține prea mulți membri ({len(infos)})')
+
+        total_size = 0
+        for info in infos:
+            if info.is_dir() or not is_python_member(info.filename):
+                continue
+
+            path = _normalize_member_path(info.filename)
+            if not path:
+                continue
+
+            # Verificări pe baza antetului, înainte de decompresie
+            if info.file_size > limits.max_member_size:
+                raise ArchiveLimitError(f'Membrul {path} depășește limita de {limits.max_member_size} bytes')
+            if info.compress_size and info.file_size / info.compress_size > limits.max_ratio:
+                raise ArchiveLimitError(f'Raport de compresie suspect pentru {path}')
+
+            remaining = limits.max_total_size - total_size
+            with archive.open(info) as member_stream:
+                data = _read_limited(member_stream, min(limits.max_member_size, remaining), path)
+
+            total_size += len(data)
+            yield path, len(data), decode_source(data)
+
+
+class _CountingReader(io.RawIOBase):
+    """Flux care numără bytes comprimați consumați din arhivă"""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        return size
+
+
+def _iter_tar_members(stream: BinaryIO, limits: ArchiveLimits) -> Iterator[Tuple[str, int, str]]:
+    """Iterează membrii Python ai unei arhive tar (eventual comprimate), strict secvențial"""
+    counter = _CountingReader(stream)
+    members = 0
+    total_size = 0
+
+    # 'r|*' citește secvențial, fără seek, cu detecție automată a compresiei
+    with tarfile.open(fileobj=counter, mode='r|*') as archive:
+        for member in archive:
+            members += 1
+            if members > limits.max_members:
+                raise ArchiveLimitError(f'Arhiva conține prea mulți membri (> {limits.max_members})')
+
+            # Fluxul decomprimat include și membrii ignorați
+            if archive.offset > limits.max_total_size:
+                raise ArchiveLimitError('Arhiva depășește dimensiunea totală permisă')
+            if (archive.offset > RATIO_CHECK_MIN_BYTES and counter.bytes_read and
+                    archive.offset / counter.bytes_read > limits.max_ratio):
+                raise ArchiveLimitError('Raport de compresie suspect pentru arhivă')
+
+            if not member.isfile() or not is_python_member(member.name):
+                continue
+
+            path = _normalize_member_path(member.name)
+            if not path:
+                continue
+
+            if member.size > limits.max_member_size:
+                raise ArchiveLimitError(f'Membrul {path} depășește limita de {limits.max_member_size} bytes')
+
+            member_stream = archive.extractfile(member)
+            if member_stream is None:
+                continue
+
+            remaining = limits.max_total_size - total_size
+            data = _read_limited(member_stream, min(limits.max_member_size, remaining), path)
+            total_size += len(data)
+            yield path, len(data), decode_source(data)
@@ -0,0 +1,274 @@
+"""
+Stocare adresată după conținut a fișierelor încărcate
+Python Forensics - Blob Store
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+_DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Indexul comun al blob-urilor din modul director
+INDEX_FILENAME = 'index.sqlite'
+
+# Cât de des (secunde) un proces actualizează ultima folosire a unui blob citit
+TOUCH_INTERVAL = 60
+
+
+def blob_digest(content: str) -> str:
+    """SHA-256 al conținutului codificat UTF-8 (același hash pe care îl calculează clientul)"""
+    return hashlib.sha256(content.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+
+def is_valid_digest(digest: str) -> bool:
+    return isinstance(digest, str) and bool(_DIGEST_PATTERN.match(digest))
+
+
+class MissingBlobError(Exception):
+    """Fișiere referite doar prin hash al căror conținut nu (mai) este în store; missing: cale -> hash"""
+
+    def __init__(self, missing: Dict[str, str]):
+        self.missing = missing
+        paths = sorted(missing)
+        listed = ', '.join(paths[:10]) + (f' și încă {len(paths) - 10}' if len(paths) > 10 else '')
+        super().__init__(f'Conținutul nu mai este disponibil pentru: {listed}')
+
+    @property
+    def digests(self) -> List[str]:
+        return sorted(set(self.missing.values()))
+
+
+class BlobStore:
+    """Conținutul fișierelor după SHA-256, partajat între sesiuni și proiecte
+
+    Un fișier identic este păstrat o singură dată, indiferent câte structuri îl
+    folosesc. Conținutul stă în memorie sau, cu path setat, într-un director
+    (câte un fișier per blob); în ambele cazuri bugetul max_bytes este impus
+    prin evacuarea blob-urilor cel mai puțin folosite.
+
+    Directorul poate fi partajat de mai multe procese. Indexul (dimensiune și
+    ultima folosire per blob) stă atunci într-o bază SQLite din director, comună
+    tuturor: bugetul este impus pe totalul blob-urilor, iar evacuarea alege
+    blob-ul cel mai vechi folosit de oricare proces. Existența fișierului este
+    verificată la fiecare interogare, deci un blob șters de alt proces nu este
+    raportat ca prezent.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = path or None
+        self.lock = threading.Lock()
+        self.evictions = 0
+        # Mod memorie: digest -> dimensiune, în ordinea ultimei folosiri
+        self.index: 'OrderedDict[str, int]' = OrderedDict()
+        self.total_bytes = 0
+        self.contents: Optional[Dict[str, str]] = None
+        # Mod director: conexiunile SQLite per thread și ultima actualizare a folosirii per blob
+        self.local = threading.local()
+        self.touched: Dict[str, float] = {}
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            connection = self._connection()
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER NOT NULL, used REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS blobs_used ON blobs (used)')
+            self._load_index()
+        else:
+            self.contents = {}
+
+    def missing(self, digests: Iterable[str]) -> List[str]:
+        """Hash-urile (valide) pe care store-ul nu le are, fără duplicate"""
+        result = []
+        seen = set()
+        for digest in digests:
+            if digest in seen or not is_valid_digest(digest):
+                continue
+            seen.add(digest)
+            if digest not in self:
+                result.append(digest)
+        return result
+
+    def __contains__(self, digest: str) -> bool:
+        if self.path is None:
+            with self.lock:
+                return digest in self.index
+        return is_valid_digest(digest) and os.path.exists(self._blob_path(digest))
+
+    def put(self, content: str, expected_digest: Optional[str] = None) -> str:
+        """
+        Salvează conținutul și returnează hash-ul lui
+
+        Raises:
+            ValueError: dacă hash-ul calculat diferă de expected_digest sau blob-ul depășește bugetul
+        """
+        digest = blob_digest(content)
+        if expected_digest is not None and digest != expected_digest:
+            raise ValueError(f'Hash diferit: așteptat {expected_digest}, calculat {digest}')
+
+        data = content.encode('utf-8', errors='surrogatepass')
+        if len(data) > self.max_bytes:
+            raise ValueError('Blob-ul depășește capacitatea store-ului')
+
+        if self.path is not None:
+            self._put_file(digest, data)
+            return digest
+
+        with self.lock:
+            if digest in self.index:
+                self.index.move_to_end(digest)
+                return digest
+
+            self.contents[digest] = content
+            self.index[digest] = len(data)
+            self.total_bytes += len(data)
+
+            while self.total_bytes > self.max_bytes and len(self.index) > 1:
+                self._remove(next(iter(self.index)))
+                self.evictions += 1
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        if self.path is None:
+            with self.lock:
+                if digest not in self.index:
+                    return None
+                self.index.move_to_end(digest)
+                return self.contents[digest]
+
+        if not is_valid_digest(digest):
+            return None
+        try:
+            with open(self._blob_path(digest), 'rb') as f:
+                content = f.read().decode('utf-8', errors='surrogatepass')
+        except OSError:
+            # Evacuat sau șters de alt proces
+            self._forget(digest)
+            return None
+        self._touch(digest, len(content))
+        return content
+
+    def stats(self) -> Dict[str, int]:
+        if self.path is None:
+            with self.lock:
+                blobs, total = len(self.index), self.total_bytes
+        else:
+            blobs, total = self._connection().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+        return {
+            'blobs': blobs,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+            'persistent': self.path is not None
+        }
+
+    def _remove(self, digest: str):
+        self.total_bytes -= self.index.pop(digest)
+        del self.contents[digest]
+
+    def _put_file(self, digest: str, data: bytes):
+        """Scrie blob-ul (dacă fișierul lipsește) și impune bugetul comun, într-o singură tranzacție"""
+        blob_path = self._blob_path(digest)
+        connection = self._connection()
+        # BEGIN IMMEDIATE serializează scrierile și evacuările tuturor proceselor
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if not os.path.exists(blob_path):
+                self._write_file(digest, data)
+            connection.execute(
+                'INSERT OR REPLACE INTO blobs (digest, size, used) VALUES (?, ?, ?)', (digest, len(data), time.time())
+            )
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+            evicted = []
+            if total > self.max_bytes:
+                for old_digest, size in connection.execute(
+                    'SELECT digest, size FROM blobs WHERE digest != ? ORDER BY used', (digest,)
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append(old_digest)
+                    total -= size
+            for old_digest in evicted:
+                connection.execute('DELETE FROM blobs WHERE digest = ?', (old_digest,))
+                try:
+                    os.remove(self._blob_path(old_digest))
+                except OSError:
+                    pass
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        with self.lock:
+            self.touched[digest] = time.time()
+            self.evictions += len(evicted)
+            for old_digest in evicted:
+                self.touched.pop(old_digest, None)
+
+    def _touch(self, digest: str, size: int):
+        """Actualizează ultima folosire în indexul comun (cel mult o dată la TOUCH_INTERVAL per proces)"""
+        now = time.time()
+        with self.lock:
+            if now - self.touched.get(digest, 0) < TOUCH_INTERVAL:
+                return
+            self.touched[digest] = now
+        # Un blob scris direct în director (fără rând) este preluat în index
+        self._connection().execute(
+            'INSERT INTO blobs (digest, size, used) VALUES (?, ?, ?) '
+            'ON CONFLICT(digest) DO UPDATE SET used = excluded.used', (digest, size, now)
+        )
+
+    def _forget(self, digest: str):
+        with self.lock:
+            self.touched.pop(digest, None)
+        self._connection().execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], digest)
+
+    def _write_file(self, digest: str, data: bytes):
+        directory = os.path.join(self.path, digest[:2])
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, self._blob_path(digest))
+
+    def _load_index(self):
+        """Adaugă în index blob-urile din director fără rând (după mtime) și uită rândurile fără fișier"""
+        connection = self._connection()
+        indexed = {digest for (digest,) in connection.execute('SELECT digest FROM blobs')}
+        found = []
+        for shard in os.listdir(self.path):
+            shard_path = os.path.join(self.path, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for name in os.listdir(shard_path):
+                if is_valid_digest(name):
+                    indexed.discard(name)
+                    stat = os.stat(os.path.join(shard_path, name))
+                    found.append((name, stat.st_size, stat.st_mtime))
+        connection.execute('BEGIN IMMEDIATE')
+        connection.executemany('INSERT OR IGNORE INTO blobs (digest, size, used) VALUES (?, ?, ?)', found)
+        connection.executemany('DELETE FROM blobs WHERE digest = ?', [(digest,) for digest in indexed])
+        connection.execute('COMMIT')
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexiunea thread-ului curent la indexul comun; redeschisă după fork"""
+        pid = os.getpid()
+        if getattr(self.local, 'pid', None) != pid:
+            # Autocommit: tranzacțiile de scriere sunt deschise explicit (BEGIN IMMEDIATE)
+            connection = sqlite3.connect(
+                os.path.join(self.path, INDEX_FILENAME), timeout=30, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+            self.local.pid = pid
+        return self.local.connection
@@ -0,0 +1,100 @@
+"""
+Compresia răspunsurilor și ETag-uri pentru cereri condiționale
+Python Forensics - HTTP Compression Utils
+"""
+import gzip
+import hashlib
+from typing import Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Tipuri de conținut care merită comprimate (msgpack și fișierele binare nu câștigă mare lucru)
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/xml',
+    'text/'
+)
+
+# Sufixul adăugat ETag-ului pentru fiecare codificare (reprezentări diferite, ETag-uri diferite)
+ENCODING_SUFFIXES = {'br': '-br', 'gzip': '-gzip'}
+
+
+def brotli_available() -> bool:
+    return brotli is not None
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and any(mimetype.startswith(prefix) for prefix in COMPRESSIBLE_MIMETYPES)
+
+
+def choose_encoding(accepted: Iterable[Tuple[str, float]]) -> Optional[str]:
+    """
+    Codificarea preferată dintre cele acceptate de client, ca perechi (valoare, q)
+
+    Codificările cu q=0 sunt refuzate explicit; dintre celelalte câștigă q-ul
+    cel mai mare, iar la egalitate br (dacă există brotli), apoi gzip. '*'
+    acoperă codificările nenumite explicit.
+    """
+    qualities = {}
+    for value, quality in accepted:
+        qualities[value.lower()] = max(quality, qualities.get(value.lower(), 0))
+    wildcard = qualities.get('*', 0)
+
+    best, best_quality = None, 0
+    for encoding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(data: bytes, encoding: str, level: int = 6) -> bytes:
+    """Comprimă corpul răspunsului (level: 1-9 pentru gzip; brotli folosește aceeași scară)"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(11, max(0, level)))
+    return gzip.compress(data, compresslevel=min(9, max(1, level)), mtime=0)
+
+
+def strong_etag(*parts: str) -> str:
+    """ETag puternic (fără ghilimele) derivat din părțile date, ex. versiunea analizorului și hash-ul conținutului"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8', errors='surrogatepass'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Verifică antetul If-None-Match față de ETag-ul necomprimat
+
+    ETag-urile trimise de client pot avea sufixul codificării (ex. "abc-gzip"),
+    deoarece răspunsul a fost comprimat după calculul ETag-ului.
+    """
+    return matching_etag(if_none_match, etag) is not None
+
+
+def matching_etag(if_none_match: str, etag: str) -> Optional[str]:
+    """ETag-ul din If-None-Match (fără W/ și ghilimele, cu sufixul codificării) care corespunde, sau None"""
+    if not if_none_match:
+        return None
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return etag
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        base = candidate
+        for suffix in ENCODING_SUFFIXES.values():
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+                break
+        if base == etag:
+            return candidate
+    return None
@@ -0,0 +1,295 @@
+"""
+Editările din sesiune, separate pe sesiuni și limitate în bytes
+Python Forensics - Session Edit Store
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class EditQuotaError(ValueError):
+    """Editarea depășește singură cota unei sesiuni"""
+
+
+class SessionEditStore:
+    """Editări per sesiune cu cote de bytes per sesiune și globale, evacuare LRU
+
+    Fără path, indexul (namespace, fișier) -> dimensiune și conținutul stau în
+    memorie, iar indexul păstrează ordinea LRU globală. Cu path, totul stă
+    într-o bază SQLite (mod WAL): editările supraviețuiesc repornirii, nu ocupă
+    RAM și sunt comune tuturor proceselor care deschid aceeași bază. Cotele și
+    evacuarea se aplică atunci într-o tranzacție (BEGIN IMMEDIATE), pe
+    totalurile tuturor proceselor.
+    """
+
+    def __init__(self, max_session_bytes: int = 20 * 1024 * 1024, max_total_bytes: int = 256 * 1024 * 1024,
+                 max_session_files: int = 100, path: Optional[str] = None):
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_session_files = max_session_files
+        self.path = path or None
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+        # Mod memorie: (namespace, fișier) -> dimensiune, în ordinea ultimei folosiri
+        self.index: 'OrderedDict[Tuple[str, str], int]' = OrderedDict()
+        # namespace -> fișierele lui, în ordinea ultimei folosiri
+        self.namespaces: Dict[str, 'OrderedDict[str, int]'] = {}
+        self.namespace_bytes: Dict[str, int] = {}
+        self.last_access: Dict[str, float] = {}
+        self.total_bytes = 0
+        self.contents: Optional[Dict[Tuple[str, str], str]] = None
+
+        # Mod bază: conexiunile per thread (redeschise după fork)
+        self.local = threading.local()
+        if self.path:
+            connection = self._connection()
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS edits (namespace TEXT NOT NULL, filename TEXT NOT NULL, '
+                'content TEXT NOT NULL, size INTEGER NOT NULL, updated REAL NOT NULL, '
+                'PRIMARY KEY (namespace, filename))'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS edits_updated ON edits (updated)')
+        else:
+            self.contents = {}
+
+    def get(self, namespace: str, filename: str) -> Optional[str]:
+        if self.path:
+            connection = self._connection()
+            row = connection.execute(
+                'SELECT content FROM edits WHERE namespace = ? AND filename = ?', (namespace, filename)
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    'UPDATE edits SET updated = ? WHERE namespace = ? AND filename = ?',
+                    (time.time(), namespace, filename)
+                )
+            return row[0] if row else None
+
+        with self.lock:
+            key = (namespace, filename)
+            if key not in self.index:
+                return None
+            self._touch(namespace, filename)
+            return self.contents[key]
+
+    def set(self, namespace: str, filename: str, content: str):
+        """
+        Salvează editarea; editările cele mai vechi ale sesiunii (apoi globale) sunt evacuate
+
+        Raises:
+            EditQuotaError: dacă editarea singură depășește cota sesiunii
+        """
+        size = len(content.encode('utf-8'))
+        if size > self.max_session_bytes:
+            raise EditQuotaError(
+                f'Editarea ocupă {size // 1024}KB, peste cota sesiunii de {self.max_session_bytes // 1024}KB'
+            )
+        if self.path:
+            self._set_row(namespace, filename, content, size)
+            return
+
+        key = (namespace, filename)
+        with self.lock:
+            if key in self.index:
+                self._forget(namespace, filename)
+
+            files = self.namespaces.setdefault(namespace, OrderedDict())
+            files[filename] = size
+            self.index[key] = size
+            self.namespace_bytes[namespace] = self.namespace_bytes.get(namespace, 0) + size
+            self.total_bytes += size
+            self.last_access[namespace] = time.time()
+
+            evicted = []
+            while files and len(files) > 1 and (
+                    self.namespace_bytes[namespace] > self.max_session_bytes or len(files) > self.max_session_files):
+                evicted.append((namespace, self._forget(namespace, next(iter(files)))))
+            while self.total_bytes > self.max_total_bytes and len(self.index) > 1:
+                oldest = next(iter(self.index))
+                self._forget(*oldest)
+                evicted.append(oldest)
+            self.evictions += len(evicted)
+
+            for evicted_key in evicted:
+                self.contents.pop(evicted_key, None)
+            self.contents[key] = content
+
+    def delete(self, namespace: str, filename: str):
+        if self.path:
+            self._execute('DELETE FROM edits WHERE namespace = ? AND filename = ?', (namespace, filename))
+            return
+        with self.lock:
+            if (namespace, filename) in self.index:
+                self._forget(namespace, filename)
+                self.contents.pop((namespace, filename), None)
+
+    def items(self, namespace: str) -> List[Tuple[str, str]]:
+        """Editările unei sesiuni (fișier, conținut)"""
+        if self.path:
+            return self._connection().execute(
+                'SELECT filename, content FROM edits WHERE namespace = ? ORDER BY updated, rowid', (namespace,)
+            ).fetchall()
+        with self.lock:
+            return [(filename, self.contents[(namespace, filename)]) for filename in self.namespaces.get(namespace, ())]
+
+    def size(self, namespace: Optional[str] = None) -> int:
+        """Numărul de editări ale unei sesiuni sau, fără namespace, al tuturor"""
+        if self.path:
+            if namespace is None:
+                return self._connection().execute('SELECT COUNT(*) FROM edits').fetchone()[0]
+            return self._connection().execute(
+                'SELECT COUNT(*) FROM edits WHERE namespace = ?', (namespace,)
+            ).fetchone()[0]
+        with self.lock:
+            if namespace is None:
+                return len(self.index)
+            return len(self.namespaces.get(namespace, ()))
+
+    def clear(self, namespace: Optional[str] = None):
+        """Șterge editările unei sesiuni sau, fără namespace, pe toate"""
+        if self.path:
+            if namespace is None:
+                self._execute('DELETE FROM edits')
+            else:
+                self._execute('DELETE FROM edits WHERE namespace = ?', (namespace,))
+            return
+        with self.lock:
+            if namespace is None:
+                keys = list(self.index)
+            else:
+                keys = [(namespace, filename) for filename in self.namespaces.get(namespace, ())]
+            for key in keys:
+                self._forget(*key)
+                self.contents.pop(key, None)
+
+    def evict_idle(self, max_idle_seconds: float) -> int:
+        """Șterge sesiunile nefolosite de mai mult de max_idle_seconds; returnează numărul lor"""
+        cutoff = time.time() - max_idle_seconds
+        if self.path:
+            connection = self._connection()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                idle = [row[0] for row in connection.execute(
+                    'SELECT namespace FROM edits GROUP BY namespace HAVING MAX(updated) < ?', (cutoff,)
+                )]
+                connection.executemany('DELETE FROM edits WHERE namespace = ?', [(namespace,) for namespace in idle])
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            return len(idle)
+
+        with self.lock:
+            idle = [namespace for namespace, accessed in self.last_access.items() if accessed < cutoff]
+            keys = [(namespace, filename) for namespace in idle for filename in self.namespaces.get(namespace, ())]
+            for key in keys:
+                self._forget(*key)
+                self.contents.pop(key, None)
+            return len(idle)
+
+    def stats(self) -> Dict[str, int]:
+        if self.path:
+            sessions, edits, total = self._connection().execute(
+                'SELECT COUNT(DISTINCT namespace), COUNT(*), COALESCE(SUM(size), 0) FROM edits'
+            ).fetchone()
+        else:
+            with self.lock:
+                sessions, edits, total = len(self.namespaces), len(self.index), self.total_bytes
+        return {
+            'sessions': sessions,
+            'edits': edits,
+            'bytes': total,
+            'max_session_bytes': self.max_session_bytes,
+            'max_total_bytes': self.max_total_bytes,
+            'evictions': self.evictions,
+            'persistent': self.path is not None
+        }
+
+    def _touch(self, namespace: str, filename: str):
+        self.index.move_to_end((namespace, filename))
+        self.namespaces[namespace].move_to_end(filename)
+        self.last_access[namespace] = time.time()
+
+    def _forget(self, namespace: str, filename: str) -> str:
+        """Scoate intrarea din index (conținutul este șters separat)"""
+        size = self.index.pop((namespace, filename))
+        files = self.namespaces[namespace]
+        del files[filename]
+        self.namespace_bytes[namespace] -= size
+        self.total_bytes -= size
+        if not files:
+            del self.namespaces[namespace]
+            del self.namespace_bytes[namespace]
+            self.last_access.pop(namespace, None)
+        return filename
+
+    def _set_row(self, namespace: str, filename: str, content: str, size: int):
+        """Scrie editarea și aplică cotele pe totalurile din bază, într-o singură tranzacție"""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'INSERT OR REPLACE INTO edits (namespace, filename, content, size, updated) VALUES (?, ?, ?, ?, ?)',
+                (namespace, filename, content, size, time.time())
+            )
+            evicted = []
+            files = connection.execute(
+                'SELECT filename, size FROM edits WHERE namespace = ? AND filename != ? ORDER BY updated, rowid',
+                (namespace, filename)
+            ).fetchall()
+            session_bytes = size + sum(file_size for _, file_size in files)
+            count = len(files) + 1
+            for old_filename, file_size in files:
+                if session_bytes <= self.max_session_bytes and count <= self.max_session_files:
+                    break
+                evicted.append((namespace, old_filename))
+                session_bytes -= file_size
+                count -= 1
+
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM edits').fetchone()[0]
+            total -= sum(file_size for old_filename, file_size in files if (namespace, old_filename) in evicted)
+            if total > self.max_total_bytes:
+                for old_namespace, old_filename, file_size in connection.execute(
+                    'SELECT namespace, filename, size FROM edits ORDER BY updated, rowid'
+                ).fetchall():
+                    if total <= self.max_total_bytes:
+                        break
+                    key = (old_namespace, old_filename)
+                    if key == (namespace, filename) or key in evicted:
+                        continue
+                    evicted.append(key)
+                    total -= file_size
+
+            connection.executemany('DELETE FROM edits WHERE namespace = ? AND filename = ?', evicted)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        with self.lock:
+            self.evictions += len(evicted)
+
+    def _execute(self, sql: str, parameters: tuple = ()):
+        self._connection().execute(sql, parameters)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexiunea thread-ului curent; redeschisă după fork (conexiunile nu se moștenesc)"""
+        pid = os.getpid()
+        if getattr(self.local, 'pid', None) != pid:
+            # Autocommit: tranzacțiile cu mai multe instrucțiuni sunt deschise explicit (BEGIN IMMEDIATE)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+            self.local.pid = pid
+        return self.local.connection
+
+    def close(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+            self.local.pid = None
@@ -185,6 +185,43 @@ def scan_directory(directory: str, extensions: Optional[List[str]] = None,
     return files_info
 
 
+def build_structure_tree(files_info: List[Dict[str, Any]], root_name: str = 'root') -> Dict[str, Any]:
+    """
+    Construiește arborele de directoare în formatul folosit de frontend
+    
+    Args:
+        files_info: Fișiere cu cel puțin 'name' și 'path' relativ (ex: scan_directory)
+        root_name: Numele nodului rădăcină
+    
+    Returns:
+        Dicționar {'name', 'type': 'folder', 'children': {...}, 'files': [...]}
+    """
+    root = {'name': root_name, 'type': 'folder', 'children': {}, 'files': []}
+    
+    for file_info in files_info:
+        parts = [p for p in file_info['path'].replace('\\', '/').split('/') if p]
+        current = root
+        
+        for dir_name in parts[:-1]:
+            if dir_name not in current['children']:
+                current['children'][dir_name] = {
+                    'name': dir_name,
+                    'type': 'folder',
+                    'children': {},
+                    'files': []
+                }
+            current = current['children'][dir_name]
+        
+        current['files'].append({
+            'name': file_info['name'],
+            'path': file_info['path'],
+            'size': file_info.get('size', 0),
+            'type': file_info.get('type', get_file_type(file_info['name']))
+        })
+    
+    return root
+
+
 def get_file_type(file_path: str) -> str:
     """Determină tipul unui fișier bazat pe extensie"""
     ext = get_file_extension(file_path).lower()
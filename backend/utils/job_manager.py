@@ -0,0 +1,280 @@
+"""
+Execuție asincronă a operațiilor lungi pentru Python Forensics
+Cererea primește un job_id; workerii preiau job-urile dintr-o coadă limitată
+"""
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Optional
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# Cât de des (secunde) un job în execuție își publică progresul și verifică
+# anularea cerută prin alt proces (doar cu baza comună)
+SHARED_SYNC_INTERVAL = 1.0
+
+
+class JobQueueFullError(RuntimeError):
+    """Coada de job-uri este plină"""
+
+
+class JobCancelled(Exception):
+    """Ridicată în job când anularea a fost cerută sau timpul maxim a expirat"""
+
+
+@dataclass
+class Job:
+    """Un job: starea, progresul raportat și rezultatul final"""
+    job_id: str
+    kind: str
+    function: Callable[['JobContext'], Any]
+    state: str = JOB_QUEUED
+    progress: Dict[str, Any] = field(default_factory=dict)
+    partial: Any = None
+    result: Any = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+
+class JobContext:
+    """Interfața job-ului în timpul execuției: progres, rezultate parțiale, anulare"""
+
+    def __init__(self, job: Job, lock: threading.Lock, deadline: Optional[float],
+                 manager: Optional['JobManager'] = None):
+        self.job = job
+        self.lock = lock
+        self.deadline = deadline
+        # Cu baza comună: publicarea progresului și anularea cerută de alt proces
+        self.manager = manager
+        self.last_sync = time.time()
+
+    @property
+    def cancelled(self) -> bool:
+        self._sync()
+        return self.job.cancel_event.is_set() or (self.deadline is not None and time.time() > self.deadline)
+
+    def check(self):
+        """Punct de anulare cooperativă: ridică JobCancelled dacă job-ul trebuie oprit"""
+        self._sync()
+        if self.job.cancel_event.is_set():
+            raise JobCancelled('Job anulat')
+        if self.deadline is not None and time.time() > self.deadline:
+            raise JobCancelled('Timpul maxim al job-ului a expirat')
+
+    def report(self, partial: Any = None, **progress):
+        """Actualizează progresul (și opțional rezultatul parțial); verifică și anularea"""
+        with self.lock:
+            self.job.progress.update(progress)
+            if partial is not None:
+                self.job.partial = partial
+        self.check()
+
+    def _sync(self):
+        if self.manager is None or self.manager.shared is None:
+            return
+        now = time.time()
+        if now - self.last_sync < SHARED_SYNC_INTERVAL:
+            return
+        self.last_sync = now
+        if self.manager.shared.get(_cancel_key(self.job.job_id)):
+            self.job.cancel_event.set()
+        self.manager._publish(self.job)
+
+
+def _cancel_key(job_id: str) -> str:
+    return f'{job_id}:cancel'
+
+
+class JobManager:
+    """Coadă limitată de job-uri executate de un număr fix de thread-uri
+
+    Numărul mic de workeri și coada limitată împiedică un job scăpat de sub
+    control să ocupe toate thread-urile serverului; rezultatele terminate se
+    păstrează result_ttl secunde după încheiere.
+
+    Cu shared setat (un SharedStore), starea fiecărui job (progres, rezultat)
+    este publicată în baza comună la fiecare schimbare și cel mult o dată pe
+    secundă în timpul execuției: un job pornit într-un worker poate fi urmărit
+    și anulat prin oricare altul. Job-ul rulează în procesul care l-a primit.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 100, result_ttl: float = 3600,
+                 max_runtime: Optional[float] = None, shared=None):
+        self.shared = shared
+        self.jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self.queue: 'queue.Queue[Job]' = queue.Queue(maxsize=max_queue)
+        self.result_ttl = result_ttl
+        self.max_runtime = max_runtime
+        self.lock = threading.Lock()
+        # Serializează publicările: o stare citită mai devreme nu poate suprascrie una mai nouă
+        self.publish_lock = threading.Lock()
+
+        for index in range(max(1, workers)):
+            threading.Thread(target=self._worker, name=f'job-worker-{index}', daemon=True).start()
+
+    def submit(self, kind: str, function: Callable[[JobContext], Any]) -> Job:
+        """
+        Adaugă un job în coadă
+
+        Raises:
+            JobQueueFullError: dacă coada este plină
+        """
+        job = Job(job_id=uuid.uuid4().hex[:16], kind=kind, function=function)
+        self.evict_expired()
+        with self.lock:
+            self.jobs[job.job_id] = job
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self.lock:
+                del self.jobs[job.job_id]
+            raise JobQueueFullError('Coada de job-uri este plină, încercați din nou mai târziu')
+        self._publish(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job-ul local sau, cu baza comună, o copie a stării publicate de alt proces"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None and self.shared is not None:
+            snapshot = self.shared.get(job_id)
+            if snapshot is not None:
+                job = Job(function=None, **snapshot)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cere anularea: un job în coadă nu mai pornește, unul în execuție se oprește la următorul check()"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job.state not in FINISHED_STATES:
+                job.cancel_event.set()
+                if job.state == JOB_QUEUED:
+                    job.state = JOB_CANCELLED
+                    job.finished = time.time()
+        if job is not None:
+            self._publish(job)
+            return job
+
+        job = self.get(job_id)
+        if job is not None and job.state not in FINISHED_STATES:
+            # Job-ul altui proces: acesta vede cererea la următoarea verificare
+            self.shared.set(_cancel_key(job_id), True)
+        return job
+
+    def status(self, job: Job, include_result: bool = True) -> Dict[str, Any]:
+        """Starea publică a unui job"""
+        with self.lock:
+            status = {
+                'job_id': job.job_id,
+                'kind': job.kind,
+                'state': job.state,
+                'progress': dict(job.progress),
+                'created': job.created,
+                'started': job.started,
+                'finished': job.finished
+            }
+            if job.state == JOB_DONE and include_result:
+                status['result'] = job.result
+            elif job.partial is not None:
+                status['partial'] = job.partial
+            if job.error:
+                status['error'] = job.error
+            return status
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            counts = {state: 0 for state in (JOB_QUEUED, JOB_RUNNING) + FINISHED_STATES}
+            for job in self.jobs.values():
+                counts[job.state] += 1
+            return counts
+
+    def evict_expired(self) -> int:
+        """Șterge job-urile terminate de mai mult de result_ttl secunde"""
+        cutoff = time.time() - self.result_ttl
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items()
+                       if job.state in FINISHED_STATES and job.finished is not None and job.finished < cutoff]
+            for job_id in expired:
+                del self.jobs[job_id]
+        if self.shared is not None:
+            self.shared.evict_older_than(self.result_ttl)
+        return len(expired)
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self._run(job)
+            finally:
+                self.queue.task_done()
+
+    def _run(self, job: Job):
+        cancel_requested = self.shared is not None and bool(self.shared.get(_cancel_key(job.job_id)))
+        with self.lock:
+            if job.state != JOB_QUEUED:
+                return
+            if cancel_requested:
+                job.cancel_event.set()
+                job.state = JOB_CANCELLED
+                job.finished = time.time()
+            else:
+                job.state = JOB_RUNNING
+                job.started = time.time()
+        self._publish(job)
+        if job.state != JOB_RUNNING:
+            return
+
+        deadline = job.started + self.max_runtime if self.max_runtime else None
+        context = JobContext(job, self.lock, deadline, self)
+        try:
+            result = job.function(context)
+            state, error = JOB_DONE, None
+        except JobCancelled as e:
+            result, state, error = None, JOB_CANCELLED, str(e)
+        except Exception as e:
+            result, state, error = None, JOB_FAILED, str(e)
+
+        with self.lock:
+            job.result = result
+            job.state = state
+            job.error = error
+            job.finished = time.time()
+            # Funcția (și datele capturate de ea) nu mai este necesară
+            job.function = None
+        self._publish(job)
+
+    def _publish(self, job: Job):
+        """Scrie starea job-ului în baza comună (dacă există)"""
+        if self.shared is None:
+            return
+        with self.publish_lock:
+            with self.lock:
+                snapshot = {
+                    'job_id': job.job_id,
+                    'kind': job.kind,
+                    'state': job.state,
+                    'progress': dict(job.progress),
+                    'partial': job.partial,
+                    'result': job.result,
+                    'error': job.error,
+                    'created': job.created,
+                    'started': job.started,
+                    'finished': job.finished
+                }
+            try:
+                self.shared.set(job.job_id, snapshot)
+            except Exception as e:
+                # Baza blocată sau rezultat neserializabil: job-ul rămâne vizibil în procesul lui
+                print(f"Eroare la publicarea job-ului {job.job_id}: {e}")
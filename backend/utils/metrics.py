@@ -0,0 +1,253 @@
+"""
+Registru de metrici în format text Prometheus
+Python Forensics - Metrics
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Limitele histogramelor de durată (secunde) și de dimensiune (bytes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Cât de des (secunde) un worker își publică totalurile în baza comună
+PUBLISH_INTERVAL = 5.0
+# Totalurile nepublicate de atâtea secunde aparțin unui worker oprit și sunt mutate în RETIRED_KEY
+STALE_AFTER = 60.0
+# Cheia din baza comună cu suma totalurilor workerilor opriți (contoarele nu scad la oprirea unui worker)
+RETIRED_KEY = 'retired'
+
+# (nume, tip, descriere, [(etichete, valoare)]) produse de un collector la fiecare citire
+CollectedMetric = Tuple[str, str, str, Iterable[Tuple[Dict[str, str], float]]]
+
+
+def process_memory() -> Dict[str, int]:
+    """Memoria procesului curent (bytes): rezidentă acum și maximă, cât este disponibil pe platformă"""
+    memory = {}
+    try:
+        with open('/proc/self/statm') as f:
+            memory['resident'] = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux raportează în KB, macOS în bytes
+        memory['max_resident'] = max_rss if sys.platform == 'darwin' else max_rss * 1024
+    return memory
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Contoare și histograme înregistrate fără lock pe calea cererilor
+
+    Fiecare thread scrie doar în propriul shard (un dicționar), deci o
+    incrementare nu așteaptă după alte thread-uri; la citirea /metrics
+    shard-urile sunt însumate. Valorile thread-urilor terminate sunt mutate
+    într-un shard comun, ca numărul de shard-uri să nu crească nelimitat.
+
+    Cu shared setat (un SharedStore), fiecare proces își publică totalurile
+    (la PUBLISH_INTERVAL secunde și la fiecare citire), iar render însumează
+    contoarele și histogramele tuturor workerilor activi, indiferent care
+    dintre ei răspunde. Totalurile unui worker oprit sunt adăugate la rândul
+    RETIRED_KEY, ca sumele să nu scadă; valorile collectorilor (gauge-uri)
+    rămân ale procesului care răspunde și nu sunt păstrate.
+    """
+
+    def __init__(self, shared=None, publish_interval: float = PUBLISH_INTERVAL):
+        self.definitions: 'OrderedDict[str, Tuple[str, str, Optional[Tuple[float, ...]]]]' = OrderedDict()
+        self.collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+        self.local = threading.local()
+        self.shards: List[dict] = []
+        self.retired: dict = {}
+        # Shard-urile thread-urilor terminate; append pe deque nu necesită lock
+        self.retiring: deque = deque()
+        self.lock = threading.Lock()
+        self.shared = shared
+        self.publish_interval = publish_interval
+        # Procesul în care rulează thread-ul de publicare (repornit după fork)
+        self.publisher_pid: Optional[int] = None
+        # Cheia sub care publică procesul curent: (pid, cheie); include momentul
+        # pornirii, ca un pid refolosit să nu suprascrie totalurile unui worker oprit
+        self.worker_key: Tuple[Optional[int], str] = (None, '')
+        # Ultimele totaluri publicate și partea lor deja mutată în RETIRED_KEY
+        self.published: dict = {}
+        self.baseline: dict = {}
+        self.publish_lock = threading.Lock()
+
+    def counter(self, name: str, description: str):
+        self.definitions[name] = ('counter', description, None)
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.definitions[name] = ('histogram', description, tuple(buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedMetric]]):
+        """Funcție apelată la fiecare citire, pentru valori luate direct din store-uri (gauge-uri, statistici)"""
+        self.collectors.append(collector)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        shard = self._shard()
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0]
+        cell[0] += value
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = self.definitions[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        shard = self._shard()
+        cell = shard.get(key)
+        if cell is None:
+            # Câte un contor per interval (ultimul este +Inf), apoi suma
+            cell = shard[key] = [0] * (len(buckets) + 1) + [0.0]
+        cell[bisect.bisect_left(buckets, value)] += 1
+        cell[-1] += value
+
+    def render(self) -> str:
+        """Toate metricile în formatul text Prometheus (versiunea 0.0.4)"""
+        totals = self._merged() if self.shared is None else self._merged_workers()
+        lines = []
+
+        by_name: Dict[str, List[Tuple[tuple, list]]] = {}
+        for (name, labels), cell in totals.items():
+            by_name.setdefault(name, []).append((labels, cell))
+
+        for name, (kind, description, buckets) in self.definitions.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, cell in sorted(by_name.get(name, ())):
+                if kind == 'counter':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(cell[0])}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (float('inf'),), cell[:-1]):
+                    cumulative += count
+                    bucket_labels = labels + (('le', _format_value(bound)),)
+                    lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(cell[-1])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+        for collector in self.collectors:
+            for name, kind, description, samples in collector():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def publish(self):
+        """Scrie totalurile procesului în baza comună (cheia este pid-ul)"""
+        pid = os.getpid()
+        totals = self._merged()
+        with self.publish_lock:
+            if self.worker_key[0] != pid:
+                self.worker_key = (pid, f'{pid}-{time.time():.6f}')
+                self.published = self.baseline = {}
+            elif self.published and self.shared.get(self.worker_key[1]) is None:
+                # Rândul a fost mutat în RETIRED_KEY (worker considerat oprit): ce era
+                # publicat este deja numărat acolo, deci de acum se publică doar diferența
+                self.baseline = self.published
+            self.published = totals
+            self.shared.set(self.worker_key[1], self._subtract(totals, self.baseline))
+
+    def _merged_workers(self) -> Dict[tuple, list]:
+        self.publish()
+        self.shared.fold_older_than(STALE_AFTER, RETIRED_KEY, self._fold, keep=(self.worker_key[1],))
+        totals: Dict[tuple, list] = {}
+        for _, worker_totals in self.shared.items():
+            self._add(totals, worker_totals)
+        return totals
+
+    def _ensure_publisher(self):
+        pid = os.getpid()
+        with self.lock:
+            if self.publisher_pid == pid:
+                return
+            self.publisher_pid = pid
+        threading.Thread(target=self._publish_loop, name='metrics-publish', daemon=True).start()
+
+    def _publish_loop(self):
+        while True:
+            time.sleep(self.publish_interval)
+            try:
+                self.publish()
+            except Exception:
+                # Baza blocată sau indisponibilă: se reîncearcă la următorul interval
+                pass
+
+    def _shard(self) -> dict:
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = {}
+            with self.lock:
+                self.shards.append(shard)
+            weakref.finalize(threading.current_thread(), self.retiring.append, shard)
+            if self.shared is not None:
+                self._ensure_publisher()
+        return shard
+
+    def _merged(self) -> Dict[tuple, list]:
+        with self.lock:
+            while self.retiring:
+                shard = self.retiring.popleft()
+                self.shards = [other for other in self.shards if other is not shard]
+                self._add(self.retired, shard)
+            totals = {key: list(cell) for key, cell in self.retired.items()}
+            for shard in self.shards:
+                # dict.copy este atomic; thread-ul proprietar poate continua să scrie
+                self._add(totals, shard.copy())
+        return totals
+
+    @classmethod
+    def _fold(cls, retired: Optional[dict], worker_totals: dict) -> dict:
+        retired = retired or {}
+        cls._add(retired, worker_totals)
+        return retired
+
+    @staticmethod
+    def _subtract(totals: dict, baseline: dict) -> dict:
+        if not baseline:
+            return totals
+        difference = {}
+        for key, cell in totals.items():
+            previous = baseline.get(key)
+            difference[key] = list(cell) if previous is None else [a - b for a, b in zip(cell, previous)]
+        return difference
+
+    @staticmethod
+    def _add(target: dict, source: dict):
+        for key, cell in source.items():
+            existing = target.get(key)
+            if existing is None:
+                target[key] = list(cell)
+            else:
+                for index, value in enumerate(cell):
+                    existing[index] += value
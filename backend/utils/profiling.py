@@ -0,0 +1,277 @@
+"""
+Profilarea la cerere a unei singure cereri HTTP (cProfile sau trasarea stivelor)
+Python Forensics - Profiling
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILE_MODES = ('cprofile', 'trace')
+PROFILE_FORMATS = ('text', 'pstats', 'collapsed')
+
+# Ramurile sub acest prag (microsecunde) sunt omise din stivele reconstruite din cProfile
+MIN_COLLAPSED_US = 1
+
+
+def _label(filename: str, line: int, name: str) -> str:
+    """Eticheta unui cadru în formatul collapsed (fără ';', separatorul de stivă)"""
+    if filename == '~':
+        # Funcții built-in, raportate de cProfile ca ('~', 0, '<built-in method ...>')
+        return name.replace(';', ':')
+    return f'{name} ({os.path.basename(filename)}:{line})'.replace(';', ':')
+
+
+class StackTracer:
+    """Profiler de trasare: timpul propriu al fiecărei stive complete de apeluri
+
+    Rulează cu sys.setprofile doar pe thread-ul cererii. Spre deosebire de
+    cProfile, păstrează stiva exactă (nu doar perechile apelant -> apelat),
+    deci flamegraph-ul nu este o aproximare; costul per apel este mai mare.
+    """
+
+    def __init__(self):
+        self.stack: List[str] = []
+        self.samples: Dict[Tuple[str, ...], int] = {}
+        self.last = 0
+
+    def start(self):
+        # Cadrele deja active (serverul, Flask, acest apel) formează baza stivei; returnările lor o golesc
+        frame = sys._getframe()
+        outer = []
+        while frame is not None:
+            outer.append(_label(frame.f_code.co_filename, frame.f_code.co_firstlineno, frame.f_code.co_name))
+            frame = frame.f_back
+        self.stack = outer[::-1]
+        self.last = time.perf_counter_ns()
+        sys.setprofile(self._event)
+
+    def stop(self):
+        sys.setprofile(None)
+        self._account()
+
+    def collapsed(self) -> Dict[str, int]:
+        """Stivă ('a;b;c') -> timp propriu în microsecunde"""
+        lines = {}
+        for stack, elapsed in self.samples.items():
+            micros = elapsed // 1000
+            if micros:
+                key = ';'.join(stack)
+                lines[key] = lines.get(key, 0) + micros
+        return lines
+
+    def _account(self):
+        now = time.perf_counter_ns()
+        if self.stack:
+            key = tuple(self.stack)
+            self.samples[key] = self.samples.get(key, 0) + now - self.last
+        self.last = now
+
+    def _event(self, frame, event, arg):
+        self._account()
+        if event == 'call':
+            code = frame.f_code
+            self.stack.append(_label(code.co_filename, code.co_firstlineno, code.co_name))
+        elif event == 'c_call':
+            self.stack.append(_label('~', 0, f'<built-in {getattr(arg, "__qualname__", arg)}>'))
+        elif self.stack:
+            # return, c_return, c_exception
+            self.stack.pop()
+
+
+def collapsed_from_stats(stats: Dict[Any, tuple], max_depth: int = 200) -> Dict[str, int]:
+    """
+    Stive collapsed reconstruite din graful apelant -> apelat al cProfile
+
+    cProfile nu păstrează stivele complete: timpul unei funcții este împărțit
+    între apelanți proporțional cu timpul cumulat măsurat pe fiecare muchie.
+    """
+    callees: Dict[Any, List[Tuple[Any, float]]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    lines: Dict[str, int] = {}
+    # Rădăcinile: funcțiile cu apeluri fără apelant profilat (ex. apelate din cadre active înainte de
+    # pornirea profilerului), cu partea din timpul cumulat neatribuită altor apelanți
+    roots = []
+    for func, (_, calls, _, cumulative, callers) in stats.items():
+        if sum(edge[0] for edge in callers.values()) >= calls:
+            continue
+        attributed = sum(edge[3] for caller, edge in callers.items() if caller != func)
+        weight = 1.0 - min(1.0, attributed / cumulative) if cumulative > 0 else 1.0
+        roots.append((func, weight))
+
+    def visit(func, path: List[str], on_path: set, weight: float):
+        _, _, own, cumulative, _ = stats[func]
+        path.append(_label(*func))
+        on_path.add(func)
+        micros = int(own * weight * 1e6)
+        if micros >= MIN_COLLAPSED_US:
+            key = ';'.join(path)
+            lines[key] = lines.get(key, 0) + micros
+        if len(path) < max_depth:
+            for callee, edge_cumulative in callees.get(func, ()):
+                callee_cumulative = stats[callee][3]
+                if callee in on_path or callee_cumulative <= 0:
+                    continue
+                child_weight = weight * min(1.0, edge_cumulative / callee_cumulative)
+                if child_weight * callee_cumulative * 1e6 >= MIN_COLLAPSED_US:
+                    visit(callee, path, on_path, child_weight)
+        on_path.discard(func)
+        path.pop()
+
+    for root, weight in roots:
+        visit(root, [], set(), weight)
+    return lines
+
+
+@dataclass
+class RequestProfile:
+    """Rezultatul profilării unei cereri; stats (cProfile) sau collapsed (trasare)"""
+    profile_id: str
+    mode: str
+    method: str
+    path: str
+    status: Optional[int] = None
+    duration: float = 0.0
+    created: float = field(default_factory=time.time)
+    pid: int = field(default_factory=os.getpid)
+    stats: Optional[Dict[Any, tuple]] = None
+    collapsed: Optional[Dict[str, int]] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'profile_id': self.profile_id,
+            'mode': self.mode,
+            'method': self.method,
+            'path': self.path,
+            'status': self.status,
+            'duration': round(self.duration, 6),
+            'created': self.created,
+            'pid': self.pid,
+            'formats': list(self.formats())
+        }
+
+    def formats(self) -> Tuple[str, ...]:
+        return PROFILE_FORMATS if self.stats is not None else ('collapsed',)
+
+    def pstats_bytes(self) -> bytes:
+        """Fișier încărcabil cu pstats.Stats(cale) sau vizualizat cu snakeviz"""
+        return marshal.dumps(self.stats)
+
+    def collapsed_text(self) -> str:
+        """Format collapsed ('a;b;c microsecunde' pe linie) pentru flamegraph.pl sau speedscope"""
+        lines = self.collapsed if self.collapsed is not None else collapsed_from_stats(self.stats)
+        return ''.join(f'{stack} {micros}\n' for stack, micros in sorted(lines.items()))
+
+    def text(self, sort: str = 'cumulative', limit: int = 60) -> str:
+        output = io.StringIO()
+        stats = pstats.Stats(stream=output)
+        stats.stats = self.stats
+        stats.get_top_level_stats()
+        stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+class ActiveProfile:
+    """Profilerul pornit pentru cererea curentă, oprit la închiderea răspunsului"""
+
+    def __init__(self, profile: RequestProfile):
+        self.profile = profile
+        self.profiler = cProfile.Profile() if profile.mode == 'cprofile' else StackTracer()
+        self.started = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+        if isinstance(self.profiler, StackTracer):
+            self.profiler.start()
+        else:
+            # Python 3.12+: un singur profiler activ per proces (ValueError dacă altă cerere profilează)
+            self.profiler.enable()
+
+    def stop(self) -> RequestProfile:
+        if isinstance(self.profiler, StackTracer):
+            self.profiler.stop()
+            self.profile.collapsed = self.profiler.collapsed()
+        else:
+            self.profiler.disable()
+            self.profiler.create_stats()
+            self.profile.stats = self.profiler.stats
+        self.profile.duration = time.perf_counter() - self.started
+        return self.profile
+
+
+class ProfileStore:
+    """Ultimele max_profiles profiluri, după id-ul cererii
+
+    Cu shared și shared_summaries setate (două SharedStore), profilurile și
+    rezumatele lor stau doar în baza comună: un profil înregistrat de un
+    worker poate fi listat, descărcat și șters prin oricare altul.
+    """
+
+    def __init__(self, max_profiles: int = 50, shared=None, shared_summaries=None):
+        self.max_profiles = max_profiles
+        self.shared = shared if shared_summaries is not None else None
+        self.shared_summaries = shared_summaries if shared is not None else None
+        self.profiles: 'OrderedDict[str, RequestProfile]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.recorded = 0
+
+    def put(self, profile: RequestProfile):
+        with self.lock:
+            self.recorded += 1
+            if self.shared is None:
+                self.profiles[profile.profile_id] = profile
+                self.profiles.move_to_end(profile.profile_id)
+                while len(self.profiles) > self.max_profiles:
+                    self.profiles.popitem(last=False)
+                return
+        self.shared.set(profile.profile_id, profile)
+        self.shared_summaries.set(profile.profile_id, profile.summary())
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        if self.shared is not None:
+            return self.shared.get(profile_id)
+        with self.lock:
+            return self.profiles.get(profile_id)
+
+    def __contains__(self, profile_id: str) -> bool:
+        return self.get(profile_id) is not None
+
+    def iter_summaries(self) -> Iterator[Dict[str, Any]]:
+        """Rezumatele profilurilor, de la cel mai nou"""
+        if self.shared is not None:
+            summaries = [summary for _, summary in self.shared_summaries.items()]
+            # Tabelul comun este tăiat la max_profiles doar periodic
+            for summary in reversed(summaries[-self.max_profiles:]):
+                yield summary
+            return
+        with self.lock:
+            profiles = list(self.profiles.values())
+        for profile in reversed(profiles):
+            yield profile.summary()
+
+    def discard(self, profile_id: str) -> bool:
+        if self.shared is not None:
+            removed = self.shared_summaries.get(profile_id) is not None
+            self.shared_summaries.delete(profile_id)
+            self.shared.delete(profile_id)
+            return removed
+        with self.lock:
+            return self.profiles.pop(profile_id, None) is not None
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            profiles = len(self.profiles)
+            recorded = self.recorded
+        if self.shared is not None:
+            profiles = min(self.shared_summaries.count(), self.max_profiles)
+        return {'profiles': profiles, 'recorded': recorded, 'max_profiles': self.max_profiles}
@@ -0,0 +1,149 @@
+"""
+Starea proiectului per sesiune: scriptul principal, entitățile lui și scripturile secundare
+Python Forensics - Project State
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+
+@dataclass
+class ProjectState:
+    """Scriptul principal și scripturile secundare ale unei sesiuni"""
+    principal_module: str = ''
+    functions: List[str] = field(default_factory=list)
+    classes: List[str] = field(default_factory=list)
+    # Mulțimi pentru verificarea O(1) a numelor importate
+    function_names: Set[str] = field(default_factory=set)
+    class_names: Set[str] = field(default_factory=set)
+    # Ordinea adăugării, fără duplicate
+    secondary: 'OrderedDict[str, None]' = field(default_factory=OrderedDict)
+    last_access: float = field(default_factory=time.time)
+
+    def set_principal(self, module: str, functions: List[str], classes: List[str]):
+        self.principal_module = module
+        self.functions = list(functions)
+        self.classes = list(classes)
+        self.function_names = set(functions)
+        self.class_names = set(classes)
+
+    def add_secondary(self, filename: str):
+        self.secondary.pop(filename, None)
+        self.secondary[filename] = None
+
+    def entities(self) -> Dict[str, List[str]]:
+        return {'functions': list(self.functions), 'classes': list(self.classes)}
+
+    def secondary_listing(self) -> str:
+        """Lista scripturilor secundare în formatul vechi al secundare.txt (un nume per linie)"""
+        return ''.join(f'{filename}\n' for filename in self.secondary)
+
+
+class ProjectStateStore:
+    """Stările proiectelor per sesiune, limitate ca număr, cu scriere opțională pe disc
+
+    Cu flush_paths setat, ultima stare modificată este scrisă asincron în
+    fișierele vechi (principal.txt, entities.json, secundare.txt) de un thread
+    separat; cererile nu mai așteaptă după disc.
+
+    Cu shared setat (un SharedStore), stările stau doar în baza comună, iar
+    update este o tranzacție: o sesiune servită alternativ de mai mulți
+    workeri vede aceeași stare, iar modificările concurente nu se pierd.
+    """
+
+    def __init__(self, max_sessions: int = 1000, flush_paths: Optional[Dict[str, str]] = None,
+                 flush_delay: float = 1.0, shared=None):
+        self.states: 'OrderedDict[str, ProjectState]' = OrderedDict()
+        self.max_sessions = max_sessions
+        self.shared = shared
+        self.lock = threading.Lock()
+
+        self.flush_paths = flush_paths
+        self.flush_delay = flush_delay
+        self.pending: Optional[ProjectState] = None
+        self.flush_event = threading.Event()
+        if flush_paths:
+            threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    def get(self, namespace: str) -> ProjectState:
+        """Starea sesiunii, creată la prima folosire (cu shared, o copie citită din baza comună)"""
+        if self.shared is not None:
+            state = self.shared.get(namespace)
+            if state is None:
+                return ProjectState()
+            self.shared.touch(namespace)
+            return state
+        with self.lock:
+            state = self.states.get(namespace)
+            if state is None:
+                state = self.states[namespace] = ProjectState()
+                while len(self.states) > self.max_sessions:
+                    self.states.popitem(last=False)
+            else:
+                self.states.move_to_end(namespace)
+            state.last_access = time.time()
+            return state
+
+    def update(self, namespace: str, action) -> ProjectState:
+        """Aplică action(state) sub lock și programează scrierea pe disc (dacă este activă)"""
+        if self.shared is not None:
+            def apply(state):
+                state = state or ProjectState()
+                action(state)
+                state.last_access = time.time()
+                return state, state
+            state = self.shared.update(namespace, apply)
+        else:
+            state = self.get(namespace)
+            with self.lock:
+                action(state)
+        if self.flush_paths:
+            with self.lock:
+                self.pending = state
+                self.flush_event.set()
+        return state
+
+    def evict_idle(self, max_idle_seconds: float) -> int:
+        """Șterge stările nefolosite de mai mult de max_idle_seconds"""
+        if self.shared is not None:
+            return self.shared.evict_older_than(max_idle_seconds)
+        cutoff = time.time() - max_idle_seconds
+        with self.lock:
+            idle = [namespace for namespace, state in self.states.items() if state.last_access < cutoff]
+            for namespace in idle:
+                del self.states[namespace]
+            return len(idle)
+
+    def _flush_loop(self):
+        while True:
+            self.flush_event.wait()
+            # Grupează rafalele de modificări într-o singură scriere
+            time.sleep(self.flush_delay)
+            with self.lock:
+                self.flush_event.clear()
+                state, self.pending = self.pending, None
+                if state is None:
+                    continue
+                files = {
+                    'principal': state.principal_module,
+                    'entities': json.dumps(state.entities(), ensure_ascii=False, indent=2),
+                    'secondary': state.secondary_listing()
+                }
+            try:
+                for key, content in files.items():
+                    path = self.flush_paths.get(key)
+                    if path:
+                        _write_atomic(path, content)
+            except OSError as e:
+                print(f"Eroare la scrierea stării proiectului: {e}")
+
+
+def _write_atomic(path: str, content: str):
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, path)
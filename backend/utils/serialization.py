@@ -0,0 +1,112 @@
+"""
+Serializare rapidă a rezultatelor de analiză
+Python Forensics - Serialization Utils
+"""
+import dataclasses
+import json
+from collections.abc import Mapping
+from datetime import datetime, date
+from typing import Any, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+# Tipuri MIME acceptate pentru msgpack (denumirea veche este încă folosită de clienți)
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+# orjson serializează nativ dataclass-uri și datetime; seturile trec prin default
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+
+def to_builtin(obj: Any) -> Any:
+    """
+    Convertește un singur nivel al unui obiect nesuportat nativ
+
+    Folosit ca `default` de encodere: nivelurile interioare sunt convertite
+    tot de encoder, deci nu se construiește o copie completă a structurii.
+
+    Args:
+        obj: Dataclass (FunctionInfo, ProjectReport...), set, datetime etc.
+
+    Returns:
+        Un dict, list sau str pe care encoderul îl poate serializa
+    """
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    if isinstance(obj, (set, frozenset)):
+        # Ordine stabilă pentru rezultate reproductibile
+        try:
+            return sorted(obj)
+        except TypeError:
+            return list(obj)
+    if isinstance(obj, Mapping):
+        # Dicționare proprii (ex. analizele păstrate pe disc)
+        return dict(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, 'tolist'):
+        # Tablouri numpy / array.array
+        return obj.tolist()
+    raise TypeError(f'Tip neserializabil: {type(obj).__name__}')
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializează obiectul în JSON (bytes UTF-8), cu orjson când este disponibil"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=to_builtin, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=to_builtin, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dumps_str(obj: Any) -> str:
+    """Serializează obiectul în JSON ca text (pentru SSE/NDJSON)"""
+    return dumps(obj).decode('utf-8')
+
+
+def packb(obj: Any) -> bytes:
+    """Serializează obiectul în msgpack"""
+    if msgpack is None:
+        raise RuntimeError('msgpack nu este instalat')
+    return msgpack.packb(obj, default=to_builtin, use_bin_type=True, strict_types=False)
+
+
+def msgpack_available() -> bool:
+    """Verifică dacă encodarea binară msgpack poate fi oferită"""
+    return msgpack is not None
+
+
+def negotiate_mimetype(accepted: Iterable[str]) -> str:
+    """
+    Alege formatul răspunsului după tipurile MIME acceptate de client
+
+    Args:
+        accepted: Tipurile acceptate, în ordinea preferinței clientului
+
+    Returns:
+        MSGPACK_MIMETYPE dacă este cerut explicit și disponibil, altfel JSON_MIMETYPE
+    """
+    if msgpack is None:
+        return JSON_MIMETYPE
+    for mimetype in accepted:
+        if mimetype in MSGPACK_MIMETYPES:
+            return MSGPACK_MIMETYPE
+        if mimetype in (JSON_MIMETYPE, '*/*'):
+            return JSON_MIMETYPE
+    return JSON_MIMETYPE
+
+
+def encode(obj: Any, mimetype: Optional[str] = None) -> bytes:
+    """Serializează obiectul în formatul negociat"""
+    if mimetype == MSGPACK_MIMETYPE:
+        return packb(obj)
+    return dumps(obj)
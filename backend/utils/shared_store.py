@@ -0,0 +1,186 @@
+"""
+Stocare cheie -> valoare partajată între procesele serverului (SQLite în mod WAL)
+Python Forensics - Shared Store
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# La câte scrieri se verifică limita de intrări
+TRIM_INTERVAL = 256
+
+
+class SharedStore:
+    """Un tabel cheie -> valoare într-o bază SQLite locală, citită de toți workerii
+
+    Fiecare proces (și fiecare thread) deschide propria conexiune, deci
+    obiectul poate fi creat înainte de fork. Modul WAL permite citiri
+    concurente cu un singur scriitor; valorile sunt serializate cu pickle
+    (baza este locală și scrisă doar de server).
+    """
+
+    def __init__(self, path: str, table: str, max_entries: Optional[int] = None):
+        if not table.isidentifier():
+            raise ValueError(f'Nume de tabel invalid: {table}')
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.local = threading.local()
+        self.writes = 0
+
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL, updated REAL NOT NULL)'
+            )
+            connection.execute(f'CREATE INDEX IF NOT EXISTS {table}_updated ON {table} (updated)')
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(f'SELECT value FROM {self.table} WHERE key = ?', (key,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, updated) VALUES (?, ?, ?)',
+                (key, data, time.time())
+            )
+        self.writes += 1
+        if self.max_entries and self.writes % TRIM_INTERVAL == 0:
+            self.trim(self.max_entries)
+
+    def touch(self, key: str):
+        """Marchează intrarea ca folosită acum (pentru expirarea după vârstă)"""
+        connection = self._connection()
+        with connection:
+            connection.execute(f'UPDATE {self.table} SET updated = ? WHERE key = ?', (time.time(), key))
+
+    def delete(self, key: str):
+        connection = self._connection()
+        with connection:
+            connection.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+
+    def trim(self, max_entries: int) -> int:
+        """Păstrează doar cele mai recente max_entries intrări; returnează câte au fost șterse"""
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                f'DELETE FROM {self.table} WHERE key IN '
+                f'(SELECT key FROM {self.table} ORDER BY updated DESC LIMIT -1 OFFSET ?)',
+                (max_entries,)
+            )
+        return cursor.rowcount
+
+    def evict_older_than(self, max_age_seconds: float) -> int:
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                f'DELETE FROM {self.table} WHERE updated < ?', (time.time() - max_age_seconds,)
+            )
+        return cursor.rowcount
+
+    def fold_older_than(self, max_age_seconds: float, into_key: str, fold: Callable[[Any, Any], Any],
+                        keep: Tuple[str, ...] = ()) -> int:
+        """Combină intrările mai vechi de max_age_seconds (în afară de keep) în into_key și le șterge
+
+        fold(acumulat, valoare) primește valoarea curentă a lui into_key (None
+        dacă lipsește); citirea, scrierea și ștergerea sunt o singură tranzacție,
+        deci două procese nu pot adăuga aceeași intrare de două ori.
+        Returnează câte intrări au fost combinate.
+        """
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            excluded = (into_key,) + tuple(keep)
+            stale = connection.execute(
+                f'SELECT key, value FROM {self.table} WHERE updated < ? '
+                f'AND key NOT IN ({", ".join("?" * len(excluded))})',
+                (time.time() - max_age_seconds,) + excluded
+            ).fetchall()
+            if stale:
+                row = connection.execute(f'SELECT value FROM {self.table} WHERE key = ?', (into_key,)).fetchone()
+                folded = pickle.loads(row[0]) if row else None
+                for _, data in stale:
+                    folded = fold(folded, pickle.loads(data))
+                connection.execute(
+                    f'INSERT OR REPLACE INTO {self.table} (key, value, updated) VALUES (?, ?, ?)',
+                    (into_key, pickle.dumps(folded, protocol=pickle.HIGHEST_PROTOCOL), time.time())
+                )
+                connection.executemany(f'DELETE FROM {self.table} WHERE key = ?', [(key,) for key, _ in stale])
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        return len(stale)
+
+    def update(self, key: str, action: Callable[[Any], Tuple[Any, Any]]) -> Any:
+        """
+        Citește, modifică și scrie înapoi o valoare într-o singură tranzacție
+
+        action(valoarea curentă sau None) returnează (valoarea nouă, rezultat);
+        o valoare nouă None șterge intrarea. Tranzacția (BEGIN IMMEDIATE)
+        serializează actualizările tuturor proceselor, deci nicio modificare
+        concurentă nu se pierde. Returnează rezultatul lui action.
+        """
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(f'SELECT value FROM {self.table} WHERE key = ?', (key,)).fetchone()
+            value, result = action(pickle.loads(row[0]) if row else None)
+            if value is None:
+                connection.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+            else:
+                connection.execute(
+                    f'INSERT OR REPLACE INTO {self.table} (key, value, updated) VALUES (?, ?, ?)',
+                    (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time())
+                )
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        return result
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Șterge toate cheile care încep cu prefix; returnează câte au fost șterse"""
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                f"DELETE FROM {self.table} WHERE key >= ? AND key < ?", (prefix, prefix + '\U0010ffff')
+            )
+        return cursor.rowcount
+
+    def items(self, prefix: str = '') -> Iterator[Tuple[str, Any]]:
+        """Intrările (cheie, valoare), opțional doar cele cu prefix, de la cea mai veche folosită; pentru tabele mici"""
+        rows = self._connection().execute(
+            f'SELECT key, value FROM {self.table} WHERE key >= ? AND key < ? ORDER BY updated',
+            (prefix, prefix + '\U0010ffff')
+        ).fetchall()
+        for key, data in rows:
+            yield key, pickle.loads(data)
+
+    def count(self) -> int:
+        return self._connection().execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+    def clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute(f'DELETE FROM {self.table}')
+
+    def stats(self) -> Dict[str, Any]:
+        return {'path': self.path, 'table': self.table, 'entries': self.count()}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexiunea thread-ului curent; redeschisă după fork (conexiunile nu se moștenesc)"""
+        pid = os.getpid()
+        if getattr(self.local, 'pid', None) != pid:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+            self.local.pid = pid
+        return self.local.connection
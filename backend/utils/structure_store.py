@@ -0,0 +1,275 @@
+"""
+Stocare limitată a structurilor de directoare încărcate
+Python Forensics - Structure Store
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+
+
+# Estimare pentru metadatele unui fișier (nume, cale, dicționar)
+FILE_OVERHEAD_BYTES = 256
+
+# Cât de des (secunde) o structură folosită local își reîmprospătează vârsta în store-ul partajat
+SHARED_TOUCH_INTERVAL = 60
+
+
+class StructureTooLargeError(ValueError):
+    """Structura depășește singură bugetul de memorie al store-ului"""
+
+
+@dataclass
+class StructureEntry:
+    """O structură salvată, cu fișierele ei și datele derivate din analiză"""
+    structure_id: str
+    structure: Dict[str, Any]
+    files: List[Dict[str, Any]]
+    project_key: str
+    size: int
+    created: float = field(default_factory=time.time)
+    last_access: float = field(default_factory=time.time)
+    # Date derivate (metrici, index de interogare), eliberate odată cu intrarea
+    extras: Dict[str, Any] = field(default_factory=dict)
+    # Memoria estimată a fiecărei date derivate, inclusă în size
+    extra_sizes: Dict[str, int] = field(default_factory=dict)
+    shared_touch: float = field(default_factory=time.time)
+
+
+def estimate_files_size(files: List[Dict[str, Any]]) -> int:
+    """Estimează memoria ocupată de fișiere: conținutul plus o constantă per fișier"""
+    total = 0
+    for file_data in files:
+        content = file_data.get('content')
+        total += FILE_OVERHEAD_BYTES + (len(content) if isinstance(content, str) else 0)
+    return total
+
+
+def strip_structure_contents(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Copie a arborelui fără conținutul fișierelor (conținutul rămâne doar în lista de fișiere)"""
+    return {
+        **node,
+        'files': [
+            {k: v for k, v in file_data.items() if k != 'content'} if isinstance(file_data, dict) else file_data
+            for file_data in node.get('files', [])
+        ],
+        'children': {
+            name: strip_structure_contents(child) for name, child in node.get('children', {}).items()
+        }
+    }
+
+
+class StructureStore:
+    """Structuri de directoare cu TTL, buget total de bytes și evacuare LRU
+
+    Cu shared setat (un SharedStore), structura și fișierele sunt scrise și în
+    baza comună a workerilor: o structură salvată printr-un proces poate fi
+    analizată de oricare altul. Datele derivate (extras) rămân locale și se
+    recalculează la nevoie.
+    """
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, max_bytes: int = 512 * 1024 * 1024,
+                 max_entries: int = 1000, shared=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.shared = shared
+        self.entries: 'OrderedDict[str, StructureEntry]' = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {'ttl': 0, 'bytes': 0, 'entries': 0, 'replaced': 0}
+
+    def put(self, structure_id: str, structure: Dict[str, Any], files: List[Dict[str, Any]],
+            project_key: str) -> StructureEntry:
+        """
+        Salvează o structură, evacuând intrările cel mai puțin folosite dacă bugetul este depășit
+
+        Raises:
+            StructureTooLargeError: dacă structura singură depășește max_bytes
+        """
+        size = estimate_files_size(files)
+        if size > self.max_bytes:
+            raise StructureTooLargeError(
+                f'Structura ocupă ~{size // 1024}KB, peste limita de {self.max_bytes // 1024}KB'
+            )
+
+        entry = StructureEntry(
+            structure_id=structure_id,
+            structure=strip_structure_contents(structure),
+            files=files,
+            project_key=project_key,
+            size=size
+        )
+        self._insert(entry)
+
+        if self.shared is not None:
+            self.shared.set(structure_id, {
+                'structure': entry.structure,
+                'files': files,
+                'project_key': project_key
+            })
+        return entry
+
+    def get(self, structure_id: str) -> Optional[StructureEntry]:
+        """Returnează intrarea (și o marchează ca folosită) sau None dacă lipsește sau a expirat"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(structure_id)
+            if entry is not None and now - entry.last_access > self.ttl_seconds:
+                self._remove(structure_id, 'ttl')
+                entry = None
+            if entry is not None:
+                entry.last_access = now
+                self.entries.move_to_end(structure_id)
+                self.hits += 1
+                touch = self.shared is not None and now - entry.shared_touch > SHARED_TOUCH_INTERVAL
+                if touch:
+                    entry.shared_touch = now
+            elif self.shared is None:
+                self.misses += 1
+                return None
+
+        if entry is not None:
+            if touch:
+                self.shared.touch(structure_id)
+            return entry
+        return self._load_shared(structure_id)
+
+    def __contains__(self, structure_id: str) -> bool:
+        # Fără hit și fără mutare în LRU: verificarea este urmată de obicei de get()
+        if self._peek(structure_id) is not None:
+            return True
+        return self.shared is not None and self._load_shared(structure_id, count=False) is not None
+
+    def get_extra(self, structure_id: str, key: str) -> Any:
+        """
+        Date derivate salvate pentru structură
+
+        None dacă lipsesc sau dacă intrarea a fost evacuată între timp (și
+        odată cu ea datele derivate); apelantul le reconstruiește.
+        """
+        entry = self.get(structure_id)
+        return entry.extras.get(key) if entry else None
+
+    def set_extra(self, structure_id: str, key: str, value: Any, size: int = 0):
+        """
+        Atașează date derivate unei structuri existente
+
+        size (memoria estimată a datelor) intră în bugetul max_bytes: sunt
+        evacuate întâi alte structuri, în ordine LRU; dacă intrarea singură
+        depășește bugetul, datele derivate nu sunt păstrate (se recalculează).
+        """
+        with self.lock:
+            entry = self.entries.get(structure_id)
+            if entry is None:
+                return
+            self._drop_extra(entry, key)
+            entry.extras[key] = value
+            entry.extra_sizes[key] = size
+            entry.size += size
+            self.total_bytes += size
+            for other_id in [sid for sid in self.entries if sid != structure_id]:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self._remove(other_id, 'bytes')
+            if self.total_bytes > self.max_bytes:
+                self._drop_extra(entry, key)
+
+    def discard(self, structure_id: str):
+        with self.lock:
+            if structure_id in self.entries:
+                self._remove(structure_id, None)
+        if self.shared is not None:
+            self.shared.delete(structure_id)
+
+    def evict_expired(self) -> int:
+        """Elimină intrările nefolosite mai mult de TTL; returnează numărul lor"""
+        if self.shared is not None:
+            self.shared.evict_older_than(self.ttl_seconds)
+        with self.lock:
+            return self._evict_expired(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        """Starea store-ului și contoarele de evacuare"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': dict(self.evictions),
+                'shared': self.shared is not None
+            }
+
+    def _peek(self, structure_id: str) -> Optional[StructureEntry]:
+        """Intrarea locală neexpirată, fără a actualiza contoarele sau ordinea LRU"""
+        with self.lock:
+            entry = self.entries.get(structure_id)
+            if entry is not None and time.time() - entry.last_access > self.ttl_seconds:
+                return None
+            return entry
+
+    def _evict_expired(self, now: float) -> int:
+        # Ordinea LRU: intrările expirate sunt la început
+        expired = []
+        for structure_id, entry in self.entries.items():
+            if now - entry.last_access <= self.ttl_seconds:
+                break
+            expired.append(structure_id)
+        for structure_id in expired:
+            self._remove(structure_id, 'ttl')
+        return len(expired)
+
+    def _drop_extra(self, entry: StructureEntry, key: str):
+        entry.extras.pop(key, None)
+        size = entry.extra_sizes.pop(key, 0)
+        entry.size -= size
+        self.total_bytes -= size
+
+    def _remove(self, structure_id: str, reason: Optional[str]):
+        entry = self.entries.pop(structure_id)
+        self.total_bytes -= entry.size
+        if reason:
+            self.evictions[reason] += 1
+
+    def _insert(self, entry: StructureEntry):
+        structure_id = entry.structure_id
+        with self.lock:
+            if structure_id in self.entries:
+                self._remove(structure_id, 'replaced')
+            self.entries[structure_id] = entry
+            self.total_bytes += entry.size
+            self._evict_expired(time.time())
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                self._remove(next(iter(self.entries)), 'bytes')
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)), 'entries')
+
+    def _load_shared(self, structure_id: str, count: bool = True) -> Optional[StructureEntry]:
+        """Structura salvată de alt worker, copiată în store-ul local"""
+        record = self.shared.get(structure_id)
+        if record is None:
+            if count:
+                with self.lock:
+                    self.misses += 1
+            return None
+
+        entry = StructureEntry(
+            structure_id=structure_id,
+            structure=record['structure'],
+            files=record['files'],
+            project_key=record['project_key'],
+            size=estimate_files_size(record['files'])
+        )
+        self._insert(entry)
+        self.shared.touch(structure_id)
+        if count:
+            with self.lock:
+                self.hits += 1
+        return entry
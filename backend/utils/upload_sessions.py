@@ -0,0 +1,349 @@
+"""
+Încărcări în bucăți (chunk-uri) ale structurilor mari, cu reluare după întrerupere
+Python Forensics - Upload Sessions
+"""
+import dataclasses
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# Câte fișiere preia job-ul de analiză al unui upload la un pas
+ANALYSIS_BATCH = 64
+
+
+class UploadChunkError(Exception):
+    """Chunk respins; status este codul HTTP, next_chunk indexul așteptat de server"""
+
+    def __init__(self, message: str, status: int = 409, next_chunk: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.next_chunk = next_chunk
+
+
+def chunk_checksum(data: str) -> str:
+    """SHA-256 al datelor unui chunk, exact cum au fost trimise (text JSON, UTF-8)"""
+    return hashlib.sha256(data.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+
+@dataclass
+class UploadSession:
+    """O încărcare în curs: fișierele primite până acum și checksum-urile chunk-urilor confirmate"""
+    upload_id: str
+    root_name: str = 'root'
+    project_id: Optional[str] = None
+    structure: Optional[Dict[str, Any]] = None
+    files: List[Dict[str, Any]] = field(default_factory=list)
+    files_received: int = 0
+    checksums: List[str] = field(default_factory=list)
+    bytes_received: int = 0
+    # Fișierele (cheie de cache, sha256, nume) care așteaptă analiza în fundal
+    analysis_queue: Deque[Tuple[str, str, str]] = field(default_factory=deque)
+    # Job-ul unic care golește coada; analysis_active cât timp rulează sau așteaptă
+    analysis_job: Optional[str] = None
+    analysis_active: bool = False
+    analyzed_files: int = 0
+    # Commit în curs: fișierele au fost copiate, chunk-urile noi sunt refuzate
+    committing: bool = False
+    # Răspunsul commit-ului, returnat din nou dacă clientul repetă cererea
+    result: Optional[Dict[str, Any]] = None
+    created: float = field(default_factory=time.time)
+    last_access: float = field(default_factory=time.time)
+
+    @property
+    def next_chunk(self) -> int:
+        return len(self.checksums)
+
+    @property
+    def committed(self) -> bool:
+        return self.result is not None
+
+
+class UploadSessionStore:
+    """Sesiunile de încărcare active, limitate ca număr, bytes per sesiune și durată
+
+    Chunk-urile sunt acceptate strict în ordine; retrimiterea unui chunk deja
+    confirmat (același index și checksum) este ignorată, astfel încât clientul
+    poate relua de la next_chunk după o conexiune întreruptă.
+
+    Cu shared și shared_chunks setate (două SharedStore), sesiunile stau în
+    baza comună: antetul (checksum-uri, coada de analiză, starea commit-ului)
+    este modificat tranzacțional, iar fișierele fiecărui chunk și structura
+    sunt scrise separat, o singură dată. Chunk-urile unui upload pot fi astfel
+    trimise oricărui worker. Obiectul UploadSession primit de apelant este
+    actualizat după fiecare operație.
+    """
+
+    def __init__(self, ttl_seconds: float = 6 * 3600, max_sessions: int = 100,
+                 max_session_bytes: int = 512 * 1024 * 1024, shared=None, shared_chunks=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_session_bytes = max_session_bytes
+        self.sessions: 'OrderedDict[str, UploadSession]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.shared = shared if shared_chunks is not None else None
+        self.shared_chunks = shared_chunks if shared is not None else None
+
+    def open(self, root_name: str = 'root', project_id: Optional[str] = None,
+             structure: Optional[Dict[str, Any]] = None) -> UploadSession:
+        upload = UploadSession(
+            upload_id=uuid.uuid4().hex,
+            root_name=root_name or 'root',
+            project_id=project_id,
+            structure=structure
+        )
+        self.evict_expired()
+        if self.shared is not None:
+            if structure is not None:
+                self.shared_chunks.set(f'{upload.upload_id}:structure', structure)
+            self.shared.set(upload.upload_id, dataclasses.replace(upload, structure=None))
+            oldest = [upload_id for upload_id, _ in self.shared.items()]
+            for upload_id in oldest[:max(0, len(oldest) - self.max_sessions)]:
+                self.discard(upload_id)
+            return upload
+
+        with self.lock:
+            self.sessions[upload.upload_id] = upload
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        return upload
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        if self.shared is not None:
+            def touch(upload):
+                if upload is not None:
+                    upload.last_access = time.time()
+                return upload, upload
+            return self.shared.update(upload_id, touch)
+
+        with self.lock:
+            upload = self.sessions.get(upload_id)
+            if upload is not None:
+                self.sessions.move_to_end(upload_id)
+                upload.last_access = time.time()
+            return upload
+
+    def check(self, upload: UploadSession, index: int, checksum: str, size: int) -> bool:
+        """
+        Verifică un chunk fără a-l confirma; False dacă era deja confirmat
+
+        Permite salvarea conținutului înainte de append: un chunk confirmat
+        nu mai este acceptat la retrimitere, deci conținutul lui trebuie să
+        fie deja stocat.
+
+        Raises:
+            UploadChunkError: ca append
+        """
+        return self._apply(upload, lambda current: self._check(current, index, checksum, size), write=False)
+
+    def append(self, upload: UploadSession, index: int, checksum: str,
+               files: List[Dict[str, Any]], size: int) -> bool:
+        """
+        Adaugă fișierele chunk-ului index; False dacă chunk-ul era deja confirmat
+
+        Raises:
+            UploadChunkError: chunk în afara ordinii, checksum diferit pentru un index confirmat,
+                upload finalizat sau limita de bytes depășită
+        """
+        if self.shared is not None:
+            if not self.check(upload, index, checksum, size):
+                return False
+            # Cheia conține checksum-ul: o cerere concurentă cu alt conținut pentru
+            # același index nu poate suprascrie fișierele chunk-ului confirmat
+            self.shared_chunks.set(self._chunk_key(upload.upload_id, index, checksum), files)
+
+        def apply(current):
+            if not self._check(current, index, checksum, size):
+                return False
+            if self.shared is None:
+                current.files.extend(files)
+            current.files_received += len(files)
+            current.checksums.append(checksum)
+            current.bytes_received += size
+            current.last_access = time.time()
+            return True
+        return self._apply(upload, apply)
+
+    def _check(self, upload: UploadSession, index: int, checksum: str, size: int) -> bool:
+        if upload.committed or upload.committing:
+            raise UploadChunkError('Upload-ul a fost deja finalizat', 409, upload.next_chunk)
+        if index < upload.next_chunk:
+            if upload.checksums[index] == checksum:
+                return False
+            raise UploadChunkError(
+                f'Chunk-ul {index} a fost confirmat cu alt checksum', 409, upload.next_chunk
+            )
+        if index > upload.next_chunk:
+            raise UploadChunkError(
+                f'Chunk în afara ordinii: se așteaptă {upload.next_chunk}, primit {index}', 409, upload.next_chunk
+            )
+        if upload.bytes_received + size > self.max_session_bytes:
+            raise UploadChunkError(
+                f'Upload-ul depășește limita de {self.max_session_bytes // 1024 // 1024}MB', 413, upload.next_chunk
+            )
+        return True
+
+    def queue_analysis(self, upload: UploadSession, sources: List[Tuple[str, str, str]]) -> bool:
+        """
+        Adaugă fișiere în coada de analiză a upload-ului
+
+        Returns:
+            True dacă apelantul trebuie să pornească job-ul (niciunul nu rulează,
+            iar coada nu este goală); upload-ul este marcat atunci ca activ
+        """
+        def apply(current):
+            current.analysis_queue.extend(sources)
+            if current.analysis_active or not current.analysis_queue:
+                return False
+            current.analysis_active = True
+            return True
+        return self._apply(upload, apply)
+
+    def analysis_started(self, upload: UploadSession, job_id: str):
+        def apply(current):
+            current.analysis_job = job_id
+        self._apply(upload, apply)
+
+    def next_analysis_batch(self, upload: UploadSession, analyzed: int = 0,
+                            limit: int = ANALYSIS_BATCH) -> List[Tuple[str, str, str]]:
+        """
+        Următoarele fișiere pentru job-ul upload-ului, după ce analyzed au fost terminate
+
+        O listă goală încheie job-ul (sub același lock cu queue_analysis, deci un
+        chunk sosit între timp pornește un job nou). Upload-urile renunțate nu mai sunt analizate.
+        """
+        def apply(current):
+            current.analyzed_files += analyzed
+            batch = [current.analysis_queue.popleft() for _ in range(min(limit, len(current.analysis_queue)))]
+            if not batch:
+                current.analysis_active = False
+            return batch
+        try:
+            return self._apply(upload, apply)
+        except UploadChunkError:
+            return []
+
+    def stop_analysis(self, upload: UploadSession):
+        """Job-ul nu a pornit sau s-a oprit cu eroare; fișierele rămase se reiau la următorul chunk"""
+        def apply(current):
+            current.analysis_active = False
+        try:
+            self._apply(upload, apply)
+        except UploadChunkError:
+            pass
+
+    def begin_commit(self, upload: UploadSession, expected_chunks: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Copiază fișierele primite și blochează chunk-urile noi, atomic
+
+        Raises:
+            UploadChunkError: upload deja finalizat sau în curs de finalizare, ori
+                expected_chunks diferit de numărul de chunk-uri confirmate
+        """
+        def apply(current):
+            if current.committed or current.committing:
+                raise UploadChunkError('Upload-ul este deja finalizat sau în curs de finalizare', 409, current.next_chunk)
+            if expected_chunks is not None and expected_chunks != current.next_chunk:
+                raise UploadChunkError(
+                    f'Upload incomplet: {current.next_chunk} din {expected_chunks} chunk-uri primite',
+                    409, current.next_chunk
+                )
+            current.committing = True
+            return list(current.files)
+        files = self._apply(upload, apply)
+        if self.shared is None:
+            return files
+
+        # Chunk-urile confirmate nu se mai pot schimba după marcarea commit-ului
+        upload.structure = self.shared_chunks.get(f'{upload.upload_id}:structure')
+        for index, checksum in enumerate(upload.checksums):
+            chunk = self.shared_chunks.get(self._chunk_key(upload.upload_id, index, checksum))
+            if chunk is None:
+                self.abort_commit(upload)
+                raise UploadChunkError(f'Fișierele chunk-ului {index} nu mai sunt disponibile', 410, index)
+            files.extend(chunk)
+        return files
+
+    def abort_commit(self, upload: UploadSession):
+        """Commit eșuat: upload-ul acceptă din nou chunk-uri și commit"""
+        def apply(current):
+            current.committing = False
+        try:
+            self._apply(upload, apply)
+        except UploadChunkError:
+            pass
+
+    def commit(self, upload: UploadSession, result: Dict[str, Any]):
+        def apply(current):
+            current.result = result
+            current.committing = False
+        self._apply(upload, apply)
+
+    def discard(self, upload_id: str) -> bool:
+        if self.shared is not None:
+            removed = self.shared.update(upload_id, lambda upload: (None, upload is not None))
+            self.shared_chunks.delete_prefix(f'{upload_id}:')
+            return removed
+        with self.lock:
+            return self.sessions.pop(upload_id, None) is not None
+
+    def evict_expired(self) -> int:
+        """Șterge sesiunile neatinse de mai mult de ttl_seconds"""
+        cutoff = time.time() - self.ttl_seconds
+        if self.shared is not None:
+            expired = [upload_id for upload_id, upload in self.shared.items() if upload.last_access < cutoff]
+            for upload_id in expired:
+                self.discard(upload_id)
+            return len(expired)
+
+        with self.lock:
+            expired = [upload_id for upload_id, upload in self.sessions.items() if upload.last_access < cutoff]
+            for upload_id in expired:
+                del self.sessions[upload_id]
+            return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        if self.shared is not None:
+            uploads = [upload for _, upload in self.shared.items()]
+        else:
+            with self.lock:
+                uploads = list(self.sessions.values())
+        return {
+            'sessions': len(uploads),
+            'committed': sum(1 for upload in uploads if upload.committed),
+            'bytes_received': sum(upload.bytes_received for upload in uploads)
+        }
+
+    def _apply(self, upload: UploadSession, action: Callable[[UploadSession], Any], write: bool = True) -> Any:
+        """
+        Rulează action pe starea curentă a upload-ului, sub lock sau într-o tranzacție a bazei comune
+
+        Raises:
+            UploadChunkError: 404 dacă upload-ul a fost renunțat sau a expirat între timp
+        """
+        if self.shared is None:
+            with self.lock:
+                if self.sessions.get(upload.upload_id) is not upload:
+                    raise UploadChunkError('Upload necunoscut sau expirat', 404, upload.next_chunk)
+                return action(upload)
+
+        def apply(current):
+            if current is None:
+                raise UploadChunkError('Upload necunoscut sau expirat', 404, upload.next_chunk)
+            return current, (action(current), current)
+        if write:
+            result, current = self.shared.update(upload.upload_id, apply)
+        else:
+            current = self.shared.get(upload.upload_id)
+            result, current = apply(current)[1]
+        structure = upload.structure
+        upload.__dict__.update(current.__dict__)
+        upload.structure = structure
+        return result
+
+    @staticmethod
+    def _chunk_key(upload_id: str, index: int, checksum: str) -> str:
+        return f'{upload_id}:{index:08d}:{checksum}'
@@ -0,0 +1,7 @@
+"""
+Punct de intrare WSGI pentru Python Forensics
+Exemplu: gunicorn --workers 4 --threads 8 --worker-class gthread wsgi:app
+"""
+from app import create_app
+
+app = create_app()
@@ -11,6 +11,180 @@ let structurePreview = null;
 let processedFilesCount = 0;
 let totalFilesToProcess = 0;
 
+// Identificatorul sesiunii: editările și scriptul principal sunt păstrate per client pe server
+const SESSION_ID = sessionStorage.getItem('p4n6SessionId') || (() => {
+    const id = Date.now().toString(36) + Math.random().toString(36).slice(2, 12);
+    sessionStorage.setItem('p4n6SessionId', id);
+    return id;
+})();
+
+// Antetele comune pentru cererile către backend
+function apiHeaders() {
+    return { 'Content-Type': 'application/json', 'X-Session-Id': SESSION_ID };
+}
+
+// Marcajul pus în locul conținutului fișierelor prea mari (nu se trimite ca blob)
+const TOO_LARGE_PLACEHOLDER = '[Fișier prea mare - conținutul nu a fost încărcat automat]';
+
+// Dimensiunea aproximativă (caractere) a unei cereri /blobs
+const BLOB_BATCH_SIZE = 8 * 1024 * 1024;
+
+// SHA-256 hex al conținutului (UTF-8, ca pe server); null dacă Web Crypto nu este disponibil
+async function sha256Hex(text) {
+    if (!window.crypto || !window.crypto.subtle) return null;
+    const digest = await window.crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// Pregătește încărcarea: fișierele cu conținut sunt trimise doar prin hash, conținutul rămâne local
+async function prepareHashedUpload(files) {
+    const blobs = {};
+    const hashedFiles = [];
+    
+    for (const file of files) {
+        const content = file.content;
+        const digest = content && content !== TOO_LARGE_PLACEHOLDER ? await sha256Hex(content) : null;
+        if (!digest) {
+            // Fără Web Crypto (sau fără conținut util) se trimite ca înainte
+            hashedFiles.push(file);
+            continue;
+        }
+        
+        const { content: _, ...metadata } = file;
+        hashedFiles.push({ ...metadata, sha256: digest });
+        blobs[digest] = content;
+    }
+    
+    return { files: hashedFiles, blobs };
+}
+
+// Trimite în loturi doar conținutul pe care serverul nu îl are
+async function uploadMissingBlobs(missing, blobs) {
+    let batch = {};
+    let batchSize = 0;
+    
+    const flush = async () => {
+        if (batchSize === 0) return;
+        const response = await fetch('http://localhost:5000/blobs', {
+            method: 'POST',
+            headers: apiHeaders(),
+            body: JSON.stringify({ blobs: batch })
+        });
+        const result = await response.json();
+        if (result.status !== 'ok' || Object.keys(result.rejected || {}).length > 0) {
+            console.warn('Blob-uri respinse de server:', result.rejected || result.message);
+        }
+        batch = {};
+        batchSize = 0;
+    };
+    
+    for (const digest of missing) {
+        const content = blobs[digest];
+        if (content === undefined) continue;
+        if (batchSize > 0 && batchSize + content.length > BLOB_BATCH_SIZE) {
+            await flush();
+        }
+        batch[digest] = content;
+        batchSize += content.length;
+    }
+    await flush();
+}
+
+// Peste acest număr de fișiere structura se încarcă în chunk-uri reluabile (/uploads)
+const CHUNKED_UPLOAD_THRESHOLD = 500;
+const CHUNK_MAX_FILES = 200;
+const CHUNK_MAX_CHARS = 4 * 1024 * 1024;
+const CHUNK_RETRIES = 5;
+
+// Împarte fișierele în loturi după număr și dimensiunea conținutului
+function splitUploadChunks(files, blobs) {
+    const chunks = [];
+    let current = [];
+    let currentSize = 0;
+    
+    for (const file of files) {
+        const size = (file.sha256 && blobs[file.sha256] || '').length;
+        if (current.length > 0 && (current.length >= CHUNK_MAX_FILES || currentSize + size > CHUNK_MAX_CHARS)) {
+            chunks.push(current);
+            current = [];
+            currentSize = 0;
+        }
+        current.push(file);
+        currentSize += size;
+    }
+    if (current.length > 0) chunks.push(current);
+    return chunks;
+}
+
+// Încărcare în chunk-uri: fiecare lot este confirmat de server, iar după o eroare se reia de la ultimul confirmat
+async function uploadStructureChunked(structure, upload) {
+    const openResponse = await fetch('http://localhost:5000/uploads', {
+        method: 'POST',
+        headers: apiHeaders(),
+        body: JSON.stringify({ structure: structure })
+    });
+    const opened = await openResponse.json();
+    if (opened.status !== 'ok') return opened;
+    
+    const uploadUrl = `http://localhost:5000/uploads/${opened.upload_id}`;
+    const chunks = splitUploadChunks(upload.files, upload.blobs);
+    let index = 0;
+    let failures = 0;
+    
+    while (index < chunks.length) {
+        try {
+            // Conținutul se trimite doar pentru fișierele pe care serverul nu le are deja
+            const hashes = chunks[index].filter(f => f.sha256).map(f => f.sha256);
+            const missingResponse = await fetch('http://localhost:5000/blobs/missing', {
+                method: 'POST',
+                headers: apiHeaders(),
+                body: JSON.stringify({ hashes: hashes })
+            });
+            const missing = new Set((await missingResponse.json()).missing || []);
+            const files = chunks[index].map(f => missing.has(f.sha256) ? { ...f, content: upload.blobs[f.sha256] } : f);
+            
+            const data = JSON.stringify(files);
+            const response = await fetch(`${uploadUrl}/chunks`, {
+                method: 'POST',
+                headers: apiHeaders(),
+                body: JSON.stringify({ index: index, checksum: await sha256Hex(data), data: data })
+            });
+            const result = await response.json();
+            
+            if (result.status !== 'ok') {
+                // 409: serverul indică de unde se continuă; 422: chunk corupt, se retrimite
+                if (response.status === 409 && typeof result.next_chunk === 'number') {
+                    index = result.next_chunk;
+                    continue;
+                }
+                if (response.status !== 422 || ++failures > CHUNK_RETRIES) return result;
+                continue;
+            }
+            
+            index = result.next_chunk;
+            failures = 0;
+            showMsg(`📤 Încărcare: ${index}/${chunks.length} loturi`, "#229966");
+        } catch (error) {
+            // Conexiune întreruptă: după o pauză se întreabă serverul care este ultimul chunk confirmat
+            if (++failures > CHUNK_RETRIES) throw error;
+            await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+            try {
+                const state = await (await fetch(uploadUrl, { headers: apiHeaders() })).json();
+                if (state.status === 'ok') index = state.next_chunk;
+            } catch (_) {
+                // Se reîncearcă la următoarea iterație
+            }
+        }
+    }
+    
+    const commitResponse = await fetch(`${uploadUrl}/commit`, {
+        method: 'POST',
+        headers: apiHeaders(),
+        body: JSON.stringify({ chunks: chunks.length })
+    });
+    return commitResponse.json();
+}
+
 // Constantă pentru mărimea maximă a fișierelor (10MB)
 const MAX_FILE_SIZE = 10 * 1024 * 1024;
 
@@ -257,13 +431,14 @@ async function processSelectedFiles(files, source) {
                 if (file.size < 1024 * 1024) { // Sub 1MB
                     content = await readFileContent(file);
                 } else {
-                    content = '[Fișier prea mare - conținutul nu a fost încărcat automat]';
+                    content = TOO_LARGE_PLACEHOLDER;
                 }
                 
                 const fileData = {
                     name: file.name,
                     path: file.webkitRelativePath || file.path || file.name,
                     size: file.size,
+                    lastModified: file.lastModified,
                     type: getFileType(file.name),
                     content: content
                 };
@@ -646,21 +821,35 @@ loadDirectoryBtn.addEventListener('click', async () => {
     loadDirectoryBtn.disabled = true;
     
     try {
-        // Trimite structura la backend
-        const response = await fetch('http://localhost:5000/save_directory_structure', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                structure: detectedStructure,
-                files: detectedFiles
-            })
-        });
+        // Trimite structura fără conținut și hash-urile fișierelor; serverul răspunde cu ce îi lipsește
+        const upload = await prepareHashedUpload(detectedFiles);
+        const structure = JSON.parse(JSON.stringify(detectedStructure, (key, value) => key === 'content' ? undefined : value));
         
-        const result = await response.json();
+        let result;
+        if (upload.files.length > CHUNKED_UPLOAD_THRESHOLD && window.crypto && window.crypto.subtle) {
+            // Proiecte mari: loturi confirmate individual, analizate pe server pe măsură ce sosesc
+            result = await uploadStructureChunked(structure, upload);
+        } else {
+            const response = await fetch('http://localhost:5000/save_directory_structure', {
+                method: 'POST',
+                headers: apiHeaders(),
+                body: JSON.stringify({
+                    structure: structure,
+                    files: upload.files
+                })
+            });
+            result = await response.json();
+        }
+        
+        if (result.status === 'ok' && result.missing_blobs && result.missing_blobs.length > 0) {
+            showMsg(`📤 Se încarcă ${result.missing_blobs.length} fișiere noi sau modificate...`, "#229966");
+            await uploadMissingBlobs(result.missing_blobs, upload.blobs);
+        }
         
         if (result.status === 'ok') {
-            // Salvează ID-ul structurii
+            // Salvează ID-ul structurii (și conținutul după hash, pentru retrimiterea blob-urilor evacuate)
             window.currentStructureId = result.structure_id;
+            window.currentStructureBlobs = upload.blobs;
             window.currentDirectoryStructure = detectedStructure;
             
             // Afișează file explorer
@@ -839,13 +1028,13 @@ function renderExplorerFile(file, level, parentPath) {
 // Încarcă entry point ca script principal
 async function loadEntryPointAsMain(entryPoint) {
     try {
-        const response = await fetch('http://localhost:5000/get_file_content', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                structure_id: window.currentStructureId,
-                file_path: entryPoint.path
-            })
+        // GET: browserul revalidează cu ETag-ul primit anterior și primește 304 dacă nimic nu s-a schimbat
+        const params = new URLSearchParams({
+            structure_id: window.currentStructureId,
+            file_path: entryPoint.path
+        });
+        const response = await fetch(`http://localhost:5000/get_file_content?${params}`, {
+            headers: { 'X-Session-Id': SESSION_ID }
         });
         
         const data = await response.json();
@@ -860,8 +1049,19 @@ async function loadEntryPointAsMain(entryPoint) {
     }
 }
 
+// Retrimite blob-urile evacuate de server (409 / missing_blobs); false dacă nu le mai avem local
+async function reuploadEvictedBlobs(missing) {
+    const blobs = window.currentStructureBlobs || {};
+    if (!missing || missing.length === 0 || !missing.every(digest => blobs[digest] !== undefined)) {
+        return false;
+    }
+    showMsg(`📤 Se retrimit ${missing.length} fișiere evacuate de server...`, "#229966");
+    await uploadMissingBlobs(missing, blobs);
+    return true;
+}
+
 // Analizare structură completă
-window.analyzeDirectoryStructure = async function() {
+window.analyzeDirectoryStructure = async function(retried = false) {
     if (!window.currentStructureId) {
         showMsg('⚠️ Nu există o structură încărcată!', "#ff2929");
         return;
@@ -870,28 +1070,69 @@ window.analyzeDirectoryStructure = async function() {
     showMsg('🔍 Se analizează structura de directoare...', "#229966");
     
     try {
-        const response = await fetch('http://localhost:5000/analyze_directory', {
+        // Varianta în flux: primim progresul fișier cu fișier (NDJSON)
+        const response = await fetch('http://localhost:5000/analyze_directory/stream', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: apiHeaders(),
             body: JSON.stringify({
                 structure_id: window.currentStructureId,
+                format: 'ndjson',
+                // Detaliile per fișier vin în evenimentele 'file'; la final doar sumarul
+                summary: true,
                 options: {
                     deep_analysis: true
                 }
             })
         });
         
-        const data = await response.json();
+        if (!response.ok || !response.body) {
+            const data = await response.json();
+            if (response.status === 409 && !retried && await reuploadEvictedBlobs(data.missing_blobs)) {
+                return window.analyzeDirectoryStructure(true);
+            }
+            showMsg('❌ Eroare la analiză: ' + data.message, "#ff2929");
+            return;
+        }
+        
+        // Rezultatele parțiale sunt utilizabile înainte de finalizare
+        window.directoryAnalysisPartial = {};
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let analysis = null;
+        let missingBlobs = null;
+        
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            let newline;
+            while ((newline = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (line) {
+                    const message = JSON.parse(line);
+                    if (message.event === 'error' && message.data && message.data.missing_blobs) {
+                        missingBlobs = message.data.missing_blobs;
+                    }
+                    analysis = handleDirectoryAnalysisEvent(message) || analysis;
+                }
+            }
+        }
         
-        if (data.status === 'ok') {
-            window.directoryAnalysis = data.analysis;
+        if (missingBlobs && !retried && await reuploadEvictedBlobs(missingBlobs)) {
+            return window.analyzeDirectoryStructure(true);
+        }
+        
+        if (analysis) {
+            window.directoryAnalysis = analysis;
             
             // Afișează rezultatele analizei
-            showDirectoryAnalysisResults(data.analysis);
+            showDirectoryAnalysisResults(analysis);
             
-            showMsg(`✅ Analiză completă: ${data.analysis.files_analyzed} fișiere procesate!`, "#229966");
-        } else {
-            showMsg('❌ Eroare la analiză: ' + data.message, "#ff2929");
+            showMsg(`✅ Analiză completă: ${analysis.files_analyzed} fișiere procesate!`, "#229966");
         }
     } catch (err) {
         showMsg('❌ Eroare de comunicare cu serverul!', "#ff2929");
@@ -899,6 +1140,34 @@ window.analyzeDirectoryStructure = async function() {
     }
 };
 
+// Procesează un eveniment de progres al analizei; returnează analiza finală la 'done'
+function handleDirectoryAnalysisEvent(message) {
+    const data = message.data || {};
+    const phaseLabels = {
+        'parse': '🔍 Parsare fișiere',
+        'dependencies': '🔗 Analiză dependențe',
+        'import_graph': '🕸️ Construire graf importuri'
+    };
+    
+    switch (message.event) {
+        case 'phase':
+            showMsg(`${phaseLabels[data.phase] || data.phase}...`, "#229966");
+            break;
+        case 'file': {
+            window.directoryAnalysisPartial[data.filename] = data.analysis;
+            const percent = data.total ? Math.round((data.index / data.total) * 100) : 100;
+            showMsg(`🔍 ${percent}% - ${data.index}/${data.total} fișiere (${data.totals.total_functions} funcții, ${data.totals.total_classes} clase)`, "#229966");
+            break;
+        }
+        case 'error':
+            showMsg('❌ Eroare la analiză: ' + data.message, "#ff2929");
+            break;
+        case 'done':
+            return data.analysis;
+    }
+    return null;
+}
+
 // Afișare rezultate analiză directoare
 function showDirectoryAnalysisResults(analysis) {
     // Verifică dacă există deja un modal de analiză și îl elimină
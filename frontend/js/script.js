@@ -147,7 +147,7 @@ async function handleFileUpload(file, isMainScript = false) {
             try {
                 await fetch('http://localhost:5000/set_principal', {
                     method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
+                    headers: apiHeaders(),
                     body: JSON.stringify({ 
                         filename: numeFaraExt,
                         content: content
@@ -166,7 +166,7 @@ async function handleFileUpload(file, isMainScript = false) {
             try {
                 await fetch('http://localhost:5000/add_secundar', {
                     method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
+                    headers: apiHeaders(),
                     body: JSON.stringify({
                         filename: fileName,
                         content: content
@@ -201,7 +201,7 @@ async function analyzeScript(fileName, content, isMainScript) {
     try {
         const response = await fetch('http://localhost:5000/analyze_imports', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: apiHeaders(),
             body: JSON.stringify({ 
                 content: content,
                 filename: fileName
@@ -217,22 +217,7 @@ async function analyzeScript(fileName, content, isMainScript) {
                 container.dataset.analysis = JSON.stringify(data.analysis || {});
             }
         } else {
-            // Găsește miniatura corespunzătoare
-            const miniature = Array.from(document.querySelectorAll('.miniature'))
-                .find(m => m.querySelector('.filename').textContent === fileName);
-            
-            if (miniature && data.analysis) {
-                // Adaugă indicator pentru tipul de script
-                addScriptTypeIndicator(miniature, data.analysis.script_type);
-                
-                // Salvează analiza
-                miniature.dataset.analysis = JSON.stringify(data.analysis);
-                
-                // Verifică conexiuni
-                if (data.imports && !isMainScript && mainScriptFile) {
-                    createConnection(mainScriptFile.name, fileName, data.entities);
-                }
-            }
+            applySecondaryAnalysis(fileName, data);
         }
         
     } catch (err) {
@@ -240,6 +225,54 @@ async function analyzeScript(fileName, content, isMainScript) {
     }
 }
 
+// Aplică rezultatul analizei unui script secundar pe miniatura lui
+function applySecondaryAnalysis(fileName, data) {
+    // Găsește miniatura corespunzătoare
+    const miniature = Array.from(document.querySelectorAll('.miniature'))
+        .find(m => m.querySelector('.filename').textContent === fileName);
+    
+    if (miniature && data.analysis) {
+        // Adaugă indicator pentru tipul de script
+        addScriptTypeIndicator(miniature, data.analysis.script_type);
+        
+        // Salvează analiza
+        miniature.dataset.analysis = JSON.stringify(data.analysis);
+        
+        // Verifică conexiuni
+        if (data.imports && mainScriptFile) {
+            createConnection(mainScriptFile.name, fileName, data.entities);
+        }
+    }
+}
+
+// Analizează mai multe scripturi secundare într-o singură cerere
+async function analyzeScriptsBatch(fileNames) {
+    const files = fileNames
+        .filter(name => scriptsData.has(name))
+        .map(name => ({ filename: name, content: scriptsData.get(name) }));
+    if (files.length === 0) return;
+    
+    try {
+        const response = await fetch('http://localhost:5000/analyze_batch', {
+            method: 'POST',
+            headers: apiHeaders(),
+            body: JSON.stringify({ files: files })
+        });
+        
+        const data = await response.json();
+        if (data.status !== 'ok') {
+            console.error('Eroare la analiza în lot:', data.message);
+            return;
+        }
+        
+        for (const [fileName, result] of Object.entries(data.results || {})) {
+            applySecondaryAnalysis(fileName, result);
+        }
+    } catch (err) {
+        console.error('Eroare la analiza în lot:', err);
+    }
+}
+
 function addScriptTypeIndicator(miniature, scriptType) {
     const existing = miniature.querySelector('.script-type-indicator');
     if (existing) existing.remove();
@@ -610,7 +643,7 @@ async function saveEdit(filename) {
     try {
         const response = await fetch('http://localhost:5000/save_session_edit', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: apiHeaders(),
             body: JSON.stringify({
                 filename: filename,
                 content: content
@@ -903,7 +936,7 @@ function clearBoard() {
 
 async function checkExistingSession() {
     try {
-        const response = await fetch('http://localhost:5000/get_session_edits');
+        const response = await fetch('http://localhost:5000/get_session_edits', { headers: apiHeaders() });
         const data = await response.json();
         
         if (data.count > 0) {
@@ -918,14 +951,8 @@ async function checkExistingSession() {
 async function updateConnectionsAfterEdit(filename) {
     // Re-verifică conexiunile după editare
     if (filename === mainScriptFile?.name) {
-        // Dacă s-a editat scriptul principal, re-analizează toate conexiunile
-        for (const mini of miniatures) {
-            const secondaryFile = mini.dataset.filename;
-            const content = scriptsData.get(secondaryFile);
-            if (content) {
-                await analyzeScript(secondaryFile, content, false);
-            }
-        }
+        // Dacă s-a editat scriptul principal, re-analizează toate conexiunile într-o singură cerere
+        await analyzeScriptsBatch(miniatures.map(mini => mini.dataset.filename));
     } else {
         // Dacă s-a editat un script secundar, verifică doar conexiunea lui
         const content = scriptsData.get(filename);
@@ -984,20 +1011,14 @@ document.getElementById('exportWorkflow').onclick = async () => {
             };
         }
         
-        // Trimite la backend pentru generare
-        const response = await fetch('http://localhost:5000/generate_workflow', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(projectData)
-        });
-        
-        const result = await response.json();
+        // Trimite la backend ca job (cererea nu rămâne deschisă pe durata generării)
+        const job = await runJob({ type: 'generate_workflow', ...projectData });
         
-        if (result.status === 'ok') {
+        if (job.state === 'done') {
             // Afișează workflow-ul în modal
-            showWorkflowModal(result.workflow);
+            showWorkflowModal(job.result.workflow);
         } else {
-            showMsg('❌ ' + (result.message || 'Eroare la generarea workflow'), "#ff2929");
+            showMsg('❌ ' + (job.error || job.message || 'Eroare la generarea workflow'), "#ff2929");
         }
         
     } catch (err) {
@@ -1006,6 +1027,25 @@ document.getElementById('exportWorkflow').onclick = async () => {
     }
 };
 
+// Pornește un job pe backend și așteaptă încheierea lui (starea finală a job-ului)
+async function runJob(payload, pollInterval = 1000) {
+    const response = await fetch('http://localhost:5000/jobs', {
+        method: 'POST',
+        headers: apiHeaders(),
+        body: JSON.stringify(payload)
+    });
+    let job = await response.json();
+    if (job.status !== 'ok') return job;
+    
+    while (job.state === 'queued' || job.state === 'running') {
+        await new Promise(resolve => setTimeout(resolve, pollInterval));
+        const poll = await fetch(`http://localhost:5000/jobs/${job.job_id}`, { headers: apiHeaders() });
+        job = await poll.json();
+        if (job.status !== 'ok') break;
+    }
+    return job;
+}
+
 function calculateCouplingScore() {
     const totalPossible = miniatures.length * (miniatures.length - 1);
     const actualConnections = connections.length;
@@ -1069,7 +1109,7 @@ document.addEventListener('DOMContentLoaded', function() {
             try {
                 const response = await fetch('http://localhost:5000/export_pdf', {
                     method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
+                    headers: apiHeaders(),
                     body: JSON.stringify({
                         content: workflowContent,
                         title: 'Python Forensics - Analiză Workflow'